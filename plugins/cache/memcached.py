@@ -44,9 +44,49 @@ DOCUMENTATION = '''
           - key: fact_caching_timeout
             section: defaults
         type: integer
+      _write_behind:
+        description:
+          - Buffer the facts written to the cache and send them with one C(set_multi) request per batch.
+          - Batches are sent when O(_flush_size) hosts are buffered, when O(_flush_interval) seconds passed since the last batch, and when the process exits.
+          - Additions to the keyset are appended to a journal entry instead of rewriting the whole keyset for every host.
+            The keyset is only rewritten when the journal grows larger than the keyset itself.
+          - All controllers sharing the cache should use the same value for this option.
+        default: false
+        type: bool
+        env:
+          - name: ANSIBLE_CACHE_MEMCACHED_WRITE_BEHIND
+        ini:
+          - key: fact_caching_memcached_write_behind
+            section: defaults
+        version_added: 8.2.0
+      _flush_size:
+        description:
+          - Number of buffered hosts after which a batch is sent when O(_write_behind=true).
+          - Also the maximum number of keys fetched by one C(get_multi) request.
+        default: 100
+        type: integer
+        env:
+          - name: ANSIBLE_CACHE_MEMCACHED_FLUSH_SIZE
+        ini:
+          - key: fact_caching_memcached_flush_size
+            section: defaults
+        version_added: 8.2.0
+      _flush_interval:
+        description:
+          - Maximum age in seconds of the oldest buffered host before a batch is sent when O(_write_behind=true).
+        default: 5
+        type: float
+        env:
+          - name: ANSIBLE_CACHE_MEMCACHED_FLUSH_INTERVAL
+        ini:
+          - key: fact_caching_memcached_flush_interval
+            section: defaults
+        version_added: 8.2.0
 '''
 
+import atexit
 import collections
+import json
 import os
 import time
 from multiprocessing import Lock
@@ -138,12 +178,32 @@ class CacheModuleKeys(MutableSet):
     """
     A set subclass that keeps track of insertion time and persists
     the set in memcached.
+
+    With ``journal`` enabled, additions are buffered and appended to a
+    separate journal entry by ``persist()``, so inserting a key does not
+    rewrite the whole set. The journal is merged back into the set once it
+    grows larger than the set itself.
     """
     PREFIX = 'ansible_cache_keys'
+    JOURNAL = 'ansible_cache_keys_journal'
 
     def __init__(self, cache, *args, **kwargs):
+        self._journal = kwargs.pop('journal', False)
         self._cache = cache
         self._keyset = dict(*args, **kwargs)
+        self._pending = {}
+        self._journal_len = 0
+        if self._journal:
+            self._load_journal()
+
+    def _load_journal(self):
+        for line in (self._cache.get(self.JOURNAL) or '').splitlines():
+            try:
+                key, timestamp = json.loads(line)
+            except ValueError:
+                continue
+            self._keyset[key] = timestamp
+            self._journal_len += 1
 
     def __contains__(self, key):
         return key in self._keyset
@@ -156,18 +216,47 @@ class CacheModuleKeys(MutableSet):
 
     def add(self, value):
         self._keyset[value] = time.time()
-        self._cache.set(self.PREFIX, self._keyset)
+        if self._journal:
+            self._pending[value] = self._keyset[value]
+        else:
+            self._cache.set(self.PREFIX, self._keyset)
 
     def discard(self, value):
         del self._keyset[value]
-        self._cache.set(self.PREFIX, self._keyset)
+        self._pending.pop(value, None)
+        self._compact()
 
     def remove_by_timerange(self, s_min, s_max):
+        removed = False
         for k in list(self._keyset.keys()):
             t = self._keyset[k]
             if s_min < t < s_max:
                 del self._keyset[k]
+                self._pending.pop(k, None)
+                removed = True
+        if removed or not self._journal:
+            self._compact()
+
+    def _compact(self):
         self._cache.set(self.PREFIX, self._keyset)
+        if self._journal:
+            self._cache.delete(self.JOURNAL)
+            self._journal_len = 0
+            self._pending = {}
+
+    def persist(self):
+        if not self._pending:
+            return
+        if self._journal_len + len(self._pending) > len(self._keyset):
+            self._compact()
+            return
+        data = ''.join(json.dumps([key, timestamp]) + '\n' for key, timestamp in self._pending.items())
+        # append only works on existing entries, add only on missing ones
+        if not self._cache.append(self.JOURNAL, data) and not self._cache.add(self.JOURNAL, data):
+            self._compact()
+            return
+        self._journal_len += len(self._pending)
+        self._pending = {}
 
 
 class CacheModule(BaseCacheModule):
@@ -180,13 +269,21 @@ class CacheModule(BaseCacheModule):
             connection = self.get_option('_uri')
         self._timeout = self.get_option('_timeout')
         self._prefix = self.get_option('_prefix')
+        self._write_behind = self.get_option('_write_behind')
+        self._flush_size = max(1, self.get_option('_flush_size'))
+        self._flush_interval = self.get_option('_flush_interval')
 
         if not HAS_MEMCACHE:
             raise AnsibleError("python-memcached is required for the memcached fact cache")
 
         self._cache = {}
+        self._pending = {}
+        self._last_flush = time.time()
+        self._pid = os.getpid()
         self._db = ProxyClientPool(connection, debug=0)
-        self._keys = CacheModuleKeys(self._db, self._db.get(CacheModuleKeys.PREFIX) or [])
+        self._keys = CacheModuleKeys(self._db, self._db.get(CacheModuleKeys.PREFIX) or [], journal=self._write_behind)
+        if self._write_behind:
+            atexit.register(self._flush_pending)
 
     def _make_key(self, key):
         return "{0}{1}".format(self._prefix, key)
@@ -196,6 +293,23 @@ class CacheModule(BaseCacheModule):
             expiry_age = time.time() - self._timeout
             self._keys.remove_by_timerange(0, expiry_age)
 
+    def _flush_pending(self):
+        # forked workers inherit the buffer, only the process owning it writes it out
+        if os.getpid() != self._pid:
+            return
+        if self._pending:
+            self._db.set_multi(self._pending, time=self._timeout, key_prefix=self._prefix, min_compress_len=1)
+            self._pending = {}
+        self._keys.persist()
+        self._last_flush = time.time()
+
+    def _prefetch(self, keys):
+        missing = [key for key in keys if key not in self._cache]
+        for start in range(0, len(missing), self._flush_size):
+            chunk = missing[start:start + self._flush_size]
+            # key_prefix makes get_multi return the results keyed by the unprefixed keys
+            self._cache.update(self._db.get_multi(chunk, key_prefix=self._prefix))
+
     def get(self, key):
         if key not in self._cache:
             value = self._db.get(self._make_key(key))
@@ -210,20 +324,28 @@ class CacheModule(BaseCacheModule):
         return self._cache.get(key)
 
     def set(self, key, value):
-        self._db.set(self._make_key(key), value, time=self._timeout, min_compress_len=1)
+        if self._write_behind:
+            self._pending[key] = value
+        else:
+            self._db.set(self._make_key(key), value, time=self._timeout, min_compress_len=1)
         self._cache[key] = value
         self._keys.add(key)
+        if self._write_behind and (len(self._pending) >= self._flush_size or time.time() - self._last_flush >= self._flush_interval):
+            self._flush_pending()
 
     def keys(self):
         self._expire_keys()
-        return list(iter(self._keys))
+        keys = list(iter(self._keys))
+        self._prefetch(keys)
+        return keys
 
     def contains(self, key):
         self._expire_keys()
         return key in self._keys
 
     def delete(self, key):
-        del self._cache[key]
+        self._pending.pop(key, None)
+        self._cache.pop(key, None)
         self._db.delete(self._make_key(key))
         self._keys.discard(key)
 
@@ -232,7 +354,8 @@ class CacheModule(BaseCacheModule):
             self.delete(key)
 
     def copy(self):
-        return self._keys.copy()
+        keys = self.keys()
+        return dict((key, self._cache[key]) for key in keys if key in self._cache)
 
     def __getstate__(self):
         return dict()
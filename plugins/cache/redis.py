@@ -61,14 +61,67 @@ DOCUMENTATION = '''
           - key: fact_caching_timeout
             section: defaults
         type: integer
+      _compact:
+        description:
+          - Store the facts as compact JSON without indentation and key sorting.
+          - Existing entries written in the indented format can still be read.
+        default: false
+        type: bool
+        env:
+          - name: ANSIBLE_CACHE_REDIS_COMPACT
+        ini:
+          - key: fact_caching_redis_compact
+            section: defaults
+        version_added: 8.2.0
+      _compression:
+        description:
+          - Compress the stored JSON payloads.
+          - V(zstd) requires the C(zstandard) python library.
+          - Entries are read back regardless of the compression they were written with.
+        default: none
+        choices:
+          - none
+          - zlib
+          - zstd
+        type: str
+        env:
+          - name: ANSIBLE_CACHE_REDIS_COMPRESSION
+        ini:
+          - key: fact_caching_redis_compression
+            section: defaults
+        version_added: 8.2.0
+      _pipeline:
+        description:
+          - Send the value and keyset updates of a host in a single pipelined transaction instead of separate round trips.
+          - When enabled, the first lookup of an uncached host loads all cached hosts at once with C(MGET) requests of O(_batch_size) keys.
+        default: false
+        type: bool
+        env:
+          - name: ANSIBLE_CACHE_REDIS_PIPELINE
+        ini:
+          - key: fact_caching_redis_pipeline
+            section: defaults
+        version_added: 8.2.0
+      _batch_size:
+        description:
+          - Maximum number of keys fetched by a single C(MGET) request when loading several hosts at once.
+        default: 1000
+        type: integer
+        env:
+          - name: ANSIBLE_CACHE_REDIS_BATCH_SIZE
+        ini:
+          - key: fact_caching_redis_batch_size
+            section: defaults
+        version_added: 8.2.0
 '''
 
 import re
 import time
 import json
+import zlib
 
 from ansible.errors import AnsibleError
-from ansible.module_utils.common.text.converters import to_native
+from ansible.module_utils.common.text.converters import to_bytes, to_native, to_text
 from ansible.parsing.ajson import AnsibleJSONEncoder, AnsibleJSONDecoder
 from ansible.plugins.cache import BaseCacheModule
 from ansible.utils.display import Display
@@ -79,6 +132,12 @@ try:
 except ImportError:
     HAS_REDIS = False
 
+try:
+    import zstandard
+    HAS_ZSTANDARD = True
+except ImportError:
+    HAS_ZSTANDARD = False
+
 display = Display()
 
 
@@ -94,6 +153,7 @@ class CacheModule(BaseCacheModule):
     _sentinel_service_name = None
     re_url_conn = re.compile(r'^([^:]+|\[[^]]+\]):(\d+):(\d+)(?::(.*))?$')
     re_sent_conn = re.compile(r'^(.*):(\d+)$')
+    zstd_magic = b'\x28\xb5\x2f\xfd'
 
     def __init__(self, *args, **kwargs):
         uri = ''
@@ -105,11 +165,18 @@ class CacheModule(BaseCacheModule):
         self._prefix = self.get_option('_prefix')
         self._keys_set = self.get_option('_keyset_name')
         self._sentinel_service_name = self.get_option('_sentinel_service_name')
+        self._compact = self.get_option('_compact')
+        self._compression = self.get_option('_compression')
+        self._pipeline = self.get_option('_pipeline')
+        self._batch_size = max(1, int(self.get_option('_batch_size')))
 
         if not HAS_REDIS:
             raise AnsibleError("The 'redis' python module (version 2.4.5 or newer) is required for the redis fact cache, 'pip install redis'")
+        if self._compression == 'zstd' and not HAS_ZSTANDARD:
+            raise AnsibleError("The 'zstandard' python module is required for zstd compression in the redis fact cache, 'pip install zstandard'")
 
         self._cache = {}
+        self._warmed_up = False
         kw = {}
 
         # tls connection
@@ -169,8 +236,65 @@ class CacheModule(BaseCacheModule):
     def _make_key(self, key):
         return self._prefix + key
 
+    def _encode(self, value):
+        if self._compact:
+            data = json.dumps(value, cls=AnsibleJSONEncoder, separators=(',', ':'))
+        else:
+            data = json.dumps(value, cls=AnsibleJSONEncoder, sort_keys=True, indent=4)
+
+        if self._compression == 'zlib':
+            return zlib.compress(to_bytes(data))
+        if self._compression == 'zstd':
+            return zstandard.ZstdCompressor().compress(to_bytes(data))
+        return data
+
+    def _decode(self, value):
+        # the payload format is detected from the data itself, so entries
+        # written with other compression settings can still be read
+        if isinstance(value, bytes):
+            if value.startswith(self.zstd_magic):
+                if not HAS_ZSTANDARD:
+                    raise AnsibleError("The 'zstandard' python module is required to read zstd compressed entries from the redis fact cache")
+                value = zstandard.ZstdDecompressor().decompress(value)
+            elif value[:1] == b'x':
+                value = zlib.decompress(value)
+        return json.loads(to_text(value), cls=AnsibleJSONDecoder)
+
+    def _zadd(self, db, key):
+        if VERSION[0] == 2:
+            db.zadd(self._keys_set, time.time(), key)
+        else:
+            db.zadd(self._keys_set, {key: time.time()})
+
+    def _get_multi(self, keys):
+        """
+        fetch and decode the given keys with chunked MGET requests,
+        returns the found entries and the keys missing from the DB
+        """
+        found = {}
+        missing = []
+        keys = [to_text(key) for key in keys]
+        for start in range(0, len(keys), self._batch_size):
+            chunk = keys[start:start + self._batch_size]
+            values = self._db.mget([self._make_key(key) for key in chunk])
+            for key, value in zip(chunk, values):
+                if value is None:
+                    missing.append(key)
+                else:
+                    found[key] = self._decode(value)
+        return found, missing
+
+    def _warm_up(self):
+        self._warmed_up = True
+        keys = [key for key in self.keys() if to_text(key) not in self._cache]
+        found, dummy = self._get_multi(keys)
+        self._cache.update(found)
+
     def get(self, key):
 
+        if key not in self._cache and self._pipeline and not self._warmed_up:
+            self._warm_up()
+
         if key not in self._cache:
             value = self._db.get(self._make_key(key))
             # guard against the key not being removed from the zset;
@@ -179,22 +303,22 @@ class CacheModule(BaseCacheModule):
             if value is None:
                 self.delete(key)
                 raise KeyError
-            self._cache[key] = json.loads(value, cls=AnsibleJSONDecoder)
+            self._cache[key] = self._decode(value)
 
         return self._cache.get(key)
 
     def set(self, key, value):
 
-        value2 = json.dumps(value, cls=AnsibleJSONEncoder, sort_keys=True, indent=4)
+        value2 = self._encode(value)
+        db = self._db.pipeline(transaction=True) if self._pipeline else self._db
         if self._timeout > 0:  # a timeout of 0 is handled as meaning 'never expire'
-            self._db.setex(self._make_key(key), int(self._timeout), value2)
+            db.setex(self._make_key(key), int(self._timeout), value2)
         else:
-            self._db.set(self._make_key(key), value2)
+            db.set(self._make_key(key), value2)
 
-        if VERSION[0] == 2:
-            self._db.zadd(self._keys_set, time.time(), key)
-        else:
-            self._db.zadd(self._keys_set, {key: time.time()})
+        self._zadd(db, key)
+        if self._pipeline:
+            db.execute()
         self._cache[key] = value
 
     def _expire_keys(self):
@@ -213,16 +337,27 @@ class CacheModule(BaseCacheModule):
     def delete(self, key):
         if key in self._cache:
             del self._cache[key]
-        self._db.delete(self._make_key(key))
-        self._db.zrem(self._keys_set, key)
+        if self._pipeline:
+            pipe = self._db.pipeline(transaction=True)
+            pipe.delete(self._make_key(key))
+            pipe.zrem(self._keys_set, key)
+            pipe.execute()
+        else:
+            self._db.delete(self._make_key(key))
+            self._db.zrem(self._keys_set, key)
 
     def flush(self):
         for key in list(self.keys()):
             self.delete(key)
 
     def copy(self):
-        # TODO: there is probably a better way to do this in redis
-        ret = dict([(k, self.get(k)) for k in self.keys()])
+        if not self._pipeline:
+            return dict([(k, self.get(k)) for k in self.keys()])
+
+        ret, missing = self._get_multi(self.keys())
+        # same guard as in get(), but removing the stale keyset entries in one go
+        if missing:
+            self._db.zrem(self._keys_set, *missing)
         return ret
 
     def __getstate__(self):
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    author: Unknown (!UNKNOWN)
+    name: sqlite
+    short_description: Use a single SQLite database file for cache
+    version_added: 8.2.0
+    description:
+        - This cache stores compressed JSON formatted, per host records in a single SQLite database file.
+        - Unlike the file based cache plugins, loading the cache does not open and parse one file per host.
+          All records are read with a single query the first time a host is looked up, and each record is
+          only decoded when the host is accessed.
+        - Writes are atomic, and expired records are removed and the database file compacted when the plugin is loaded.
+    options:
+      _uri:
+        required: true
+        description:
+          - Path of the directory in which the cache plugin will create the database file.
+        env:
+          - name: ANSIBLE_CACHE_PLUGIN_CONNECTION
+        ini:
+          - key: fact_caching_connection
+            section: defaults
+        type: path
+      _prefix:
+        description: User defined prefix to use when creating the DB entries.
+        default: ''
+        env:
+          - name: ANSIBLE_CACHE_PLUGIN_PREFIX
+        ini:
+          - key: fact_caching_prefix
+            section: defaults
+      _timeout:
+        default: 86400
+        description: Expiration timeout in seconds for the cache plugin data. Set to 0 to never expire.
+        env:
+          - name: ANSIBLE_CACHE_PLUGIN_TIMEOUT
+        ini:
+          - key: fact_caching_timeout
+            section: defaults
+        type: integer
+      _db_name:
+        description: Name of the database file created in O(_uri).
+        default: ansible_facts.sqlite
+        env:
+          - name: ANSIBLE_CACHE_SQLITE_DB_NAME
+        ini:
+          - key: fact_caching_sqlite_db_name
+            section: defaults
+'''
+
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+from ansible.errors import AnsibleError
+from ansible.module_utils.common.text.converters import to_bytes, to_native, to_text
+from ansible.parsing.ajson import AnsibleJSONEncoder, AnsibleJSONDecoder
+from ansible.plugins.cache import BaseCacheModule
+from ansible.utils.display import Display
+
+display = Display()
+
+
+class CacheModule(BaseCacheModule):
+    """
+    A caching module backed by a SQLite database file.
+
+    Records are loaded in bulk but kept compressed until a host is accessed,
+    so hosts that are never looked up are never decoded.
+    """
+
+    # compact the database file when more than this fraction of its pages is unused
+    compact_ratio = 0.5
+
+    def __init__(self, *args, **kwargs):
+        super(CacheModule, self).__init__(*args, **kwargs)
+        self._timeout = float(self.get_option('_timeout'))
+        self._prefix = self.get_option('_prefix') or ''
+
+        uri = self.get_option('_uri')
+        if not uri:
+            raise AnsibleError("error, '%s' cache plugin requires the 'fact_caching_connection' config option "
+                               "to be set (to a writeable directory path)" % self.plugin_name)
+        if not os.path.exists(uri):
+            try:
+                os.makedirs(uri)
+            except (OSError, IOError) as e:
+                raise AnsibleError("error in '%s' cache plugin while trying to create cache dir %s : %s" % (self.plugin_name, uri, to_native(e)))
+        self._path = os.path.join(uri, self.get_option('_db_name'))
+
+        self._cache = {}
+        self._raw = None
+        self._conn = None
+        self._pid = None
+
+        self._setup()
+
+    def _get_conn(self):
+        # connections must not be shared with forked processes
+        if self._conn is None or self._pid != os.getpid():
+            try:
+                self._conn = sqlite3.connect(self._path, timeout=30, isolation_level=None)
+            except sqlite3.Error as e:
+                raise AnsibleError("error in '%s' cache plugin while trying to open %s : %s" % (self.plugin_name, self._path, to_native(e)))
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._pid = os.getpid()
+        return self._conn
+
+    def _execute(self, query, *args):
+        try:
+            return self._get_conn().execute(query, args)
+        except sqlite3.Error as e:
+            raise AnsibleError("error in '%s' cache plugin while accessing %s : %s" % (self.plugin_name, self._path, to_native(e)))
+
+    def _setup(self):
+        self._execute('CREATE TABLE IF NOT EXISTS facts (prefix TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, '
+                      'updated REAL NOT NULL, PRIMARY KEY (prefix, key))')
+        self._execute('CREATE INDEX IF NOT EXISTS facts_updated ON facts (updated)')
+        if self._timeout > 0:
+            self._execute('DELETE FROM facts WHERE updated < ?', time.time() - self._timeout)
+        self._compact()
+
+    def _compact(self):
+        page_count = self._execute('PRAGMA page_count').fetchone()[0]
+        freelist_count = self._execute('PRAGMA freelist_count').fetchone()[0]
+        if page_count and freelist_count > page_count * self.compact_ratio:
+            # VACUUM rebuilds the file in a single transaction
+            display.vv('Compacting fact cache database %s' % self._path)
+            self._execute('VACUUM')
+
+    def _expiry_age(self):
+        if self._timeout > 0:
+            return time.time() - self._timeout
+        return 0
+
+    @staticmethod
+    def _encode(value):
+        return zlib.compress(to_bytes(json.dumps(value, cls=AnsibleJSONEncoder, separators=(',', ':'))), 1)
+
+    @staticmethod
+    def _decode(value):
+        return json.loads(to_text(zlib.decompress(value)), cls=AnsibleJSONDecoder)
+
+    def _load_raw(self):
+        rows = self._execute('SELECT key, value FROM facts WHERE prefix = ? AND updated >= ?', self._prefix, self._expiry_age())
+        self._raw = dict((key, value) for key, value in rows if key not in self._cache)
+
+    def get(self, key):
+        if key not in self._cache:
+            if self._raw is None:
+                self._load_raw()
+            value = self._raw.pop(key, None)
+            if value is None:
+                # written by another process since the records were loaded
+                row = self._execute('SELECT value FROM facts WHERE prefix = ? AND key = ? AND updated >= ?',
+                                    self._prefix, key, self._expiry_age()).fetchone()
+                if row is None:
+                    raise KeyError
+                value = row[0]
+            self._cache[key] = self._decode(value)
+
+        return self._cache.get(key)
+
+    def set(self, key, value):
+        self._execute('INSERT OR REPLACE INTO facts (prefix, key, value, updated) VALUES (?, ?, ?, ?)',
+                      self._prefix, key, sqlite3.Binary(self._encode(value)), time.time())
+        self._cache[key] = value
+        if self._raw is not None:
+            self._raw.pop(key, None)
+
+    def keys(self):
+        rows = self._execute('SELECT key FROM facts WHERE prefix = ? AND updated >= ?', self._prefix, self._expiry_age())
+        return [row[0] for row in rows]
+
+    def contains(self, key):
+        row = self._execute('SELECT 1 FROM facts WHERE prefix = ? AND key = ? AND updated >= ?', self._prefix, key, self._expiry_age()).fetchone()
+        return row is not None
+
+    def delete(self, key):
+        self._cache.pop(key, None)
+        if self._raw is not None:
+            self._raw.pop(key, None)
+        self._execute('DELETE FROM facts WHERE prefix = ? AND key = ?', self._prefix, key)
+
+    def flush(self):
+        self._cache = {}
+        self._raw = {}
+        self._execute('DELETE FROM facts WHERE prefix = ?', self._prefix)
+        self._compact()
+
+    def copy(self):
+        ret = dict()
+        for key in self.keys():
+            try:
+                ret[key] = self.get(key)
+            except KeyError:
+                pass
+        return ret
+
+    def __getstate__(self):
+        return dict()
+
+    def __setstate__(self, data):
+        self.__init__()
@@ -26,12 +26,70 @@ DOCUMENTATION = '''
         ini:
           - section: callback_log_plays
             key: log_folder
+      max_open_files:
+        description:
+          - Number of log files kept open between events, the least recently used files are closed first.
+          - Writes to open files are buffered and written out every O(flush_interval) seconds and at the end of the playbook run.
+          - When set to V(0), every event opens, writes and closes the log file of its host.
+        default: 0
+        type: int
+        env:
+          - name: ANSIBLE_LOG_PLAYS_MAX_OPEN_FILES
+        ini:
+          - section: callback_log_plays
+            key: max_open_files
+        version_added: 8.2.0
+      flush_interval:
+        description:
+          - Maximum time in seconds buffered events are kept before they are written to the log files when O(max_open_files) is set.
+        default: 5
+        type: float
+        env:
+          - name: ANSIBLE_LOG_PLAYS_FLUSH_INTERVAL
+        ini:
+          - section: callback_log_plays
+            key: flush_interval
+        version_added: 8.2.0
+      format:
+        description:
+          - Format of the log entries.
+          - V(text) writes the human readable format used by earlier versions.
+          - V(jsonl) writes one JSON object per line, with the keys C(timestamp), C(playbook), C(task_name), C(task_action),
+            C(category), C(invocation) and C(result).
+        default: text
+        type: str
+        choices:
+          - text
+          - jsonl
+        env:
+          - name: ANSIBLE_LOG_PLAYS_FORMAT
+        ini:
+          - section: callback_log_plays
+            key: format
+        version_added: 8.2.0
+      rotate_size:
+        description:
+          - When a log file grows larger than this size in bytes, it is compressed with gzip into C(<host>.<timestamp>.gz) and a new log file is started.
+          - Set to V(0) to never rotate the log files.
+        default: 0
+        type: int
+        env:
+          - name: ANSIBLE_LOG_PLAYS_ROTATE_SIZE
+        ini:
+          - section: callback_log_plays
+            key: rotate_size
+        version_added: 8.2.0
 '''
 
+import atexit
+import gzip
 import os
+import shutil
 import time
 import json
 
+from collections import OrderedDict
+
 from ansible.utils.path import makedirs_safe
 from ansible.module_utils.common.text.converters import to_bytes
 from ansible.module_utils.common._collections_compat import MutableMapping
@@ -46,6 +104,63 @@ from ansible.plugins.callback import CallbackBase
 # that want it.
 
 
+class LogFilePool(object):
+    """
+    Appends to log files, keeping up to ``max_open`` of them open with
+    buffered writes and closing the least recently used ones first.
+    """
+    BUFSIZE = 64 * 1024
+
+    def __init__(self, max_open=0, rotate_size=0):
+        self.max_open = max_open
+        self.rotate_size = rotate_size
+        # path -> [file object, size]
+        self._files = OrderedDict()
+
+    def write(self, path, data):
+        if not self.max_open:
+            with open(path, 'ab') as fd:
+                fd.write(data)
+                size = fd.tell()
+        else:
+            entry = self._files.pop(path, None)
+            if entry is None:
+                if len(self._files) >= self.max_open:
+                    self._files.popitem(last=False)[1][0].close()
+                fd = open(path, 'ab', self.BUFSIZE)
+                entry = [fd, fd.tell()]
+            # re-inserting keeps the most recently used files at the end
+            self._files[path] = entry
+            entry[0].write(data)
+            entry[1] += len(data)
+            size = entry[1]
+
+        if self.rotate_size and size >= self.rotate_size:
+            self.rotate(path)
+
+    def rotate(self, path):
+        entry = self._files.pop(path, None)
+        if entry is not None:
+            entry[0].close()
+        target = '%s.%s.gz' % (path, time.strftime('%Y%m%d%H%M%S'))
+        count = 1
+        while os.path.exists(target):
+            target = '%s.%s-%d.gz' % (path, time.strftime('%Y%m%d%H%M%S'), count)
+            count += 1
+        with open(path, 'rb') as src:
+            with gzip.open(target, 'wb') as dst:
+                shutil.copyfileobj(src, dst, self.BUFSIZE)
+        os.remove(path)
+
+    def flush(self):
+        for fd, dummy in self._files.values():
+            fd.flush()
+
+    def close(self):
+        while self._files:
+            self._files.popitem()[1][0].close()
+
+
 class CallbackModule(CallbackBase):
     """
     logs playbook results, per host, in /var/log/ansible/hosts
@@ -61,6 +176,8 @@ class CallbackModule(CallbackBase):
     def __init__(self):
 
         super(CallbackModule, self).__init__()
+        self.files = None
+        self.last_flush = time.time()
 
     def set_options(self, task_keys=None, var_options=None, direct=None):
         super(CallbackModule, self).set_options(task_keys=task_keys, var_options=var_options, direct=direct)
@@ -70,7 +187,46 @@ class CallbackModule(CallbackBase):
         if not os.path.exists(self.log_folder):
             makedirs_safe(self.log_folder)
 
+        self.format = self.get_option('format')
+        self.flush_interval = self.get_option('flush_interval')
+        if self.files is None:
+            self.files = LogFilePool(self.get_option('max_open_files'), self.get_option('rotate_size'))
+            atexit.register(self.files.close)
+
+    def _jsonl(self, result, category):
+        data = result._result
+        invocation = None
+        if isinstance(data, MutableMapping):
+            if '_ansible_verbose_override' in data:
+                # avoid logging extraneous data
+                data = 'omitted'
+            else:
+                data = data.copy()
+                invocation = data.pop('invocation', None)
+
+        return json.dumps(dict(
+            timestamp=time.strftime(self.TIME_FORMAT, time.localtime()),
+            playbook=self.playbook,
+            task_name=result._task.name,
+            task_action=result._task.action,
+            category=category,
+            invocation=invocation,
+            result=data,
+        ), cls=AnsibleJSONEncoder) + '\n'
+
     def log(self, result, category):
+        path = os.path.join(self.log_folder, result._host.get_name())
+
+        if self.format == 'jsonl':
+            self.files.write(path, to_bytes(self._jsonl(result, category)))
+        else:
+            self.files.write(path, self._text(result, category))
+
+        if self.files.max_open and time.time() - self.last_flush >= self.flush_interval:
+            self.files.flush()
+            self.last_flush = time.time()
+
+    def _text(self, result, category):
         data = result._result
         if isinstance(data, MutableMapping):
             if '_ansible_verbose_override' in data:
@@ -83,10 +239,9 @@ class CallbackModule(CallbackBase):
                 if invocation is not None:
                     data = json.dumps(invocation) + " => %s " % data
 
-        path = os.path.join(self.log_folder, result._host.get_name())
         now = time.strftime(self.TIME_FORMAT, time.localtime())
 
-        msg = to_bytes(
+        return to_bytes(
             self.MSG_FORMAT
             % dict(
                 now=now,
@@ -97,8 +252,6 @@ class CallbackModule(CallbackBase):
                 data=data,
             )
         )
-        with open(path, "ab") as fd:
-            fd.write(msg)
 
     def v2_runner_on_failed(self, result, ignore_errors=False):
         self.log(result, 'FAILED')
@@ -123,3 +276,6 @@ class CallbackModule(CallbackBase):
 
     def v2_playbook_on_not_import_for_host(self, result, missing_file):
         self.log(result, 'NOTIMPORTED', missing_file)
+
+    def v2_playbook_on_stats(self, stats):
+        self.files.close()
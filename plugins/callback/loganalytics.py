@@ -35,6 +35,93 @@ DOCUMENTATION = '''
         ini:
           - section: callback_loganalytics
             key: shared_key
+      background_send:
+        description:
+          - Send the events from a background thread instead of blocking the playbook run for every event.
+          - Several events are sent in a single request.
+          - Events still queued are sent when the playbook run ends.
+        env:
+          - name: LOGANALYTICS_BACKGROUND_SEND
+        ini:
+          - section: callback_loganalytics
+            key: background_send
+        type: bool
+        default: false
+        version_added: 8.2.0
+      max_events_per_request:
+        description:
+          - Maximum number of events sent in a single request when O(background_send=true).
+        env:
+          - name: LOGANALYTICS_MAX_EVENTS_PER_REQUEST
+        ini:
+          - section: callback_loganalytics
+            key: max_events_per_request
+        type: int
+        default: 100
+        version_added: 8.2.0
+      max_request_size:
+        description:
+          - Size in bytes of the queued events after which they are sent, even when less than O(max_events_per_request) events are queued.
+          - Only used when O(background_send=true).
+        env:
+          - name: LOGANALYTICS_MAX_REQUEST_SIZE
+        ini:
+          - section: callback_loganalytics
+            key: max_request_size
+        type: int
+        default: 1000000
+        version_added: 8.2.0
+      flush_interval:
+        description:
+          - Maximum time in seconds an event waits for more events before it is sent when O(background_send=true).
+        env:
+          - name: LOGANALYTICS_FLUSH_INTERVAL
+        ini:
+          - section: callback_loganalytics
+            key: flush_interval
+        type: float
+        default: 1
+        version_added: 8.2.0
+      queue_size:
+        description:
+          - Maximum number of events waiting to be sent when O(background_send=true).
+        env:
+          - name: LOGANALYTICS_QUEUE_SIZE
+        ini:
+          - section: callback_loganalytics
+            key: queue_size
+        type: int
+        default: 10000
+        version_added: 8.2.0
+      overflow:
+        description:
+          - What to do with new events when the queue is full and O(background_send=true).
+          - V(drop_newest) drops the new event, V(drop_oldest) drops the oldest queued event.
+            A warning with the number of dropped events is shown at the end of the playbook run.
+          - V(block) waits until the event can be queued, which slows down the playbook run to the speed of the endpoint.
+        env:
+          - name: LOGANALYTICS_OVERFLOW
+        ini:
+          - section: callback_loganalytics
+            key: overflow
+        type: str
+        choices:
+          - drop_newest
+          - drop_oldest
+          - block
+        default: drop_newest
+        version_added: 8.2.0
+      retries:
+        description:
+          - Number of times a failed request is retried with exponential backoff when O(background_send=true).
+        env:
+          - name: LOGANALYTICS_RETRIES
+        ini:
+          - section: callback_loganalytics
+            key: retries
+        type: int
+        default: 3
+        version_added: 8.2.0
 '''
 
 EXAMPLES = '''
@@ -62,10 +149,13 @@ import getpass
 from datetime import datetime
 from os.path import basename
 
+from ansible.module_utils.common.text.converters import to_bytes, to_native
 from ansible.module_utils.urls import open_url
 from ansible.parsing.ajson import AnsibleJSONEncoder
 from ansible.plugins.callback import CallbackBase
 
+from ansible_collections.community.general.plugins.module_utils._batch_sender import BatchSender
+
 
 class AzureLogAnalyticsSource(object):
     def __init__(self):
@@ -76,15 +166,20 @@ class AzureLogAnalyticsSource(object):
         self.host = socket.gethostname()
         self.user = getpass.getuser()
         self.extra_vars = ""
+        self.sender = None
+        self._shared_key = None
+        self._decoded_shared_key = None
 
     def __build_signature(self, date, workspace_id, shared_key, content_length):
         # Build authorisation signature for Azure log analytics API call
         sigs = "POST\n{0}\napplication/json\nx-ms-date:{1}\n/api/logs".format(
             str(content_length), date)
         utf8_sigs = sigs.encode('utf-8')
-        decoded_shared_key = base64.b64decode(shared_key)
+        if shared_key != self._shared_key:
+            self._shared_key = shared_key
+            self._decoded_shared_key = base64.b64decode(shared_key)
         hmac_sha256_sigs = hmac.new(
-            decoded_shared_key, utf8_sigs, digestmod=hashlib.sha256).digest()
+            self._decoded_shared_key, utf8_sigs, digestmod=hashlib.sha256).digest()
         encoded_hash = base64.b64encode(hmac_sha256_sigs).decode('utf-8')
         signature = "SharedKey {0}:{1}".format(workspace_id, encoded_hash)
         return signature
@@ -95,6 +190,30 @@ class AzureLogAnalyticsSource(object):
     def __rfc1123date(self):
         return datetime.utcnow().strftime('%a, %d %b %Y %H:%M:%S GMT')
 
+    def __post(self, workspace_id, shared_key, jsondata):
+        content_length = len(jsondata)
+        rfc1123date = self.__rfc1123date()
+        signature = self.__build_signature(rfc1123date, workspace_id, shared_key, content_length)
+        workspace_url = self.__build_workspace_url(workspace_id)
+
+        open_url(
+            workspace_url,
+            jsondata,
+            headers={
+                'content-type': 'application/json',
+                'Authorization': signature,
+                'Log-Type': 'ansible_playbook',
+                'x-ms-date': rfc1123date
+            },
+            method='POST'
+        )
+
+    def start_sender(self, workspace_id, shared_key, **kwargs):
+        # the API takes a JSON array of records, so a whole batch needs a single signature
+        def send(events):
+            self.__post(workspace_id, shared_key, to_bytes('[' + ','.join(events) + ']'))
+        self.sender = BatchSender(send, **kwargs)
+
     def send_event(self, workspace_id, shared_key, state, result, runtime):
         if result._task_fields['args'].get('_ansible_check_mode') is True:
             self.ansible_check_mode = True
@@ -134,22 +253,10 @@ class AzureLogAnalyticsSource(object):
 
         # Preparing the playbook logs as JSON format and send to Azure log analytics
         jsondata = json.dumps({'event': data}, cls=AnsibleJSONEncoder, sort_keys=True)
-        content_length = len(jsondata)
-        rfc1123date = self.__rfc1123date()
-        signature = self.__build_signature(rfc1123date, workspace_id, shared_key, content_length)
-        workspace_url = self.__build_workspace_url(workspace_id)
-
-        open_url(
-            workspace_url,
-            jsondata,
-            headers={
-                'content-type': 'application/json',
-                'Authorization': signature,
-                'Log-Type': 'ansible_playbook',
-                'x-ms-date': rfc1123date
-            },
-            method='POST'
-        )
+        if self.sender is not None:
+            self.sender.put(jsondata)
+        else:
+            self.__post(workspace_id, shared_key, jsondata)
 
 
 class CallbackModule(CallbackBase):
@@ -176,6 +283,22 @@ class CallbackModule(CallbackBase):
         self.workspace_id = self.get_option('workspace_id')
         self.shared_key = self.get_option('shared_key')
 
+        if self.get_option('background_send') and self.loganalytics.sender is None:
+            self.loganalytics.start_sender(
+                self.workspace_id,
+                self.shared_key,
+                queue_size=self.get_option('queue_size'),
+                batch_size=self.get_option('max_events_per_request'),
+                batch_bytes=self.get_option('max_request_size'),
+                flush_interval=self.get_option('flush_interval'),
+                overflow=self.get_option('overflow'),
+                retries=self.get_option('retries'),
+                on_error=self._on_send_error,
+            )
+
+    def _on_send_error(self, exc):
+        self._display.warning('Failed to send events to Azure Log Analytics: %s' % to_native(exc))
+
     def v2_playbook_on_play_start(self, play):
         vm = play.get_variable_manager()
         extra_vars = vm.extra_vars
@@ -234,3 +357,14 @@ class CallbackModule(CallbackBase):
             result,
             self._seconds_since_start(result)
         )
+
+    def v2_playbook_on_stats(self, stats):
+        sender = self.loganalytics.sender
+        if sender is None:
+            return
+        sender.flush()
+        self._display.vvv('Azure Log Analytics: %(sent)d events sent in %(requests)d requests, '
+                          'maximum queue depth %(max_queue_depth)d' % sender.stats)
+        if sender.stats['dropped'] or sender.stats['failed']:
+            self._display.warning('Azure Log Analytics: %(dropped)d events were dropped because the queue was full, '
+                                  '%(failed)d events could not be sent' % sender.stats)
@@ -55,6 +55,59 @@ DOCUMENTATION = '''
           - section: callback_logdna
             key: conf_tags
         default: ansible
+      background_send:
+        description:
+          - Send the events from a background thread instead of blocking the playbook run for every event.
+          - The events are handed to the LogDNA library from that thread.
+          - Events still queued are sent when the playbook run ends.
+        env:
+          - name: LOGDNA_BACKGROUND_SEND
+        ini:
+          - section: callback_logdna
+            key: background_send
+        type: bool
+        default: false
+        version_added: 8.2.0
+      flush_interval:
+        description:
+          - Maximum time in seconds an event waits for more events before it is sent when O(background_send=true).
+        env:
+          - name: LOGDNA_FLUSH_INTERVAL
+        ini:
+          - section: callback_logdna
+            key: flush_interval
+        type: float
+        default: 1
+        version_added: 8.2.0
+      queue_size:
+        description:
+          - Maximum number of events waiting to be sent when O(background_send=true).
+        env:
+          - name: LOGDNA_QUEUE_SIZE
+        ini:
+          - section: callback_logdna
+            key: queue_size
+        type: int
+        default: 10000
+        version_added: 8.2.0
+      overflow:
+        description:
+          - What to do with new events when the queue is full and O(background_send=true).
+          - V(drop_newest) drops the new event, V(drop_oldest) drops the oldest queued event.
+            A warning with the number of dropped events is shown at the end of the playbook run.
+          - V(block) waits until the event can be queued, which slows down the playbook run to the speed of the endpoint.
+        env:
+          - name: LOGDNA_OVERFLOW
+        ini:
+          - section: callback_logdna
+            key: overflow
+        type: str
+        choices:
+          - drop_newest
+          - drop_oldest
+          - block
+        default: drop_newest
+        version_added: 8.2.0
 '''
 
 import logging
@@ -64,6 +117,8 @@ from uuid import getnode
 from ansible.plugins.callback import CallbackBase
 from ansible.parsing.ajson import AnsibleJSONEncoder
 
+from ansible_collections.community.general.plugins.module_utils._batch_sender import BatchSender
+
 try:
     from logdna import LogDNAHandler
     HAS_LOGDNA = True
@@ -125,6 +180,7 @@ class CallbackModule(CallbackBase):
         self.plugin_ignore_errors = None
         self.conf_hostname = None
         self.conf_tags = None
+        self.sender = None
 
     def set_options(self, task_keys=None, var_options=None, direct=None):
         super(CallbackModule, self).set_options(task_keys=task_keys, var_options=var_options, direct=direct)
@@ -147,6 +203,14 @@ class CallbackModule(CallbackBase):
             self.options = {'hostname': self.conf_hostname, 'mac': self.mac, 'index_meta': True}
             self.log.addHandler(LogDNAHandler(self.conf_key, self.options))
             self.disabled = False
+            if self.get_option('background_send') and self.sender is None:
+                self.sender = BatchSender(
+                    self._emit,
+                    queue_size=self.get_option('queue_size'),
+                    flush_interval=self.get_option('flush_interval'),
+                    overflow=self.get_option('overflow'),
+                    retries=0,
+                )
         else:
             self.disabled = True
             self._display.warning('WARNING:\nPlease, install LogDNA Python Package: `pip install logdna`')
@@ -170,9 +234,16 @@ class CallbackModule(CallbackBase):
         except Exception:
             return {'warnings': ['JSON Formatting Issue', json.dumps(data, sort_keys=True, cls=AnsibleJSONEncoder)]}
 
+    def _emit(self, logs):
+        for log, options in logs:
+            self.log.info(json.dumps(log), options)
+
     def flush(self, log, options):
         if HAS_LOGDNA:
-            self.log.info(json.dumps(log), options)
+            if self.sender is not None:
+                self.sender.put((log, options))
+            else:
+                self.log.info(json.dumps(log), options)
 
     def sendLog(self, host, category, logdata):
         options = {'app': 'ansible', 'meta': {'playbook': self.playbook_name, 'host': host, 'category': category}}
@@ -191,6 +262,10 @@ class CallbackModule(CallbackBase):
         for host in stats.processed.keys():
             result[host] = stats.summarize(host)
         self.sendLog(self.conf_hostname, 'STATS', {'info': self.sanitizeJSON(result)})
+        if self.sender is not None:
+            self.sender.flush()
+            if self.sender.stats['dropped']:
+                self._display.warning('LogDNA: %(dropped)d events were dropped because the queue was full' % self.sender.stats)
 
     def runner_on_failed(self, host, res, ignore_errors=False):
         if self.plugin_ignore_errors:
@@ -67,6 +67,93 @@ DOCUMENTATION = '''
             key: batch
         type: str
         version_added: 3.3.0
+      background_send:
+        description:
+          - Send the events from a background thread instead of blocking the playbook run for every event.
+          - Several events are sent in a single request to the Splunk HTTP collector.
+          - Events still queued are sent when the playbook run ends.
+        env:
+          - name: SPLUNK_BACKGROUND_SEND
+        ini:
+          - section: callback_splunk
+            key: background_send
+        type: bool
+        default: false
+        version_added: 8.2.0
+      max_events_per_request:
+        description:
+          - Maximum number of events sent in a single request when O(background_send=true).
+        env:
+          - name: SPLUNK_MAX_EVENTS_PER_REQUEST
+        ini:
+          - section: callback_splunk
+            key: max_events_per_request
+        type: int
+        default: 100
+        version_added: 8.2.0
+      max_request_size:
+        description:
+          - Size in bytes of the queued events after which they are sent, even when less than O(max_events_per_request) events are queued.
+          - Only used when O(background_send=true).
+        env:
+          - name: SPLUNK_MAX_REQUEST_SIZE
+        ini:
+          - section: callback_splunk
+            key: max_request_size
+        type: int
+        default: 1000000
+        version_added: 8.2.0
+      flush_interval:
+        description:
+          - Maximum time in seconds an event waits for more events before it is sent when O(background_send=true).
+        env:
+          - name: SPLUNK_FLUSH_INTERVAL
+        ini:
+          - section: callback_splunk
+            key: flush_interval
+        type: float
+        default: 1
+        version_added: 8.2.0
+      queue_size:
+        description:
+          - Maximum number of events waiting to be sent when O(background_send=true).
+        env:
+          - name: SPLUNK_QUEUE_SIZE
+        ini:
+          - section: callback_splunk
+            key: queue_size
+        type: int
+        default: 10000
+        version_added: 8.2.0
+      overflow:
+        description:
+          - What to do with new events when the queue is full and O(background_send=true).
+          - V(drop_newest) drops the new event, V(drop_oldest) drops the oldest queued event.
+            A warning with the number of dropped events is shown at the end of the playbook run.
+          - V(block) waits until the event can be queued, which slows down the playbook run to the speed of the endpoint.
+        env:
+          - name: SPLUNK_OVERFLOW
+        ini:
+          - section: callback_splunk
+            key: overflow
+        type: str
+        choices:
+          - drop_newest
+          - drop_oldest
+          - block
+        default: drop_newest
+        version_added: 8.2.0
+      retries:
+        description:
+          - Number of times a failed request is retried with exponential backoff when O(background_send=true).
+        env:
+          - name: SPLUNK_RETRIES
+        ini:
+          - section: callback_splunk
+            key: retries
+        type: int
+        default: 3
+        version_added: 8.2.0
 '''
 
 EXAMPLES = '''
@@ -91,10 +178,13 @@ import getpass
 from datetime import datetime
 from os.path import basename
 
+from ansible.module_utils.common.text.converters import to_native
 from ansible.module_utils.urls import open_url
 from ansible.parsing.ajson import AnsibleJSONEncoder
 from ansible.plugins.callback import CallbackBase
 
+from ansible_collections.community.general.plugins.module_utils._batch_sender import BatchSender
+
 
 class SplunkHTTPCollectorSource(object):
     def __init__(self):
@@ -105,6 +195,26 @@ class SplunkHTTPCollectorSource(object):
         self.host = socket.gethostname()
         self.ip_address = socket.gethostbyname(socket.gethostname())
         self.user = getpass.getuser()
+        self.sender = None
+
+    @staticmethod
+    def post(url, authtoken, validate_certs, jsondata):
+        open_url(
+            url,
+            jsondata,
+            headers={
+                'Content-type': 'application/json',
+                'Authorization': 'Splunk ' + authtoken
+            },
+            method='POST',
+            validate_certs=validate_certs
+        )
+
+    def start_sender(self, url, authtoken, validate_certs, **kwargs):
+        # HEC accepts several events concatenated in a single request
+        def send(events):
+            self.post(url, authtoken, validate_certs, '\n'.join(events))
+        self.sender = BatchSender(send, **kwargs)
 
     def send_event(self, url, authtoken, validate_certs, include_milliseconds, batch, state, result, runtime):
         if result._task_fields['args'].get('_ansible_check_mode') is True:
@@ -148,19 +258,12 @@ class SplunkHTTPCollectorSource(object):
         data['ansible_result'] = result._result
 
         # This wraps the json payload in and outer json event needed by Splunk
-        jsondata = json.dumps(data, cls=AnsibleJSONEncoder, sort_keys=True)
-        jsondata = '{"event":' + jsondata + "}"
+        jsondata = json.dumps({'event': data}, cls=AnsibleJSONEncoder, sort_keys=True)
 
-        open_url(
-            url,
-            jsondata,
-            headers={
-                'Content-type': 'application/json',
-                'Authorization': 'Splunk ' + authtoken
-            },
-            method='POST',
-            validate_certs=validate_certs
-        )
+        if self.sender is not None:
+            self.sender.put(jsondata)
+        else:
+            self.post(url, authtoken, validate_certs, jsondata)
 
 
 class CallbackModule(CallbackBase):
@@ -216,6 +319,23 @@ class CallbackModule(CallbackBase):
 
         self.batch = self.get_option('batch')
 
+        if self.get_option('background_send') and not self.disabled and self.splunk.sender is None:
+            self.splunk.start_sender(
+                self.url,
+                self.authtoken,
+                self.validate_certs,
+                queue_size=self.get_option('queue_size'),
+                batch_size=self.get_option('max_events_per_request'),
+                batch_bytes=self.get_option('max_request_size'),
+                flush_interval=self.get_option('flush_interval'),
+                overflow=self.get_option('overflow'),
+                retries=self.get_option('retries'),
+                on_error=self._on_send_error,
+            )
+
+    def _on_send_error(self, exc):
+        self._display.warning('Failed to send events to the Splunk HTTP collector: %s' % to_native(exc))
+
     def v2_playbook_on_start(self, playbook):
         self.splunk.ansible_playbook = basename(playbook._file_name)
 
@@ -284,3 +404,14 @@ class CallbackModule(CallbackBase):
             result,
             self._runtime(result)
         )
+
+    def v2_playbook_on_stats(self, stats):
+        sender = self.splunk.sender
+        if sender is None:
+            return
+        sender.flush()
+        self._display.vvv('Splunk HTTP collector: %(sent)d events sent in %(requests)d requests, '
+                          'maximum queue depth %(max_queue_depth)d' % sender.stats)
+        if sender.stats['dropped'] or sender.stats['failed']:
+            self._display.warning('Splunk HTTP collector: %(dropped)d events were dropped because the queue was full, '
+                                  '%(failed)d events could not be sent' % sender.stats)
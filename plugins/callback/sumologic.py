@@ -25,6 +25,104 @@ options:
     ini:
       - section: callback_sumologic
         key: url
+  background_send:
+    description:
+      - Send the events from a background thread instead of blocking the playbook run for every event.
+      - Several events are sent in a single request.
+      - Events still queued are sent when the playbook run ends.
+    env:
+      - name: SUMOLOGIC_BACKGROUND_SEND
+    ini:
+      - section: callback_sumologic
+        key: background_send
+    type: bool
+    default: false
+    version_added: 8.2.0
+  max_events_per_request:
+    description:
+      - Maximum number of events sent in a single request when O(background_send=true).
+    env:
+      - name: SUMOLOGIC_MAX_EVENTS_PER_REQUEST
+    ini:
+      - section: callback_sumologic
+        key: max_events_per_request
+    type: int
+    default: 100
+    version_added: 8.2.0
+  max_request_size:
+    description:
+      - Size in bytes of the queued events after which they are sent, even when less than O(max_events_per_request) events are queued.
+      - Only used when O(background_send=true).
+    env:
+      - name: SUMOLOGIC_MAX_REQUEST_SIZE
+    ini:
+      - section: callback_sumologic
+        key: max_request_size
+    type: int
+    default: 1000000
+    version_added: 8.2.0
+  flush_interval:
+    description:
+      - Maximum time in seconds an event waits for more events before it is sent when O(background_send=true).
+    env:
+      - name: SUMOLOGIC_FLUSH_INTERVAL
+    ini:
+      - section: callback_sumologic
+        key: flush_interval
+    type: float
+    default: 1
+    version_added: 8.2.0
+  queue_size:
+    description:
+      - Maximum number of events waiting to be sent when O(background_send=true).
+    env:
+      - name: SUMOLOGIC_QUEUE_SIZE
+    ini:
+      - section: callback_sumologic
+        key: queue_size
+    type: int
+    default: 10000
+    version_added: 8.2.0
+  overflow:
+    description:
+      - What to do with new events when the queue is full and O(background_send=true).
+      - V(drop_newest) drops the new event, V(drop_oldest) drops the oldest queued event.
+        A warning with the number of dropped events is shown at the end of the playbook run.
+      - V(block) waits until the event can be queued, which slows down the playbook run to the speed of the endpoint.
+    env:
+      - name: SUMOLOGIC_OVERFLOW
+    ini:
+      - section: callback_sumologic
+        key: overflow
+    type: str
+    choices:
+      - drop_newest
+      - drop_oldest
+      - block
+    default: drop_newest
+    version_added: 8.2.0
+  retries:
+    description:
+      - Number of times a failed request is retried with exponential backoff when O(background_send=true).
+    env:
+      - name: SUMOLOGIC_RETRIES
+    ini:
+      - section: callback_sumologic
+        key: retries
+    type: int
+    default: 3
+    version_added: 8.2.0
+  compress:
+    description:
+      - Compress the requests with gzip when O(background_send=true).
+    env:
+      - name: SUMOLOGIC_COMPRESS
+    ini:
+      - section: callback_sumologic
+        key: compress
+    type: bool
+    default: true
+    version_added: 8.2.0
 '''
 
 EXAMPLES = '''
@@ -49,10 +147,13 @@ import getpass
 from datetime import datetime
 from os.path import basename
 
+from ansible.module_utils.common.text.converters import to_native
 from ansible.module_utils.urls import open_url
 from ansible.parsing.ajson import AnsibleJSONEncoder
 from ansible.plugins.callback import CallbackBase
 
+from ansible_collections.community.general.plugins.module_utils._batch_sender import BatchSender, gzip_compress
+
 
 class SumologicHTTPCollectorSource(object):
     def __init__(self):
@@ -63,6 +164,35 @@ class SumologicHTTPCollectorSource(object):
         self.host = socket.gethostname()
         self.ip_address = socket.gethostbyname(socket.gethostname())
         self.user = getpass.getuser()
+        self.sender = None
+
+    def start_sender(self, url, compress, **kwargs):
+        # the collector takes one event per line, but the host header applies to the whole request.
+        # A failed batch is retried with the same list, so the hosts that were already delivered
+        # are remembered and skipped to not send their events twice.
+        delivered = {'batch': None, 'hosts': set()}
+
+        def send(events):
+            if delivered['batch'] is not events:
+                delivered['batch'] = events
+                delivered['hosts'] = set()
+            lines_by_host = {}
+            for host, jsondata in events:
+                lines_by_host.setdefault(host, []).append(jsondata)
+            for host, lines in lines_by_host.items():
+                if host in delivered['hosts']:
+                    continue
+                headers = {
+                    'Content-type': 'application/json',
+                    'X-Sumo-Host': host
+                }
+                data = '\n'.join(lines)
+                if compress:
+                    data = gzip_compress(data)
+                    headers['Content-Encoding'] = 'gzip'
+                open_url(url, data=data, headers=headers, method='POST')
+                delivered['hosts'].add(host)
+        self.sender = BatchSender(send, **kwargs)
 
     def send_event(self, url, state, result, runtime):
         if result._task_fields['args'].get('_ansible_check_mode') is True:
@@ -98,9 +228,14 @@ class SumologicHTTPCollectorSource(object):
         data['ansible_task'] = result._task_fields
         data['ansible_result'] = result._result
 
+        jsondata = json.dumps(data, cls=AnsibleJSONEncoder, sort_keys=True)
+        if self.sender is not None:
+            self.sender.put((data['ansible_host'], jsondata))
+            return
+
         open_url(
             url,
-            data=json.dumps(data, cls=AnsibleJSONEncoder, sort_keys=True),
+            data=jsondata,
             headers={
                 'Content-type': 'application/json',
                 'X-Sumo-Host': data['ansible_host']
@@ -140,6 +275,22 @@ class CallbackModule(CallbackBase):
                                   '`SUMOLOGIC_URL` environment variable or '
                                   'in the ansible.cfg file.')
 
+        if self.get_option('background_send') and not self.disabled and self.sumologic.sender is None:
+            self.sumologic.start_sender(
+                self.url,
+                self.get_option('compress'),
+                queue_size=self.get_option('queue_size'),
+                batch_size=self.get_option('max_events_per_request'),
+                batch_bytes=self.get_option('max_request_size'),
+                flush_interval=self.get_option('flush_interval'),
+                overflow=self.get_option('overflow'),
+                retries=self.get_option('retries'),
+                on_error=self._on_send_error,
+            )
+
+    def _on_send_error(self, exc):
+        self._display.warning('Failed to send events to the Sumologic HTTP collector: %s' % to_native(exc))
+
     def v2_playbook_on_start(self, playbook):
         self.sumologic.ansible_playbook = basename(playbook._file_name)
 
@@ -188,3 +339,14 @@ class CallbackModule(CallbackBase):
             result,
             self._runtime(result)
         )
+
+    def v2_playbook_on_stats(self, stats):
+        sender = self.sumologic.sender
+        if sender is None:
+            return
+        sender.flush()
+        self._display.vvv('Sumologic HTTP collector: %(sent)d events sent in %(requests)d requests, '
+                          'maximum queue depth %(max_queue_depth)d' % sender.stats)
+        if sender.stats['dropped'] or sender.stats['failed']:
+            self._display.warning('Sumologic HTTP collector: %(dropped)d events were dropped because the queue was full, '
+                                  '%(failed)d events could not be sent' % sender.stats)
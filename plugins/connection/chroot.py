@@ -59,6 +59,39 @@ DOCUMENTATION = '''
         default: false
         type: bool
         version_added: 7.3.0
+      persistent_shell:
+        description:
+            - Run all commands through one long-lived shell in the chroot instead of starting O(chroot_exe) and a new
+              shell for every command.
+            - Commands are sent to the shell on its standard input and their output, error output and exit code are
+              read back from its standard output and standard error, so the commands cannot use a terminal.
+            - Commands whose input contains NUL bytes or does not end with a newline are still run on their own.
+        ini:
+          - section: chroot_connection
+            key: persistent_shell
+        env:
+          - name: ANSIBLE_CHROOT_PERSISTENT_SHELL
+        vars:
+          - name: ansible_chroot_persistent_shell
+        default: false
+        type: bool
+        version_added: 8.2.0
+      host_copy:
+        description:
+            - Transfer files by copying them directly between the controller and the chroot directory, using
+              C(copy_file_range) or C(sendfile) where available, instead of running C(dd) in the chroot.
+            - Paths whose directories contain symbolic links, and files that are symbolic links, are still
+              transferred with C(dd) so that links are resolved inside the chroot.
+        ini:
+          - section: chroot_connection
+            key: host_copy
+        env:
+          - name: ANSIBLE_CHROOT_HOST_COPY
+        vars:
+          - name: ansible_chroot_host_copy
+        default: false
+        type: bool
+        version_added: 8.2.0
 '''
 
 EXAMPLES = r"""
@@ -80,14 +113,28 @@ EXAMPLES = r"""
     - debug:
         msg: "This is coming from chroot environment"
 
+# Reuse one shell for all commands and copy files directly into the chroot
+- hosts: chroots
+  connection: community.general.chroot
+  vars:
+    ansible_chroot_persistent_shell: true
+    ansible_chroot_host_copy: true
+  tasks:
+    - copy:
+        src: big.tar
+        dest: /srv/big.tar
+
 """
 
+import errno
 import os
 import os.path
+import shutil
+import stat
 import subprocess
 import traceback
 
-from ansible.errors import AnsibleError
+from ansible.errors import AnsibleConnectionFailure, AnsibleError
 from ansible.module_utils.basic import is_executable
 from ansible.module_utils.common.process import get_bin_path
 from ansible.module_utils.six.moves import shlex_quote
@@ -95,8 +142,40 @@ from ansible.module_utils.common.text.converters import to_bytes, to_native
 from ansible.plugins.connection import ConnectionBase, BUFSIZE
 from ansible.utils.display import Display
 
+from ansible_collections.community.general.plugins.module_utils._shell_session import ShellSession, ShellSessionError
+
 display = Display()
 
+# errors that mean that an in-kernel copy is not possible between two files
+COPY_UNSUPPORTED_ERRORS = frozenset(
+    getattr(errno, name) for name in ('EXDEV', 'ENOSYS', 'EINVAL', 'EOPNOTSUPP', 'ENOTSUP') if hasattr(errno, name))
+
+
+def _copy_file(in_file, out_file):
+    """ copy the contents of in_file to out_file, in the kernel when possible """
+    in_fd = in_file.fileno()
+    out_fd = out_file.fileno()
+    size = os.fstat(in_fd).st_size
+    copied = 0
+    for method in ('copy_file_range', 'sendfile'):
+        if not hasattr(os, method):
+            continue
+        try:
+            while copied < size:
+                if method == 'copy_file_range':
+                    count = os.copy_file_range(in_fd, out_fd, size - copied)
+                else:
+                    count = os.sendfile(out_fd, in_fd, copied, size - copied)
+                if not count:
+                    break
+                copied += count
+            return
+        except OSError as e:
+            if e.errno not in COPY_UNSUPPORTED_ERRORS:
+                raise
+    in_file.seek(copied)
+    shutil.copyfileobj(in_file, out_file, BUFSIZE)
+
 
 class Connection(ConnectionBase):
     """ Local chroot based connections """
@@ -114,6 +193,7 @@ class Connection(ConnectionBase):
         super(Connection, self).__init__(play_context, new_stdin, *args, **kwargs)
 
         self.chroot = self._play_context.remote_addr
+        self._shell_session = None
 
         # do some trivial checks for ensuring 'host' is actually a chroot'able dir
         if not os.path.isdir(self.chroot):
@@ -165,10 +245,25 @@ class Connection(ConnectionBase):
 
         return p
 
+    def _persistent_shell(self):
+        """ return the persistent shell of the chroot, it is started on first use """
+        if self._shell_session is None:
+            local_cmd = [self.chroot_cmd, self.chroot, self.get_option('executable')]
+            display.vvv("SHELL SESSION %s" % local_cmd, host=self.chroot)
+            self._shell_session = ShellSession(local_cmd)
+        return self._shell_session
+
     def exec_command(self, cmd, in_data=None, sudoable=False):
         """ run a command on the chroot """
         super(Connection, self).exec_command(cmd, in_data=in_data, sudoable=sudoable)
 
+        if self.get_option('persistent_shell') and ShellSession.accepts_input(in_data):
+            display.vvv("EXEC (persistent shell) %s" % cmd, host=self.chroot)
+            try:
+                return self._persistent_shell().run(cmd, in_data)
+            except ShellSessionError as e:
+                raise AnsibleConnectionFailure("chroot shell session failed: %s" % to_native(e))
+
         p = self._buffered_exec_command(cmd)
 
         stdout, stderr = p.communicate(in_data)
@@ -189,11 +284,65 @@ class Connection(ConnectionBase):
             remote_path = os.path.join(os.path.sep, remote_path)
         return os.path.normpath(remote_path)
 
+    def _host_path(self, remote_path):
+        """ Return the path of remote_path on the controller
+
+            None is returned if a directory on the way is a symbolic link,
+            which would be resolved against the root of the controller
+            instead of the root of the chroot.
+        """
+        root = os.path.realpath(self.chroot)
+        path = os.path.join(root, self._prefix_login_path(remote_path).lstrip(os.path.sep))
+        parent = os.path.dirname(path)
+        if os.path.realpath(parent) != parent:
+            return None
+        return path
+
+    def _host_put_file(self, in_path, out_path):
+        """ copy a file into the chroot directory, return False if this is not possible """
+        host_path = self._host_path(out_path)
+        if host_path is None:
+            return False
+        with open(to_bytes(in_path, errors='surrogate_or_strict'), 'rb') as in_file:
+            try:
+                fd = os.open(to_bytes(host_path, errors='surrogate_or_strict'),
+                             os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_NOFOLLOW', 0), 0o666)
+            except OSError:
+                return False
+            display.vvv("PUT %s TO %s ON THE CONTROLLER" % (in_path, host_path), host=self.chroot)
+            with os.fdopen(fd, 'wb') as out_file:
+                _copy_file(in_file, out_file)
+        return True
+
+    def _host_fetch_file(self, in_path, out_path):
+        """ copy a file out of the chroot directory, return False if this is not possible """
+        host_path = self._host_path(in_path)
+        if host_path is None:
+            return False
+        try:
+            fd = os.open(to_bytes(host_path, errors='surrogate_or_strict'), os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+        except OSError:
+            return False
+        with os.fdopen(fd, 'rb') as in_file:
+            if not stat.S_ISREG(os.fstat(fd).st_mode):
+                return False
+            display.vvv("FETCH %s TO %s ON THE CONTROLLER" % (host_path, out_path), host=self.chroot)
+            with open(to_bytes(out_path, errors='surrogate_or_strict'), 'wb+') as out_file:
+                _copy_file(in_file, out_file)
+        return True
+
     def put_file(self, in_path, out_path):
         """ transfer a file from local to chroot """
         super(Connection, self).put_file(in_path, out_path)
         display.vvv("PUT %s TO %s" % (in_path, out_path), host=self.chroot)
 
+        if self.get_option('host_copy'):
+            try:
+                if self._host_put_file(in_path, out_path):
+                    return
+            except (IOError, OSError) as e:
+                raise AnsibleError("failed to transfer file %s to %s: %s" % (in_path, out_path, to_native(e)))
+
         out_path = shlex_quote(self._prefix_login_path(out_path))
         try:
             with open(to_bytes(in_path, errors='surrogate_or_strict'), 'rb') as in_file:
@@ -220,6 +369,13 @@ class Connection(ConnectionBase):
         super(Connection, self).fetch_file(in_path, out_path)
         display.vvv("FETCH %s TO %s" % (in_path, out_path), host=self.chroot)
 
+        if self.get_option('host_copy'):
+            try:
+                if self._host_fetch_file(in_path, out_path):
+                    return
+            except (IOError, OSError) as e:
+                raise AnsibleError("failed to transfer file %s to %s: %s" % (in_path, out_path, to_native(e)))
+
         in_path = shlex_quote(self._prefix_login_path(in_path))
         try:
             p = self._buffered_exec_command('dd if=%s bs=%s' % (in_path, BUFSIZE))
@@ -240,6 +396,9 @@ class Connection(ConnectionBase):
                 raise AnsibleError("failed to transfer file %s to %s:\n%s\n%s" % (in_path, out_path, stdout, stderr))
 
     def close(self):
-        """ terminate the connection; nothing to do here """
+        """ terminate the connection and the persistent shell, if any """
         super(Connection, self).close()
+        if self._shell_session is not None:
+            self._shell_session.close()
+            self._shell_session = None
         self._connected = False
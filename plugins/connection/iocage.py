@@ -29,6 +29,23 @@ DOCUMENTATION = '''
         vars:
             - name: ansible_user
             - name: ansible_iocage_user
+      persistent_shell:
+        description:
+            - Run all commands through one long-lived shell in the jail instead of starting C(jexec) and a new
+              shell for every command.
+            - Commands are sent to the shell on its standard input and their output, error output and exit code are
+              read back from its standard output and standard error, so the commands cannot use a terminal.
+            - Commands whose input contains NUL bytes or does not end with a newline are still run on their own.
+        ini:
+          - section: iocage_connection
+            key: persistent_shell
+        env:
+          - name: ANSIBLE_IOCAGE_PERSISTENT_SHELL
+        vars:
+          - name: ansible_iocage_persistent_shell
+        default: false
+        type: bool
+        version_added: 8.2.0
 '''
 
 import subprocess
@@ -31,6 +31,23 @@ DOCUMENTATION = '''
         vars:
             - name: ansible_user
             - name: ansible_jail_user
+      persistent_shell:
+        description:
+            - Run all commands through one long-lived shell in the jail instead of starting C(jexec) and a new
+              shell for every command.
+            - Commands are sent to the shell on its standard input and their output, error output and exit code are
+              read back from its standard output and standard error, so the commands cannot use a terminal.
+            - Commands whose input contains NUL bytes or does not end with a newline are still run on their own.
+        ini:
+          - section: jail_connection
+            key: persistent_shell
+        env:
+          - name: ANSIBLE_JAIL_PERSISTENT_SHELL
+        vars:
+          - name: ansible_jail_persistent_shell
+        default: false
+        type: bool
+        version_added: 8.2.0
 '''
 
 import os
@@ -38,13 +55,15 @@ import os.path
 import subprocess
 import traceback
 
-from ansible.errors import AnsibleError
+from ansible.errors import AnsibleConnectionFailure, AnsibleError
 from ansible.module_utils.six.moves import shlex_quote
 from ansible.module_utils.common.process import get_bin_path
 from ansible.module_utils.common.text.converters import to_bytes, to_native, to_text
 from ansible.plugins.connection import ConnectionBase, BUFSIZE
 from ansible.utils.display import Display
 
+from ansible_collections.community.general.plugins.module_utils._shell_session import ShellSession, ShellSessionError
+
 display = Display()
 
 
@@ -65,6 +84,7 @@ class Connection(ConnectionBase):
         self.jail = self._play_context.remote_addr
         if self.modified_jailname_key in kwargs:
             self.jail = kwargs[self.modified_jailname_key]
+        self._shell_session = None
 
         if os.geteuid() != 0:
             raise AnsibleError("jail connection requires running as root")
@@ -98,15 +118,10 @@ class Connection(ConnectionBase):
             display.vvv(u"ESTABLISH JAIL CONNECTION FOR USER: {0}".format(self._play_context.remote_user), host=self.jail)
             self._connected = True
 
-    def _buffered_exec_command(self, cmd, stdin=subprocess.PIPE):
-        """ run a command on the jail.  This is only needed for implementing
-        put_file() get_file() so that we don't have to read the whole file
-        into memory.
-
-        compared to exec_command() it looses some niceties like being able to
-        return the process's exit code immediately.
+    def _jexec_shell(self):
+        """ return the command that starts a shell in the jail, and the
+        environment to set for commands run by it
         """
-
         local_cmd = [self.jexec_cmd]
         set_env = ''
 
@@ -115,7 +130,20 @@ class Connection(ConnectionBase):
             # update HOME since -U does not update the jail environment
             set_env = 'HOME=~' + self._play_context.remote_user + ' '
 
-        local_cmd += [self.jail, self._play_context.executable, '-c', set_env + cmd]
+        local_cmd += [self.jail, self._play_context.executable]
+        return local_cmd, set_env
+
+    def _buffered_exec_command(self, cmd, stdin=subprocess.PIPE):
+        """ run a command on the jail.  This is only needed for implementing
+        put_file() get_file() so that we don't have to read the whole file
+        into memory.
+
+        compared to exec_command() it looses some niceties like being able to
+        return the process's exit code immediately.
+        """
+
+        local_cmd, set_env = self._jexec_shell()
+        local_cmd += ['-c', set_env + cmd]
 
         display.vvv("EXEC %s" % (local_cmd,), host=self.jail)
         local_cmd = [to_bytes(i, errors='surrogate_or_strict') for i in local_cmd]
@@ -124,10 +152,25 @@ class Connection(ConnectionBase):
 
         return p
 
+    def _persistent_shell(self):
+        """ return the persistent shell of the jail, it is started on first use """
+        if self._shell_session is None:
+            local_cmd = self._jexec_shell()[0]
+            display.vvv("SHELL SESSION %s" % (local_cmd,), host=self.jail)
+            self._shell_session = ShellSession(local_cmd)
+        return self._shell_session
+
     def exec_command(self, cmd, in_data=None, sudoable=False):
         """ run a command on the jail """
         super(Connection, self).exec_command(cmd, in_data=in_data, sudoable=sudoable)
 
+        if self.get_option('persistent_shell') and ShellSession.accepts_input(in_data):
+            display.vvv("EXEC (persistent shell) %s" % cmd, host=self.jail)
+            try:
+                return self._persistent_shell().run(self._jexec_shell()[1] + cmd, in_data)
+            except ShellSessionError as e:
+                raise AnsibleConnectionFailure("jail shell session failed: %s" % to_native(e))
+
         p = self._buffered_exec_command(cmd)
 
         stdout, stderr = p.communicate(in_data)
@@ -199,6 +242,9 @@ class Connection(ConnectionBase):
                 raise AnsibleError("failed to transfer file %s to %s:\n%s\n%s" % (in_path, out_path, to_native(stdout), to_native(stderr)))
 
     def close(self):
-        """ terminate the connection; nothing to do here """
+        """ terminate the connection and the persistent shell, if any """
         super(Connection, self).close()
+        if self._shell_session is not None:
+            self._shell_session.close()
+            self._shell_session = None
         self._connected = False
@@ -29,12 +29,22 @@ DOCUMENTATION = '''
         vars:
             - name: ansible_executable
             - name: ansible_lxc_executable
+      batch_put_file:
+        description:
+            - Defer file uploads until the next command, file download or the end of the connection, and then
+              upload all pending files while attached to the container once, instead of once per file.
+            - With this, the module and its arguments file are uploaded together.
+            - Errors writing a file in the container are reported by the operation that uploads it.
+        default: false
+        type: bool
+        vars:
+            - name: ansible_lxc_batch_put_file
+        version_added: 8.2.0
 '''
 
 import os
 import shutil
 import traceback
-import select
 import fcntl
 import errno
 
@@ -46,8 +56,38 @@ except ImportError:
     pass
 
 from ansible import errors
+from ansible.module_utils.compat import selectors
 from ansible.module_utils.common.text.converters import to_bytes, to_native
-from ansible.plugins.connection import ConnectionBase
+from ansible.plugins.connection import ConnectionBase, ensure_connect
+
+# command output is read in chunks starting at READ_SIZE, doubled up to
+# MAX_READ_SIZE while the reads fill the buffer
+READ_SIZE = 64 * 1024
+MAX_READ_SIZE = 1024 * 1024
+# buffer size of file transfers that cannot be done in the kernel
+TRANSFER_BUFSIZE = 1024 * 1024
+
+
+def _copy_file(src_file, dst_file):
+    ''' copy src_file to dst_file, with sendfile() when the platform allows it '''
+    if hasattr(os, 'sendfile'):
+        in_fd = src_file.fileno()
+        offset = src_file.tell()
+        size = os.fstat(in_fd).st_size
+        dst_file.flush()
+        try:
+            while offset < size:
+                sent = os.sendfile(dst_file.fileno(), in_fd, offset, size - offset)
+                if not sent:
+                    break
+                offset += sent
+            return
+        except OSError as e:
+            if e.errno not in (errno.EINVAL, errno.ENOSYS):
+                raise
+        finally:
+            src_file.seek(offset)
+    shutil.copyfileobj(src_file, dst_file, TRANSFER_BUFSIZE)
 
 
 class Connection(ConnectionBase):
@@ -62,6 +102,7 @@ class Connection(ConnectionBase):
 
         self.container_name = None
         self.container = None
+        self._pending_puts = []
 
     def _connect(self):
         """ connect to the lxc; nothing to do here """
@@ -84,32 +125,50 @@ class Connection(ConnectionBase):
 
     @staticmethod
     def _communicate(pid, in_data, stdin, stdout, stderr):
-        buf = {stdout: [], stderr: []}
-        read_fds = [stdout, stderr]
-        if in_data:
-            write_fds = [stdin]
-        else:
-            write_fds = []
-        while len(read_fds) > 0 or len(write_fds) > 0:
-            try:
-                ready_reads, ready_writes, dummy = select.select(read_fds, write_fds, [])
-            except select.error as e:
-                if e.args[0] == errno.EINTR:
-                    continue
-                raise
-            for fd in ready_writes:
-                in_data = in_data[os.write(fd, in_data):]
-                if len(in_data) == 0:
-                    write_fds.remove(fd)
-            for fd in ready_reads:
-                data = os.read(fd, 32768)
-                if not data:
-                    read_fds.remove(fd)
-                buf[fd].append(data)
+        ''' feed in_data to the command and collect its output
+
+        stdin is closed once all of in_data has been written, so that the
+        command sees the end of its input.
+        '''
+        buf = {stdout: bytearray(), stderr: bytearray()}
+        read_size = {stdout: READ_SIZE, stderr: READ_SIZE}
+        pending = memoryview(in_data) if in_data else None
+
+        selector = selectors.DefaultSelector()
+        selector.register(stdout, selectors.EVENT_READ)
+        selector.register(stderr, selectors.EVENT_READ)
+        if pending is not None:
+            selector.register(stdin, selectors.EVENT_WRITE)
+        try:
+            while selector.get_map():
+                for key, dummy in selector.select():
+                    fd = key.fd
+                    if fd == stdin:
+                        try:
+                            pending = pending[os.write(fd, pending):]
+                        except OSError as e:
+                            if e.errno not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                                raise
+                        if not len(pending):
+                            selector.unregister(fd)
+                            os.close(fd)
+                            stdin = None
+                        continue
+                    data = os.read(fd, read_size[fd])
+                    if not data:
+                        selector.unregister(fd)
+                        continue
+                    buf[fd] += data
+                    if len(data) == read_size[fd] and read_size[fd] < MAX_READ_SIZE:
+                        read_size[fd] *= 2
+        finally:
+            selector.close()
+            if stdin is not None:
+                os.close(stdin)
 
         (pid, returncode) = os.waitpid(pid, 0)
 
-        return returncode, b"".join(buf[stdout]), b"".join(buf[stderr])
+        return returncode, bytes(buf[stdout]), bytes(buf[stderr])
 
     def _set_nonblocking(self, fd):
         flags = fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_NONBLOCK
@@ -120,6 +179,8 @@ class Connection(ConnectionBase):
         """ run a command on the chroot """
         super(Connection, self).exec_command(cmd, in_data=in_data, sudoable=sudoable)
 
+        self._flush_puts()
+
         # python2-lxc needs bytes. python3-lxc needs text.
         executable = to_native(self.get_option('executable'), errors='surrogate_or_strict')
         local_cmd = [executable, '-c', to_native(cmd, errors='surrogate_or_strict')]
@@ -141,6 +202,7 @@ class Connection(ConnectionBase):
             if in_data:
                 read_stdin, write_stdin = os.pipe()
                 kwargs['stdin'] = self._set_nonblocking(read_stdin)
+                self._set_nonblocking(write_stdin)
 
             self._display.vvv("EXEC %s" % (local_cmd), host=self.container_name)
             pid = self.container.attach(_lxc.attach_run_command, local_cmd, **kwargs)
@@ -153,9 +215,11 @@ class Connection(ConnectionBase):
             if read_stdin:
                 read_stdin = os.close(read_stdin)
 
+            # _communicate() closes stdin when it is done with it
+            stdin, write_stdin = write_stdin, None
             return self._communicate(pid,
                                      in_data,
-                                     write_stdin,
+                                     stdin,
                                      read_stdout,
                                      read_stderr)
         finally:
@@ -169,31 +233,76 @@ class Connection(ConnectionBase):
                 if fd:
                     os.close(fd)
 
-    def put_file(self, in_path, out_path):
-        ''' transfer a file from local to lxc '''
-        super(Connection, self).put_file(in_path, out_path)
-        self._display.vvv("PUT %s TO %s" % (in_path, out_path), host=self.container_name)
+    def _open_source(self, in_path):
         in_path = to_bytes(in_path, errors='surrogate_or_strict')
-        out_path = to_bytes(out_path, errors='surrogate_or_strict')
-
         if not os.path.exists(in_path):
             msg = "file or module does not exist: %s" % in_path
             raise errors.AnsibleFileNotFound(msg)
         try:
-            src_file = open(in_path, "rb")
+            return open(in_path, "rb")
         except IOError:
             traceback.print_exc()
             raise errors.AnsibleError("failed to open input file to %s" % in_path)
-        try:
-            def write_file(args):
+
+    def _put_sources(self, sources):
+        ''' write the open files of sources, a list of (file, out_path), in one attach '''
+        def write_files(args):
+            for src_file, out_path in sources:
                 with open(out_path, 'wb+') as dst_file:
-                    shutil.copyfileobj(src_file, dst_file)
-            try:
-                self.container.attach_wait(write_file, None)
-            except IOError:
-                traceback.print_exc()
-                msg = "failed to transfer file to %s" % out_path
-                raise errors.AnsibleError(msg)
+                    _copy_file(src_file, dst_file)
+            return 0
+
+        try:
+            rc = self.container.attach_wait(write_files, None)
+        except IOError:
+            rc = None
+            traceback.print_exc()
+        if rc != 0:
+            msg = "failed to transfer file to %s" % ", ".join(to_native(out_path) for dummy, out_path in sources)
+            raise errors.AnsibleError(msg)
+
+    def _flush_puts(self):
+        ''' upload the files deferred by put_file() '''
+        sources, self._pending_puts = self._pending_puts, []
+        if not sources:
+            return
+        self._display.vvv("PUT %d FILES" % len(sources), host=self.container_name)
+        try:
+            self._put_sources(sources)
+        finally:
+            for src_file, dummy in sources:
+                src_file.close()
+
+    @ensure_connect
+    def put_files(self, files):
+        ''' transfer several files from local to lxc while attached once
+
+        :arg files: a list of (in_path, out_path) tuples
+        '''
+        sources = []
+        try:
+            for in_path, out_path in files:
+                self._display.vvv("PUT %s TO %s" % (in_path, out_path), host=self.container_name)
+                sources.append((self._open_source(in_path), to_bytes(out_path, errors='surrogate_or_strict')))
+            self._put_sources(sources)
+        finally:
+            for src_file, dummy in sources:
+                src_file.close()
+
+    def put_file(self, in_path, out_path):
+        ''' transfer a file from local to lxc '''
+        super(Connection, self).put_file(in_path, out_path)
+        self._display.vvv("PUT %s TO %s" % (in_path, out_path), host=self.container_name)
+
+        # the file is opened right away as the caller may remove it before
+        # the deferred upload happens
+        src_file = self._open_source(in_path)
+        out_path = to_bytes(out_path, errors='surrogate_or_strict')
+        if self.get_option('batch_put_file'):
+            self._pending_puts.append((src_file, out_path))
+            return
+        try:
+            self._put_sources([(src_file, out_path)])
         finally:
             src_file.close()
 
@@ -201,6 +310,7 @@ class Connection(ConnectionBase):
         ''' fetch a file from lxc to local '''
         super(Connection, self).fetch_file(in_path, out_path)
         self._display.vvv("FETCH %s TO %s" % (in_path, out_path), host=self.container_name)
+        self._flush_puts()
         in_path = to_bytes(in_path, errors='surrogate_or_strict')
         out_path = to_bytes(out_path, errors='surrogate_or_strict')
 
@@ -214,7 +324,7 @@ class Connection(ConnectionBase):
             def write_file(args):
                 try:
                     with open(in_path, 'rb') as src_file:
-                        shutil.copyfileobj(src_file, dst_file)
+                        _copy_file(src_file, dst_file)
                 finally:
                     # this is needed in the lxc child process
                     # to flush internal python buffers
@@ -229,6 +339,13 @@ class Connection(ConnectionBase):
             dst_file.close()
 
     def close(self):
-        ''' terminate the connection; nothing to do here '''
-        super(Connection, self).close()
-        self._connected = False
+        ''' terminate the connection, after uploading the deferred files '''
+        try:
+            if self.container is not None:
+                self._flush_puts()
+        finally:
+            for src_file, dummy in self._pending_puts:
+                src_file.close()
+            self._pending_puts = []
+            super(Connection, self).close()
+            self._connected = False
@@ -13,6 +13,8 @@ DOCUMENTATION = '''
     short_description: Run tasks in lxc containers via lxc CLI
     description:
         - Run commands or put/fetch files to an existing lxc container using lxc CLI
+        - When O(url) is set, commands and file transfers go directly through the LXD REST API instead,
+          over a single connection kept open for all of them.
     options:
       remote_addr:
         description:
@@ -44,39 +46,146 @@ DOCUMENTATION = '''
         vars:
             - name: ansible_lxd_project
         version_added: 2.0.0
+      url:
+        description:
+            - URL of the LXD API to talk to directly instead of running the C(lxc) CLI, for example
+              V(unix:/var/lib/lxd/unix.socket), V(unix:/var/snap/lxd/common/lxd/unix.socket) or V(https://lxd.example.com:8443).
+            - O(remote) is not used in that case.
+            - Commands run with their output recorded by LXD, which has no standard input, so pipelining is
+              not available and modules are transferred as files.
+        vars:
+            - name: ansible_lxd_url
+        version_added: 8.2.0
+      client_key:
+        description:
+            - The client certificate key file path, for O(url) using HTTPS.
+            - If not specified, it defaults to C(~/.config/lxc/client.key).
+        vars:
+            - name: ansible_lxd_client_key
+        version_added: 8.2.0
+      client_cert:
+        description:
+            - The client certificate file path, for O(url) using HTTPS.
+            - If not specified, it defaults to C(~/.config/lxc/client.crt).
+        vars:
+            - name: ansible_lxd_client_cert
+        version_added: 8.2.0
+      server_cert:
+        description:
+            - The server certificate file path, for O(url) using HTTPS when it is not signed by a trusted CA.
+        vars:
+            - name: ansible_lxd_server_cert
+        version_added: 8.2.0
 '''
 
+import io
 import os
 from subprocess import Popen, PIPE
 
 from ansible.errors import AnsibleError, AnsibleConnectionFailure, AnsibleFileNotFound
 from ansible.module_utils.common.process import get_bin_path
 from ansible.module_utils.common.text.converters import to_bytes, to_text
+from ansible.module_utils.six.moves.urllib.parse import quote, urlencode
 from ansible.plugins.connection import ConnectionBase
+from ansible_collections.community.general.plugins.module_utils.lxd import (
+    LXDClient,
+    LXDClientException,
+    default_cert_file,
+    default_key_file,
+)
 
 
 class Connection(ConnectionBase):
     """ lxd based connections """
 
     transport = 'community.general.lxd'
-    has_pipelining = True
     default_user = 'root'
 
     def __init__(self, play_context, new_stdin, *args, **kwargs):
         super(Connection, self).__init__(play_context, new_stdin, *args, **kwargs)
 
-        try:
-            self._lxc_cmd = get_bin_path("lxc")
-        except ValueError:
-            raise AnsibleError("lxc command not found in PATH")
+        self._lxc_cmd_path = None
+        self._client = None
 
         if self._play_context.remote_user is not None and self._play_context.remote_user != 'root':
             self._display.warning('lxd does not support remote_user, using container default: root')
 
+    @property
+    def has_pipelining(self):
+        """ commands run through the API have no stdin to pipe modules into """
+        try:
+            return not self.get_option("url")
+        except (KeyError, AnsibleError):
+            return True
+
+    @property
+    def _lxc_cmd(self):
+        if self._lxc_cmd_path is None:
+            try:
+                self._lxc_cmd_path = get_bin_path("lxc")
+            except ValueError:
+                raise AnsibleError("lxc command not found in PATH")
+        return self._lxc_cmd_path
+
     def _host(self):
         """ translate remote_addr to lxd (short) hostname """
         return self.get_option("remote_addr").split(".", 1)[0]
 
+    def _api_client(self):
+        """ return the LXD API client, opening its connection on first use """
+        if self._client is None:
+            try:
+                self._client = LXDClient(
+                    self.get_option("url"),
+                    key_file=self.get_option("client_key") or default_key_file(),
+                    cert_file=self.get_option("client_cert") or default_cert_file(),
+                    server_cert_file=self.get_option("server_cert"),
+                )
+            except (LXDClientException, IOError, OSError) as e:
+                raise AnsibleConnectionFailure("cannot connect to LXD at %s: %s" % (self.get_option("url"), getattr(e, 'msg', e)))
+        return self._client
+
+    def _api_url(self, resource, **params):
+        """ return the API URL of resource, relative to the instance unless it is absolute """
+        if not resource.startswith('/'):
+            resource = '/1.0/instances/%s/%s' % (quote(self._host(), safe=''), resource)
+        if self.get_option("project"):
+            params['project'] = self.get_option("project")
+        if params:
+            resource = '%s?%s' % (resource, urlencode(params))
+        return resource
+
+    def _api_error(self, e):
+        """ map an API error to the exceptions raised when using the CLI """
+        msg = to_text(e.msg)
+        if "not running" in msg:
+            return AnsibleConnectionFailure("instance not running: %s" % self._host())
+        if msg.lower() in ("instance not found", "not found"):
+            return AnsibleConnectionFailure("instance not found: %s" % self._host())
+        return AnsibleConnectionFailure("LXD API error on %s: %s" % (self._host(), msg))
+
+    def _api_exec(self, cmd):
+        """ run a command through the exec API, with its output recorded by LXD """
+        client = self._api_client()
+        body = {
+            'command': [self.get_option("executable"), "-c", cmd],
+            'record-output': True,
+            'wait-for-websocket': False,
+            'interactive': False,
+        }
+        try:
+            metadata = client.do('POST', self._api_url('exec'), body_json=body)['metadata'].get('metadata') or {}
+            output = {}
+            for fd, log_path in (metadata.get('output') or {}).items():
+                buf = io.BytesIO()
+                client.download(self._api_url(log_path), buf)
+                output[fd] = buf.getvalue()
+                # exec logs are kept by LXD until they are deleted
+                client.do('DELETE', self._api_url(log_path))
+        except LXDClientException as e:
+            raise self._api_error(e)
+        return metadata.get('return', -1), to_text(output.get('1', b'')), to_text(output.get('2', b''))
+
     def _connect(self):
         """connect to lxd (nothing to do here) """
         super(Connection, self)._connect()
@@ -91,6 +200,11 @@ class Connection(ConnectionBase):
 
         self._display.vvv(u"EXEC {0}".format(cmd), host=self._host())
 
+        if self.get_option("url") and in_data is None:
+            returncode, stdout, stderr = self._api_exec(cmd)
+            self._display.vvvvv(u"EXEC lxd api output: {0} {1}".format(stdout, stderr), host=self._host())
+            return returncode, stdout, stderr
+
         local_cmd = [self._lxc_cmd]
         if self.get_option("project"):
             local_cmd.extend(["--project", self.get_option("project")])
@@ -128,9 +242,25 @@ class Connection(ConnectionBase):
 
         self._display.vvv(u"PUT {0} TO {1}".format(in_path, out_path), host=self._host())
 
-        if not os.path.isfile(to_bytes(in_path, errors='surrogate_or_strict')):
+        b_in_path = to_bytes(in_path, errors='surrogate_or_strict')
+        if not os.path.isfile(b_in_path):
             raise AnsibleFileNotFound("input path is not a file: %s" % in_path)
 
+        if self.get_option("url"):
+            headers = {
+                'X-LXD-type': 'file',
+                'X-LXD-uid': '0',
+                'X-LXD-gid': '0',
+                'X-LXD-mode': '%04o' % (os.stat(b_in_path).st_mode & 0o7777),
+                'X-LXD-write': 'overwrite',
+            }
+            try:
+                with open(b_in_path, 'rb') as f:
+                    self._api_client().upload(self._api_url('files', path=out_path), f, os.fstat(f.fileno()).st_size, headers=headers)
+            except LXDClientException as e:
+                raise self._api_error(e)
+            return
+
         local_cmd = [self._lxc_cmd]
         if self.get_option("project"):
             local_cmd.extend(["--project", self.get_option("project")])
@@ -151,6 +281,14 @@ class Connection(ConnectionBase):
 
         self._display.vvv(u"FETCH {0} TO {1}".format(in_path, out_path), host=self._host())
 
+        if self.get_option("url"):
+            try:
+                with open(to_bytes(out_path, errors='surrogate_or_strict'), 'wb') as f:
+                    self._api_client().download(self._api_url('files', path=in_path), f)
+            except LXDClientException as e:
+                raise self._api_error(e)
+            return
+
         local_cmd = [self._lxc_cmd]
         if self.get_option("project"):
             local_cmd.extend(["--project", self.get_option("project")])
@@ -166,7 +304,11 @@ class Connection(ConnectionBase):
         process.communicate()
 
     def close(self):
-        """ close the connection (nothing to do here) """
+        """ close the connection to the LXD API, if any """
         super(Connection, self).close()
 
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
         self._connected = False
@@ -37,17 +37,58 @@ DOCUMENTATION = '''
             - name: ansible_user
 #        keyword:
 #            - name: hosts
+      persistent_shell:
+        description:
+            - Run all commands through one long-lived C(qvm-run --pass-io) shell in the VM instead of starting
+              C(qvm-run) for every command.
+            - Commands are sent to the shell on its standard input and their output, error output and exit code are
+              read back from its standard output and standard error.
+            - Commands whose input contains NUL bytes or does not end with a newline are still run on their own.
+        ini:
+          - section: qubes_connection
+            key: persistent_shell
+        env:
+          - name: ANSIBLE_QUBES_PERSISTENT_SHELL
+        vars:
+          - name: ansible_qubes_persistent_shell
+        default: false
+        type: bool
+        version_added: 8.2.0
+      transfer_compression:
+        description:
+            - Compress file transfers with gzip. C(gzip) must be installed in the VM.
+            - When putting a file, it is only compressed if a sample of its content compresses well, so
+              already compressed files are sent as they are.
+        ini:
+          - section: qubes_connection
+            key: transfer_compression
+        env:
+          - name: ANSIBLE_QUBES_TRANSFER_COMPRESSION
+        vars:
+          - name: ansible_qubes_transfer_compression
+        default: false
+        type: bool
+        version_added: 8.2.0
 '''
 
 import subprocess
+import zlib
 
-from ansible.module_utils.common.text.converters import to_bytes
-from ansible.plugins.connection import ConnectionBase, ensure_connect
+from ansible.module_utils.common.text.converters import to_bytes, to_native
+from ansible.module_utils.six.moves import shlex_quote
+from ansible.plugins.connection import ConnectionBase, ensure_connect, BUFSIZE
 from ansible.errors import AnsibleConnectionFailure
 from ansible.utils.display import Display
 
+from ansible_collections.community.general.plugins.module_utils._shell_session import ShellSession, ShellSessionError
+
 display = Display()
 
+# files smaller than this are never compressed
+COMPRESS_MIN_SIZE = 4096
+# compress a file only if a sample of it shrinks to less than this ratio
+COMPRESS_MAX_RATIO = 0.9
+
 
 # this _has to be_ named Connection
 class Connection(ConnectionBase):
@@ -62,21 +103,14 @@ class Connection(ConnectionBase):
 
         self._remote_vmname = self._play_context.remote_addr
         self._connected = False
+        self._shell_session = None
         # Default username in Qubes
         self.user = "user"
         if self._play_context.remote_user:
             self.user = self._play_context.remote_user
 
-    def _qubes(self, cmd=None, in_data=None, shell="qubes.VMShell"):
-        """run qvm-run executable
-
-        :param cmd: cmd string for remote system
-        :param in_data: data passed to qvm-run-vm's stdin
-        :return: return code, stdout, stderr
-        """
-        display.vvvv("CMD: ", cmd)
-        if not cmd.endswith("\n"):
-            cmd = cmd + "\n"
+    def _qvm_run_cmd(self, shell="qubes.VMShell"):
+        """build the qvm-run command line starting shell in the VM"""
         local_cmd = []
 
         # For dom0
@@ -89,19 +123,69 @@ class Connection(ConnectionBase):
 
         local_cmd.append(shell)
 
-        local_cmd = [to_bytes(i, errors='surrogate_or_strict') for i in local_cmd]
+        return [to_bytes(i, errors='surrogate_or_strict') for i in local_cmd]
+
+    def _qubes_process(self, cmd, shell="qubes.VMShell", stdout=subprocess.PIPE):
+        """start qvm-run and send it cmd, the rest of its stdin is the input of cmd
+
+        :param cmd: cmd string for remote system
+        :param shell: the qubes service to run cmd with
+        :param stdout: where the output of cmd is sent
+        :return: the qvm-run process
+        """
+        display.vvvv("CMD: ", cmd)
+        if not cmd.endswith("\n"):
+            cmd = cmd + "\n"
+        local_cmd = self._qvm_run_cmd(shell)
 
         display.vvvv("Local cmd: ", local_cmd)
 
         display.vvv("RUN %s" % (local_cmd,), host=self._remote_vmname)
         p = subprocess.Popen(local_cmd, shell=False, stdin=subprocess.PIPE,
-                             stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                             stdout=stdout, stderr=subprocess.PIPE)
 
         # Here we are writing the actual command to the remote bash
         p.stdin.write(to_bytes(cmd, errors='surrogate_or_strict'))
+        return p
+
+    def _qubes(self, cmd=None, in_data=None, shell="qubes.VMShell"):
+        """run qvm-run executable
+
+        :param cmd: cmd string for remote system
+        :param in_data: data passed to qvm-run-vm's stdin
+        :return: return code, stdout, stderr
+        """
+        p = self._qubes_process(cmd, shell)
         stdout, stderr = p.communicate(input=in_data)
         return p.returncode, stdout, stderr
 
+    def _qubes_put(self, cmd, in_file, compressor=None, shell="qubes.VMShell"):
+        """run cmd with the content of in_file as its input, sent in chunks of BUFSIZE
+
+        :return: return code, stdout, stderr
+        """
+        p = self._qubes_process(cmd, shell)
+        try:
+            chunk = in_file.read(BUFSIZE)
+            while chunk:
+                if compressor is not None:
+                    chunk = compressor.compress(chunk)
+                p.stdin.write(chunk)
+                chunk = in_file.read(BUFSIZE)
+            if compressor is not None:
+                p.stdin.write(compressor.flush())
+        except (IOError, OSError):
+            # the remote command went away, its exit code tells why
+            pass
+        stdout, stderr = p.communicate()
+        return p.returncode, stdout, stderr
+
+    def _persistent_shell(self):
+        """return the persistent shell of the VM, it is started on first use"""
+        if self._shell_session is None:
+            self._shell_session = ShellSession(self._qvm_run_cmd())
+        return self._shell_session
+
     def _connect(self):
         """No persistent connection is being maintained."""
         super(Connection, self)._connect()
@@ -114,7 +198,14 @@ class Connection(ConnectionBase):
 
         display.vvvv("CMD IS: %s" % cmd)
 
-        rc, stdout, stderr = self._qubes(cmd)
+        if self.get_option('persistent_shell') and ShellSession.accepts_input(in_data):
+            display.vvv("RUN (persistent shell) %s" % cmd, host=self._remote_vmname)
+            try:
+                rc, stdout, stderr = self._persistent_shell().run(cmd, in_data)
+            except ShellSessionError as e:
+                raise AnsibleConnectionFailure('qubes shell session failed: {0}'.format(to_native(e)))
+        else:
+            rc, stdout, stderr = self._qubes(cmd, in_data)
 
         display.vvvvv("STDOUT %r STDERR %r" % (stderr, stderr))
         return rc, stdout, stderr
@@ -125,31 +216,75 @@ class Connection(ConnectionBase):
         display.vvv("PUT %s TO %s" % (in_path, out_path), host=self._remote_vmname)
 
         with open(in_path, "rb") as fobj:
-            source_data = fobj.read()
+            compress = self._should_compress(fobj)
+            cmd = '{0} > {1}\n'.format('gzip -dc' if compress else 'cat', shlex_quote(out_path))
 
-        retcode, dummy, dummy = self._qubes('cat > "{0}"\n'.format(out_path), source_data, "qubes.VMRootShell")
-        # if qubes.VMRootShell service not supported, fallback to qubes.VMShell and
-        # hope it will have appropriate permissions
-        if retcode == 127:
-            retcode, dummy, dummy = self._qubes('cat > "{0}"\n'.format(out_path), source_data)
+            retcode, dummy, dummy = self._qubes_put(cmd, fobj, self._compressor(compress), "qubes.VMRootShell")
+            # if qubes.VMRootShell service not supported, fallback to qubes.VMShell and
+            # hope it will have appropriate permissions
+            if retcode == 127:
+                fobj.seek(0)
+                retcode, dummy, dummy = self._qubes_put(cmd, fobj, self._compressor(compress))
 
         if retcode != 0:
             raise AnsibleConnectionFailure('Failed to put_file to {0}'.format(out_path))
 
+    def _should_compress(self, fobj):
+        """whether a file is worth compressing, judging from its first chunk"""
+        if not self.get_option('transfer_compression'):
+            return False
+        sample = fobj.read(BUFSIZE)
+        fobj.seek(0)
+        if len(sample) < COMPRESS_MIN_SIZE:
+            return False
+        return len(zlib.compress(sample, 1)) < len(sample) * COMPRESS_MAX_RATIO
+
+    @staticmethod
+    def _compressor(compress):
+        if not compress:
+            return None
+        # wbits=31 writes the gzip format understood by gzip -d
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+
     def fetch_file(self, in_path, out_path):
         """Obtain file specified via 'in_path' from the container and place it at 'out_path' """
         super(Connection, self).fetch_file(in_path, out_path)
         display.vvv("FETCH %s TO %s" % (in_path, out_path), host=self._remote_vmname)
 
         # We are running in dom0
-        cmd_args_list = ["qvm-run", "--pass-io", self._remote_vmname, "cat {0}".format(in_path)]
-        with open(out_path, "wb") as fobj:
-            p = subprocess.Popen(cmd_args_list, shell=False, stdout=fobj)
-            p.communicate()
-            if p.returncode != 0:
-                raise AnsibleConnectionFailure('Failed to fetch file to {0}'.format(out_path))
+        if not self.get_option('transfer_compression'):
+            cmd_args_list = ["qvm-run", "--pass-io", self._remote_vmname, "cat {0}".format(in_path)]
+            with open(out_path, "wb") as fobj:
+                p = subprocess.Popen(cmd_args_list, shell=False, stdout=fobj)
+                p.communicate()
+                if p.returncode != 0:
+                    raise AnsibleConnectionFailure('Failed to fetch file to {0}'.format(out_path))
+            return
+
+        p = self._qubes_process('gzip -c < {0}\n'.format(shlex_quote(in_path)))
+        p.stdin.close()
+        decompressor = zlib.decompressobj(31)
+        try:
+            with open(out_path, "wb") as fobj:
+                chunk = p.stdout.read(BUFSIZE)
+                while chunk:
+                    fobj.write(decompressor.decompress(chunk))
+                    chunk = p.stdout.read(BUFSIZE)
+                fobj.write(decompressor.flush())
+        except zlib.error as e:
+            p.kill()
+            raise AnsibleConnectionFailure('Failed to fetch file to {0}: {1}'.format(out_path, to_native(e)))
+        finally:
+            p.stdout.close()
+            p.stderr.close()
+            p.wait()
+        if p.returncode != 0:
+            raise AnsibleConnectionFailure('Failed to fetch file to {0}'.format(out_path))
 
     def close(self):
         """ Closing the connection """
         super(Connection, self).close()
+        if self._shell_session is not None:
+            self._shell_session.close()
+            self._shell_session = None
         self._connected = False
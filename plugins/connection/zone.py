@@ -25,6 +25,23 @@ DOCUMENTATION = '''
         vars:
             - name: ansible_host
             - name: ansible_zone_host
+      persistent_shell:
+        description:
+            - Run all commands through one long-lived shell in the zone instead of starting C(zlogin) and a new
+              shell for every command.
+            - Commands are sent to the shell on its standard input and their output, error output and exit code are
+              read back from its standard output and standard error, so the commands cannot use a terminal.
+            - Commands whose input contains NUL bytes or does not end with a newline are still run on their own.
+        ini:
+          - section: zone_connection
+            key: persistent_shell
+        env:
+          - name: ANSIBLE_ZONE_PERSISTENT_SHELL
+        vars:
+          - name: ansible_zone_persistent_shell
+        default: false
+        type: bool
+        version_added: 8.2.0
 '''
 
 import os
@@ -32,13 +49,15 @@ import os.path
 import subprocess
 import traceback
 
-from ansible.errors import AnsibleError
+from ansible.errors import AnsibleConnectionFailure, AnsibleError
 from ansible.module_utils.six.moves import shlex_quote
 from ansible.module_utils.common.process import get_bin_path
-from ansible.module_utils.common.text.converters import to_bytes
+from ansible.module_utils.common.text.converters import to_bytes, to_native
 from ansible.plugins.connection import ConnectionBase, BUFSIZE
 from ansible.utils.display import Display
 
+from ansible_collections.community.general.plugins.module_utils._shell_session import ShellSession, ShellSessionError
+
 display = Display()
 
 
@@ -53,6 +72,7 @@ class Connection(ConnectionBase):
         super(Connection, self).__init__(play_context, new_stdin, *args, **kwargs)
 
         self.zone = self._play_context.remote_addr
+        self._shell_session = None
 
         if os.geteuid() != 0:
             raise AnsibleError("zone connection requires running as root")
@@ -122,10 +142,26 @@ class Connection(ConnectionBase):
 
         return p
 
+    def _persistent_shell(self):
+        """ return the persistent shell of the zone, it is started on first use """
+        if self._shell_session is None:
+            # zlogin runs the given command through the login shell of the zone
+            local_cmd = [self.zlogin_cmd, self.zone, '/bin/sh']
+            display.vvv("SHELL SESSION %s" % (local_cmd,), host=self.zone)
+            self._shell_session = ShellSession(local_cmd)
+        return self._shell_session
+
     def exec_command(self, cmd, in_data=None, sudoable=False):
         """ run a command on the zone """
         super(Connection, self).exec_command(cmd, in_data=in_data, sudoable=sudoable)
 
+        if self.get_option('persistent_shell') and ShellSession.accepts_input(in_data):
+            display.vvv("EXEC (persistent shell) %s" % cmd, host=self.zone)
+            try:
+                return self._persistent_shell().run(cmd, in_data)
+            except ShellSessionError as e:
+                raise AnsibleConnectionFailure("zone shell session failed: %s" % to_native(e))
+
         p = self._buffered_exec_command(cmd)
 
         stdout, stderr = p.communicate(in_data)
@@ -196,6 +232,9 @@ class Connection(ConnectionBase):
                 raise AnsibleError("failed to transfer file %s to %s:\n%s\n%s" % (in_path, out_path, stdout, stderr))
 
     def close(self):
-        """ terminate the connection; nothing to do here """
+        """ terminate the connection and the persistent shell, if any """
         super(Connection, self).close()
+        if self._shell_session is not None:
+            self._shell_session.close()
+            self._shell_session = None
         self._connected = False
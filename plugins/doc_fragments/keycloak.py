@@ -76,4 +76,31 @@ options:
         type: str
         default: Ansible
         version_added: 5.4.0
+
+    token_cache:
+        description:
+            - Cache the access token obtained from O(auth_username) and O(auth_password) on disk and reuse it
+              in later tasks until shortly before it expires.
+            - Expired tokens are renewed with the refresh token grant when possible, instead of logging in again.
+            - The cache is locked, so concurrent tasks using the same credentials log in only once.
+            - The cache files contain live access tokens and are only readable by the user running the module.
+        type: bool
+        default: false
+        version_added: 8.2.0
+
+    token_cache_dir:
+        description:
+            - Directory holding the token cache when O(token_cache=true).
+            - Defaults to C(~/.ansible/keycloak_token_cache) of the user running the module.
+        type: path
+        version_added: 8.2.0
+
+    http_keep_alive:
+        description:
+            - Send all API requests of a task over one persistent HTTP connection to Keycloak,
+              instead of opening a new connection (and TLS session) for each request.
+            - Requests that need a proxy or are redirected are still sent over separate connections.
+        type: bool
+        default: false
+        version_added: 8.2.0
 '''
@@ -44,6 +44,24 @@ options:
       - This should only be used on personally controlled sites using self-signed certificates.
     type: bool
     default: false
+  api_ticket_cache:
+    description:
+      - Keep the authentication ticket obtained with O(api_password) in an on-disk cache,
+        and log in with it in the following tasks using the same credentials while it is valid.
+      - Proxmox VE accepts a valid ticket in place of the password, which spares the realm
+        a full password login for every task.
+      - The cache files are only readable by their owner, but hold tickets granting the
+        privileges of O(api_user) until they expire.
+      - Has no effect with API tokens.
+    type: bool
+    default: false
+    version_added: 8.2.0
+  api_ticket_cache_dir:
+    description:
+      - Directory holding the ticket cache when O(api_ticket_cache=true).
+      - Defaults to C(~/.ansible/proxmox_ticket_cache).
+    type: path
+    version_added: 8.2.0
 requirements: [ "proxmoxer", "requests" ]
 '''
 
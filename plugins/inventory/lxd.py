@@ -104,6 +104,15 @@ DOCUMENTATION = r'''
             - Create groups by the following keywords C(location), C(network_range), C(os), C(pattern), C(profile), C(release), C(type), C(vlanid).
             - See example for syntax.
             type: dict
+        recursion:
+            description:
+            - Fetch all instances together with their state in a single request by using the C(recursion=2)
+              parameter of the LXD API, instead of two requests per instance.
+            - The response of such a request also contains the snapshots and backups of all instances and
+              can become large. When that is a problem, leave this disabled.
+            type: bool
+            default: false
+            version_added: 8.2.0
 '''
 
 EXAMPLES = '''
@@ -121,6 +130,11 @@ plugin: community.general.lxd
 url: unix:/var/snap/lxd/common/lxd/unix.socket
 type_filter: both
 
+# lxd.yml fetching all instances with a single request
+plugin: community.general.lxd
+url: unix:/var/snap/lxd/common/lxd/unix.socket
+recursion: true
+
 # grouping lxd.yml
 groupby:
   locationBerlin:
@@ -403,11 +417,55 @@ class InventoryModule(BaseInventoryPlugin):
         # tuple(('instances','metadata/templates')) to get section in branch
         # e.g. /1.0/instances/<name>/metadata/templates
         branches = ['instances', ('instances', 'state')]
-        instance_config = {}
+        instances = self.data.setdefault('instances', {})
         for branch in branches:
             for name in names:
-                instance_config['instances'] = self._get_config(branch, name)
-                self.data = dict_merge(instance_config, self.data)
+                self._add_config(instances, self._get_config(branch, name))
+
+    def get_instance_data_recursive(self):
+        """Create Inventory of all instances with a single request
+
+        Use recursion=2 to get the configuration and the state of all instances at once
+        and store them like get_instance_data() does.
+
+        Args:
+            None
+        Kwargs:
+            None
+        Source:
+            https://documentation.ubuntu.com/lxd/en/latest/rest-api/#recursion
+        Raises:
+            None
+        Returns:
+            None"""
+        params = dict(recursion=2)
+        if self.project:
+            params['project'] = self.project
+        response = self.socket.do('GET', '/1.0/instances?{0}'.format(urlencode(params)))
+
+        instances = self.data.setdefault('instances', {})
+        for instance in response['metadata']:
+            instance = dict(instance)
+            state = instance.pop('state', None) or {}
+            # snapshots and backups are not used by the inventory
+            instance.pop('snapshots', None)
+            instance.pop('backups', None)
+            instances[instance['name']] = {
+                'instances': self._wrap_metadata(response, instance),
+                'state': self._wrap_metadata(response, state),
+            }
+
+    @staticmethod
+    def _wrap_metadata(response, metadata):
+        """Build the response a request for a single object would have returned"""
+        return dict(type=response.get('type'), status=response.get('status'), status_code=response.get('status_code'),
+                    operation='', error_code=0, error='', metadata=metadata)
+
+    @staticmethod
+    def _add_config(store, config):
+        """Add the result of _get_config() to store without copying store"""
+        for name, branches in config.items():
+            store.setdefault(name, {}).update(branches)
 
     def get_network_data(self, names):
         """Create Inventory of the instance
@@ -425,14 +483,17 @@ class InventoryModule(BaseInventoryPlugin):
         # tuple(('instances','metadata/templates')) to get section in branch
         # e.g. /1.0/instances/<name>/metadata/templates
         branches = [('networks', 'state')]
-        network_config = {}
+        networks = self.data.setdefault('networks', {})
         for branch in branches:
             for name in names:
                 try:
-                    network_config['networks'] = self._get_config(branch, name)
+                    config = self._get_config(branch, name)
                 except LXDClientException:
-                    network_config['networks'] = {name: None}
-                self.data = dict_merge(network_config, self.data)
+                    config = {name: None}
+                if config[name] is None:
+                    networks[name] = None
+                else:
+                    self._add_config(networks, config)
 
     def extract_network_information_from_instance_config(self, instance_name):
         """Returns the network interface configuration
@@ -1048,8 +1109,14 @@ class InventoryModule(BaseInventoryPlugin):
 
         if len(self.data) == 0:  # If no data is injected by unittests open socket
             self.socket = self._connect_to_socket()
-            self.get_instance_data(self._get_instances())
-            self.get_network_data(self._get_networks())
+            try:
+                if self.recursion:
+                    self.get_instance_data_recursive()
+                else:
+                    self.get_instance_data(self._get_instances())
+                self.get_network_data(self._get_networks())
+            finally:
+                self.socket.close()
 
         # The first version of the inventory only supported containers.
         # This will change in the future.
@@ -1108,6 +1175,7 @@ class InventoryModule(BaseInventoryPlugin):
                 self.filter = self.get_option('state').lower()
             self.trust_password = self.get_option('trust_password')
             self.url = self.get_option('url')
+            self.recursion = self.get_option('recursion')
         except Exception as err:
             raise AnsibleParserError(
                 'All correct options required: {0}'.format(to_native(err)))
@@ -90,6 +90,51 @@ DOCUMENTATION = '''
             type: boolean
             default: true
             version_added: 7.4.0
+        output_format:
+            description:
+                - Which nmap output to parse.
+                - With V(text), the normal output is parsed once nmap has finished.
+                - With V(xml), nmap writes XML output (C(-oX -)) which is parsed while the scan is running,
+                  and each host is added to the inventory as soon as nmap reports it. This uses much less
+                  memory for large networks.
+            type: string
+            default: text
+            choices: [ text, xml ]
+            version_added: 8.2.0
+        timing:
+            description:
+                - Timing template (C(-T)), from V(0) (paranoid) to V(5) (insane).
+            type: int
+            choices: [ 0, 1, 2, 3, 4, 5 ]
+            version_added: 8.2.0
+        min_parallelism:
+            description:
+                - Minimum number of probes sent in parallel (C(--min-parallelism)).
+            type: int
+            version_added: 8.2.0
+        max_parallelism:
+            description:
+                - Maximum number of probes sent in parallel (C(--max-parallelism)).
+            type: int
+            version_added: 8.2.0
+        max_hostgroup:
+            description:
+                - Maximum number of hosts scanned in parallel (C(--max-hostgroup)).
+                - Results of a group of hosts are only reported once the whole group has been scanned,
+                  so smaller groups make hosts show up earlier with O(output_format=xml).
+            type: int
+            version_added: 8.2.0
+        rescan_ttl:
+            description:
+                - When the inventory is read from the cache, hosts that have been scanned more than this many seconds ago
+                  are scanned again, and only these hosts are scanned. Hosts that are no longer up are removed.
+                - New hosts in O(address) are only found by a full scan, which happens when the last full scan is older
+                  than O(cache_timeout).
+                - Set to V(0) to use the cached hosts as they are.
+                - Requires O(cache=true).
+            type: int
+            default: 0
+            version_added: 8.2.0
     notes:
         - At least one of ipv4 or ipv6 is required to be True, both can be True, but they cannot both be False.
         - 'TODO: add OS fingerprinting'
@@ -114,12 +159,26 @@ exclude: 192.168.0.1, web.example.com
 port: 22, 443
 groups:
   web_servers: "ports | selectattr('port', 'equalto', '443')"
+
+# a large scan which adds hosts to the inventory while nmap is running,
+# and only checks the cached hosts again every hour
+plugin: community.general.nmap
+address: 10.0.0.0/16
+output_format: xml
+timing: 4
+max_hostgroup: 256
+cache: true
+cache_timeout: 86400
+rescan_ttl: 3600
 '''
 
 import os
 import re
+import tempfile
+import time
 
 from subprocess import Popen, PIPE
+from xml.etree import ElementTree
 
 from ansible import constants as C
 from ansible.errors import AnsibleParserError
@@ -197,107 +256,272 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                 # This occurs if the cache_key is not in the cache or if the cache_key expired, so the cache needs to be updated
                 cache_needs_update = True
 
-        if not user_cache_setting or cache_needs_update:
-            # setup command
-            cmd = [self._nmap]
-
-            if self.get_option('sudo'):
-                cmd.insert(0, 'sudo')
-
-            if self.get_option('port'):
-                cmd.append('-p')
-                cmd.append(self.get_option('port'))
-
-            if not self.get_option('ports'):
-                cmd.append('-sP')
-
-            if self.get_option('ipv4') and not self.get_option('ipv6'):
-                cmd.append('-4')
-            elif self.get_option('ipv6') and not self.get_option('ipv4'):
-                cmd.append('-6')
-            elif not self.get_option('ipv6') and not self.get_option('ipv4'):
-                raise AnsibleParserError('One of ipv4 or ipv6 must be enabled for this plugin')
-
-            if self.get_option('exclude'):
-                cmd.append('--exclude')
-                cmd.append(','.join(self.get_option('exclude')))
-
-            if self.get_option('dns_resolve'):
-                cmd.append('-n')
-
-            if self.get_option('udp_scan'):
-                cmd.append('-sU')
-
-            if self.get_option('icmp_timestamp'):
-                cmd.append('-PP')
-
-            if self.get_option('open'):
-                cmd.append('--open')
+        scanned = None
+        try:
+            if not user_cache_setting or cache_needs_update:
+                results, scanned = self._full_scan()
+            elif self.get_option('rescan_ttl'):
+                try:
+                    scanned = self._cache[cache_key + '_scanned']
+                except KeyError:
+                    scanned = None
+                if self._full_scan_expired(scanned):
+                    # writing the scan times refreshes the expiry of the cached hosts as well,
+                    # so look for new hosts in address once the last full scan is older than cache_timeout
+                    results, scanned = self._full_scan()
+                    cache_needs_update = True
+                else:
+                    results, hosts, changed = self._rescan(results, scanned['hosts'], self.get_option('rescan_ttl'))
+                    if changed:
+                        scanned = dict(scanned, hosts=hosts)
+                        cache_needs_update = True
+            else:
+                self._populate(results)
+        except AnsibleParserError:
+            raise
+        except Exception as e:
+            raise AnsibleParserError("failed to parse %s: %s " % (to_native(path), to_native(e)))
 
-            if not self.get_option('use_arp_ping'):
-                cmd.append('--disable-arp-ping')
+        if cache_needs_update:
+            self._cache[cache_key] = results
+            if scanned is not None:
+                self._cache[cache_key + '_scanned'] = scanned
+
+    def _full_scan(self):
+        """ Scan address and return the hosts and the scan times to cache """
+        now = time.time()
+        results = self._scan_and_populate([self.get_option('address')])
+        return results, {'full_scan': now, 'hosts': dict.fromkeys((host['ip'] for host in results), now)}
+
+    def _full_scan_expired(self, scanned):
+        if not isinstance(scanned, dict) or 'full_scan' not in scanned:
+            return True
+        cache_timeout = self.get_option('cache_timeout')
+        return bool(cache_timeout) and time.time() - scanned['full_scan'] >= cache_timeout
+
+    def _rescan(self, results, scanned, ttl):
+        """ Scan the cached hosts that have been scanned more than ttl seconds ago again
+
+            Returns the hosts, their scan times and whether any host was scanned.
+        """
+        now = time.time()
+        current = []
+        stale = []
+        for host in results:
+            if now - scanned.get(host['ip'], 0) > ttl:
+                stale.append(host['ip'])
+            else:
+                current.append(host)
+
+        self._populate(current)
+        if stale:
+            rescanned = self._scan_and_populate(stale)
+            current.extend(rescanned)
+            scanned = dict((host['ip'], scanned.get(host['ip'], now)) for host in current)
+            scanned.update(dict.fromkeys((host['ip'] for host in rescanned), now))
+        return current, scanned, bool(stale)
+
+    def _scan_and_populate(self, targets):
+        results = []
+        for host in self._scan(targets):
+            self._populate([host])
+            results.append(host)
+        return results
+
+    def _build_command(self, targets):
+        # setup command
+        cmd = [self._nmap]
+
+        if self.get_option('sudo'):
+            cmd.insert(0, 'sudo')
+
+        if self.get_option('port'):
+            cmd.append('-p')
+            cmd.append(self.get_option('port'))
+
+        if not self.get_option('ports'):
+            cmd.append('-sP')
+
+        if self.get_option('ipv4') and not self.get_option('ipv6'):
+            cmd.append('-4')
+        elif self.get_option('ipv6') and not self.get_option('ipv4'):
+            cmd.append('-6')
+        elif not self.get_option('ipv6') and not self.get_option('ipv4'):
+            raise AnsibleParserError('One of ipv4 or ipv6 must be enabled for this plugin')
+
+        if self.get_option('exclude'):
+            cmd.append('--exclude')
+            cmd.append(','.join(self.get_option('exclude')))
+
+        if self.get_option('dns_resolve'):
+            cmd.append('-n')
+
+        if self.get_option('udp_scan'):
+            cmd.append('-sU')
+
+        if self.get_option('icmp_timestamp'):
+            cmd.append('-PP')
+
+        if self.get_option('open'):
+            cmd.append('--open')
+
+        if not self.get_option('use_arp_ping'):
+            cmd.append('--disable-arp-ping')
+
+        if self.get_option('timing') is not None:
+            cmd.append('-T%d' % self.get_option('timing'))
+
+        for option in ('min_parallelism', 'max_parallelism', 'max_hostgroup'):
+            if self.get_option(option):
+                cmd.append('--%s' % option.replace('_', '-'))
+                cmd.append(str(self.get_option(option)))
+
+        if self.get_option('output_format') == 'xml':
+            cmd.extend(['-oX', '-'])
+
+        cmd.extend(targets)
+        return cmd
+
+    def _scan(self, targets):
+        """ Run nmap and yield the hosts it found """
+        target_file = None
+        if len(targets) > 1:
+            # keep the command line short when scanning a list of cached hosts
+            target_file = tempfile.NamedTemporaryFile(mode='w', prefix='ansible-nmap-', delete=False)
+            target_file.write('\n'.join(targets))
+            target_file.close()
+            targets = ['-iL', target_file.name]
 
-            cmd.append(self.get_option('address'))
-            try:
+        try:
+            cmd = self._build_command(targets)
+            # stderr is written to a file, so that nmap cannot block on it while stdout is read
+            with tempfile.TemporaryFile() as stderr:
                 # execute
-                p = Popen(cmd, stdout=PIPE, stderr=PIPE)
-                stdout, stderr = p.communicate()
+                p = Popen(cmd, stdout=PIPE, stderr=stderr)
+                try:
+                    if self.get_option('output_format') == 'xml':
+                        for host in self._parse_xml(p.stdout):
+                            yield host
+                        p.stdout.close()
+                    else:
+                        stdout = p.communicate()[0]
+                except BaseException:
+                    # do not wait for a scan whose output is no longer read
+                    if p.poll() is None:
+                        try:
+                            p.kill()
+                        except OSError:
+                            pass
+                    raise
+                finally:
+                    p.wait()
                 if p.returncode != 0:
-                    raise AnsibleParserError('Failed to run nmap, rc=%s: %s' % (p.returncode, to_native(stderr)))
-
-                # parse results
-                host = None
-                ip = None
-                ports = []
-                results = []
+                    stderr.seek(0)
+                    raise AnsibleParserError('Failed to run nmap, rc=%s: %s' % (p.returncode, to_native(stderr.read())))
+                if self.get_option('output_format') != 'xml':
+                    for host in self._parse_text(stdout):
+                        yield host
+        finally:
+            if target_file is not None:
+                os.unlink(target_file.name)
+
+    def _parse_text(self, stdout):
+        # parse results
+        host = None
+        ip = None
+        ports = []
+        results = []
 
-                try:
-                    t_stdout = to_text(stdout, errors='surrogate_or_strict')
-                except UnicodeError as e:
-                    raise AnsibleParserError('Invalid (non unicode) input returned: %s' % to_native(e))
-
-                for line in t_stdout.splitlines():
-                    hits = self.find_host.match(line)
-                    if hits:
-                        if host is not None and ports:
-                            results[-1]['ports'] = ports
-
-                        # if dns only shows arpa, just use ip instead as hostname
-                        if hits.group(1).endswith('.in-addr.arpa'):
-                            host = hits.group(2)
-                        else:
-                            host = hits.group(1)
-
-                        # if no reverse dns exists, just use ip instead as hostname
-                        if hits.group(2) is not None:
-                            ip = hits.group(2)
-                        else:
-                            ip = hits.group(1)
-
-                        if host is not None:
-                            # update inventory
-                            results.append(dict())
-                            results[-1]['name'] = host
-                            results[-1]['ip'] = ip
-                            ports = []
-                        continue
-
-                    host_ports = self.find_port.match(line)
-                    if host is not None and host_ports:
-                        ports.append({'port': host_ports.group(1),
-                                      'protocol': host_ports.group(2),
-                                      'state': host_ports.group(3),
-                                      'service': host_ports.group(4)})
-                        continue
-
-                # if any leftovers
-                if host and ports:
+        try:
+            t_stdout = to_text(stdout, errors='surrogate_or_strict')
+        except UnicodeError as e:
+            raise AnsibleParserError('Invalid (non unicode) input returned: %s' % to_native(e))
+
+        for line in t_stdout.splitlines():
+            hits = self.find_host.match(line)
+            if hits:
+                if host is not None and ports:
                     results[-1]['ports'] = ports
 
-            except Exception as e:
-                raise AnsibleParserError("failed to parse %s: %s " % (to_native(path), to_native(e)))
-
-        if cache_needs_update:
-            self._cache[cache_key] = results
-
-        self._populate(results)
+                # if dns only shows arpa, just use ip instead as hostname
+                if hits.group(1).endswith('.in-addr.arpa'):
+                    host = hits.group(2)
+                else:
+                    host = hits.group(1)
+
+                # if no reverse dns exists, just use ip instead as hostname
+                if hits.group(2) is not None:
+                    ip = hits.group(2)
+                else:
+                    ip = hits.group(1)
+
+                if host is not None:
+                    # update inventory
+                    results.append(dict())
+                    results[-1]['name'] = host
+                    results[-1]['ip'] = ip
+                    ports = []
+                continue
+
+            host_ports = self.find_port.match(line)
+            if host is not None and host_ports:
+                ports.append({'port': host_ports.group(1),
+                              'protocol': host_ports.group(2),
+                              'state': host_ports.group(3),
+                              'service': host_ports.group(4)})
+                continue
+
+        # if any leftovers
+        if host and ports:
+            results[-1]['ports'] = ports
+
+        return results
+
+    def _parse_xml(self, stdout):
+        """ Yield the hosts from nmap's XML output as soon as each of them has been read """
+        root = None
+        for event, elem in ElementTree.iterparse(stdout, events=('start', 'end')):
+            if root is None:
+                root = elem
+            if event != 'end' or elem.tag != 'host':
+                continue
+
+            host = self._xml_host(elem)
+            # the host has been handled, do not keep it in memory
+            root.clear()
+            if host is not None:
+                yield host
+
+    @staticmethod
+    def _xml_host(elem):
+        status = elem.find('status')
+        if status is not None and status.get('state') != 'up':
+            return None
+
+        ip = None
+        for address in elem.findall('address'):
+            if address.get('addrtype') in ('ipv4', 'ipv6'):
+                ip = address.get('addr')
+                break
+        if ip is None:
+            return None
+
+        # if no reverse dns exists, or dns only shows arpa, just use ip instead as hostname
+        name = ip
+        for hostname in elem.findall('hostnames/hostname'):
+            if hostname.get('name') and not hostname.get('name').endswith('.in-addr.arpa'):
+                name = hostname.get('name')
+                break
+
+        host = {'name': name, 'ip': ip}
+        ports = []
+        for port in elem.findall('ports/port'):
+            state = port.find('state')
+            service = port.find('service')
+            ports.append({'port': port.get('portid'),
+                          'protocol': port.get('protocol'),
+                          'state': state.get('state') if state is not None else 'unknown',
+                          'service': service.get('name') if service is not None else 'unknown'})
+        if ports:
+            host['ports'] = ports
+        return host
@@ -121,6 +121,34 @@ DOCUMENTATION = '''
         type: bool
         default: false
         version_added: 8.1.0
+      concurrency:
+        description:
+          - Number of API requests sent in parallel.
+          - When set to more than V(1), the lists of guests, and when O(want_facts=true) the configuration, status, snapshots
+            and guest agent network interfaces of all guests, are fetched by a pool of threads before the inventory is populated.
+        type: int
+        default: 1
+        version_added: 8.2.0
+      use_cluster_resources:
+        description:
+          - Get the list of LXC containers and QEMU VMs of all nodes with a single request to C(/cluster/resources)
+            instead of two requests per node.
+          - When O(want_facts=true), the C(status) fact is also taken from this request, so the status of a guest does not need
+            a request per guest. The status of QEMU VMs is only requested when O(qemu_extended_statuses=true), so the C(qmpstatus) fact
+            is only set in that case.
+        type: bool
+        default: false
+        version_added: 8.2.0
+      cache_ttls:
+        description:
+          - Per endpoint maximum age in seconds of the cached API results, when the inventory cache is enabled.
+          - This allows for example to refresh the configuration of the guests more often than their snapshots.
+            Results of endpoints not listed here are kept for O(cache_timeout).
+          - "The keys are the endpoint types: V(nodes), V(network) (network of the nodes), V(pools), V(vms) (lists of guests),
+            V(config), V(status), V(snapshot) and V(agent) (guest agent network interfaces)."
+        type: dict
+        default: {}
+        version_added: 8.2.0
       filters:
         version_added: 4.6.0
         description: A list of Jinja templates that allow filtering hosts.
@@ -217,6 +245,7 @@ want_proxmox_nodes_ansible_host: true
 
 import itertools
 import re
+import time
 
 from ansible.module_utils.common._collections_compat import MutableMapping
 
@@ -229,6 +258,12 @@ from ansible.utils.display import Display
 
 from ansible_collections.community.general.plugins.module_utils.version import LooseVersion
 
+try:
+    from concurrent.futures import ThreadPoolExecutor
+    HAS_FUTURES = True
+except ImportError:
+    HAS_FUTURES = False
+
 # 3rd party imports
 try:
     import requests
@@ -246,6 +281,17 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
 
     NAME = 'community.general.proxmox'
 
+    ENDPOINT_TYPES = [
+        ('nodes', re.compile(r'/api2/json/nodes$')),
+        ('network', re.compile(r'/api2/json/nodes/[^/]+/network$')),
+        ('pools', re.compile(r'/api2/json/pools(/[^/]+)?$')),
+        ('vms', re.compile(r'/api2/json/(nodes/[^/]+/(lxc|qemu)|cluster/resources\?type=vm)$')),
+        ('config', re.compile(r'/config$')),
+        ('status', re.compile(r'/status/current$')),
+        ('snapshot', re.compile(r'/snapshot$')),
+        ('agent', re.compile(r'/agent/network-get-interfaces$')),
+    ]
+
     def __init__(self):
 
         super(InventoryModule, self).__init__()
@@ -256,6 +302,8 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         self.session = None
         self.cache_key = None
         self.use_cache = None
+        # URLs fetched during this run
+        self._fetched = set()
 
     def verify_file(self, path):
 
@@ -271,6 +319,11 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         if not self.session:
             self.session = requests.session()
             self.session.verify = self.get_option('validate_certs')
+            concurrency = self.get_option('concurrency') or 1
+            if concurrency > 1:
+                adapter = requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+                self.session.mount('http://', adapter)
+                self.session.mount('https://', adapter)
         return self.session
 
     def _get_auth(self):
@@ -300,12 +353,52 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
 
             self.headers = {'Authorization': 'PVEAPIToken={0}!{1}={2}'.format(self.proxmox_user, self.proxmox_token_id, self.proxmox_token_secret)}
 
+    def _endpoint_type(self, url):
+        for endpoint_type, regex in self.ENDPOINT_TYPES:
+            if regex.search(url):
+                return endpoint_type
+        return None
+
+    def _is_cached(self, url):
+        if url in self._fetched:
+            return True
+        cache = self._cache.get(self.cache_key, {})
+        if not self.use_cache or url not in cache:
+            return False
+        ttl = (self.get_option('cache_ttls') or {}).get(self._endpoint_type(url))
+        if ttl is None:
+            return True
+        fetched = cache.get('_fetched', {}).get(url)
+        return fetched is not None and time.time() - fetched <= ttl
+
+    def _init_cache(self):
+        if self.cache_key not in self._cache:
+            self._cache[self.cache_key] = {'url': ''}
+        self._cache[self.cache_key].setdefault('_fetched', {})
+
+    def _fetch_concurrently(self, urls):
+        '''Fetch the given URLs in parallel so that later calls to _get_json() find
+        them in the cache. Errors are ignored here, they are raised again when the
+        URL is requested by _get_json().'''
+        concurrency = self.get_option('concurrency') or 1
+        urls = [url for url in urls if not self._is_cached(url)]
+        if concurrency <= 1 or not HAS_FUTURES or not urls:
+            return
+
+        self._init_cache()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(self._get_json, url) for url in urls]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception:  # pylint: disable=broad-except
+                    pass
+
     def _get_json(self, url, ignore_errors=None):
 
-        if not self.use_cache or url not in self._cache.get(self.cache_key, {}):
+        if not self._is_cached(url):
 
-            if self.cache_key not in self._cache:
-                self._cache[self.cache_key] = {'url': ''}
+            self._init_cache()
 
             data = []
             s = self._get_session()
@@ -333,6 +426,8 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                     break
 
             self._cache[self.cache_key][url] = data
+            self._cache[self.cache_key]['_fetched'][url] = time.time()
+            self._fetched.add(url)
 
         return self._cache[self.cache_key][url]
 
@@ -348,6 +443,14 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
     def _get_qemu_per_node(self, node):
         return self._get_json("%s/api2/json/nodes/%s/qemu" % (self.proxmox_url, node))
 
+    def _get_vms_per_node(self):
+        '''Get the LXC containers and QEMU VMs of all nodes from the cluster resources.'''
+        vms = {}
+        for item in self._get_json("%s/api2/json/cluster/resources?type=vm" % self.proxmox_url):
+            if item.get('type') in ('lxc', 'qemu'):
+                vms.setdefault(item['node'], {'lxc': [], 'qemu': []})[item['type']].append(item)
+        return vms
+
     def _get_members_per_pool(self, pool):
         ret = self._get_json("%s/api2/json/pools/%s" % (self.proxmox_url, pool))
         return ret['members']
@@ -393,6 +496,19 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
 
         return result
 
+    @staticmethod
+    def _agent_enabled(value):
+        agent_enabled = 0
+        try:
+            agent_enabled = int(value.split(',')[0])
+        except ValueError:
+            if value.split(',')[0] == "enabled=1":
+                agent_enabled = 1
+        return bool(agent_enabled)
+
+    def _vm_url(self, node, vmtype, vmid, endpoint):
+        return "%s/api2/json/nodes/%s/%s/%s/%s" % (self.proxmox_url, node, vmtype, vmid, endpoint)
+
     def _get_vm_config(self, properties, node, vmid, vmtype, name):
         ret = self._get_json("%s/api2/json/nodes/%s/%s/%s/config" % (self.proxmox_url, node, vmtype, vmid))
 
@@ -423,13 +539,7 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                 # the rest of the comma separated string is extra config for the agent.
                 # In some (newer versions of proxmox) instances it can be 'enabled=1'.
                 if config == 'agent':
-                    agent_enabled = 0
-                    try:
-                        agent_enabled = int(value.split(',')[0])
-                    except ValueError:
-                        if value.split(',')[0] == "enabled=1":
-                            agent_enabled = 1
-                    if agent_enabled:
+                    if self._agent_enabled(value):
                         agent_iface_value = self._get_agent_network_interfaces(node, vmid, vmtype)
                         if agent_iface_value:
                             agent_iface_key = self.to_safe('%s%s' % (key, "_interfaces"))
@@ -521,7 +631,10 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         # get status, config and snapshots if want_facts == True
         want_facts = self.get_option('want_facts')
         if want_facts:
-            self._get_vm_status(properties, node, vmid, ittype, name)
+            if self._need_vm_status(ittype):
+                self._get_vm_status(properties, node, vmid, ittype, name)
+            else:
+                properties[self._fact('status')] = item['status']
             self._get_vm_config(properties, node, vmid, ittype, name)
             self._get_vm_snapshots(properties, node, vmid, ittype, name)
 
@@ -544,10 +657,44 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
 
         return name
 
+    def _need_vm_status(self, vmtype):
+        '''The status of the guests is part of the cluster resources, only the
+        qmpstatus of QEMU VMs needs an additional request.'''
+        if not self.get_option('use_cluster_resources'):
+            return True
+        return vmtype == 'qemu' and self.get_option('qemu_extended_statuses')
+
+    def _prefetch_vms(self, items):
+        '''Fetch the details of all guests in parallel when want_facts is set.'''
+        if not self.get_option('want_facts') or (self.get_option('concurrency') or 1) <= 1:
+            return
+
+        items = [(node, ittype, item) for node, ittype, item in items if not item.get('template')]
+        urls = []
+        for node, ittype, item in items:
+            urls.append(self._vm_url(node, ittype, item['vmid'], 'config'))
+            urls.append(self._vm_url(node, ittype, item['vmid'], 'snapshot'))
+            if self._need_vm_status(ittype):
+                urls.append(self._vm_url(node, ittype, item['vmid'], 'status/current'))
+        self._fetch_concurrently(urls)
+
+        # the guest agent is only queried when it is enabled in the configuration
+        urls = []
+        for node, ittype, item in items:
+            config_url = self._vm_url(node, ittype, item['vmid'], 'config')
+            if not self._is_cached(config_url):
+                continue
+            agent = self._get_json(config_url).get('agent')
+            if agent and self._agent_enabled(agent):
+                urls.append(self._vm_url(node, ittype, item['vmid'], 'agent/network-get-interfaces'))
+        self._fetch_concurrently(urls)
+
     def _populate_pool_groups(self, added_hosts):
         '''Generate groups from Proxmox resource pools, ignoring VMs and
         containers that were skipped.'''
-        for pool in self._get_pools():
+        pools = self._get_pools()
+        self._fetch_concurrently(["%s/api2/json/pools/%s" % (self.proxmox_url, pool['poolid']) for pool in pools if pool.get('poolid')])
+        for pool in pools:
             poolid = pool.get('poolid')
             if not poolid:
                 continue
@@ -578,7 +725,29 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         # gather vm's on nodes
         self._get_auth()
         hosts = []
-        for node in self._get_nodes():
+        nodes = self._get_nodes()
+        online_nodes = [node['node'] for node in nodes if node.get('node') and node['status'] != 'offline']
+
+        vms_per_node = None
+        if self.get_option('use_cluster_resources'):
+            vms_per_node = self._get_vms_per_node()
+        else:
+            self._fetch_concurrently(list(itertools.chain.from_iterable(
+                ("%s/api2/json/nodes/%s/lxc" % (self.proxmox_url, node), "%s/api2/json/nodes/%s/qemu" % (self.proxmox_url, node))
+                for node in online_nodes)))
+            vms_per_node = dict(
+                (node, {'lxc': self._get_lxc_per_node(node), 'qemu': self._get_qemu_per_node(node)})
+                for node in online_nodes)
+
+        if want_proxmox_nodes_ansible_host and not self.exclude_nodes:
+            self._fetch_concurrently(["%s/api2/json/nodes/%s/network" % (self.proxmox_url, node) for node in online_nodes])
+        self._prefetch_vms([
+            (node, ittype, item)
+            for node in online_nodes
+            for ittype in ('lxc', 'qemu')
+            for item in vms_per_node.get(node, {}).get(ittype, [])])
+
+        for node in nodes:
             if not node.get('node'):
                 continue
             if not self.exclude_nodes:
@@ -605,8 +774,9 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                 self.inventory.add_group(node_type_group)
 
             # get LXC containers and Qemu VMs for this node
-            lxc_objects = zip(itertools.repeat('lxc'), self._get_lxc_per_node(node['node']))
-            qemu_objects = zip(itertools.repeat('qemu'), self._get_qemu_per_node(node['node']))
+            node_vms = vms_per_node.get(node['node'], {})
+            lxc_objects = zip(itertools.repeat('lxc'), node_vms.get('lxc', []))
+            qemu_objects = zip(itertools.repeat('qemu'), node_vms.get('qemu', []))
             for ittype, item in itertools.chain(lxc_objects, qemu_objects):
                 name = self._handle_item(node['node'], ittype, item)
                 if name is not None:
@@ -35,6 +35,13 @@ DOCUMENTATION = '''
             description: create vars from virtualbox properties
             type: dictionary
             default: {}
+        concurrency:
+            description:
+              - Number of VMs whose guest properties are read in parallel.
+              - The guest properties of each VM are read with a single C(VBoxManage guestproperty enumerate) call.
+            type: int
+            default: 4
+            version_added: 8.2.0
 '''
 
 EXAMPLES = '''
@@ -54,6 +61,7 @@ groups:
 '''
 
 import os
+import re
 
 from subprocess import Popen, PIPE
 
@@ -63,6 +71,17 @@ from ansible.module_utils.common._collections_compat import MutableMapping
 from ansible.plugins.inventory import BaseInventoryPlugin, Constructable, Cacheable
 from ansible.module_utils.common.process import get_bin_path
 
+try:
+    from concurrent.futures import ThreadPoolExecutor
+    HAS_FUTURES = True
+except ImportError:
+    HAS_FUTURES = False
+
+# VirtualBox < 7.0: Name: /VirtualBox/GuestInfo/Net/0/V4/IP, value: 10.0.2.15, timestamp: 1700000000000000000, flags:
+PROPERTY_RE_OLD = re.compile(r'^Name: (?P<name>.*?), value: (?P<value>.*), timestamp: \d+, flags:.*$')
+# VirtualBox >= 7.0: /VirtualBox/GuestInfo/Net/0/V4/IP = '10.0.2.15' @ 2023-11-14T22:13:20.000000000Z
+PROPERTY_RE = re.compile(r"^(?P<name>/\S+)\s*=\s*'(?P<value>.*?)'(?:\s+@\s+\S+(?:\s+.*)?)?$")
+
 
 class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
     ''' Host inventory parser for ansible using local virtualbox. '''
@@ -81,7 +100,7 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                    to_bytes(host, errors='surrogate_or_strict'),
                    to_bytes(property_path, errors='surrogate_or_strict')]
             x = Popen(cmd, stdout=PIPE)
-            ipinfo = to_text(x.stdout.read(), errors='surrogate_or_strict')
+            ipinfo = to_text(x.communicate()[0], errors='surrogate_or_strict')
             if 'Value' in ipinfo:
                 a, ip = ipinfo.split(':', 1)
                 ret = ip.strip()
@@ -89,7 +108,43 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
             pass
         return ret
 
-    def _set_variables(self, hostvars):
+    def _enumerate_vbox_data(self, host):
+        ''' Return all guest properties of a VM, or None if they cannot be enumerated '''
+        try:
+            cmd = [self._vbox_path, b'guestproperty', b'enumerate',
+                   to_bytes(host, errors='surrogate_or_strict')]
+            x = Popen(cmd, stdout=PIPE)
+            output = to_text(x.communicate()[0], errors='surrogate_or_strict')
+            if x.returncode != 0:
+                return None
+        except Exception:
+            return None
+
+        properties = {}
+        for line in output.splitlines():
+            match = PROPERTY_RE.match(line) or PROPERTY_RE_OLD.match(line)
+            if match:
+                properties[match.group('name')] = match.group('value')
+        return properties
+
+    def _probe_hosts(self, hosts):
+        ''' Enumerate the guest properties of all hosts, several VMs at a time '''
+        concurrency = self.get_option('concurrency') or 1
+        if concurrency <= 1 or not HAS_FUTURES or len(hosts) <= 1:
+            return dict((host, self._enumerate_vbox_data(host)) for host in hosts)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return dict(zip(hosts, executor.map(self._enumerate_vbox_data, hosts)))
+
+    def _get_vbox_data(self, host, property_path, properties):
+        if properties.get(host) is None:
+            # enumerating failed, ask for the single property
+            return self._query_vbox_data(host, property_path)
+        return properties[host].get(property_path)
+
+    def _set_variables(self, hostvars, properties=None):
+        if properties is None:
+            properties = {}
 
         # set vars in inventory from hostvars
         for host in hostvars:
@@ -98,7 +153,7 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
             # create vars from vbox properties
             if query and isinstance(query, MutableMapping):
                 for varname in query:
-                    hostvars[host][varname] = self._query_vbox_data(host, query[varname])
+                    hostvars[host][varname] = self._get_vbox_data(host, query[varname], properties)
 
             strict = self.get_option('strict')
 
@@ -141,6 +196,8 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         hostvars = {}
         prevkey = pref_k = ''
         current_host = None
+        # hosts listed in any group of cacheable_results, including 'ungrouped'
+        listed_hosts = set()
 
         # needed to possibly set ansible_host
         netinfo = self.get_option('network_info_path')
@@ -167,11 +224,6 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                     hostvars[current_host] = {}
                     self.inventory.add_host(current_host)
 
-                # try to get network info
-                netdata = self._query_vbox_data(current_host, netinfo)
-                if netdata:
-                    self.inventory.set_variable(current_host, 'ansible_host', netdata)
-
             # found groups
             elif k == 'Groups':
                 for group in v.split('/'):
@@ -181,6 +233,7 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                         if group not in cacheable_results:
                             cacheable_results[group] = {'hosts': []}
                         cacheable_results[group]['hosts'].append(current_host)
+                        listed_hosts.add(current_host)
                 continue
 
             else:
@@ -196,33 +249,29 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                 else:
                     if v != '':
                         hostvars[current_host][pref_k] = v
-                if self._ungrouped_host(current_host, cacheable_results):
+                if current_host not in listed_hosts:
                     if 'ungrouped' not in cacheable_results:
                         cacheable_results['ungrouped'] = {'hosts': []}
                     cacheable_results['ungrouped']['hosts'].append(current_host)
+                    listed_hosts.add(current_host)
 
                 prevkey = pref_k
 
-        self._set_variables(hostvars)
+        properties = self._probe_hosts(list(hostvars))
+
+        # try to get network info
+        for host in hostvars:
+            netdata = self._get_vbox_data(host, netinfo, properties)
+            if netdata:
+                self.inventory.set_variable(host, 'ansible_host', netdata)
+
+        self._set_variables(hostvars, properties)
         for host in hostvars:
             h = self.inventory.get_host(host)
             cacheable_results['_meta']['hostvars'][h.name] = h.vars
 
         return cacheable_results
 
-    def _ungrouped_host(self, host, inventory):
-        def find_host(host, inventory):
-            for k, v in inventory.items():
-                if k == '_meta':
-                    continue
-                if isinstance(v, dict):
-                    yield self._ungrouped_host(host, v)
-                elif isinstance(v, list):
-                    yield host not in v
-            yield True
-
-        return all(find_host(host, inventory))
-
     def verify_file(self, path):
 
         valid = False
@@ -139,6 +139,33 @@ DOCUMENTATION = '''
         type: bool
         default: true
         version_added: 8.1.0
+      cache:
+        description:
+          - Keep the decrypted content of passwords in memory, so that looking up the same passname again
+            within one task does not decrypt it again, for example when it is used by several terms or
+            several lookups of the task.
+          - The cache is not shared between hosts or tasks. Ansible evaluates every task for every host in
+            its own worker process, and the cache does not outlive it, so it does not reduce the number of
+            decryptions when many hosts look up the same password.
+          - Entries are keyed by O(backend), O(directory) and passname, and expire after O(cache_ttl).
+          - Passwords written by O(create) or O(overwrite) replace their cached value. With O(overwrite=true),
+            the password is always read again before it is overwritten.
+        ini:
+          - section: passwordstore_lookup
+            key: cache
+        type: bool
+        default: false
+        version_added: 8.2.0
+      cache_ttl:
+        description:
+          - How long passwords are kept in the cache when O(cache=true).
+          - Time with a unit suffix, V(s), V(m), V(h) for seconds, minutes, and hours, respectively.
+        ini:
+          - section: passwordstore_lookup
+            key: cache_ttl
+        type: str
+        default: 5m
+        version_added: 8.2.0
     notes:
       - The lookup supports passing all options as lookup parameters since community.general 6.0.0.
 '''
@@ -230,6 +257,17 @@ from ansible_collections.community.general.plugins.module_utils._filelock import
 
 display = Display()
 
+# decrypted passwords kept when cache=true, shared by the lookups of the
+# worker process: {(backend, directory, passname): (expiry time, lines)}
+_PASS_CACHE = {}
+
+
+def _duration_to_seconds(name, value):
+    if not re.match('^[0-9]+[smh]$', value):
+        raise AnsibleError("{0} is not a correct value for {1}".format(value, name))
+    unit_to_seconds = {"s": 1, "m": 60, "h": 3600}
+    return int(value[:-1]) * unit_to_seconds[value[-1]]
+
 
 # backhacked check_output with input for python 2.7
 # http://stackoverflow.com/questions/10103551/passing-data-to-subprocess-check-output
@@ -345,28 +383,59 @@ class LookupModule(LookupBase):
                 else:
                     self.env['PASSWORD_STORE_UMASK'] = self.paramvals['umask']
 
-    def check_pass(self):
+    def cache_key(self, passname):
+        return (self.backend, self.paramvals['directory'], passname)
+
+    def cache_get(self, passname):
+        if not self.cache_ttl:
+            return None
+        key = self.cache_key(passname)
+        entry = _PASS_CACHE.get(key)
+        if entry is None:
+            return None
+        expires, passoutput = entry
+        if expires <= time.time():
+            del _PASS_CACHE[key]
+            return None
+        return passoutput
+
+    def cache_set(self, passname, passoutput):
+        if self.cache_ttl:
+            _PASS_CACHE[self.cache_key(passname)] = (time.time() + self.cache_ttl, passoutput)
+
+    def show_pass(self, passname):
+        return to_text(
+            check_output2([self.pass_cmd, 'show'] +
+                          [passname], env=self.env),
+            errors='surrogate_or_strict'
+        ).splitlines()
+
+    def set_passoutput(self, passoutput):
+        self.passoutput = passoutput
+        self.password = self.passoutput[0]
+        self.passdict = {}
         try:
-            self.passoutput = to_text(
-                check_output2([self.pass_cmd, 'show'] +
-                              [self.passname], env=self.env),
-                errors='surrogate_or_strict'
-            ).splitlines()
-            self.password = self.passoutput[0]
-            self.passdict = {}
-            try:
-                values = yaml.safe_load('\n'.join(self.passoutput[1:]))
-                for key, item in values.items():
-                    self.passdict[key] = item
-            except (yaml.YAMLError, AttributeError):
-                for line in self.passoutput[1:]:
-                    if ':' in line:
-                        name, value = line.split(':', 1)
-                        self.passdict[name.strip()] = value.strip()
+            values = yaml.safe_load('\n'.join(self.passoutput[1:]))
+            for key, item in values.items():
+                self.passdict[key] = item
+        except (yaml.YAMLError, AttributeError):
+            for line in self.passoutput[1:]:
+                if ':' in line:
+                    name, value = line.split(':', 1)
+                    self.passdict[name.strip()] = value.strip()
+
+    def check_pass(self, use_cache=True):
+        passoutput = self.cache_get(self.passname) if use_cache else None
+        if passoutput is not None:
+            self.set_passoutput(passoutput)
+            return True
+        try:
+            self.set_passoutput(self.show_pass(self.passname))
             if (self.backend == 'gopass' or
                     os.path.isfile(os.path.join(self.paramvals['directory'], self.passname + ".gpg"))
                     or not self.is_real_pass()):
                 # When using real pass, only accept password as found if there is a .gpg file for it (might be a tree node otherwise)
+                self.cache_set(self.passname, self.passoutput)
                 return True
         except (subprocess.CalledProcessError) as e:
             # 'not in password store' is the expected error if a password wasn't found
@@ -407,6 +476,7 @@ class LookupModule(LookupBase):
             check_output2([self.pass_cmd, 'insert', '-f', '-m', self.passname], input=msg, env=self.env)
         except (subprocess.CalledProcessError) as e:
             raise AnsibleError('exit code {0} while running {1}. Error output: {2}'.format(e.returncode, e.cmd, e.output))
+        self.cache_set(self.passname, msg.splitlines())
         return newpass
 
     def generate_password(self):
@@ -421,6 +491,7 @@ class LookupModule(LookupBase):
             check_output2([self.pass_cmd, 'insert', '-f', '-m', self.passname], input=msg, env=self.env)
         except (subprocess.CalledProcessError) as e:
             raise AnsibleError('exit code {0} while running {1}. Error output: {2}'.format(e.returncode, e.cmd, e.output))
+        self.cache_set(self.passname, msg.splitlines())
         return newpass
 
     def get_passresult(self):
@@ -450,11 +521,10 @@ class LookupModule(LookupBase):
         self.backend = self.get_option('backend')
         self.pass_cmd = self.backend  # pass and gopass are commands as well
         self.locked = None
-        timeout = self.get_option('locktimeout')
-        if not re.match('^[0-9]+[smh]$', timeout):
-            raise AnsibleError("{0} is not a correct value for locktimeout".format(timeout))
-        unit_to_seconds = {"s": 1, "m": 60, "h": 3600}
-        self.lock_timeout = int(timeout[:-1]) * unit_to_seconds[timeout[-1]]
+        self.lock_timeout = _duration_to_seconds('locktimeout', self.get_option('locktimeout'))
+        self.cache_ttl = 0
+        if self.get_option('cache'):
+            self.cache_ttl = _duration_to_seconds('cache_ttl', self.get_option('cache_ttl'))
 
         directory = self.get_option('directory')
         if directory is None:
@@ -491,8 +561,11 @@ class LookupModule(LookupBase):
         for term in terms:
             self.parse_params(term)   # parse the input into paramvals
             with self.opt_lock('readwrite'):
-                if self.check_pass():     # password exists
-                    if self.paramvals['overwrite'] and self.paramvals['subkey'] == 'password':
+                # the password is read again before it is overwritten, so that
+                # the preserved lines are the current ones
+                overwrite = self.paramvals['overwrite'] and self.paramvals['subkey'] == 'password'
+                if self.check_pass(use_cache=not overwrite):     # password exists
+                    if overwrite:
                         with self.opt_lock('write'):
                             result.append(self.update_password())
                     else:
@@ -500,7 +573,7 @@ class LookupModule(LookupBase):
                 else:                     # password does not exist
                     if self.paramvals['missing'] == 'create':
                         with self.opt_lock('write'):
-                            if self.locked == 'write' and self.check_pass():  # lookup password again if under write lock
+                            if self.locked == 'write' and self.check_pass(use_cache=False):  # lookup password again if under write lock
                                 result.append(self.get_passresult())
                             else:
                                 result.append(self.generate_password())
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023, Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# NOTE:
+# This is a private helper for the callback plugins of this collection and not meant to be used by modules.
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import gzip
+import io
+import threading
+import time
+
+from ansible.module_utils.common.text.converters import to_bytes
+from ansible.module_utils.six.moves import queue
+
+
+OVERFLOW_POLICIES = ('drop_newest', 'drop_oldest', 'block')
+
+
+def gzip_compress(data):
+    '''Compress ``data`` to be sent with ``Content-Encoding: gzip``.'''
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode='wb') as f:
+        f.write(to_bytes(data))
+    return buf.getvalue()
+
+
+class _Flush(object):
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class BatchSender(object):
+    '''
+    Sends payloads from a background thread, several payloads per request.
+
+    ``send`` is called from the worker thread with a list of payloads and is
+    expected to raise an exception when the request failed. A batch is sent
+    once ``batch_size`` payloads or ``batch_bytes`` bytes are queued, or
+    ``flush_interval`` seconds after its first payload was queued. Failed
+    requests are retried ``retries`` times with exponential backoff starting
+    at ``retry_delay``, after which the batch is dropped and counted as failed.
+
+    ``overflow`` decides what happens when the queue is full: ``drop_newest``
+    drops the new payload and ``drop_oldest`` the oldest queued one, so that a
+    slow endpoint never blocks the caller, while ``block`` waits for space.
+    Payloads given as ``(key, data)`` tuples are measured by ``data``.
+    '''
+
+    def __init__(self, send, queue_size=1000, batch_size=100, batch_bytes=None, flush_interval=1.0, retries=3, retry_delay=1.0,
+                 overflow='drop_newest', on_error=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError('overflow must be one of %s' % ', '.join(OVERFLOW_POLICIES))
+        self._send = send
+        self._queue = queue.Queue(maxsize=queue_size)
+        self.batch_size = max(1, batch_size)
+        self.batch_bytes = batch_bytes
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.on_error = on_error
+        self.stats = dict(queued=0, sent=0, dropped=0, failed=0, requests=0, max_queue_depth=0)
+        self._thread = threading.Thread(target=self._run, name='batch-sender')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def put(self, payload):
+        if self.overflow == 'block':
+            self._queue.put(payload)
+        else:
+            while True:
+                try:
+                    self._queue.put_nowait(payload)
+                    break
+                except queue.Full:
+                    if self.overflow == 'drop_newest':
+                        self.stats['dropped'] += 1
+                        return False
+                    self._drop_oldest()
+        self.stats['queued'] += 1
+        self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], self._queue.qsize())
+        return True
+
+    def _drop_oldest(self):
+        try:
+            item = self._queue.get_nowait()
+        except queue.Empty:
+            return
+        if isinstance(item, _Flush):
+            # only left behind by a flush() that timed out
+            item.done.set()
+        else:
+            self.stats['dropped'] += 1
+
+    @staticmethod
+    def _size(payload):
+        if isinstance(payload, tuple):
+            payload = payload[-1]
+        return len(payload)
+
+    def flush(self, timeout=None):
+        '''Wait until all payloads queued so far have been handled.'''
+        marker = _Flush()
+        self._queue.put(marker)
+        return marker.done.wait(timeout)
+
+    def _run(self):
+        batch = []
+        batch_bytes = 0
+        deadline = None
+        while True:
+            try:
+                if deadline is None:
+                    item = self._queue.get()
+                else:
+                    item = self._queue.get(timeout=max(0, deadline - time.time()))
+            except queue.Empty:
+                item = None
+
+            if item is not None and not isinstance(item, _Flush):
+                batch.append(item)
+                if self.batch_bytes:
+                    batch_bytes += self._size(item)
+                if deadline is None:
+                    deadline = time.time() + self.flush_interval
+                if len(batch) < self.batch_size and (not self.batch_bytes or batch_bytes < self.batch_bytes):
+                    continue
+
+            if batch:
+                self._send_batch(batch)
+                batch = []
+                batch_bytes = 0
+                deadline = None
+            if isinstance(item, _Flush):
+                item.done.set()
+
+    def _send_batch(self, batch):
+        delay = self.retry_delay
+        for attempt in range(self.retries + 1):
+            try:
+                self._send(batch)
+            except Exception as e:
+                if attempt == self.retries:
+                    self.stats['failed'] += len(batch)
+                    if self.on_error:
+                        self.on_error(e)
+                    return
+                time.sleep(delay)
+                delay *= 2
+            else:
+                self.stats['sent'] += len(batch)
+                self.stats['requests'] += 1
+                return
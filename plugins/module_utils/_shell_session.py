@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Ansible Project
+# Simplified BSD License (see LICENSES/BSD-2-Clause.txt or https://opensource.org/licenses/BSD-2-Clause)
+# SPDX-License-Identifier: BSD-2-Clause
+
+# NOTE:
+# This is a private helper for the chroot, jail and zone connection plugins. It
+# is not meant to be used by modules and its API may change without notice.
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import errno
+import os
+import subprocess
+import uuid
+
+from ansible.module_utils.compat import selectors
+from ansible.module_utils.common.text.converters import to_bytes, to_text
+from ansible.module_utils.six.moves import shlex_quote
+
+
+READ_SIZE = 64 * 1024
+
+
+class ShellSessionError(Exception):
+    pass
+
+
+class ShellSession(object):
+    '''
+    Runs commands through a single long-lived POSIX shell.
+
+    Every command is sent on the shell's stdin as one frame::
+
+        ( eval '<command>' ) </dev/null
+        __rc=$?; printf '\\n%s %d\\n' <marker> $__rc; printf '\\n%s\\n' <marker> >&2
+
+    where ``<marker>`` is random for every command.  The command output ends
+    right before the marker on stdout and on stderr, and the exit code follows
+    the marker on stdout.  Data for the command's stdin is passed as a quoted
+    here-document, see accepts_input().  Running the command through ``eval``
+    in a subshell means that syntax errors, ``exit`` and changes to the
+    environment do not affect the session.
+    '''
+
+    def __init__(self, command):
+        self.command = [to_bytes(c, errors='surrogate_or_strict') for c in command]
+        self._process = None
+
+    @property
+    def alive(self):
+        return self._process is not None and self._process.poll() is None
+
+    @staticmethod
+    def accepts_input(in_data):
+        '''
+        Whether in_data can be passed to a command as a here-document without
+        being modified, that is it has no NUL bytes and ends with a newline.
+        '''
+        return not in_data or (in_data.endswith(b'\n') and b'\0' not in in_data)
+
+    def start(self):
+        if not self.alive:
+            self._process = subprocess.Popen(self.command, shell=False, stdin=subprocess.PIPE,
+                                             stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        return self._process
+
+    def _frame(self, cmd, in_data, marker):
+        cmd = shlex_quote(to_text(cmd, errors='surrogate_or_strict'))
+        frame = [b'( eval ', to_bytes(cmd, errors='surrogate_or_strict'), b' )']
+        if in_data:
+            frame += [b" <<'", marker, b"'\n", in_data, marker, b'\n']
+        else:
+            frame += [b' </dev/null\n']
+        frame += [
+            b"__rc=$?; printf '\\n%s %d\\n' ", marker, b' $__rc; ',
+            b"printf '\\n%s\\n' ", marker, b' >&2\n',
+        ]
+        return b''.join(frame)
+
+    def run(self, cmd, in_data=None):
+        '''
+        Run cmd in the session and return a tuple (rc, stdout, stderr).
+
+        Raises ShellSessionError if the shell goes away before the command
+        finished, after which the session has to be started again.
+        '''
+        if not self.accepts_input(in_data):
+            raise ValueError('input cannot be passed through a shell session')
+
+        process = self.start()
+        marker = to_bytes('ANSIBLE_SESSION_%s' % uuid.uuid4().hex)
+        pending = self._frame(cmd, in_data, marker)
+        stdout = b''
+        stderr = b''
+        out_end = None
+        err_end = None
+
+        selector = selectors.DefaultSelector()
+        selector.register(process.stdin, selectors.EVENT_WRITE)
+        selector.register(process.stdout, selectors.EVENT_READ)
+        selector.register(process.stderr, selectors.EVENT_READ)
+        try:
+            while out_end is None or err_end is None:
+                if not selector.get_map():
+                    break
+                for key, dummy in selector.select():
+                    fileobj = key.fileobj
+                    if fileobj is process.stdin:
+                        try:
+                            written = os.write(fileobj.fileno(), pending[:READ_SIZE])
+                        except OSError as e:
+                            if e.errno != errno.EPIPE:
+                                raise
+                            written = len(pending)
+                        pending = pending[written:]
+                        if not pending:
+                            selector.unregister(fileobj)
+                        continue
+
+                    chunk = os.read(fileobj.fileno(), READ_SIZE)
+                    if not chunk:
+                        selector.unregister(fileobj)
+                    elif fileobj is process.stdout:
+                        stdout += chunk
+                        if out_end is None:
+                            out_end = self._find_end(stdout, b'\n' + marker + b' ', len(chunk))
+                    else:
+                        stderr += chunk
+                        if err_end is None:
+                            err_end = self._find_end(stderr, b'\n' + marker + b'\n', len(chunk))
+                    if out_end is not None and err_end is not None:
+                        break
+        finally:
+            selector.close()
+
+        if out_end is None or err_end is None:
+            self.close()
+            raise ShellSessionError('shell session exited while running the command: %s'
+                                    % to_text(stderr, errors='surrogate_or_strict').strip())
+
+        rc_line = stdout[out_end + len(marker) + 2:].split(b'\n', 1)[0]
+        return int(rc_line), stdout[:out_end], stderr[:err_end]
+
+    @staticmethod
+    def _find_end(data, needle, received):
+        '''
+        Return the offset of the frame end in data once the whole trailer line
+        has been received, None otherwise.  Only the last received bytes and
+        the trailer line that may precede them are searched.
+        '''
+        index = data.find(needle, max(0, len(data) - received - len(needle) - 16))
+        if index == -1:
+            return None
+        if not needle.endswith(b'\n') and data.find(b'\n', index + len(needle)) == -1:
+            return None
+        return index
+
+    def close(self):
+        process, self._process = self._process, None
+        if process is None:
+            return
+        for pipe in (process.stdin, process.stdout, process.stderr):
+            try:
+                pipe.close()
+            except (IOError, OSError):
+                pass
+        if process.poll() is None:
+            process.terminate()
+        process.wait()
@@ -7,14 +7,25 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import hashlib
 import json
+import os
+import socket
+import ssl
+import tempfile
+import time
 import traceback
 import copy
+from io import BytesIO
 
 from ansible.module_utils.urls import open_url
-from ansible.module_utils.six.moves.urllib.parse import urlencode, quote
+from ansible.module_utils.six.moves import http_client
+from ansible.module_utils.six.moves.urllib.parse import urlencode, quote, urlparse
 from ansible.module_utils.six.moves.urllib.error import HTTPError
-from ansible.module_utils.common.text.converters import to_native, to_text
+from ansible.module_utils.six.moves.urllib.request import getproxies, proxy_bypass
+from ansible.module_utils.common.text.converters import to_bytes, to_native, to_text
+
+from ansible_collections.community.general.plugins.module_utils._filelock import FileLock, LockTimeout
 
 URL_REALM_INFO = "{url}/realms/{realm}"
 URL_REALMS = "{url}/admin/realms"
@@ -119,6 +130,10 @@ URL_AUTHZ_RESOURCES = "{url}/admin/realms/{realm}/clients/{client_id}/authz/reso
 URL_AUTHZ_CUSTOM_POLICY = "{url}/admin/realms/{realm}/clients/{client_id}/authz/resource-server/policy/{policy_type}"
 URL_AUTHZ_CUSTOM_POLICIES = "{url}/admin/realms/{realm}/clients/{client_id}/authz/resource-server/policy"
 
+TOKEN_CACHE_DIR = "~/.ansible/keycloak_token_cache"
+# Cached tokens are not reused (nor refresh tokens used) when they expire within this many seconds.
+TOKEN_CACHE_EXPIRY_MARGIN = 30
+
 
 def keycloak_argument_spec():
     """
@@ -137,6 +152,9 @@ def keycloak_argument_spec():
         connection_timeout=dict(type='int', default=10),
         token=dict(type='str', no_log=True),
         http_agent=dict(type='str', default='Ansible'),
+        token_cache=dict(type='bool', default=False),
+        token_cache_dir=dict(type='path'),
+        http_keep_alive=dict(type='bool', default=False),
     )
 
 
@@ -148,6 +166,130 @@ class KeycloakError(Exception):
     pass
 
 
+def _request_token(auth_url, payload, module_params):
+    """ Posts a grant to the token endpoint
+        :param auth_url: URL of the token endpoint
+        :param payload: grant parameters, empty values are dropped
+        :param module_params: parameters of the module
+        :return: decoded token response, always containing an access token
+    """
+    # Remove empty items, for instance missing client_secret
+    payload = dict(
+        (k, v) for k, v in payload.items() if v is not None)
+    try:
+        r = json.loads(to_native(open_url(auth_url, method='POST',
+                                          validate_certs=module_params.get('validate_certs'),
+                                          http_agent=module_params.get('http_agent'),
+                                          timeout=module_params.get('connection_timeout'),
+                                          data=urlencode(payload)).read()))
+    except ValueError as e:
+        raise KeycloakError(
+            'API returned invalid JSON when trying to obtain access token from %s: %s'
+            % (auth_url, str(e)))
+    except Exception as e:
+        raise KeycloakError('Could not obtain access token from %s: %s'
+                            % (auth_url, str(e)))
+
+    if not isinstance(r, dict) or 'access_token' not in r:
+        raise KeycloakError(
+            'Could not obtain access token from %s' % auth_url)
+    return r
+
+
+def _token_cache_path(module_params, cache_dir):
+    """ Returns the cache file for the credentials in module_params.
+        The password and client secret are part of the key, so changed
+        credentials never pick up a token obtained with the old ones.
+    """
+    key = '\0'.join(
+        to_text(module_params.get(param) or '')
+        for param in ('auth_keycloak_url', 'auth_realm', 'auth_client_id', 'auth_username',
+                      'auth_password', 'auth_client_secret'))
+    return os.path.join(cache_dir, 'token-%s.json' % hashlib.sha256(to_bytes(key)).hexdigest())
+
+
+def _read_token_cache(path):
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+    return cached if isinstance(cached, dict) else None
+
+
+def _write_token_cache(path, response, now):
+    refresh_expires_in = response.get('refresh_expires_in')
+    cached = {
+        'access_token': response['access_token'],
+        'expires_at': now + (response.get('expires_in') or 0),
+        'refresh_token': response.get('refresh_token'),
+        # Keycloak reports 0 for refresh tokens that do not expire (offline tokens)
+        'refresh_expires_at': now + refresh_expires_in if refresh_expires_in else None,
+    }
+    cache_dir = os.path.dirname(path)
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.token-')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(cached, f)
+        os.chmod(tmp_path, 0o600)
+        os.rename(tmp_path, path)
+    except (IOError, OSError):
+        # The cache is an optimisation only; the token itself is still valid.
+        pass
+
+
+def _get_cached_token(module_params, auth_url, payload):
+    """ Returns an access token from the on-disk cache, refreshing or
+        renewing it while holding the cache lock so that concurrent tasks
+        with the same credentials only log in once.
+    """
+    cache_dir = module_params.get('token_cache_dir') or os.path.expanduser(TOKEN_CACHE_DIR)
+    if not os.path.isdir(cache_dir):
+        try:
+            os.makedirs(cache_dir, 0o700)
+        except OSError as e:
+            if not os.path.isdir(cache_dir):
+                raise KeycloakError('Could not create token cache directory %s: %s' % (cache_dir, str(e)))
+
+    path = _token_cache_path(module_params, cache_dir)
+    # A refresh and a full login may each take up to connection_timeout
+    lock_timeout = 2 * (module_params.get('connection_timeout') or 10) + TOKEN_CACHE_EXPIRY_MARGIN
+    lock = FileLock()
+    try:
+        lock.set_lock(path, cache_dir, lock_timeout)
+    except LockTimeout:
+        return _request_token(auth_url, payload, module_params)['access_token']
+
+    try:
+        now = time.time()
+        cached = _read_token_cache(path) or {}
+        if cached.get('access_token') and cached.get('expires_at', 0) > now + TOKEN_CACHE_EXPIRY_MARGIN:
+            return cached['access_token']
+
+        r = None
+        refresh_expires_at = cached.get('refresh_expires_at')
+        if cached.get('refresh_token') and (refresh_expires_at is None or refresh_expires_at > now + TOKEN_CACHE_EXPIRY_MARGIN):
+            refresh_payload = {
+                'grant_type': 'refresh_token',
+                'client_id': payload.get('client_id'),
+                'client_secret': payload.get('client_secret'),
+                'refresh_token': cached['refresh_token'],
+            }
+            try:
+                r = _request_token(auth_url, refresh_payload, module_params)
+            except KeycloakError:
+                # The session may have been revoked or timed out server side
+                r = None
+
+        if r is None:
+            r = _request_token(auth_url, payload, module_params)
+
+        _write_token_cache(path, r, now)
+        return r['access_token']
+    finally:
+        lock.unlock()
+
+
 def get_token(module_params):
     """ Obtains connection header with token for the authentication,
         token already given or obtained from credentials
@@ -156,48 +298,24 @@ def get_token(module_params):
     """
     token = module_params.get('token')
     base_url = module_params.get('auth_keycloak_url')
-    http_agent = module_params.get('http_agent')
 
     if not base_url.lower().startswith(('http', 'https')):
         raise KeycloakError("auth_url '%s' should either start with 'http' or 'https'." % base_url)
 
     if token is None:
-        base_url = module_params.get('auth_keycloak_url')
-        validate_certs = module_params.get('validate_certs')
         auth_realm = module_params.get('auth_realm')
-        client_id = module_params.get('auth_client_id')
-        auth_username = module_params.get('auth_username')
-        auth_password = module_params.get('auth_password')
-        client_secret = module_params.get('auth_client_secret')
-        connection_timeout = module_params.get('connection_timeout')
         auth_url = URL_TOKEN.format(url=base_url, realm=auth_realm)
-        temp_payload = {
+        payload = {
             'grant_type': 'password',
-            'client_id': client_id,
-            'client_secret': client_secret,
-            'username': auth_username,
-            'password': auth_password,
+            'client_id': module_params.get('auth_client_id'),
+            'client_secret': module_params.get('auth_client_secret'),
+            'username': module_params.get('auth_username'),
+            'password': module_params.get('auth_password'),
         }
-        # Remove empty items, for instance missing client_secret
-        payload = dict(
-            (k, v) for k, v in temp_payload.items() if v is not None)
-        try:
-            r = json.loads(to_native(open_url(auth_url, method='POST',
-                                              validate_certs=validate_certs, http_agent=http_agent, timeout=connection_timeout,
-                                              data=urlencode(payload)).read()))
-        except ValueError as e:
-            raise KeycloakError(
-                'API returned invalid JSON when trying to obtain access token from %s: %s'
-                % (auth_url, str(e)))
-        except Exception as e:
-            raise KeycloakError('Could not obtain access token from %s: %s'
-                                % (auth_url, str(e)))
-
-        try:
-            token = r['access_token']
-        except KeyError:
-            raise KeycloakError(
-                'Could not obtain access token from %s' % auth_url)
+        if module_params.get('token_cache'):
+            token = _get_cached_token(module_params, auth_url, payload)
+        else:
+            token = _request_token(auth_url, payload, module_params)['access_token']
     return {
         'Authorization': 'Bearer ' + token,
         'Content-Type': 'application/json'
@@ -263,6 +381,114 @@ def is_struct_included(struct1, struct2, exclude=None):
         return to_text(struct1, 'utf-8') == to_text(struct2, 'utf-8')
 
 
+class KeycloakResponse(object):
+    """ Fully read response of a KeycloakSession request, offering the parts
+        of the open_url() response interface used by KeycloakAPI.
+    """
+    def __init__(self, url, status, headers, body):
+        self.url = url
+        self.status = self.code = status
+        self.headers = headers
+        self._body = BytesIO(body)
+
+    def read(self, *args):
+        return self._body.read(*args)
+
+    def getcode(self):
+        return self.status
+
+    def geturl(self):
+        return self.url
+
+    def info(self):
+        return self.headers
+
+
+class KeycloakSession(object):
+    """ Sends requests over one persistent HTTP(S) connection per server, so
+        that a module run pays TCP and TLS setup only once.
+
+        Requests that need more than a plain connection (proxies, redirects)
+        are handed over to open_url().
+    """
+    # Errors showing that the server closed an idle keep-alive connection
+    CONNECTION_LOST_ERRORS = (http_client.BadStatusLine, http_client.CannotSendRequest,
+                              http_client.ResponseNotReady, socket.error)
+    REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+    def __init__(self):
+        self._connections = {}
+
+    def close(self):
+        for connection in self._connections.values():
+            connection.close()
+        self._connections = {}
+
+    def _connection(self, parsed, timeout, validate_certs):
+        key = (parsed.scheme, parsed.netloc, validate_certs)
+        connection = self._connections.get(key)
+        if connection is None:
+            if parsed.scheme == 'https':
+                context = ssl.create_default_context()
+                if not validate_certs:
+                    context.check_hostname = False
+                    context.verify_mode = ssl.CERT_NONE
+                connection = http_client.HTTPSConnection(parsed.netloc, timeout=timeout, context=context)
+            else:
+                connection = http_client.HTTPConnection(parsed.netloc, timeout=timeout)
+            self._connections[key] = connection
+        return connection
+
+    def open(self, url, method='GET', headers=None, data=None, timeout=10, validate_certs=True, http_agent=None):
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or (parsed.scheme in getproxies() and not proxy_bypass(parsed.hostname)):
+            return open_url(url, method=method, headers=headers, data=data, timeout=timeout,
+                            validate_certs=validate_certs, http_agent=http_agent)
+
+        path = parsed.path or '/'
+        if parsed.query:
+            path += '?' + parsed.query
+        request_headers = dict(headers or {})
+        if http_agent:
+            request_headers['User-Agent'] = http_agent
+        body = to_bytes(data) if data is not None else None
+
+        connection = self._connection(parsed, timeout, validate_certs)
+        reused = connection.sock is not None
+        try:
+            connection.request(method, path, body=body, headers=request_headers)
+        except self.CONNECTION_LOST_ERRORS:
+            # The server dropped the idle connection before the request
+            # reached it, so sending it again on a new connection is safe.
+            connection.close()
+            if not reused:
+                raise
+            reused = False
+            connection.request(method, path, body=body, headers=request_headers)
+
+        try:
+            response = connection.getresponse()
+            content = response.read()
+        except self.CONNECTION_LOST_ERRORS as e:
+            connection.close()
+            # Only reads are repeated: a write may already have been applied.
+            if not reused or method != 'GET' or isinstance(e, socket.timeout):
+                raise
+            connection.request(method, path, body=body, headers=request_headers)
+            response = connection.getresponse()
+            content = response.read()
+
+        if response.will_close:
+            connection.close()
+
+        if response.status in self.REDIRECT_CODES:
+            return open_url(url, method=method, headers=headers, data=data, timeout=timeout,
+                            validate_certs=validate_certs, http_agent=http_agent)
+        if response.status >= 400:
+            raise HTTPError(url, response.status, response.reason, response.msg, BytesIO(content))
+        return KeycloakResponse(url, response.status, response.msg, content)
+
+
 class KeycloakAPI(object):
     """ Keycloak API access; Keycloak uses OAuth 2.0 to protect its API, an access token for which
         is obtained through OpenID connect
@@ -274,6 +500,66 @@ class KeycloakAPI(object):
         self.connection_timeout = self.module.params.get('connection_timeout')
         self.restheaders = connection_header
         self.http_agent = self.module.params.get('http_agent')
+        self.session = KeycloakSession() if self.module.params.get('http_keep_alive') else None
+        # (kind, realm, scope) -> {name: id}, filled lazily and dropped whenever
+        # an object of that kind is created, renamed or deleted
+        self._id_index = {}
+
+    def _request(self, url, **kwargs):
+        """ Sends an API request, over the shared keep-alive session if enabled.
+            Takes the same arguments as open_url().
+        """
+        if self.session is not None:
+            return self.session.open(url, **kwargs)
+        return open_url(url, **kwargs)
+
+    def _lookup_id(self, kind, realm, name, load, scope=None):
+        """ Returns the id of the object called name, or None if there is none.
+
+        :param kind: kind of object (for instance 'clientscope')
+        :param load: callable returning the list of objects (dicts with name and id)
+        :param scope: parent object id for nested objects such as client roles
+        """
+        key = (kind, realm, scope)
+        index = self._id_index.get(key)
+        if index is None:
+            index = self._id_index[key] = dict((item['name'], item['id']) for item in load() or [])
+        return index.get(name)
+
+    def _resolve_id(self, kind, realm, name, resolve, scope=None):
+        """ Returns the id of the object called name, or None if there is none,
+            asking the server only the first time a name is looked up.
+
+        :param resolve: callable returning the id for name, or None
+        """
+        index = self._id_index.setdefault((kind, realm, scope), {})
+        if name not in index:
+            index[name] = resolve()
+        return index[name]
+
+    def _invalidate_ids(self, kind, realm, scope=None):
+        self._id_index.pop((kind, realm, scope), None)
+
+    def _get_paged(self, url, params=None, page_size=100):
+        """ Fetches all items of a list resource one page at a time, using the
+            server side first/max pagination parameters.
+
+        :param url: URL of the list resource, without query string
+        :param params: additional query parameters, for instance a search term
+        :param page_size: number of items requested per page
+        :return: list of all items
+        """
+        items = []
+        first = 0
+        while True:
+            query = dict(params or {}, first=first, max=page_size)
+            page = json.loads(to_native(self._request(url + '?' + urlencode(sorted(query.items())), method='GET', http_agent=self.http_agent,
+                                                      headers=self.restheaders, timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
+            items.extend(page)
+            if len(page) < page_size:
+                return items
+            first += page_size
 
     def get_realm_info_by_id(self, realm='master'):
         """ Obtain realm public info by id
@@ -284,9 +570,9 @@ class KeycloakAPI(object):
         realm_info_url = URL_REALM_INFO.format(url=self.baseurl, realm=realm)
 
         try:
-            return json.loads(to_native(open_url(realm_info_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(realm_info_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
 
         except HTTPError as e:
             if e.code == 404:
@@ -310,8 +596,9 @@ class KeycloakAPI(object):
         realm_url = URL_REALM.format(url=self.baseurl, realm=realm)
 
         try:
-            return json.loads(to_native(open_url(realm_url, method='GET', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(realm_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
 
         except HTTPError as e:
             if e.code == 404:
@@ -335,8 +622,8 @@ class KeycloakAPI(object):
         realm_url = URL_REALM.format(url=self.baseurl, realm=realm)
 
         try:
-            return open_url(realm_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(realmrep), validate_certs=self.validate_certs)
+            return self._request(realm_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(realmrep), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not update realm %s: %s' % (realm, str(e)),
                                exception=traceback.format_exc())
@@ -349,8 +636,8 @@ class KeycloakAPI(object):
         realm_url = URL_REALMS.format(url=self.baseurl)
 
         try:
-            return open_url(realm_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(realmrep), validate_certs=self.validate_certs)
+            return self._request(realm_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(realmrep), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not create realm %s: %s' % (realmrep['id'], str(e)),
                                exception=traceback.format_exc())
@@ -364,8 +651,8 @@ class KeycloakAPI(object):
         realm_url = URL_REALM.format(url=self.baseurl, realm=realm)
 
         try:
-            return open_url(realm_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            validate_certs=self.validate_certs)
+            return self._request(realm_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not delete realm %s: %s' % (realm, str(e)),
                                exception=traceback.format_exc())
@@ -382,9 +669,9 @@ class KeycloakAPI(object):
             clientlist_url += '?clientId=%s' % filter
 
         try:
-            return json.loads(to_native(open_url(clientlist_url, http_agent=self.http_agent, method='GET', headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(clientlist_url, http_agent=self.http_agent, method='GET', headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except ValueError as e:
             self.module.fail_json(msg='API returned incorrect JSON when trying to obtain list of clients for realm %s: %s'
                                       % (realm, str(e)))
@@ -414,9 +701,9 @@ class KeycloakAPI(object):
         client_url = URL_CLIENT.format(url=self.baseurl, realm=realm, id=id)
 
         try:
-            return json.loads(to_native(open_url(client_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(client_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
 
         except HTTPError as e:
             if e.code == 404:
@@ -438,12 +725,14 @@ class KeycloakAPI(object):
         :param realm: client template from this realm
         :return: id of client (usually a UUID)
         """
-        result = self.get_client_by_clientid(client_id, realm)
-        if isinstance(result, dict) and 'id' in result:
-            return result['id']
-        else:
+        def resolve():
+            result = self.get_client_by_clientid(client_id, realm)
+            if isinstance(result, dict) and 'id' in result:
+                return result['id']
             return None
 
+        return self._resolve_id('client', realm, client_id, resolve)
+
     def update_client(self, id, clientrep, realm="master"):
         """ Update an existing client
         :param id: id (not clientId) of client to be updated in Keycloak
@@ -452,10 +741,11 @@ class KeycloakAPI(object):
         :return: HTTPResponse object on success
         """
         client_url = URL_CLIENT.format(url=self.baseurl, realm=realm, id=id)
+        self._invalidate_ids('client', realm)
 
         try:
-            return open_url(client_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(clientrep), validate_certs=self.validate_certs)
+            return self._request(client_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(clientrep), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not update client %s in realm %s: %s'
                                       % (id, realm, str(e)))
@@ -467,10 +757,11 @@ class KeycloakAPI(object):
         :return: HTTPResponse object on success
         """
         client_url = URL_CLIENTS.format(url=self.baseurl, realm=realm)
+        self._invalidate_ids('client', realm)
 
         try:
-            return open_url(client_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(clientrep), validate_certs=self.validate_certs)
+            return self._request(client_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(clientrep), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not create client %s in realm %s: %s'
                                       % (clientrep['clientId'], realm, str(e)))
@@ -483,10 +774,12 @@ class KeycloakAPI(object):
         :return: HTTPResponse object on success
         """
         client_url = URL_CLIENT.format(url=self.baseurl, realm=realm, id=id)
+        self._invalidate_ids('client', realm)
+        self._invalidate_ids('client_role', realm, id)
 
         try:
-            return open_url(client_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            validate_certs=self.validate_certs)
+            return self._request(client_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not delete client %s in realm %s: %s'
                                       % (id, realm, str(e)))
@@ -500,9 +793,9 @@ class KeycloakAPI(object):
         """
         client_roles_url = URL_CLIENT_ROLES.format(url=self.baseurl, realm=realm, id=cid)
         try:
-            return json.loads(to_native(open_url(client_roles_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(client_roles_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except Exception as e:
             self.fail_open_url(e, msg="Could not fetch rolemappings for client %s in realm %s: %s"
                                       % (cid, realm, str(e)))
@@ -515,11 +808,7 @@ class KeycloakAPI(object):
         :param realm: Realm from which to obtain the rolemappings.
         :return: The ID of the role, None if not found.
         """
-        rolemappings = self.get_client_roles_by_id(cid, realm=realm)
-        for role in rolemappings:
-            if name == role['name']:
-                return role['id']
-        return None
+        return self._lookup_id('client_role', realm, name, lambda: self.get_client_roles_by_id(cid, realm=realm), scope=cid)
 
     def get_client_group_rolemapping_by_id(self, gid, cid, rid, realm='master'):
         """ Obtain client representation by id
@@ -532,9 +821,9 @@ class KeycloakAPI(object):
         """
         rolemappings_url = URL_CLIENT_GROUP_ROLEMAPPINGS.format(url=self.baseurl, realm=realm, id=gid, client=cid)
         try:
-            rolemappings = json.loads(to_native(open_url(rolemappings_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                         timeout=self.connection_timeout,
-                                                         validate_certs=self.validate_certs).read()))
+            rolemappings = json.loads(to_native(self._request(rolemappings_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                              timeout=self.connection_timeout,
+                                                              validate_certs=self.validate_certs).read()))
             for role in rolemappings:
                 if rid == role['id']:
                     return role
@@ -553,9 +842,9 @@ class KeycloakAPI(object):
         """
         available_rolemappings_url = URL_CLIENT_GROUP_ROLEMAPPINGS_AVAILABLE.format(url=self.baseurl, realm=realm, id=gid, client=cid)
         try:
-            return json.loads(to_native(open_url(available_rolemappings_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(available_rolemappings_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except Exception as e:
             self.fail_open_url(e, msg="Could not fetch available rolemappings for client %s in group %s, realm %s: %s"
                                       % (cid, gid, realm, str(e)))
@@ -570,9 +859,9 @@ class KeycloakAPI(object):
         """
         composite_rolemappings_url = URL_CLIENT_GROUP_ROLEMAPPINGS_COMPOSITE.format(url=self.baseurl, realm=realm, id=gid, client=cid)
         try:
-            return json.loads(to_native(open_url(composite_rolemappings_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(composite_rolemappings_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except Exception as e:
             self.fail_open_url(e, msg="Could not fetch available rolemappings for client %s in group %s, realm %s: %s"
                                       % (cid, gid, realm, str(e)))
@@ -586,9 +875,9 @@ class KeycloakAPI(object):
         """
         client_roles_url = URL_ROLES_BY_ID.format(url=self.baseurl, realm=realm, id=rid)
         try:
-            return json.loads(to_native(open_url(client_roles_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(client_roles_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except Exception as e:
             self.fail_open_url(e, msg="Could not fetch role for id %s in realm %s: %s"
                                       % (rid, realm, str(e)))
@@ -603,9 +892,9 @@ class KeycloakAPI(object):
         """
         client_roles_url = URL_ROLES_BY_ID_COMPOSITES_CLIENTS.format(url=self.baseurl, realm=realm, id=rid, cid=cid)
         try:
-            return json.loads(to_native(open_url(client_roles_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(client_roles_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except Exception as e:
             self.fail_open_url(e, msg="Could not fetch role for id %s and cid %s in realm %s: %s"
                                       % (rid, cid, realm, str(e)))
@@ -620,8 +909,8 @@ class KeycloakAPI(object):
         """
         available_rolemappings_url = URL_ROLES_BY_ID_COMPOSITES.format(url=self.baseurl, realm=realm, id=rid)
         try:
-            open_url(available_rolemappings_url, method="POST", http_agent=self.http_agent, headers=self.restheaders, data=json.dumps(roles_rep),
-                     validate_certs=self.validate_certs, timeout=self.connection_timeout)
+            self._request(available_rolemappings_url, method="POST", http_agent=self.http_agent, headers=self.restheaders, data=json.dumps(roles_rep),
+                          validate_certs=self.validate_certs, timeout=self.connection_timeout)
         except Exception as e:
             self.fail_open_url(e, msg="Could not assign roles to composite role %s and realm %s: %s"
                                       % (rid, realm, str(e)))
@@ -637,8 +926,8 @@ class KeycloakAPI(object):
         """
         available_rolemappings_url = URL_CLIENT_GROUP_ROLEMAPPINGS.format(url=self.baseurl, realm=realm, id=gid, client=cid)
         try:
-            open_url(available_rolemappings_url, method="POST", http_agent=self.http_agent, headers=self.restheaders, data=json.dumps(role_rep),
-                     validate_certs=self.validate_certs, timeout=self.connection_timeout)
+            self._request(available_rolemappings_url, method="POST", http_agent=self.http_agent, headers=self.restheaders, data=json.dumps(role_rep),
+                          validate_certs=self.validate_certs, timeout=self.connection_timeout)
         except Exception as e:
             self.fail_open_url(e, msg="Could not fetch available rolemappings for client %s in group %s, realm %s: %s"
                                       % (cid, gid, realm, str(e)))
@@ -654,8 +943,8 @@ class KeycloakAPI(object):
         """
         available_rolemappings_url = URL_CLIENT_GROUP_ROLEMAPPINGS.format(url=self.baseurl, realm=realm, id=gid, client=cid)
         try:
-            open_url(available_rolemappings_url, method="DELETE", http_agent=self.http_agent, headers=self.restheaders, data=json.dumps(role_rep),
-                     validate_certs=self.validate_certs, timeout=self.connection_timeout)
+            self._request(available_rolemappings_url, method="DELETE", http_agent=self.http_agent, headers=self.restheaders, data=json.dumps(role_rep),
+                          validate_certs=self.validate_certs, timeout=self.connection_timeout)
         except Exception as e:
             self.fail_open_url(e, msg="Could not delete available rolemappings for client %s in group %s, realm %s: %s"
                                       % (cid, gid, realm, str(e)))
@@ -671,9 +960,9 @@ class KeycloakAPI(object):
         """
         rolemappings_url = URL_CLIENT_USER_ROLEMAPPINGS.format(url=self.baseurl, realm=realm, id=uid, client=cid)
         try:
-            rolemappings = json.loads(to_native(open_url(rolemappings_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                         timeout=self.connection_timeout,
-                                                         validate_certs=self.validate_certs).read()))
+            rolemappings = json.loads(to_native(self._request(rolemappings_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                              timeout=self.connection_timeout,
+                                                              validate_certs=self.validate_certs).read()))
             for role in rolemappings:
                 if rid == role['id']:
                     return role
@@ -692,9 +981,9 @@ class KeycloakAPI(object):
         """
         available_rolemappings_url = URL_CLIENT_USER_ROLEMAPPINGS_AVAILABLE.format(url=self.baseurl, realm=realm, id=uid, client=cid)
         try:
-            return json.loads(to_native(open_url(available_rolemappings_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(available_rolemappings_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except Exception as e:
             self.fail_open_url(e, msg="Could not fetch effective rolemappings for client %s and user %s, realm %s: %s"
                                       % (cid, uid, realm, str(e)))
@@ -709,9 +998,9 @@ class KeycloakAPI(object):
         """
         composite_rolemappings_url = URL_CLIENT_USER_ROLEMAPPINGS_COMPOSITE.format(url=self.baseurl, realm=realm, id=uid, client=cid)
         try:
-            return json.loads(to_native(open_url(composite_rolemappings_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(composite_rolemappings_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except Exception as e:
             self.fail_open_url(e, msg="Could not fetch available rolemappings for user %s of realm %s: %s"
                                       % (uid, realm, str(e)))
@@ -726,9 +1015,9 @@ class KeycloakAPI(object):
         """
         rolemappings_url = URL_REALM_ROLEMAPPINGS.format(url=self.baseurl, realm=realm, id=uid)
         try:
-            rolemappings = json.loads(to_native(open_url(rolemappings_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                         timeout=self.connection_timeout,
-                                                         validate_certs=self.validate_certs).read()))
+            rolemappings = json.loads(to_native(self._request(rolemappings_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                              timeout=self.connection_timeout,
+                                                              validate_certs=self.validate_certs).read()))
             for role in rolemappings:
                 if rid == role['id']:
                     return role
@@ -746,9 +1035,9 @@ class KeycloakAPI(object):
         """
         available_rolemappings_url = URL_REALM_ROLEMAPPINGS_AVAILABLE.format(url=self.baseurl, realm=realm, id=uid)
         try:
-            return json.loads(to_native(open_url(available_rolemappings_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(available_rolemappings_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except Exception as e:
             self.fail_open_url(e, msg="Could not fetch available rolemappings for user %s of realm %s: %s"
                                       % (uid, realm, str(e)))
@@ -762,9 +1051,9 @@ class KeycloakAPI(object):
         """
         composite_rolemappings_url = URL_REALM_ROLEMAPPINGS_COMPOSITE.format(url=self.baseurl, realm=realm, id=uid)
         try:
-            return json.loads(to_native(open_url(composite_rolemappings_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(composite_rolemappings_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except Exception as e:
             self.fail_open_url(e, msg="Could not fetch effective rolemappings for user %s, realm %s: %s"
                                       % (uid, realm, str(e)))
@@ -780,9 +1069,9 @@ class KeycloakAPI(object):
         users_url += '?username=%s&exact=true' % username
         try:
             userrep = None
-            users = json.loads(to_native(open_url(users_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
-                                                  timeout=self.connection_timeout,
-                                                  validate_certs=self.validate_certs).read()))
+            users = json.loads(to_native(self._request(users_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
+                                                       timeout=self.connection_timeout,
+                                                       validate_certs=self.validate_certs).read()))
             for user in users:
                 if user['username'] == username:
                     userrep = user
@@ -807,9 +1096,9 @@ class KeycloakAPI(object):
 
         service_account_user_url = URL_CLIENT_SERVICE_ACCOUNT_USER.format(url=self.baseurl, realm=realm, id=cid)
         try:
-            return json.loads(to_native(open_url(service_account_user_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(service_account_user_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except ValueError as e:
             self.module.fail_json(msg='API returned incorrect JSON when trying to obtain the service-account-user for realm %s and client_id %s: %s'
                                       % (realm, client_id, str(e)))
@@ -829,16 +1118,16 @@ class KeycloakAPI(object):
         if cid is None:
             user_realm_rolemappings_url = URL_REALM_ROLEMAPPINGS.format(url=self.baseurl, realm=realm, id=uid)
             try:
-                open_url(user_realm_rolemappings_url, method="POST", http_agent=self.http_agent, headers=self.restheaders, data=json.dumps(role_rep),
-                         validate_certs=self.validate_certs, timeout=self.connection_timeout)
+                self._request(user_realm_rolemappings_url, method="POST", http_agent=self.http_agent, headers=self.restheaders, data=json.dumps(role_rep),
+                              validate_certs=self.validate_certs, timeout=self.connection_timeout)
             except Exception as e:
                 self.fail_open_url(e, msg="Could not map roles to userId %s for realm %s and roles %s: %s"
                                           % (uid, realm, json.dumps(role_rep), str(e)))
         else:
             user_client_rolemappings_url = URL_CLIENT_USER_ROLEMAPPINGS.format(url=self.baseurl, realm=realm, id=uid, client=cid)
             try:
-                open_url(user_client_rolemappings_url, method="POST", http_agent=self.http_agent, headers=self.restheaders, data=json.dumps(role_rep),
-                         validate_certs=self.validate_certs, timeout=self.connection_timeout)
+                self._request(user_client_rolemappings_url, method="POST", http_agent=self.http_agent, headers=self.restheaders, data=json.dumps(role_rep),
+                              validate_certs=self.validate_certs, timeout=self.connection_timeout)
             except Exception as e:
                 self.fail_open_url(e, msg="Could not map roles to userId %s for client %s, realm %s and roles %s: %s"
                                           % (cid, uid, realm, json.dumps(role_rep), str(e)))
@@ -855,16 +1144,16 @@ class KeycloakAPI(object):
         if cid is None:
             user_realm_rolemappings_url = URL_REALM_ROLEMAPPINGS.format(url=self.baseurl, realm=realm, id=uid)
             try:
-                open_url(user_realm_rolemappings_url, method="DELETE", http_agent=self.http_agent, headers=self.restheaders, data=json.dumps(role_rep),
-                         validate_certs=self.validate_certs, timeout=self.connection_timeout)
+                self._request(user_realm_rolemappings_url, method="DELETE", http_agent=self.http_agent, headers=self.restheaders, data=json.dumps(role_rep),
+                              validate_certs=self.validate_certs, timeout=self.connection_timeout)
             except Exception as e:
                 self.fail_open_url(e, msg="Could not remove roles %s from userId %s, realm %s: %s"
                                           % (json.dumps(role_rep), uid, realm, str(e)))
         else:
             user_client_rolemappings_url = URL_CLIENT_USER_ROLEMAPPINGS.format(url=self.baseurl, realm=realm, id=uid, client=cid)
             try:
-                open_url(user_client_rolemappings_url, method="DELETE", http_agent=self.http_agent, headers=self.restheaders, data=json.dumps(role_rep),
-                         validate_certs=self.validate_certs, timeout=self.connection_timeout)
+                self._request(user_client_rolemappings_url, method="DELETE", http_agent=self.http_agent, headers=self.restheaders, data=json.dumps(role_rep),
+                              validate_certs=self.validate_certs, timeout=self.connection_timeout)
             except Exception as e:
                 self.fail_open_url(e, msg="Could not remove roles %s for client %s from userId %s, realm %s: %s"
                                           % (json.dumps(role_rep), cid, uid, realm, str(e)))
@@ -878,8 +1167,8 @@ class KeycloakAPI(object):
         url = URL_CLIENTTEMPLATES.format(url=self.baseurl, realm=realm)
 
         try:
-            return json.loads(to_native(open_url(url, method='GET', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(url, method='GET', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except ValueError as e:
             self.module.fail_json(msg='API returned incorrect JSON when trying to obtain list of client templates for realm %s: %s'
                                       % (realm, str(e)))
@@ -897,8 +1186,8 @@ class KeycloakAPI(object):
         url = URL_CLIENTTEMPLATE.format(url=self.baseurl, id=id, realm=realm)
 
         try:
-            return json.loads(to_native(open_url(url, method='GET', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(url, method='GET', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except ValueError as e:
             self.module.fail_json(msg='API returned incorrect JSON when trying to obtain client templates %s for realm %s: %s'
                                       % (id, realm, str(e)))
@@ -943,8 +1232,8 @@ class KeycloakAPI(object):
         url = URL_CLIENTTEMPLATE.format(url=self.baseurl, realm=realm, id=id)
 
         try:
-            return open_url(url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(clienttrep), validate_certs=self.validate_certs)
+            return self._request(url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(clienttrep), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not update client template %s in realm %s: %s'
                                       % (id, realm, str(e)))
@@ -958,8 +1247,8 @@ class KeycloakAPI(object):
         url = URL_CLIENTTEMPLATES.format(url=self.baseurl, realm=realm)
 
         try:
-            return open_url(url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(clienttrep), validate_certs=self.validate_certs)
+            return self._request(url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(clienttrep), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not create client template %s in realm %s: %s'
                                       % (clienttrep['clientId'], realm, str(e)))
@@ -974,8 +1263,8 @@ class KeycloakAPI(object):
         url = URL_CLIENTTEMPLATE.format(url=self.baseurl, realm=realm, id=id)
 
         try:
-            return open_url(url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            validate_certs=self.validate_certs)
+            return self._request(url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not delete client template %s in realm %s: %s'
                                       % (id, realm, str(e)))
@@ -991,9 +1280,9 @@ class KeycloakAPI(object):
         """
         clientscopes_url = URL_CLIENTSCOPES.format(url=self.baseurl, realm=realm)
         try:
-            return json.loads(to_native(open_url(clientscopes_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(clientscopes_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except Exception as e:
             self.fail_open_url(e, msg="Could not fetch list of clientscopes in realm %s: %s"
                                       % (realm, str(e)))
@@ -1009,9 +1298,9 @@ class KeycloakAPI(object):
         """
         clientscope_url = URL_CLIENTSCOPE.format(url=self.baseurl, realm=realm, id=cid)
         try:
-            return json.loads(to_native(open_url(clientscope_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(clientscope_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
 
         except HTTPError as e:
             if e.code == 404:
@@ -1027,21 +1316,20 @@ class KeycloakAPI(object):
         """ Fetch a keycloak clientscope within a realm based on its name.
 
         The Keycloak API does not allow filtering of the clientscopes resource by name.
-        As a result, this method first retrieves the entire list of clientscopes - name and ID -
-        then performs a second query to fetch the group.
+        As a result, this method resolves the name through an index built from the entire
+        list of clientscopes - name and ID - once per run, then performs a second query to
+        fetch the clientscope.
 
         If the clientscope does not exist, None is returned.
         :param name: Name of the clientscope to fetch.
         :param realm: Realm in which the clientscope resides; default 'master'
         """
         try:
-            all_clientscopes = self.get_clientscopes(realm=realm)
-
-            for clientscope in all_clientscopes:
-                if clientscope['name'] == name:
-                    return self.get_clientscope_by_clientscopeid(clientscope['id'], realm=realm)
+            cid = self._lookup_id('clientscope', realm, name, lambda: self.get_clientscopes(realm=realm))
+            if cid is None:
+                return None
 
-            return None
+            return self.get_clientscope_by_clientscopeid(cid, realm=realm)
 
         except Exception as e:
             self.module.fail_json(msg="Could not fetch clientscope %s in realm %s: %s"
@@ -1054,9 +1342,10 @@ class KeycloakAPI(object):
         :return: HTTPResponse object on success
         """
         clientscopes_url = URL_CLIENTSCOPES.format(url=self.baseurl, realm=realm)
+        self._invalidate_ids('clientscope', realm)
         try:
-            return open_url(clientscopes_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(clientscoperep), validate_certs=self.validate_certs)
+            return self._request(clientscopes_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(clientscoperep), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg="Could not create clientscope %s in realm %s: %s"
                                       % (clientscoperep['name'], realm, str(e)))
@@ -1068,10 +1357,11 @@ class KeycloakAPI(object):
         :return HTTPResponse object on success
         """
         clientscope_url = URL_CLIENTSCOPE.format(url=self.baseurl, realm=realm, id=clientscoperep['id'])
+        self._invalidate_ids('clientscope', realm)
 
         try:
-            return open_url(clientscope_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(clientscoperep), validate_certs=self.validate_certs)
+            return self._request(clientscope_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(clientscoperep), validate_certs=self.validate_certs)
 
         except Exception as e:
             self.fail_open_url(e, msg='Could not update clientscope %s in realm %s: %s'
@@ -1096,10 +1386,7 @@ class KeycloakAPI(object):
         # in the case that both are provided, prefer the ID, since it's one
         # less lookup.
         if cid is None and name is not None:
-            for clientscope in self.get_clientscopes(realm=realm):
-                if clientscope['name'] == name:
-                    cid = clientscope['id']
-                    break
+            cid = self._lookup_id('clientscope', realm, name, lambda: self.get_clientscopes(realm=realm))
 
         # if the group doesn't exist - no problem, nothing to delete.
         if cid is None:
@@ -1107,9 +1394,10 @@ class KeycloakAPI(object):
 
         # should have a good cid by here.
         clientscope_url = URL_CLIENTSCOPE.format(realm=realm, id=cid, url=self.baseurl)
+        self._invalidate_ids('clientscope', realm)
         try:
-            return open_url(clientscope_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            validate_certs=self.validate_certs)
+            return self._request(clientscope_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 validate_certs=self.validate_certs)
 
         except Exception as e:
             self.fail_open_url(e, msg="Unable to delete clientscope %s: %s" % (cid, str(e)))
@@ -1126,9 +1414,9 @@ class KeycloakAPI(object):
         """
         protocolmappers_url = URL_CLIENTSCOPE_PROTOCOLMAPPERS.format(id=cid, url=self.baseurl, realm=realm)
         try:
-            return json.loads(to_native(open_url(protocolmappers_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(protocolmappers_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except Exception as e:
             self.fail_open_url(e, msg="Could not fetch list of protocolmappers in realm %s: %s"
                                       % (realm, str(e)))
@@ -1146,9 +1434,9 @@ class KeycloakAPI(object):
         """
         protocolmapper_url = URL_CLIENTSCOPE_PROTOCOLMAPPER.format(url=self.baseurl, realm=realm, id=cid, mapper_id=pid)
         try:
-            return json.loads(to_native(open_url(protocolmapper_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(protocolmapper_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
 
         except HTTPError as e:
             if e.code == 404:
@@ -1194,8 +1482,8 @@ class KeycloakAPI(object):
         """
         protocolmappers_url = URL_CLIENTSCOPE_PROTOCOLMAPPERS.format(url=self.baseurl, id=cid, realm=realm)
         try:
-            return open_url(protocolmappers_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(mapper_rep), validate_certs=self.validate_certs)
+            return self._request(protocolmappers_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(mapper_rep), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg="Could not create protocolmapper %s in realm %s: %s"
                                       % (mapper_rep['name'], realm, str(e)))
@@ -1210,8 +1498,8 @@ class KeycloakAPI(object):
         protocolmapper_url = URL_CLIENTSCOPE_PROTOCOLMAPPER.format(url=self.baseurl, realm=realm, id=cid, mapper_id=mapper_rep['id'])
 
         try:
-            return open_url(protocolmapper_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(mapper_rep), validate_certs=self.validate_certs)
+            return self._request(protocolmapper_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(mapper_rep), validate_certs=self.validate_certs)
 
         except Exception as e:
             self.fail_open_url(e, msg='Could not update protocolmappers for clientscope %s in realm %s: %s'
@@ -1258,16 +1546,16 @@ class KeycloakAPI(object):
         if client_id is None:
             clientscopes_url = url_template.format(url=self.baseurl, realm=realm)
             try:
-                return json.loads(to_native(open_url(clientscopes_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                     timeout=self.connection_timeout, validate_certs=self.validate_certs).read()))
+                return json.loads(to_native(self._request(clientscopes_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                          timeout=self.connection_timeout, validate_certs=self.validate_certs).read()))
             except Exception as e:
                 self.fail_open_url(e, msg="Could not fetch list of %s clientscopes in realm %s: %s" % (scope_type, realm, str(e)))
         else:
             cid = self.get_client_id(client_id=client_id, realm=realm)
             clientscopes_url = url_template.format(url=self.baseurl, realm=realm, cid=cid)
             try:
-                return json.loads(to_native(open_url(clientscopes_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                     timeout=self.connection_timeout, validate_certs=self.validate_certs).read()))
+                return json.loads(to_native(self._request(clientscopes_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                          timeout=self.connection_timeout, validate_certs=self.validate_certs).read()))
             except Exception as e:
                 self.fail_open_url(e, msg="Could not fetch list of %s clientscopes in client %s: %s" % (scope_type, client_id, clientscopes_url))
 
@@ -1335,8 +1623,8 @@ class KeycloakAPI(object):
         clientscope_type_url = self._decide_url_type_clientscope(client_id, scope_type).format(realm=realm, id=id, cid=cid, url=self.baseurl)
         try:
             method = 'PUT' if action == "add" else 'DELETE'
-            return open_url(clientscope_type_url, method=method, http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            validate_certs=self.validate_certs)
+            return self._request(clientscope_type_url, method=method, http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 validate_certs=self.validate_certs)
 
         except Exception as e:
             place = 'realm' if client_id is None else 'client ' + client_id
@@ -1352,9 +1640,9 @@ class KeycloakAPI(object):
         clientsecret_url = URL_CLIENTSECRET.format(url=self.baseurl, realm=realm, id=id)
 
         try:
-            return json.loads(to_native(open_url(clientsecret_url, method='POST', http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(clientsecret_url, method='POST', http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
 
         except HTTPError as e:
             if e.code == 404:
@@ -1376,9 +1664,9 @@ class KeycloakAPI(object):
         clientsecret_url = URL_CLIENTSECRET.format(url=self.baseurl, realm=realm, id=id)
 
         try:
-            return json.loads(to_native(open_url(clientsecret_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(clientsecret_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
 
         except HTTPError as e:
             if e.code == 404:
@@ -1400,9 +1688,9 @@ class KeycloakAPI(object):
         """
         groups_url = URL_GROUPS.format(url=self.baseurl, realm=realm)
         try:
-            return json.loads(to_native(open_url(groups_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(groups_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except Exception as e:
             self.fail_open_url(e, msg="Could not fetch list of groups in realm %s: %s"
                                       % (realm, str(e)))
@@ -1418,9 +1706,9 @@ class KeycloakAPI(object):
         """
         groups_url = URL_GROUP.format(url=self.baseurl, realm=realm, groupid=gid)
         try:
-            return json.loads(to_native(open_url(groups_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(groups_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except HTTPError as e:
             if e.code == 404:
                 return None
@@ -1431,12 +1719,41 @@ class KeycloakAPI(object):
             self.module.fail_json(msg="Could not fetch group %s in realm %s: %s"
                                       % (gid, realm, str(e)))
 
+    def search_groups(self, name, realm="master"):
+        """ Fetch the top level groups whose name is name, using the server side search.
+
+        Older Keycloak versions ignore the exact parameter and return every group whose
+        name contains the search term, as well as the top level groups containing matching
+        subgroups, so the results are filtered again here.
+
+        :param name: Name of the groups to search for.
+        :param realm: Realm in which the groups reside; default 'master'.
+        """
+        groups_url = URL_GROUPS.format(url=self.baseurl, realm=realm)
+        try:
+            groups = self._get_paged(groups_url, params={'search': name, 'exact': 'true', 'briefRepresentation': 'true'})
+        except Exception as e:
+            self.fail_open_url(e, msg="Could not search groups %s in realm %s: %s"
+                                      % (name, realm, str(e)))
+        return [group for group in groups if group['name'] == name]
+
+    def get_group_id(self, name, realm="master"):
+        """ Obtain the id of a top level group by its name, or None if there is no such group.
+
+        :param name: Name of the group.
+        :param realm: Realm in which the group resides; default 'master'.
+        """
+        def resolve():
+            groups = self.search_groups(name, realm=realm)
+            return groups[0]['id'] if groups else None
+
+        return self._resolve_id('group', realm, name, resolve)
+
     def get_group_by_name(self, name, realm="master", parents=None):
         """ Fetch a keycloak group within a realm based on its name.
 
-        The Keycloak API does not allow filtering of the Groups resource by name.
-        As a result, this method first retrieves the entire list of groups - name and ID -
-        then performs a second query to fetch the group.
+        Top level groups are looked up with the server side search, subgroups within the
+        children of their direct parent. A second query then fetches the group.
 
         If the group does not exist, None is returned.
         :param name: Name of the group to fetch.
@@ -1451,15 +1768,17 @@ class KeycloakAPI(object):
                 if not parent:
                     return None
 
-                all_groups = parent['subGroups']
-            else:
-                all_groups = self.get_groups(realm=realm)
+                for group in parent['subGroups']:
+                    if group['name'] == name:
+                        return self.get_group_by_groupid(group['id'], realm=realm)
+
+                return None
 
-            for group in all_groups:
-                if group['name'] == name:
-                    return self.get_group_by_groupid(group['id'], realm=realm)
+            gid = self.get_group_id(name, realm=realm)
+            if gid is None:
+                return None
 
-            return None
+            return self.get_group_by_groupid(gid, realm=realm)
 
         except Exception as e:
             self.module.fail_json(msg="Could not fetch group %s in realm %s: %s"
@@ -1568,9 +1887,10 @@ class KeycloakAPI(object):
         :return: HTTPResponse object on success
         """
         groups_url = URL_GROUPS.format(url=self.baseurl, realm=realm)
+        self._invalidate_ids('group', realm)
         try:
-            return open_url(groups_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(grouprep), validate_certs=self.validate_certs)
+            return self._request(groups_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(grouprep), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg="Could not create group %s in realm %s: %s"
                                       % (grouprep['name'], realm, str(e)))
@@ -1597,8 +1917,9 @@ class KeycloakAPI(object):
 
             parent_id = parent_id["id"]
             url = URL_GROUP_CHILDREN.format(url=self.baseurl, realm=realm, groupid=parent_id)
-            return open_url(url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(grouprep), validate_certs=self.validate_certs)
+            self._invalidate_ids('group', realm)
+            return self._request(url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(grouprep), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg="Could not create subgroup %s for parent group %s in realm %s: %s"
                                       % (grouprep['name'], parent_id, realm, str(e)))
@@ -1610,10 +1931,11 @@ class KeycloakAPI(object):
         :return HTTPResponse object on success
         """
         group_url = URL_GROUP.format(url=self.baseurl, realm=realm, groupid=grouprep['id'])
+        self._invalidate_ids('group', realm)
 
         try:
-            return open_url(group_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(grouprep), validate_certs=self.validate_certs)
+            return self._request(group_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(grouprep), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not update group %s in realm %s: %s'
                                       % (grouprep['name'], realm, str(e)))
@@ -1637,10 +1959,7 @@ class KeycloakAPI(object):
         # in the case that both are provided, prefer the ID, since it's one
         # less lookup.
         if groupid is None and name is not None:
-            for group in self.get_groups(realm=realm):
-                if group['name'] == name:
-                    groupid = group['id']
-                    break
+            groupid = self.get_group_id(name, realm=realm)
 
         # if the group doesn't exist - no problem, nothing to delete.
         if groupid is None:
@@ -1648,9 +1967,10 @@ class KeycloakAPI(object):
 
         # should have a good groupid by here.
         group_url = URL_GROUP.format(realm=realm, groupid=groupid, url=self.baseurl)
+        self._invalidate_ids('group', realm)
         try:
-            return open_url(group_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            validate_certs=self.validate_certs)
+            return self._request(group_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg="Unable to delete group %s: %s" % (groupid, str(e)))
 
@@ -1662,9 +1982,9 @@ class KeycloakAPI(object):
         """
         rolelist_url = URL_REALM_ROLES.format(url=self.baseurl, realm=realm)
         try:
-            return json.loads(to_native(open_url(rolelist_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(rolelist_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except ValueError as e:
             self.module.fail_json(msg='API returned incorrect JSON when trying to obtain list of roles for realm %s: %s'
                                       % (realm, str(e)))
@@ -1681,8 +2001,9 @@ class KeycloakAPI(object):
         """
         role_url = URL_REALM_ROLE.format(url=self.baseurl, realm=realm, name=quote(name, safe=''))
         try:
-            return json.loads(to_native(open_url(role_url, method="GET", http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(role_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except HTTPError as e:
             if e.code == 404:
                 return None
@@ -1704,8 +2025,8 @@ class KeycloakAPI(object):
             if "composites" in rolerep:
                 keycloak_compatible_composites = self.convert_role_composites(rolerep["composites"])
                 rolerep["composites"] = keycloak_compatible_composites
-            return open_url(roles_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(rolerep), validate_certs=self.validate_certs)
+            return self._request(roles_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(rolerep), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not create role %s in realm %s: %s'
                                       % (rolerep['name'], realm, str(e)))
@@ -1722,8 +2043,8 @@ class KeycloakAPI(object):
             if "composites" in rolerep:
                 composites = copy.deepcopy(rolerep["composites"])
                 del rolerep["composites"]
-            role_response = open_url(role_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                                     data=json.dumps(rolerep), validate_certs=self.validate_certs)
+            role_response = self._request(role_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                          data=json.dumps(rolerep), validate_certs=self.validate_certs)
             if composites is not None:
                 self.update_role_composites(rolerep=rolerep, composites=composites, realm=realm)
             return role_response
@@ -1741,7 +2062,7 @@ class KeycloakAPI(object):
             else:
                 composite_url = URL_REALM_ROLE_COMPOSITES.format(url=self.baseurl, realm=realm, name=quote(rolerep["name"], safe=''))
             # Get existing composites
-            return json.loads(to_native(open_url(
+            return json.loads(to_native(self._request(
                 composite_url,
                 method='GET',
                 http_agent=self.http_agent,
@@ -1763,8 +2084,8 @@ class KeycloakAPI(object):
                 composite_url = URL_REALM_ROLE_COMPOSITES.format(url=self.baseurl, realm=realm, name=quote(rolerep["name"], safe=''))
             # Get existing composites
             # create new composites
-            return open_url(composite_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(composites), validate_certs=self.validate_certs)
+            return self._request(composite_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(composites), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not create role %s composites in realm %s: %s'
                                       % (rolerep['name'], realm, str(e)))
@@ -1780,8 +2101,8 @@ class KeycloakAPI(object):
                 composite_url = URL_REALM_ROLE_COMPOSITES.format(url=self.baseurl, realm=realm, name=quote(rolerep["name"], safe=''))
             # Get existing composites
             # create new composites
-            return open_url(composite_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(composites), validate_certs=self.validate_certs)
+            return self._request(composite_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(composites), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not create role %s composites in realm %s: %s'
                                       % (rolerep['name'], realm, str(e)))
@@ -1844,8 +2165,8 @@ class KeycloakAPI(object):
         """
         role_url = URL_REALM_ROLE.format(url=self.baseurl, realm=realm, name=quote(name, safe=''))
         try:
-            return open_url(role_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            validate_certs=self.validate_certs)
+            return self._request(role_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Unable to delete role %s in realm %s: %s'
                                       % (name, realm, str(e)))
@@ -1863,9 +2184,9 @@ class KeycloakAPI(object):
                                       % (clientid, realm))
         rolelist_url = URL_CLIENT_ROLES.format(url=self.baseurl, realm=realm, id=cid)
         try:
-            return json.loads(to_native(open_url(rolelist_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(rolelist_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except ValueError as e:
             self.module.fail_json(msg='API returned incorrect JSON when trying to obtain list of roles for client %s in realm %s: %s'
                                       % (clientid, realm, str(e)))
@@ -1888,8 +2209,9 @@ class KeycloakAPI(object):
                                       % (clientid, realm))
         role_url = URL_CLIENT_ROLE.format(url=self.baseurl, realm=realm, id=cid, name=quote(name, safe=''))
         try:
-            return json.loads(to_native(open_url(role_url, method="GET", http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(role_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except HTTPError as e:
             if e.code == 404:
                 return None
@@ -1913,12 +2235,13 @@ class KeycloakAPI(object):
             self.module.fail_json(msg='Could not find client %s in realm %s'
                                       % (clientid, realm))
         roles_url = URL_CLIENT_ROLES.format(url=self.baseurl, realm=realm, id=cid)
+        self._invalidate_ids('client_role', realm, cid)
         try:
             if "composites" in rolerep:
                 keycloak_compatible_composites = self.convert_role_composites(rolerep["composites"])
                 rolerep["composites"] = keycloak_compatible_composites
-            return open_url(roles_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(rolerep), validate_certs=self.validate_certs)
+            return self._request(roles_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(rolerep), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not create role %s for client %s in realm %s: %s'
                                       % (rolerep['name'], clientid, realm, str(e)))
@@ -1956,8 +2279,8 @@ class KeycloakAPI(object):
             if "composites" in rolerep:
                 composites = copy.deepcopy(rolerep["composites"])
                 del rolerep['composites']
-            update_role_response = open_url(role_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                                            data=json.dumps(rolerep), validate_certs=self.validate_certs)
+            update_role_response = self._request(role_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                                 data=json.dumps(rolerep), validate_certs=self.validate_certs)
             if composites is not None:
                 self.update_role_composites(rolerep=rolerep, clientid=clientid, composites=composites, realm=realm)
             return update_role_response
@@ -1977,9 +2300,10 @@ class KeycloakAPI(object):
             self.module.fail_json(msg='Could not find client %s in realm %s'
                                       % (clientid, realm))
         role_url = URL_CLIENT_ROLE.format(url=self.baseurl, realm=realm, id=cid, name=quote(name, safe=''))
+        self._invalidate_ids('client_role', realm, cid)
         try:
-            return open_url(role_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            validate_certs=self.validate_certs)
+            return self._request(role_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Unable to delete role %s for client %s in realm %s: %s'
                                       % (name, clientid, realm, str(e)))
@@ -1994,9 +2318,9 @@ class KeycloakAPI(object):
         try:
             authentication_flow = {}
             # Check if the authentication flow exists on the Keycloak serveraders
-            authentications = json.load(open_url(URL_AUTHENTICATION_FLOWS.format(url=self.baseurl, realm=realm), method='GET',
-                                                 http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout, validate_certs=self.validate_certs))
+            authentications = json.load(self._request(URL_AUTHENTICATION_FLOWS.format(url=self.baseurl, realm=realm), method='GET',
+                                                      http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout, validate_certs=self.validate_certs))
             for authentication in authentications:
                 if authentication["alias"] == alias:
                     authentication_flow = authentication
@@ -2015,8 +2339,8 @@ class KeycloakAPI(object):
         flow_url = URL_AUTHENTICATION_FLOW.format(url=self.baseurl, realm=realm, id=id)
 
         try:
-            return open_url(flow_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            validate_certs=self.validate_certs)
+            return self._request(flow_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not delete authentication flow %s in realm %s: %s'
                                       % (id, realm, str(e)))
@@ -2032,7 +2356,7 @@ class KeycloakAPI(object):
             new_name = dict(
                 newName=config["alias"]
             )
-            open_url(
+            self._request(
                 URL_AUTHENTICATION_FLOW_COPY.format(
                     url=self.baseurl,
                     realm=realm,
@@ -2043,7 +2367,7 @@ class KeycloakAPI(object):
                 timeout=self.connection_timeout,
                 validate_certs=self.validate_certs)
             flow_list = json.load(
-                open_url(
+                self._request(
                     URL_AUTHENTICATION_FLOWS.format(url=self.baseurl,
                                                     realm=realm),
                     method='GET',
@@ -2072,7 +2396,7 @@ class KeycloakAPI(object):
                 description=config["description"],
                 topLevel=True
             )
-            open_url(
+            self._request(
                 URL_AUTHENTICATION_FLOWS.format(
                     url=self.baseurl,
                     realm=realm),
@@ -2082,7 +2406,7 @@ class KeycloakAPI(object):
                 timeout=self.connection_timeout,
                 validate_certs=self.validate_certs)
             flow_list = json.load(
-                open_url(
+                self._request(
                     URL_AUTHENTICATION_FLOWS.format(
                         url=self.baseurl,
                         realm=realm),
@@ -2106,7 +2430,7 @@ class KeycloakAPI(object):
         :return: HTTPResponse object on success
         """
         try:
-            open_url(
+            self._request(
                 URL_AUTHENTICATION_FLOW_EXECUTIONS.format(
                     url=self.baseurl,
                     realm=realm,
@@ -2130,7 +2454,7 @@ class KeycloakAPI(object):
         :return: HTTPResponse object on success
         """
         try:
-            open_url(
+            self._request(
                 URL_AUTHENTICATION_EXECUTION_CONFIG.format(
                     url=self.baseurl,
                     realm=realm,
@@ -2155,7 +2479,7 @@ class KeycloakAPI(object):
             newSubFlow["alias"] = subflowName
             newSubFlow["provider"] = "registration-page-form"
             newSubFlow["type"] = flowType
-            open_url(
+            self._request(
                 URL_AUTHENTICATION_FLOW_EXECUTIONS_FLOW.format(
                     url=self.baseurl,
                     realm=realm,
@@ -2179,7 +2503,7 @@ class KeycloakAPI(object):
             newExec = {}
             newExec["provider"] = execution["providerId"]
             newExec["requirement"] = execution["requirement"]
-            open_url(
+            self._request(
                 URL_AUTHENTICATION_FLOW_EXECUTIONS_EXECUTION.format(
                     url=self.baseurl,
                     realm=realm,
@@ -2206,7 +2530,7 @@ class KeycloakAPI(object):
         try:
             if diff > 0:
                 for i in range(diff):
-                    open_url(
+                    self._request(
                         URL_AUTHENTICATION_EXECUTION_RAISE_PRIORITY.format(
                             url=self.baseurl,
                             realm=realm,
@@ -2217,7 +2541,7 @@ class KeycloakAPI(object):
                         validate_certs=self.validate_certs)
             elif diff < 0:
                 for i in range(-diff):
-                    open_url(
+                    self._request(
                         URL_AUTHENTICATION_EXECUTION_LOWER_PRIORITY.format(
                             url=self.baseurl,
                             realm=realm,
@@ -2239,7 +2563,7 @@ class KeycloakAPI(object):
         try:
             # Get executions created
             executions = json.load(
-                open_url(
+                self._request(
                     URL_AUTHENTICATION_FLOW_EXECUTIONS.format(
                         url=self.baseurl,
                         realm=realm,
@@ -2252,7 +2576,7 @@ class KeycloakAPI(object):
                 if "authenticationConfig" in execution:
                     execConfigId = execution["authenticationConfig"]
                     execConfig = json.load(
-                        open_url(
+                        self._request(
                             URL_AUTHENTICATION_CONFIG.format(
                                 url=self.baseurl,
                                 realm=realm,
@@ -2276,7 +2600,7 @@ class KeycloakAPI(object):
 
         try:
             required_actions = json.load(
-                open_url(
+                self._request(
                     URL_AUTHENTICATION_REQUIRED_ACTIONS.format(
                         url=self.baseurl,
                         realm=realm
@@ -2306,7 +2630,7 @@ class KeycloakAPI(object):
         }
 
         try:
-            return open_url(
+            return self._request(
                 URL_AUTHENTICATION_REGISTER_REQUIRED_ACTION.format(
                     url=self.baseurl,
                     realm=realm
@@ -2334,7 +2658,7 @@ class KeycloakAPI(object):
         """
 
         try:
-            return open_url(
+            return self._request(
                 URL_AUTHENTICATION_REQUIRED_ACTIONS_ALIAS.format(
                     url=self.baseurl,
                     alias=quote(alias, safe=''),
@@ -2362,7 +2686,7 @@ class KeycloakAPI(object):
         """
 
         try:
-            return open_url(
+            return self._request(
                 URL_AUTHENTICATION_REQUIRED_ACTIONS_ALIAS.format(
                     url=self.baseurl,
                     alias=quote(alias, safe=''),
@@ -2387,8 +2711,9 @@ class KeycloakAPI(object):
         """
         idps_url = URL_IDENTITY_PROVIDERS.format(url=self.baseurl, realm=realm)
         try:
-            return json.loads(to_native(open_url(idps_url, method='GET', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(idps_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except ValueError as e:
             self.module.fail_json(msg='API returned incorrect JSON when trying to obtain list of identity providers for realm %s: %s'
                                       % (realm, str(e)))
@@ -2404,8 +2729,9 @@ class KeycloakAPI(object):
         """
         idp_url = URL_IDENTITY_PROVIDER.format(url=self.baseurl, realm=realm, alias=alias)
         try:
-            return json.loads(to_native(open_url(idp_url, method="GET", http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(idp_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except HTTPError as e:
             if e.code == 404:
                 return None
@@ -2424,8 +2750,8 @@ class KeycloakAPI(object):
         """
         idps_url = URL_IDENTITY_PROVIDERS.format(url=self.baseurl, realm=realm)
         try:
-            return open_url(idps_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(idprep), validate_certs=self.validate_certs)
+            return self._request(idps_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(idprep), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not create identity provider %s in realm %s: %s'
                                       % (idprep['alias'], realm, str(e)))
@@ -2438,8 +2764,8 @@ class KeycloakAPI(object):
         """
         idp_url = URL_IDENTITY_PROVIDER.format(url=self.baseurl, realm=realm, alias=idprep['alias'])
         try:
-            return open_url(idp_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(idprep), validate_certs=self.validate_certs)
+            return self._request(idp_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(idprep), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not update identity provider %s in realm %s: %s'
                                       % (idprep['alias'], realm, str(e)))
@@ -2451,8 +2777,8 @@ class KeycloakAPI(object):
         """
         idp_url = URL_IDENTITY_PROVIDER.format(url=self.baseurl, realm=realm, alias=alias)
         try:
-            return open_url(idp_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            validate_certs=self.validate_certs)
+            return self._request(idp_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Unable to delete identity provider %s in realm %s: %s'
                                       % (alias, realm, str(e)))
@@ -2465,9 +2791,9 @@ class KeycloakAPI(object):
         """
         mappers_url = URL_IDENTITY_PROVIDER_MAPPERS.format(url=self.baseurl, realm=realm, alias=alias)
         try:
-            return json.loads(to_native(open_url(mappers_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(mappers_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except ValueError as e:
             self.module.fail_json(msg='API returned incorrect JSON when trying to obtain list of identity provider mappers for idp %s in realm %s: %s'
                                       % (alias, realm, str(e)))
@@ -2484,9 +2810,9 @@ class KeycloakAPI(object):
         """
         mapper_url = URL_IDENTITY_PROVIDER_MAPPER.format(url=self.baseurl, realm=realm, alias=alias, id=mid)
         try:
-            return json.loads(to_native(open_url(mapper_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(mapper_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except HTTPError as e:
             if e.code == 404:
                 return None
@@ -2506,8 +2832,8 @@ class KeycloakAPI(object):
         """
         mappers_url = URL_IDENTITY_PROVIDER_MAPPERS.format(url=self.baseurl, realm=realm, alias=alias)
         try:
-            return open_url(mappers_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(mapper), validate_certs=self.validate_certs)
+            return self._request(mappers_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(mapper), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not create identity provider mapper %s for idp %s in realm %s: %s'
                                       % (mapper['name'], alias, realm, str(e)))
@@ -2521,8 +2847,8 @@ class KeycloakAPI(object):
         """
         mapper_url = URL_IDENTITY_PROVIDER_MAPPER.format(url=self.baseurl, realm=realm, alias=alias, id=mapper['id'])
         try:
-            return open_url(mapper_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(mapper), validate_certs=self.validate_certs)
+            return self._request(mapper_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(mapper), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not update mapper %s for identity provider %s in realm %s: %s'
                                       % (mapper['id'], alias, realm, str(e)))
@@ -2535,8 +2861,8 @@ class KeycloakAPI(object):
         """
         mapper_url = URL_IDENTITY_PROVIDER_MAPPER.format(url=self.baseurl, realm=realm, alias=alias, id=mid)
         try:
-            return open_url(mapper_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            validate_certs=self.validate_certs)
+            return self._request(mapper_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Unable to delete mapper %s for identity provider %s in realm %s: %s'
                                       % (mid, alias, realm, str(e)))
@@ -2552,8 +2878,9 @@ class KeycloakAPI(object):
             comps_url += '?%s' % filter
 
         try:
-            return json.loads(to_native(open_url(comps_url, method='GET', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(comps_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except ValueError as e:
             self.module.fail_json(msg='API returned incorrect JSON when trying to obtain list of components for realm %s: %s'
                                       % (realm, str(e)))
@@ -2569,8 +2896,9 @@ class KeycloakAPI(object):
         """
         comp_url = URL_COMPONENT.format(url=self.baseurl, realm=realm, id=cid)
         try:
-            return json.loads(to_native(open_url(comp_url, method="GET", http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(comp_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except HTTPError as e:
             if e.code == 404:
                 return None
@@ -2589,14 +2917,15 @@ class KeycloakAPI(object):
         """
         comps_url = URL_COMPONENTS.format(url=self.baseurl, realm=realm)
         try:
-            resp = open_url(comps_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(comprep), validate_certs=self.validate_certs)
+            resp = self._request(comps_url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(comprep), validate_certs=self.validate_certs)
             comp_url = resp.getheader('Location')
             if comp_url is None:
                 self.module.fail_json(msg='Could not create component in realm %s: %s'
                                           % (realm, 'unexpected response'))
-            return json.loads(to_native(open_url(comp_url, method="GET", http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(comp_url, method="GET", http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except Exception as e:
             self.fail_open_url(e, msg='Could not create component in realm %s: %s'
                                       % (realm, str(e)))
@@ -2612,8 +2941,8 @@ class KeycloakAPI(object):
             self.module.fail_json(msg='Cannot update component without id')
         comp_url = URL_COMPONENT.format(url=self.baseurl, realm=realm, id=cid)
         try:
-            return open_url(comp_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(comprep), validate_certs=self.validate_certs)
+            return self._request(comp_url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(comprep), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not update component %s in realm %s: %s'
                                       % (cid, realm, str(e)))
@@ -2625,8 +2954,8 @@ class KeycloakAPI(object):
         """
         comp_url = URL_COMPONENT.format(url=self.baseurl, realm=realm, id=cid)
         try:
-            return open_url(comp_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            validate_certs=self.validate_certs)
+            return self._request(comp_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Unable to delete component %s in realm %s: %s'
                                       % (cid, realm, str(e)))
@@ -2636,9 +2965,9 @@ class KeycloakAPI(object):
         search_url = "%s/search?name=%s" % (url, quote(name, safe=''))
 
         try:
-            return json.loads(to_native(open_url(search_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(search_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except Exception:
             return False
 
@@ -2647,8 +2976,8 @@ class KeycloakAPI(object):
         url = URL_AUTHZ_AUTHORIZATION_SCOPES.format(url=self.baseurl, client_id=client_id, realm=realm)
 
         try:
-            return open_url(url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(payload), validate_certs=self.validate_certs)
+            return self._request(url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(payload), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not create authorization scope %s for client %s in realm %s: %s' % (payload['name'], client_id, realm, str(e)))
 
@@ -2657,8 +2986,8 @@ class KeycloakAPI(object):
         url = URL_AUTHZ_AUTHORIZATION_SCOPE.format(url=self.baseurl, id=id, client_id=client_id, realm=realm)
 
         try:
-            return open_url(url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(payload), validate_certs=self.validate_certs)
+            return self._request(url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(payload), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not create update scope %s for client %s in realm %s: %s' % (payload['name'], client_id, realm, str(e)))
 
@@ -2667,8 +2996,8 @@ class KeycloakAPI(object):
         url = URL_AUTHZ_AUTHORIZATION_SCOPE.format(url=self.baseurl, id=id, client_id=client_id, realm=realm)
 
         try:
-            return open_url(url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            validate_certs=self.validate_certs)
+            return self._request(url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not delete scope %s for client %s in realm %s: %s' % (id, client_id, realm, str(e)))
 
@@ -2685,7 +3014,7 @@ class KeycloakAPI(object):
                 realm=realm,
                 id=user_id)
             userrep = json.load(
-                open_url(
+                self._request(
                     user_url,
                     method='GET',
                     http_agent=self.http_agent, headers=self.restheaders,
@@ -2710,12 +3039,12 @@ class KeycloakAPI(object):
             users_url = URL_USERS.format(
                 url=self.baseurl,
                 realm=realm)
-            open_url(users_url,
-                     method='POST',
-                     http_agent=self.http_agent, headers=self.restheaders,
-                     data=json.dumps(userrep),
-                     timeout=self.connection_timeout,
-                     validate_certs=self.validate_certs)
+            self._request(users_url,
+                          method='POST',
+                          http_agent=self.http_agent, headers=self.restheaders,
+                          data=json.dumps(userrep),
+                          timeout=self.connection_timeout,
+                          validate_certs=self.validate_certs)
             created_user = self.get_user_by_username(
                 username=userrep['username'],
                 realm=realm)
@@ -2755,7 +3084,7 @@ class KeycloakAPI(object):
                 url=self.baseurl,
                 realm=realm,
                 id=userrep["id"])
-            open_url(
+            self._request(
                 user_url,
                 method='PUT',
                 http_agent=self.http_agent, headers=self.restheaders,
@@ -2782,7 +3111,7 @@ class KeycloakAPI(object):
                 url=self.baseurl,
                 realm=realm,
                 id=user_id)
-            return open_url(
+            return self._request(
                 user_url,
                 method='DELETE',
                 http_agent=self.http_agent, headers=self.restheaders,
@@ -2806,7 +3135,7 @@ class KeycloakAPI(object):
                 realm=realm,
                 id=user_id)
             user_groups = json.load(
-                open_url(
+                self._request(
                     user_groups_url,
                     method='GET',
                     http_agent=self.http_agent, headers=self.restheaders,
@@ -2833,7 +3162,7 @@ class KeycloakAPI(object):
                 realm=realm,
                 id=user_id,
                 group_id=group_id)
-            return open_url(
+            return self._request(
                 user_group_url,
                 method='PUT',
                 http_agent=self.http_agent, headers=self.restheaders,
@@ -2857,7 +3186,7 @@ class KeycloakAPI(object):
                 realm=realm,
                 id=user_id,
                 group_id=group_id)
-            return open_url(
+            return self._request(
                 user_group_url,
                 method='DELETE',
                 http_agent=self.http_agent, headers=self.restheaders,
@@ -2933,8 +3262,8 @@ class KeycloakAPI(object):
         url = URL_AUTHZ_CUSTOM_POLICY.format(url=self.baseurl, policy_type=policy_type, client_id=client_id, realm=realm)
 
         try:
-            return open_url(url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(payload), validate_certs=self.validate_certs)
+            return self._request(url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(payload), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not create permission %s for client %s in realm %s: %s' % (payload['name'], client_id, realm, str(e)))
 
@@ -2944,8 +3273,8 @@ class KeycloakAPI(object):
         delete_url = "%s/%s" % (url, policy_id)
 
         try:
-            return open_url(delete_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            validate_certs=self.validate_certs)
+            return self._request(delete_url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not delete custom policy %s for client %s in realm %s: %s' % (id, client_id, realm, str(e)))
 
@@ -2955,9 +3284,9 @@ class KeycloakAPI(object):
         search_url = "%s/search?name=%s" % (url, name.replace(' ', '%20'))
 
         try:
-            return json.loads(to_native(open_url(search_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(search_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except Exception:
             return False
 
@@ -2966,8 +3295,8 @@ class KeycloakAPI(object):
         url = URL_AUTHZ_PERMISSIONS.format(url=self.baseurl, permission_type=permission_type, client_id=client_id, realm=realm)
 
         try:
-            return open_url(url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(payload), validate_certs=self.validate_certs)
+            return self._request(url, method='POST', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(payload), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not create permission %s for client %s in realm %s: %s' % (payload['name'], client_id, realm, str(e)))
 
@@ -2976,8 +3305,8 @@ class KeycloakAPI(object):
         url = URL_AUTHZ_POLICY.format(url=self.baseurl, id=id, client_id=client_id, realm=realm)
 
         try:
-            return open_url(url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            validate_certs=self.validate_certs)
+            return self._request(url, method='DELETE', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not delete permission %s for client %s in realm %s: %s' % (id, client_id, realm, str(e)))
 
@@ -2986,8 +3315,8 @@ class KeycloakAPI(object):
         url = URL_AUTHZ_PERMISSION.format(url=self.baseurl, permission_type=permission_type, id=id, client_id=client_id, realm=realm)
 
         try:
-            return open_url(url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
-                            data=json.dumps(payload), validate_certs=self.validate_certs)
+            return self._request(url, method='PUT', http_agent=self.http_agent, headers=self.restheaders, timeout=self.connection_timeout,
+                                 data=json.dumps(payload), validate_certs=self.validate_certs)
         except Exception as e:
             self.fail_open_url(e, msg='Could not create update permission %s for client %s in realm %s: %s' % (payload['name'], client_id, realm, str(e)))
 
@@ -2997,9 +3326,9 @@ class KeycloakAPI(object):
         search_url = "%s/search?name=%s" % (url, name.replace(' ', '%20'))
 
         try:
-            return json.loads(to_native(open_url(search_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(search_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except Exception:
             return False
 
@@ -3009,9 +3338,9 @@ class KeycloakAPI(object):
         search_url = "%s/search?name=%s&permission=false" % (url, name.replace(' ', '%20'))
 
         try:
-            return json.loads(to_native(open_url(search_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
-                                                 timeout=self.connection_timeout,
-                                                 validate_certs=self.validate_certs).read()))
+            return json.loads(to_native(self._request(search_url, method='GET', http_agent=self.http_agent, headers=self.restheaders,
+                                                      timeout=self.connection_timeout,
+                                                      validate_certs=self.validate_certs).read()))
         except Exception:
             return False
 
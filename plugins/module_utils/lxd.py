@@ -22,6 +22,19 @@ from ansible.module_utils.common.text.converters import to_text
 HTTPConnection = http_client.HTTPConnection
 HTTPSConnection = http_client.HTTPSConnection
 
+try:
+    CONNECTION_LOST_ERRORS = (BrokenPipeError, ConnectionResetError)
+except NameError:
+    # Python 2
+    CONNECTION_LOST_ERRORS = (socket.error, )
+
+# errors raised when the server closed a kept-alive connection
+SEND_ERRORS = (http_client.CannotSendRequest, ) + CONNECTION_LOST_ERRORS
+RESPONSE_ERRORS = (http_client.BadStatusLine, http_client.ResponseNotReady) + CONNECTION_LOST_ERRORS
+
+# size of the chunks file transfers are streamed in
+CHUNK_SIZE = 64 * 1024
+
 
 class UnixHTTPConnection(HTTPConnection):
     def __init__(self, path):
@@ -41,6 +54,8 @@ class LXDClientException(Exception):
 
 
 class LXDClient(object):
+    HEADERS = {'Connection': 'keep-alive', 'Content-Type': 'application/json'}
+
     def __init__(self, url, key_file=None, cert_file=None, debug=False, server_cert_file=None, server_check_hostname=True):
         """LXD Client.
 
@@ -93,30 +108,101 @@ class LXDClient(object):
         body_json = {'type': 'client', 'password': trust_password}
         return self._send_request('POST', '/1.0/certificates', body_json=body_json)
 
+    def close(self):
+        self.connection.close()
+
+    def upload(self, url, fileobj, size, headers=None):
+        """Send the content of a file as request body, streamed in blocks.
+
+        :param url: The URL of the request, for example a /1.0/instances/<name>/files URL.
+        :type url: ``str``
+        :param fileobj: The file to send, opened in binary mode.
+        :param size: The number of bytes to send.
+        :type size: ``int``
+        :param headers: Additional request headers.
+        :type headers: ``dict``
+        :return: The JSON response.
+        """
+        req_headers = {'Connection': 'keep-alive', 'Content-Type': 'application/octet-stream', 'Content-Length': str(size)}
+        req_headers.update(headers or {})
+        try:
+            resp_data = self._open_request('POST', url, fileobj, req_headers).read()
+            return self._check_response(json.loads(to_text(resp_data, errors='surrogate_or_strict')), 'POST', url)
+        except socket.error as e:
+            raise LXDClientException('cannot connect to the LXD server', err=e)
+
+    def download(self, url, fileobj, chunk_size=CHUNK_SIZE):
+        """Write the raw body of a GET request to a file, one chunk at a time.
+
+        :param url: The URL of the request, for example a /1.0/instances/<name>/files URL.
+        :type url: ``str``
+        :param fileobj: The file to write to, opened in binary mode.
+        :param chunk_size: The size of the chunks read from the response.
+        :type chunk_size: ``int``
+        """
+        try:
+            resp = self._open_request('GET', url, None, self.HEADERS)
+            if resp.status != 200:
+                resp_json = json.loads(to_text(resp.read(), errors='surrogate_or_strict'))
+                self._check_response(resp_json, 'GET', url)
+                self._raise_err_from_json(resp_json)
+            while True:
+                chunk = resp.read(chunk_size)
+                if not chunk:
+                    break
+                fileobj.write(chunk)
+        except socket.error as e:
+            raise LXDClientException('cannot connect to the LXD server', err=e)
+
+    def _open_request(self, method, url, body, headers):
+        # The connection is kept open between requests. If the server closed
+        # it while we were idle, reconnect and send the request once more.
+        # Requests that may have reached the server are only repeated for GET.
+        for attempt in (1, 2):
+            if attempt == 2 and hasattr(body, 'seek'):
+                body.seek(0)
+            try:
+                self.connection.request(method, url, body=body, headers=headers)
+            except SEND_ERRORS as e:
+                self.connection.close()
+                if attempt == 2:
+                    raise socket.error(str(e))
+                continue
+            try:
+                return self.connection.getresponse()
+            except RESPONSE_ERRORS as e:
+                self.connection.close()
+                if attempt == 2 or method != 'GET':
+                    raise socket.error(str(e))
+
+    def _request(self, method, url, body):
+        return self._open_request(method, url, body, self.HEADERS).read()
+
     def _send_request(self, method, url, body_json=None, ok_error_codes=None, timeout=None):
         try:
             body = json.dumps(body_json)
-            self.connection.request(method, url, body=body)
-            resp = self.connection.getresponse()
-            resp_data = resp.read()
+            resp_data = self._request(method, url, body)
             resp_data = to_text(resp_data, errors='surrogate_or_strict')
             resp_json = json.loads(resp_data)
-            self.logs.append({
-                'type': 'sent request',
-                'request': {'method': method, 'url': url, 'json': body_json, 'timeout': timeout},
-                'response': {'json': resp_json}
-            })
-            resp_type = resp_json.get('type', None)
-            if resp_type == 'error':
-                if ok_error_codes is not None and resp_json['error_code'] in ok_error_codes:
-                    return resp_json
-                if resp_json['error'] == "Certificate already in trust store":
-                    return resp_json
-                self._raise_err_from_json(resp_json)
-            return resp_json
+            return self._check_response(resp_json, method, url, body_json=body_json, ok_error_codes=ok_error_codes, timeout=timeout)
         except socket.error as e:
             raise LXDClientException('cannot connect to the LXD server', err=e)
 
+    def _check_response(self, resp_json, method, url, body_json=None, ok_error_codes=None, timeout=None):
+        self.logs.append({
+            'type': 'sent request',
+            'request': {'method': method, 'url': url, 'json': body_json, 'timeout': timeout},
+            'response': {'json': resp_json}
+        })
+        resp_type = resp_json.get('type', None)
+        if resp_type == 'error':
+            if ok_error_codes is not None and resp_json['error_code'] in ok_error_codes:
+                return resp_json
+            if resp_json['error'] == "Certificate already in trust store":
+                return resp_json
+            self._raise_err_from_json(resp_json)
+        return resp_json
+
     def _raise_err_from_json(self, resp_json):
         err_params = {}
         if self.debug:
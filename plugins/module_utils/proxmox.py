@@ -7,6 +7,11 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
+import hashlib
+import json
+import os
+import tempfile
+import time
 import traceback
 
 PROXMOXER_IMP_ERR = None
@@ -20,8 +25,20 @@ except ImportError:
 
 
 from ansible.module_utils.basic import env_fallback, missing_required_lib
+from ansible.module_utils.common.text.converters import to_bytes, to_text
+from ansible_collections.community.general.plugins.module_utils._filelock import FileLock, LockTimeout
 from ansible_collections.community.general.plugins.module_utils.version import LooseVersion
 
+TICKET_CACHE_DIR = '~/.ansible/proxmox_ticket_cache'
+# Proxmox VE tickets are valid for two hours; cached ones are only reused
+# while they have at least TICKET_CACHE_EXPIRY_MARGIN seconds left
+TICKET_LIFETIME = 7200
+TICKET_CACHE_EXPIRY_MARGIN = 300
+
+# Bounds, in seconds, of the exponential backoff used when waiting for tasks
+TASK_POLL_INTERVAL = 0.5
+TASK_POLL_MAX_INTERVAL = 5
+
 
 def proxmox_auth_argument_spec():
     return dict(
@@ -46,6 +63,11 @@ def proxmox_auth_argument_spec():
         validate_certs=dict(type='bool',
                             default=False
                             ),
+        api_ticket_cache=dict(type='bool',
+                              default=False
+                              ),
+        api_ticket_cache_dir=dict(type='path'
+                                  ),
     )
 
 
@@ -65,6 +87,35 @@ def ansible_to_proxmox_bool(value):
     return 1 if value else 0
 
 
+def _ticket_cache_path(module_params, cache_dir):
+    '''Return the cache file for the credentials in module_params.
+    The password is part of the key, so a changed password never picks up a
+    ticket obtained with the old one.'''
+    key = '\0'.join(to_text(module_params.get(param) or '') for param in ('api_host', 'api_user', 'api_password'))
+    return os.path.join(cache_dir, 'ticket-%s.json' % hashlib.sha256(to_bytes(key)).hexdigest())
+
+
+def _read_ticket_cache(path):
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+    return cached if isinstance(cached, dict) else None
+
+
+def _write_ticket_cache(path, ticket, now):
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.ticket-')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'ticket': ticket, 'expires_at': now + TICKET_LIFETIME}, f)
+        os.chmod(tmp_path, 0o600)
+        os.rename(tmp_path, path)
+    except (IOError, OSError):
+        # The cache is an optimisation only; the connection is already established
+        pass
+
+
 class ProxmoxAnsible(object):
     """Base class for Proxmox modules"""
     def __init__(self, module):
@@ -73,6 +124,11 @@ class ProxmoxAnsible(object):
 
         self.module = module
         self.proxmoxer_version = proxmoxer_version
+        # Snapshot of cluster/resources?type=vm indexed by vmid and by name,
+        # loaded on first use and dropped once a task has changed the cluster
+        self._vm_resources = None
+        # UPID -> (number of log lines read so far, last line read)
+        self._task_logs = {}
         self.proxmox_api = self._connect()
         # Test token validity
         try:
@@ -98,10 +154,56 @@ class ProxmoxAnsible(object):
             auth_args['token_value'] = api_token_secret
 
         try:
+            if api_password and self.module.params.get('api_ticket_cache'):
+                return self._connect_with_ticket_cache(api_host, validate_certs, auth_args)
             return ProxmoxAPI(api_host, verify_ssl=validate_certs, **auth_args)
         except Exception as e:
             self.module.fail_json(msg='%s' % e, exception=traceback.format_exc())
 
+    def _connect_with_ticket_cache(self, api_host, validate_certs, auth_args):
+        '''Log in with a ticket from the on-disk cache when there is a valid one.
+
+        Proxmox VE accepts a valid ticket in place of the password and answers
+        with a fresh one, which spares the realm (PAM, LDAP, ...) a full login.
+        The cache lock is held meanwhile, so that concurrent tasks with the
+        same credentials only log in once.'''
+        cache_dir = self.module.params.get('api_ticket_cache_dir') or os.path.expanduser(TICKET_CACHE_DIR)
+        if not os.path.isdir(cache_dir):
+            try:
+                os.makedirs(cache_dir, 0o700)
+            except OSError:
+                if not os.path.isdir(cache_dir):
+                    return ProxmoxAPI(api_host, verify_ssl=validate_certs, **auth_args)
+
+        path = _ticket_cache_path(self.module.params, cache_dir)
+        lock = FileLock()
+        try:
+            lock.set_lock(path, cache_dir, 30)
+        except LockTimeout:
+            return ProxmoxAPI(api_host, verify_ssl=validate_certs, **auth_args)
+
+        try:
+            now = time.time()
+            cached = _read_ticket_cache(path) or {}
+            api = None
+            if cached.get('ticket') and cached.get('expires_at', 0) > now + TICKET_CACHE_EXPIRY_MARGIN:
+                try:
+                    api = ProxmoxAPI(api_host, verify_ssl=validate_certs, **dict(auth_args, password=cached['ticket']))
+                except Exception:
+                    # The ticket may have been invalidated server side
+                    api = None
+            if api is None:
+                api = ProxmoxAPI(api_host, verify_ssl=validate_certs, **auth_args)
+
+            # get_tokens() is only available with proxmoxer>=1.3.0
+            if hasattr(api, 'get_tokens'):
+                ticket = api.get_tokens()[0]
+                if ticket:
+                    _write_ticket_cache(path, ticket, now)
+            return api
+        finally:
+            lock.unlock()
+
     def version(self):
         try:
             apiversion = self.proxmox_api.version.get()
@@ -122,9 +224,25 @@ class ProxmoxAnsible(object):
         except Exception as e:
             self.module.fail_json(msg='Unable to retrieve next free vmid: %s' % e)
 
+    def _get_vm_resources(self):
+        '''Return the cluster VM resources as a tuple of a vmid index and a name index.
+        The list is downloaded once and reused until invalidate_vm_resources() is called.'''
+        if self._vm_resources is None:
+            by_vmid = {}
+            by_name = {}
+            for vm in self.proxmox_api.cluster.resources.get(type='vm'):
+                by_vmid[int(vm['vmid'])] = vm
+                by_name.setdefault(vm.get('name'), []).append(vm['vmid'])
+            self._vm_resources = (by_vmid, by_name)
+        return self._vm_resources
+
+    def invalidate_vm_resources(self):
+        '''Forget the cluster VM resources, so that the next lookup sees the current state'''
+        self._vm_resources = None
+
     def get_vmid(self, name, ignore_missing=False, choose_first_if_multiple=False):
         try:
-            vms = [vm['vmid'] for vm in self.proxmox_api.cluster.resources.get(type='vm') if vm.get('name') == name]
+            vms = self._get_vm_resources()[1].get(name, [])
         except Exception as e:
             self.module.fail_json(msg='Unable to retrieve list of VMs filtered by name %s: %s' % (name, e))
 
@@ -140,12 +258,12 @@ class ProxmoxAnsible(object):
 
     def get_vm(self, vmid, ignore_missing=False):
         try:
-            vms = [vm for vm in self.proxmox_api.cluster.resources.get(type='vm') if vm['vmid'] == int(vmid)]
+            vm = self._get_vm_resources()[0].get(int(vmid))
         except Exception as e:
             self.module.fail_json(msg='Unable to retrieve list of VMs filtered by vmid %s: %s' % (vmid, e))
 
-        if vms:
-            return vms[0]
+        if vm:
+            return vm
         else:
             if ignore_missing:
                 return None
@@ -159,6 +277,60 @@ class ProxmoxAnsible(object):
         except Exception as e:
             self.module.fail_json(msg='Unable to retrieve API task ID from node %s: %s' % (node, e))
 
+    def _read_task_log(self, node, taskid):
+        '''Read the task log lines written since the previous call'''
+        count = self._task_logs.get(taskid, (0, None))[0]
+        try:
+            lines = self.proxmox_api.nodes(node).tasks(taskid).log.get(start=count, limit=500)
+        except Exception:
+            return
+        # Past the end of the log, Proxmox VE answers with a "no content" placeholder
+        lines = [line for line in lines if line.get('n', 0) > count]
+        if lines:
+            self._task_logs[taskid] = (lines[-1]['n'], lines[-1])
+
+    def api_task_last_log(self, node, taskid):
+        '''Return the last line of a task log, in a list as returned by the log endpoint.
+        Only the lines not read yet while waiting for the task are downloaded.'''
+        self._read_task_log(node, taskid)
+        last = self._task_logs.get(taskid, (0, None))[1]
+        return [last] if last else []
+
+    def api_task_wait(self, node, taskid, timeout):
+        '''Wait for a task to stop
+
+        The task status is polled with an exponential backoff, between
+        TASK_POLL_INTERVAL and TASK_POLL_MAX_INTERVAL seconds, and its log is
+        tailed meanwhile, see api_task_last_log().  The module fails if the
+        task stops with an exit status other than OK.
+
+        :param node: str - node running the task
+        :param taskid: str - UPID of the task
+        :param timeout: int - maximum number of seconds to wait
+        :return: bool - True if the task stopped successfully, False on timeout
+        '''
+        deadline = time.time() + timeout
+        delay = TASK_POLL_INTERVAL
+        while True:
+            try:
+                status = self.proxmox_api.nodes(node).tasks(taskid).status.get()
+            except Exception as e:
+                self.module.fail_json(msg='Unable to retrieve API task ID from node %s: %s' % (node, e))
+            self._read_task_log(node, taskid)
+            if status['status'] == 'stopped':
+                # Whatever the outcome, the task may have changed the cluster
+                self.invalidate_vm_resources()
+                if status.get('exitstatus') != 'OK':
+                    self.module.fail_json(taskid=taskid, msg='Task %s on node %s failed: %s. Last line in task: %s'
+                                          % (taskid, node, status.get('exitstatus'), self.api_task_last_log(node, taskid)))
+                return True
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, TASK_POLL_MAX_INTERVAL)
+
     def get_pool(self, poolid):
         """Retrieve pool information
 
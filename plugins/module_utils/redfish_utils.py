@@ -6,11 +6,15 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
+import copy
 import json
 import os
 import random
 import string
 import gzip
+import threading
+import time
+from email.utils import mktime_tz, parsedate_tz
 from io import BytesIO
 from ansible.module_utils.urls import open_url
 from ansible.module_utils.common.text.converters import to_native
@@ -21,6 +25,12 @@ from ansible.module_utils.six.moves import http_client
 from ansible.module_utils.six.moves.urllib.error import URLError, HTTPError
 from ansible.module_utils.six.moves.urllib.parse import urlparse
 
+try:
+    from concurrent.futures import ThreadPoolExecutor
+    HAS_FUTURES = True
+except ImportError:
+    HAS_FUTURES = False
+
 GET_HEADERS = {'accept': 'application/json', 'OData-Version': '4.0'}
 POST_HEADERS = {'content-type': 'application/json', 'accept': 'application/json',
                 'OData-Version': '4.0'}
@@ -35,11 +45,84 @@ FAIL_MSG = 'Issuing a data modification command without specifying the '\
            'than one %(resource)s is no longer allowed. Use the `resource_id` '\
            'option to specify the target %(resource)s ID.'
 
+# Number of collection members fetched at the same time when the service
+# cannot return them inline with $expand
+MEMBER_FETCH_WORKERS = 4
+
+# Bounds, in seconds, of the exponential backoff used when polling a task
+# whose service does not ask for a specific delay with Retry-After
+TASK_POLL_INTERVAL = 1
+TASK_POLL_MAX_INTERVAL = 30
+
+
+class _TaskEventListener(object):
+    """
+    Reads a Redfish SSE stream in a background thread and flags the events
+    that concern a given task, so that a waiting poll loop can wake up early.
+    """
+
+    def __init__(self, response, task_uri):
+        self.response = response
+        self.task_uri = task_uri
+        self.events = 0
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._read)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _is_task_event(self, data):
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            return False
+        for event in payload.get('Events', []):
+            message_id = event.get('MessageId') or ''
+            origin = (event.get('OriginOfCondition') or {}).get('@odata.id') or ''
+            if message_id.startswith('TaskEvent.') or (origin and self.task_uri.endswith(origin)):
+                return True
+        return False
+
+    def _read(self):
+        data = []
+        try:
+            while True:
+                line = self.response.readline()
+                if not line:
+                    break
+                line = to_native(line).rstrip('\r\n')
+                if line.startswith('data:'):
+                    data.append(line[5:].strip())
+                elif not line and data:
+                    # A blank line ends the event
+                    if self._is_task_event('\n'.join(data)):
+                        self.events += 1
+                        self._wake.set()
+                    data = []
+        except Exception:
+            # The stream only shortens the waits; polling carries on without it
+            pass
+
+    def wait(self, delay):
+        """
+        Sleep for up to delay seconds, returning early with True when a
+        task event arrived in the meantime.
+        """
+        woken = self._wake.wait(delay)
+        self._wake.clear()
+        return woken
+
+    def close(self):
+        try:
+            self.response.close()
+        except Exception:
+            pass
+
 
 class RedfishUtils(object):
 
     def __init__(self, creds, root_uri, timeout, module, resource_id=None,
-                 data_modification=False, strip_etag_quotes=False):
+                 data_modification=False, strip_etag_quotes=False,
+                 cache_responses=False):
         self.root_uri = root_uri
         self.creds = creds
         self.timeout = timeout
@@ -51,6 +134,10 @@ class RedfishUtils(object):
         self.data_modification = data_modification
         self.strip_etag_quotes = strip_etag_quotes
         self._vendor = None
+        # URI -> successful GET response, kept for the module run when
+        # cache_responses is set and dropped on any modification request
+        self._response_cache = {} if cache_responses else None
+        self._expand_query = None
         self._init_session()
 
     def _auth_params(self, headers):
@@ -130,10 +217,21 @@ class RedfishUtils(object):
         return resp
 
     # The following functions are to send GET/POST/PATCH/DELETE requests
-    def get_request(self, uri, override_headers=None):
+    def get_request(self, uri, override_headers=None, revalidate=False):
         req_headers = dict(GET_HEADERS)
         if override_headers:
             req_headers.update(override_headers)
+        cached = None
+        if self._response_cache is not None and not override_headers:
+            cached = self._response_cache.get(uri)
+            if cached is not None:
+                if not revalidate:
+                    return self._copy_response(cached)
+                # Only reuse the cached copy if the service confirms it is current
+                if cached['headers'].get('etag'):
+                    req_headers['If-None-Match'] = cached['headers']['etag']
+                else:
+                    cached = None
         username, password, basic_auth = self._auth_params(req_headers)
         try:
             # Service root is an unauthenticated resource; remove credentials
@@ -153,6 +251,8 @@ class RedfishUtils(object):
                 data = json.loads(to_native(resp.read()))
                 headers = dict((k.lower(), v) for (k, v) in resp.info().items())
         except HTTPError as e:
+            if e.code == 304 and cached is not None:
+                return self._copy_response(cached)
             msg = self._get_extended_message(e)
             return {'ret': False,
                     'msg': "HTTP Error %s on GET request to '%s', extended message: '%s'"
@@ -165,10 +265,90 @@ class RedfishUtils(object):
         except Exception as e:
             return {'ret': False,
                     'msg': "Failed GET request to '%s': '%s'" % (uri, to_text(e))}
-        return {'ret': True, 'data': data, 'headers': headers, 'resp': resp}
+        response = {'ret': True, 'data': data, 'headers': headers, 'resp': resp}
+        if self._response_cache is not None and not override_headers:
+            self._response_cache[uri] = self._copy_response(response)
+        return response
+
+    @staticmethod
+    def _copy_response(response):
+        # Callers are free to modify the data they get back
+        return dict(response, data=copy.deepcopy(response['data']))
+
+    def _clear_response_cache(self):
+        if self._response_cache is not None:
+            self._response_cache.clear()
+
+    def _get_expand_query(self):
+        """
+        Return the $expand query that inlines the members of a collection,
+        or an empty string if the service does not support it
+        """
+        if self._expand_query is None:
+            self._expand_query = ''
+            response = self.get_request(self.root_uri + self.service_root)
+            if response['ret']:
+                features = response['data'].get('ProtocolFeaturesSupported', {}).get('ExpandQuery', {})
+                if features.get('NoLinks'):
+                    if features.get('Levels'):
+                        self._expand_query = '$expand=.($levels=1)'
+                    else:
+                        self._expand_query = '$expand=.'
+        return self._expand_query
+
+    def get_collection_request(self, uri):
+        """
+        GET a resource collection and, when responses are cached, all of its
+        members along with it, so that the following per-member GET requests
+        are served from the cache.
+
+        The members are inlined with $expand when the service supports it,
+        and fetched in parallel otherwise.
+
+        :param uri: full URI of the collection
+        :return: the response for the collection, as returned by get_request()
+        """
+        if self._response_cache is None:
+            return self.get_request(uri)
+
+        expand = self._get_expand_query()
+        if expand:
+            response = self.get_request(uri + ('&' if '?' in uri else '?') + expand)
+            members = response['data'].get('Members', []) if response['ret'] else []
+            # Some services accept $expand but still return plain references
+            if response['ret'] and all(len(m) > 1 for m in members):
+                for member in members:
+                    if member.get('@odata.id'):
+                        self._response_cache.setdefault(self.root_uri + member['@odata.id'], {
+                            'ret': True, 'data': copy.deepcopy(member), 'headers': {}, 'resp': None})
+                self._response_cache[uri] = self._copy_response(response)
+                return response
+
+        response = self.get_request(uri)
+        if response['ret']:
+            self.prefetch([m.get('@odata.id') for m in response['data'].get('Members', [])])
+        return response
+
+    def prefetch(self, uris):
+        """
+        GET the given resources into the response cache, several at a time.
+        Does nothing when responses are not cached.
+
+        :param uris: list of resource URIs, relative to root_uri
+        """
+        if self._response_cache is None:
+            return
+        uris = [self.root_uri + uri for uri in uris
+                if uri and self.root_uri + uri not in self._response_cache]
+        if len(uris) < 2 or not HAS_FUTURES:
+            return
+        with ThreadPoolExecutor(max_workers=MEMBER_FETCH_WORKERS) as executor:
+            # get_request() stores every successful response in the cache
+            list(executor.map(self.get_request, uris))
 
     def post_request(self, uri, pyld, multipart=False):
         req_headers = dict(POST_HEADERS)
+        self._clear_response_cache()
         username, password, basic_auth = self._auth_params(req_headers)
         try:
             # When performing a POST to the session collection, credentials are
@@ -212,7 +392,7 @@ class RedfishUtils(object):
 
     def patch_request(self, uri, pyld, check_pyld=False):
         req_headers = dict(PATCH_HEADERS)
-        r = self.get_request(uri)
+        r = self.get_request(uri, revalidate=True)
         if r['ret']:
             # Get etag from etag header or @odata.etag property
             etag = r['headers'].get('etag')
@@ -235,6 +415,7 @@ class RedfishUtils(object):
                 r['changed'] = False
                 return r
 
+        self._clear_response_cache()
         username, password, basic_auth = self._auth_params(req_headers)
         try:
             resp = open_url(uri, data=json.dumps(pyld),
@@ -260,7 +441,7 @@ class RedfishUtils(object):
 
     def put_request(self, uri, pyld):
         req_headers = dict(PUT_HEADERS)
-        r = self.get_request(uri)
+        r = self.get_request(uri, revalidate=True)
         if r['ret']:
             # Get etag from etag header or @odata.etag property
             etag = r['headers'].get('etag')
@@ -270,6 +451,7 @@ class RedfishUtils(object):
                 if self.strip_etag_quotes:
                     etag = etag.strip('"')
                 req_headers['If-Match'] = etag
+        self._clear_response_cache()
         username, password, basic_auth = self._auth_params(req_headers)
         try:
             resp = open_url(uri, data=json.dumps(pyld),
@@ -295,6 +477,7 @@ class RedfishUtils(object):
 
     def delete_request(self, uri, pyld=None):
         req_headers = dict(DELETE_HEADERS)
+        self._clear_response_cache()
         username, password, basic_auth = self._auth_params(req_headers)
         try:
             data = json.dumps(pyld) if pyld else None
@@ -484,7 +667,7 @@ class RedfishUtils(object):
         data = response['data']
         if 'Systems' not in data:
             return {'ret': False, 'msg': "Systems resource not found"}
-        response = self.get_request(self.root_uri + data['Systems']['@odata.id'])
+        response = self.get_collection_request(self.root_uri + data['Systems']['@odata.id'])
         if response['ret'] is False:
             return response
         self.systems_uris = [
@@ -535,7 +718,7 @@ class RedfishUtils(object):
         if 'Chassis' not in data:
             return {'ret': False, 'msg': "Chassis resource not found"}
         chassis = data["Chassis"]["@odata.id"]
-        response = self.get_request(self.root_uri + chassis)
+        response = self.get_collection_request(self.root_uri + chassis)
         if response['ret'] is False:
             return response
         self.chassis_uris = [
@@ -564,7 +747,7 @@ class RedfishUtils(object):
         if 'Managers' not in data:
             return {'ret': False, 'msg': "Manager resource not found"}
         manager = data["Managers"]["@odata.id"]
-        response = self.get_request(self.root_uri + manager)
+        response = self.get_collection_request(self.root_uri + manager)
         if response['ret'] is False:
             return response
         self.manager_uris = [
@@ -740,7 +923,7 @@ class RedfishUtils(object):
 
         # Get a list of all storage controllers and build respective URIs
         storage_uri = data['Storage']["@odata.id"]
-        response = self.get_request(self.root_uri + storage_uri)
+        response = self.get_collection_request(self.root_uri + storage_uri)
         if response['ret'] is False:
             return response
         result['ret'] = True
@@ -757,7 +940,7 @@ class RedfishUtils(object):
                 if key in data:
                     controllers_uri = data[key][u'@odata.id']
 
-                    response = self.get_request(self.root_uri + controllers_uri)
+                    response = self.get_collection_request(self.root_uri + controllers_uri)
                     if response['ret'] is False:
                         return response
                     result['ret'] = True
@@ -817,7 +1000,7 @@ class RedfishUtils(object):
         if 'Storage' in data:
             # Get a list of all storage controllers and build respective URIs
             storage_uri = data[u'Storage'][u'@odata.id']
-            response = self.get_request(self.root_uri + storage_uri)
+            response = self.get_collection_request(self.root_uri + storage_uri)
             if response['ret'] is False:
                 return response
             result['ret'] = True
@@ -836,7 +1019,7 @@ class RedfishUtils(object):
                     if 'Controllers' in data:
                         controllers_uri = data['Controllers'][u'@odata.id']
 
-                        response = self.get_request(self.root_uri + controllers_uri)
+                        response = self.get_collection_request(self.root_uri + controllers_uri)
                         if response['ret'] is False:
                             return response
                         result['ret'] = True
@@ -861,6 +1044,7 @@ class RedfishUtils(object):
                                 controller_name = 'Controller %s' % sc_id
                     drive_results = []
                     if 'Drives' in data:
+                        self.prefetch([device[u'@odata.id'] for device in data[u'Drives']])
                         for device in data[u'Drives']:
                             disk_uri = self.root_uri + device[u'@odata.id']
                             response = self.get_request(disk_uri)
@@ -884,7 +1068,7 @@ class RedfishUtils(object):
         if 'SimpleStorage' in data:
             # Get a list of all storage controllers and build respective URIs
             storage_uri = data["SimpleStorage"]["@odata.id"]
-            response = self.get_request(self.root_uri + storage_uri)
+            response = self.get_collection_request(self.root_uri + storage_uri)
             if response['ret'] is False:
                 return response
             result['ret'] = True
@@ -944,7 +1128,7 @@ class RedfishUtils(object):
         if 'Storage' in data:
             # Get a list of all storage controllers and build respective URIs
             storage_uri = data[u'Storage'][u'@odata.id']
-            response = self.get_request(self.root_uri + storage_uri)
+            response = self.get_collection_request(self.root_uri + storage_uri)
             if response['ret'] is False:
                 return response
             result['ret'] = True
@@ -961,7 +1145,7 @@ class RedfishUtils(object):
                     data = response['data']
                     controller_name = 'Controller %s' % str(idx)
                     if 'Controllers' in data:
-                        response = self.get_request(self.root_uri + data['Controllers'][u'@odata.id'])
+                        response = self.get_collection_request(self.root_uri + data['Controllers'][u'@odata.id'])
                         if response['ret'] is False:
                             return response
                         c_data = response['data']
@@ -991,7 +1175,7 @@ class RedfishUtils(object):
                     if 'Volumes' in data:
                         # Get a list of all volumes and build respective URIs
                         volumes_uri = data[u'Volumes'][u'@odata.id']
-                        response = self.get_request(self.root_uri + volumes_uri)
+                        response = self.get_collection_request(self.root_uri + volumes_uri)
                         data = response['data']
 
                         if data.get('Members'):
@@ -1678,6 +1862,144 @@ class RedfishUtils(object):
 
         return operation_results
 
+    @staticmethod
+    def _parse_retry_after(value):
+        """
+        Converts a Retry-After header, given either in seconds or as an HTTP
+        date, to a number of seconds; returns None if it cannot be parsed.
+        """
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return int(value)
+        date = parsedate_tz(value)
+        if date is None:
+            return None
+        return max(0, mktime_tz(date) - time.time())
+
+    def _get_task_state(self, task_uri):
+        """
+        GET a task monitor, task or job, bypassing the response cache.
+
+        :param task_uri: The task or job handle
+        :return: tuple of the operation results and the delay requested by
+            the service with Retry-After, or None
+        """
+        uri = self.root_uri + task_uri
+        req_headers = dict(GET_HEADERS)
+        username, password, basic_auth = self._auth_params(req_headers)
+        try:
+            resp = open_url(uri, method="GET", headers=req_headers,
+                            url_username=username, url_password=password,
+                            force_basic_auth=basic_auth, validate_certs=False,
+                            follow_redirects='all',
+                            use_proxy=True, timeout=self.timeout)
+            # Task monitors may answer 202 without a body while the task runs
+            body = resp.read()
+            data = json.loads(to_native(body)) if body else None
+        except HTTPError as e:
+            msg = self._get_extended_message(e)
+            return {'ret': False,
+                    'msg': "HTTP Error %s on GET request to '%s', extended message: '%s'"
+                           % (e.code, uri, msg),
+                    'status': e.code}, None
+        except URLError as e:
+            return {'ret': False, 'msg': "URL Error on GET request to '%s': '%s'"
+                                         % (uri, e.reason)}, None
+        except Exception as e:
+            return {'ret': False,
+                    'msg': "Failed GET request to '%s': '%s'" % (uri, to_text(e))}, None
+        return self._operation_results(resp, data, task_uri), self._parse_retry_after(resp.getheader('Retry-After'))
+
+    def _listen_task_events(self, task_uri, timeout):
+        """
+        Opens the SSE stream of the EventService, if the service has one.
+
+        :param task_uri: The task or job handle the events are filtered for
+        :param timeout: Socket timeout for the stream
+        :return: a _TaskEventListener, or None if the stream is not available
+        """
+        response = self.get_request(self.root_uri + self.service_root)
+        if response['ret'] is False or 'EventService' not in response['data']:
+            return None
+        response = self.get_request(self.root_uri + response['data']['EventService']['@odata.id'])
+        if response['ret'] is False or not response['data'].get('ServerSentEventUri'):
+            return None
+        req_headers = {'accept': 'text/event-stream', 'OData-Version': '4.0'}
+        username, password, basic_auth = self._auth_params(req_headers)
+        try:
+            resp = open_url(self.root_uri + response['data']['ServerSentEventUri'], method="GET",
+                            headers=req_headers, url_username=username, url_password=password,
+                            force_basic_auth=basic_auth, validate_certs=False,
+                            follow_redirects='all', use_proxy=True, timeout=timeout)
+        except Exception:
+            return None
+        return _TaskEventListener(resp, task_uri)
+
+    def wait_for_task(self, task_uri, timeout, use_events=False, resets_performed=None):
+        """
+        Waits for a task or job to finish, or to require a reset to continue.
+
+        The task is polled with an exponential backoff with jitter, between
+        TASK_POLL_INTERVAL and TASK_POLL_MAX_INTERVAL seconds, unless the
+        service asks for a delay with Retry-After.  With use_events, the SSE
+        stream of the EventService is watched as well and a task event cuts
+        the current delay short.
+
+        :param task_uri: The task or job handle
+        :param timeout: Maximum number of seconds to wait
+        :param use_events: Whether to listen on the EventService SSE stream
+        :param resets_performed: Resets already performed for the task; the
+            task messages may still request them, so they do not end the wait
+        :return: dict containing the last update status and the wait metrics
+        """
+        performed = set((r['uri'], r['type']) for r in resets_performed or [])
+        start = time.time()
+        metrics = {'elapsed': 0, 'polls': 0, 'waited': 0, 'events': 0, 'event_stream': False}
+        listener = self._listen_task_events(task_uri, timeout) if use_events else None
+        metrics['event_stream'] = listener is not None
+        handle = task_uri
+        try:
+            while True:
+                status, retry_after = self._get_task_state(handle)
+                metrics['polls'] += 1
+                if status['ret'] is False:
+                    result = dict(status)
+                    break
+                resets = [r for r in status['resets_requested'] if (r['uri'], r['type']) not in performed]
+                if status['handle'] is None or resets:
+                    result = {'ret': True, 'update_status': status}
+                    break
+                # The task may have moved to a job
+                handle = status['handle']
+
+                remaining = start + timeout - time.time()
+                if remaining <= 0:
+                    result = {'ret': False, 'update_status': status,
+                              'msg': "Timed out after %d seconds waiting for '%s'" % (timeout, handle)}
+                    break
+                if retry_after is not None:
+                    delay = retry_after
+                else:
+                    delay = min(TASK_POLL_MAX_INTERVAL, TASK_POLL_INTERVAL * 2 ** (metrics['polls'] - 1))
+                    delay = random.uniform(delay / 2.0, delay)
+                delay = min(delay, remaining)
+                before = time.time()
+                if listener is not None:
+                    listener.wait(delay)
+                else:
+                    time.sleep(delay)
+                metrics['waited'] += time.time() - before
+        finally:
+            if listener is not None:
+                listener.close()
+                metrics['events'] = listener.events
+        metrics['elapsed'] = round(time.time() - start, 3)
+        metrics['waited'] = round(metrics['waited'], 3)
+        result['wait'] = metrics
+        return result
+
     def simple_update(self, update_opts):
         image_uri = update_opts.get('update_image_uri')
         protocol = update_opts.get('update_protocol')
@@ -1834,6 +2156,7 @@ class RedfishUtils(object):
             return update_status
 
         changed = False
+        performed = []
 
         # Perform any requested updates
         for reset in update_status['resets_requested']:
@@ -1844,13 +2167,14 @@ class RedfishUtils(object):
                 resp['changed'] = changed
                 return resp
             changed = True
+            performed.append(reset)
 
         msg = 'No operations required for the update'
         if changed:
             # Will need to consider finetuning this message if the scope of the
             # requested operations grow over time
             msg = 'One or more components reset to continue the update'
-        return {'ret': True, 'changed': changed, 'msg': msg}
+        return {'ret': True, 'changed': changed, 'msg': msg, 'resets_performed': performed}
 
     def get_bios_attributes(self, systems_uri):
         result = {}
@@ -2386,7 +2710,7 @@ class RedfishUtils(object):
         processors_uri = data[key]["@odata.id"]
 
         # Get a list of all CPUs and build respective URIs
-        response = self.get_request(self.root_uri + processors_uri)
+        response = self.get_collection_request(self.root_uri + processors_uri)
         if response['ret'] is False:
             return response
         result['ret'] = True
@@ -2436,7 +2760,7 @@ class RedfishUtils(object):
         memory_uri = data[key]["@odata.id"]
 
         # Get a list of all DIMMs and build respective URIs
-        response = self.get_request(self.root_uri + memory_uri)
+        response = self.get_collection_request(self.root_uri + memory_uri)
         if response['ret'] is False:
             return response
         result['ret'] = True
@@ -2506,7 +2830,7 @@ class RedfishUtils(object):
         ethernetinterfaces_uri = data[key]["@odata.id"]
 
         # Get a list of all network controllers and build respective URIs
-        response = self.get_request(self.root_uri + ethernetinterfaces_uri)
+        response = self.get_collection_request(self.root_uri + ethernetinterfaces_uri)
         if response['ret'] is False:
             return response
         result['ret'] = True
@@ -2562,7 +2886,7 @@ class RedfishUtils(object):
         virtualmedia_uri = data[key]["@odata.id"]
 
         # Get a list of all virtual media and build respective URIs
-        response = self.get_request(self.root_uri + virtualmedia_uri)
+        response = self.get_collection_request(self.root_uri + virtualmedia_uri)
         if response['ret'] is False:
             return response
         result['ret'] = True
@@ -6,7 +6,17 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
+import json
+import time
+
+from ansible.module_utils.common.text.converters import to_text
+from ansible.module_utils.six.moves.urllib.parse import quote, urlencode
+
 from ansible_collections.community.general.plugins.module_utils.cmd_runner import CmdRunner, cmd_runner_fmt
+from ansible_collections.community.general.plugins.module_utils.lxd import UnixHTTPConnection
+
+
+SNAPD_SOCKET = '/run/snapd.socket'
 
 
 _alias_state_map = dict(
@@ -46,3 +56,110 @@ def snap_runner(module, **kwargs):
         **kwargs
     )
     return runner
+
+
+class SnapdError(Exception):
+    def __init__(self, msg, kind=None, status_code=None):
+        super(SnapdError, self).__init__(msg)
+        self.msg = msg
+        self.kind = kind
+        self.status_code = status_code
+
+
+class SnapdClient(object):
+    """Client for the REST API of snapd, see https://snapcraft.io/docs/snapd-api
+
+    All requests are sent over a single connection to the snapd socket. Changes
+    (install, remove, ...) are asynchronous in snapd: the methods submitting them
+    return change IDs which are then polled with wait().
+    """
+
+    def __init__(self, socket_path=SNAPD_SOCKET, poll_interval=0.5, timeout=None):
+        self.connection = UnixHTTPConnection(socket_path)
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+    def request(self, method, path, body=None, params=None):
+        if params:
+            path = '{0}?{1}'.format(path, urlencode(params))
+        headers = {}
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            resp = self.connection.getresponse()
+            data = json.loads(to_text(resp.read(), errors='surrogate_or_strict'))
+        except (IOError, OSError, ValueError) as e:
+            raise SnapdError('Cannot talk to snapd on {0}: {1}'.format(self.connection.path, e))
+
+        if data.get('type') == 'error':
+            result = data.get('result') or {}
+            raise SnapdError(result.get('message', 'unknown error'), kind=result.get('kind'), status_code=data.get('status-code'))
+        if data.get('type') == 'async':
+            return data['change']
+        return data.get('result')
+
+    def snaps(self, names):
+        """Returns {name: snap} for the snaps in names that are installed"""
+        try:
+            result = self.request('GET', '/v2/snaps', params=dict(snaps=','.join(names)))
+        except SnapdError as e:
+            if e.status_code == 404:
+                return {}
+            raise
+        return dict((snap['name'], snap) for snap in result or [])
+
+    def find(self, name):
+        """Returns the snap called name in the store, or None"""
+        try:
+            result = self.request('GET', '/v2/find', params=dict(name=name))
+        except SnapdError as e:
+            if e.status_code == 404 or e.kind == 'snap-not-found':
+                return None
+            raise
+        return result[0] if result else None
+
+    def conf(self, name):
+        try:
+            return self.request('GET', '/v2/snaps/{0}/conf'.format(quote(name))) or {}
+        except SnapdError as e:
+            if e.kind == 'option-not-found':
+                return {}
+            raise
+
+    def set_conf(self, name, conf):
+        return self.request('PUT', '/v2/snaps/{0}/conf'.format(quote(name)), body=conf)
+
+    def action(self, action, names, **options):
+        """Submits action for names and returns the change IDs
+
+        Actions without options are submitted for all snaps in a single change
+        when snapd supports it for the action.
+        """
+        options = dict((k, v) for k, v in options.items() if v)
+        if len(names) > 1 and not options and action in ('install', 'refresh', 'remove'):
+            return [self.request('POST', '/v2/snaps', body=dict(action=action, snaps=names))]
+        changes = []
+        for name in names:
+            body = dict(action=action)
+            body.update(options)
+            changes.append(self.request('POST', '/v2/snaps/{0}'.format(quote(name)), body=body))
+        return changes
+
+    def wait(self, changes):
+        """Polls the changes until all of them are ready, raises SnapdError for the first failed one"""
+        deadline = time.time() + self.timeout if self.timeout else None
+        results = []
+        for change in changes:
+            while True:
+                result = self.request('GET', '/v2/changes/{0}'.format(change))
+                if result.get('ready'):
+                    break
+                if deadline and time.time() > deadline:
+                    raise SnapdError('Timeout waiting for snapd change {0} ({1})'.format(change, result.get('summary')))
+                time.sleep(self.poll_interval)
+            if result.get('status') != 'Done':
+                raise SnapdError(result.get('err') or 'snapd change {0} failed: {1}'.format(change, result.get('status')))
+            results.append(result)
+        return results
@@ -168,6 +168,8 @@ import re
 # Import module snippets.
 from ansible.module_utils.basic import AnsibleModule
 
+INSTALLED_DB = '/lib/apk/db/installed'
+
 
 def parse_for_packages(stdout):
     packages = []
@@ -203,6 +205,66 @@ def query_toplevel(module, name, world):
     return False
 
 
+def read_world(world):
+    # Returns every name query_toplevel() would find in the world file: the
+    # entries, and the parts of them in front of a repository or version separator
+    names = set()
+    with open(world) as f:
+        for p in f.read().split():
+            names.add(p)
+            for i, c in enumerate(p[:-1]):
+                if c in '@=<>~':
+                    names.add(p[:i])
+    return names
+
+
+def read_installed():
+    # Reads the installed packages from the apk database, or returns None if it cannot be read.
+    # Returns {name: {'description': str, 'depends': [str], 'provides': [str]}}
+    try:
+        with open(INSTALLED_DB) as f:
+            content = f.read()
+    except (IOError, OSError):
+        return None
+
+    installed = {}
+    for block in content.split('\n\n'):
+        fields = {}
+        for line in block.splitlines():
+            if len(line) > 2 and line[1] == ':':
+                fields.setdefault(line[0], line[2:])
+        if 'P' not in fields:
+            continue
+        installed[fields['P']] = {
+            'description': fields.get('T', ''),
+            'depends': fields.get('D', '').split(),
+            'provides': [re.split(r'[=<>~]', p, 1)[0] for p in fields.get('p', '').split()],
+        }
+    return installed
+
+
+def installed_names(installed):
+    names = set(installed)
+    for package in installed.values():
+        names.update(package['provides'])
+    return names
+
+
+def query_outdated(module, names):
+    # Returns the names of the packages that have a newer version available, with a single apk call
+    if not names:
+        return set()
+    cmd = "%s version -l '<' %s" % (APK_PATH, " ".join(names))
+    rc, stdout, stderr = module.run_command(cmd, check_rc=False)
+    outdated = set()
+    regex = re.compile(r'^(\S+)-[\d\.\w]+-[\d\w]+\s+<\s+[\d\.\w]+-[\d\w]+')
+    for line in stdout.splitlines():
+        match = regex.match(line)
+        if match:
+            outdated.add(match.group(1))
+    return outdated
+
+
 def query_package(module, name):
     cmd = "%s -v info --installed %s" % (APK_PATH, name)
     rc, stdout, stderr = module.run_command(cmd, check_rc=False)
@@ -257,23 +319,52 @@ def upgrade_packages(module, available):
     module.exit_json(changed=True, msg="upgraded packages", stdout=stdout, stderr=stderr, packages=packagelist)
 
 
-def install_packages(module, names, state, world):
-    upgrade = False
+def resolve_packages(module, names, state, world, installed):
+    # Same as the loop in install_packages(), but with the installed packages and the
+    # world file read once, and all versions checked with a single apk call
+    toplevel = read_world(world)
     to_install = []
-    to_upgrade = []
+    candidates = []
     for name in names:
-        # Check if virtual package
-        if query_virtual(module, name):
-            # Get virtual package dependencies
-            dependencies = get_dependencies(module, name)
-            for dependency in dependencies:
-                if state == 'latest' and not query_latest(module, dependency):
-                    to_upgrade.append(dependency)
+        package = installed.get(name)
+        if package is not None and package['description'] == 'virtual meta package':
+            # Dependencies of the virtual package, without version constraints and conflicts
+            for dependency in package['depends']:
+                if not dependency.startswith('!'):
+                    candidates.append(re.split(r'[=<>~]', dependency, 1)[0])
+        elif name not in toplevel:
+            to_install.append(name)
         else:
-            if not query_toplevel(module, name, world):
-                to_install.append(name)
-            elif state == 'latest' and not query_latest(module, name):
-                to_upgrade.append(name)
+            candidates.append(name)
+
+    to_upgrade = []
+    if state == 'latest':
+        outdated = query_outdated(module, candidates)
+        to_upgrade = [name for name in candidates if name in outdated]
+    return to_install, to_upgrade
+
+
+def install_packages(module, names, state, world):
+    upgrade = False
+    installed = read_installed()
+    if installed is not None:
+        to_install, to_upgrade = resolve_packages(module, names, state, world, installed)
+    else:
+        to_install = []
+        to_upgrade = []
+        for name in names:
+            # Check if virtual package
+            if query_virtual(module, name):
+                # Get virtual package dependencies
+                dependencies = get_dependencies(module, name)
+                for dependency in dependencies:
+                    if state == 'latest' and not query_latest(module, dependency):
+                        to_upgrade.append(dependency)
+            else:
+                if not query_toplevel(module, name, world):
+                    to_install.append(name)
+                elif state == 'latest' and not query_latest(module, name):
+                    to_upgrade.append(name)
     if to_upgrade:
         upgrade = True
     if not to_install and not upgrade:
@@ -297,10 +388,12 @@ def install_packages(module, names, state, world):
 
 
 def remove_packages(module, names):
-    installed = []
-    for name in names:
-        if query_package(module, name):
-            installed.append(name)
+    installed_db = read_installed()
+    if installed_db is not None:
+        present = installed_names(installed_db)
+        installed = [name for name in names if name in present]
+    else:
+        installed = [name for name in names if query_package(module, name)]
     if not installed:
         module.exit_json(changed=False, msg="package(s) already removed")
     names = " ".join(installed)
@@ -311,10 +404,13 @@ def remove_packages(module, names):
     rc, stdout, stderr = module.run_command(cmd, check_rc=False)
     packagelist = parse_for_packages(stdout)
     # Check to see if packages are still present because of dependencies
-    for name in installed:
-        if query_package(module, name):
+    installed_db = read_installed()
+    if installed_db is not None:
+        present = installed_names(installed_db)
+        if any(name in present for name in installed):
             rc = 1
-            break
+    elif any(query_package(module, name) for name in installed):
+        rc = 1
     if rc != 0:
         module.fail_json(msg="failed to remove %s package(s)" % (names), stdout=stdout, stderr=stderr, packages=packagelist)
     module.exit_json(changed=True, msg="removed %s package(s)" % (names), stdout=stdout, stderr=stderr, packages=packagelist)
@@ -71,6 +71,30 @@ options:
       - Remove any added source files and trees after adding to archive.
     type: bool
     default: false
+  compression_threads:
+    description:
+      - Number of threads to compress with when O(format) is V(gz), V(bz2) or V(xz).
+      - Values other than V(1) pipe the data through C(pigz), C(pbzip2), C(lbzip2) or C(xz) found in the
+        remote host's E(PATH), which produce regular C(gzip), C(bzip2) and C(xz) files.
+        The Python compressors are used when no such tool is available.
+      - V(0) uses as many threads as there are CPUs.
+    type: int
+    default: 1
+    version_added: 8.2.0
+  change_detection:
+    description:
+      - How to find out whether the destination changed.
+      - V(checksum) reads the existing destination before writing it again, and compares the checksums of its members
+        with the new ones.
+      - V(manifest) records the name, size and modification time of every source in a hidden C(.<dest>.manifest.json)
+        file beside the destination. When the sources and the destination still match the manifest, the destination is
+        left untouched instead of being written again, also in check mode.
+        As with C(rsync)'s default, a source modified without changing its size or modification time is not noticed.
+      - The first run with V(manifest) writes the destination again and reports a change, as there is no manifest yet.
+    type: str
+    choices: [ checksum, manifest ]
+    default: checksum
+    version_added: 8.2.0
 notes:
     - Can produce C(gzip), C(bzip2), C(lzma), and C(zip) compressed files or archives.
     - This module uses C(tarfile), C(zipfile), C(gzip), and C(bz2) packages on the target host to create archives.
@@ -138,6 +162,14 @@ EXAMPLES = r'''
     dest: /path/file.tar.gz
     format: gz
     force_archive: true
+
+- name: Archive a large log directory with all CPUs, only when its files changed
+  community.general.archive:
+    path: /var/log/app
+    dest: /backup/app-logs.tar.xz
+    format: xz
+    compression_threads: 0
+    change_detection: manifest
 '''
 
 RETURN = r'''
@@ -182,10 +214,12 @@ import abc
 import bz2
 import glob
 import gzip
-import io
+import json
+import multiprocessing
 import os
 import re
 import shutil
+import subprocess
 import tarfile
 import zipfile
 from fnmatch import fnmatch
@@ -225,6 +259,14 @@ STATE_ARCHIVED = 'archive'
 STATE_COMPRESSED = 'compress'
 STATE_INCOMPLETE = 'incomplete'
 
+# Multi-threaded compressors writing the same formats as the Python modules,
+# with the option setting their number of threads
+PARALLEL_COMPRESSORS = {
+    'gz': [('pigz', '-p%d')],
+    'bz2': [('pbzip2', '-p%d'), ('lbzip2', '-n%d')],
+    'xz': [('xz', '-T%d')],
+}
+
 
 def common_path(paths):
     empty = b'' if paths and isinstance(paths[0], six.binary_type) else ''
@@ -282,6 +324,8 @@ class Archive(object):
         self.format = module.params['format']
         self.must_archive = module.params['force_archive']
         self.remove = module.params['remove']
+        self.compression_threads = module.params.get('compression_threads', 1)
+        self.use_manifest = module.params.get('change_detection') == 'manifest'
 
         self.changed = False
         self.destination_state = STATE_ABSENT
@@ -323,7 +367,14 @@ class Archive(object):
         if self.remove:
             self._check_removal_safety()
 
-        self.original_checksums = self.destination_checksums()
+        self.manifest = None
+        self.original_manifest = None
+        if self.use_manifest:
+            # Reading the whole archive back is what the manifest avoids
+            self.original_checksums = None
+            self.original_manifest = self._read_manifest()
+        else:
+            self.original_checksums = self.destination_checksums()
         self.original_size = self.destination_size()
 
     def add(self, path, archive_name):
@@ -342,10 +393,15 @@ class Archive(object):
             self.destination_state = STATE_ARCHIVED
         else:
             try:
-                f_out = self._open_compressed_file(_to_native_ascii(self.destination), 'wb')
-                with open(path, 'rb') as f_in:
-                    shutil.copyfileobj(f_in, f_out)
-                f_out.close()
+                compressor = self._get_parallel_compressor()
+                if compressor:
+                    with open(path, 'rb') as f_in:
+                        self._wait_compressor(self._start_compressor(compressor, f_in))
+                else:
+                    f_out = self._open_compressed_file(_to_native_ascii(self.destination), 'wb')
+                    with open(path, 'rb') as f_in:
+                        shutil.copyfileobj(f_in, f_out)
+                    f_out.close()
                 self.successes.append(path)
                 self.destination_state = STATE_COMPRESSED
             except (IOError, OSError) as e:
@@ -389,6 +445,8 @@ class Archive(object):
             )
 
     def is_different_from_original(self):
+        if self.use_manifest:
+            return not self.is_up_to_date()
         if self.original_checksums is None:
             return self.original_size != self.destination_size()
         else:
@@ -452,6 +510,75 @@ class Archive(object):
                 dest=_to_native(self.destination), msg='Error deleting some source files: ', files=self.errors
             )
 
+    @property
+    def manifest_path(self):
+        directory, name = os.path.split(self.destination)
+        return os.path.join(directory, b'.%s.manifest.json' % name)
+
+    def _source_entries(self):
+        '''Yield the (path, archive name) of every source that ends up in the destination'''
+        skip = (self.destination, self.manifest_path)
+        for target in self.targets:
+            if os.path.isdir(target) and self.must_archive:
+                for directory_path, directory_names, file_names in os.walk(target, topdown=True):
+                    for name in sorted(directory_names) + sorted(file_names):
+                        full_path = os.path.join(directory_path, name)
+                        if full_path not in skip and not self._is_excluded(full_path, strip_prefix(self.root, full_path)):
+                            yield full_path, strip_prefix(self.root, full_path)
+            elif target not in skip and not self._is_excluded(target, strip_prefix(self.root, target)):
+                yield target, strip_prefix(self.root, target)
+
+    def _build_manifest(self):
+        entries = []
+        for path, archive_name in self._source_entries():
+            st = os.lstat(path)
+            entries.append([_to_native(archive_name), st.st_size, st.st_mtime, st.st_mode])
+        return {'format': self.format, 'entries': entries}
+
+    def _destination_stat(self):
+        st = os.stat(self.destination)
+        return [st.st_size, st.st_mtime]
+
+    def _read_manifest(self):
+        '''Return the stored manifest, unless the destination changed since it was written'''
+        if not self.destination_exists():
+            return None
+        try:
+            with open(self.manifest_path, 'rb') as f:
+                manifest = json.loads(f.read().decode('utf-8'))
+        except (IOError, OSError, ValueError):
+            return None
+        if not isinstance(manifest, dict) or manifest.pop('destination', None) != self._destination_stat():
+            return None
+        return manifest
+
+    def is_up_to_date(self):
+        '''Whether the sources and the destination still match the stored manifest'''
+        if not self.use_manifest:
+            return False
+        if self.manifest is None:
+            # Taken before writing, so that sources modified meanwhile are archived again next time
+            self.manifest = self._build_manifest()
+        return self.manifest == self.original_manifest
+
+    def keep_destination(self):
+        '''Account for the sources as if they had been written again'''
+        self.successes = [path for path, dummy in self._source_entries()]
+
+    def write_manifest(self):
+        if not self.use_manifest or not self.destination_exists():
+            return
+        if self.manifest is None:
+            self.manifest = self._build_manifest()
+        manifest = dict(self.manifest, destination=self._destination_stat())
+        tmp_path = self.manifest_path + b'.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(to_bytes(json.dumps(manifest)))
+            os.rename(tmp_path, self.manifest_path)
+        except (IOError, OSError) as e:
+            self.module.warn('Unable to write the manifest %s: %s' % (_to_native(self.manifest_path), _to_native(e)))
+
     def update_permissions(self):
         file_args = self.module.load_file_common_arguments(self.module.params, path=self.destination)
         self.changed = self.module.set_fs_attributes_if_different(file_args, self.changed)
@@ -477,6 +604,29 @@ class Archive(object):
                     msg='Error, created archive can not be contained in source paths when remove=true'
                 )
 
+    def _get_parallel_compressor(self):
+        '''Return the command compressing stdin to stdout with several threads, or None'''
+        if self.compression_threads == 1 or self.format not in PARALLEL_COMPRESSORS:
+            return None
+        threads = self.compression_threads or multiprocessing.cpu_count()
+        for name, threads_option in PARALLEL_COMPRESSORS[self.format]:
+            executable = self.module.get_bin_path(name)
+            if executable:
+                return [executable, '-c', threads_option % threads]
+        return None
+
+    def _start_compressor(self, command, stdin=subprocess.PIPE):
+        with open(_to_native_ascii(self.destination), 'wb') as f_out:
+            return subprocess.Popen(command, stdin=stdin, stdout=f_out, stderr=subprocess.PIPE)
+
+    def _wait_compressor(self, process):
+        dummy, stderr = process.communicate()
+        if process.returncode != 0:
+            raise OSError('compressor exited with %d: %s' % (process.returncode, _to_native(stderr).strip()))
+
+    def _is_excluded(self, path, archive_name):
+        return matches_exclusion_patterns(path, self.exclusion_patterns)
+
     def _open_compressed_file(self, path, mode):
         f = None
         if self.format == 'gz':
@@ -546,13 +696,16 @@ class TarArchive(Archive):
     def __init__(self, module):
         super(TarArchive, self).__init__(module)
         self.fileIO = None
+        self.compressor = None
 
     def close(self):
         self.file.close()
-        if self.format == 'xz':
-            with lzma.open(_to_native(self.destination), 'wb') as f:
-                f.write(self.fileIO.getvalue())
+        if self.compressor is not None:
+            process, self.compressor = self.compressor, None
+            self._wait_compressor(process)
+        if self.fileIO is not None:
             self.fileIO.close()
+            self.fileIO = None
 
     def contains(self, name):
         try:
@@ -562,13 +715,17 @@ class TarArchive(Archive):
         return True
 
     def open(self):
-        if self.format in ('gz', 'bz2'):
+        compressor = self._get_parallel_compressor()
+        if compressor:
+            self.compressor = self._start_compressor(compressor)
+            self.file = tarfile.open(fileobj=self.compressor.stdin, mode='w|')
+        elif self.format in ('gz', 'bz2'):
             self.file = tarfile.open(_to_native_ascii(self.destination), 'w|' + self.format)
-        # python3 tarfile module allows xz format but for python2 we have to create the tarfile
-        # in memory and then compress it with lzma.
+        # python3 tarfile module allows xz format but python2 does not, so stream the tar
+        # through lzma, which works with both and never holds the archive in memory.
         elif self.format == 'xz':
-            self.fileIO = io.BytesIO()
-            self.file = tarfile.open(fileobj=self.fileIO, mode='w')
+            self.fileIO = lzma.LZMAFile(_to_native_ascii(self.destination), 'wb')
+            self.file = tarfile.open(fileobj=self.fileIO, mode='w|')
         elif self.format == 'tar':
             self.file = tarfile.open(_to_native_ascii(self.destination), 'w')
         else:
@@ -586,6 +743,9 @@ class TarArchive(Archive):
         else:
             self.file.add(path, archive_name, recursive=False, exclude=py26_filter)
 
+    def _is_excluded(self, path, archive_name):
+        return matches_exclusion_patterns(archive_name, self.exclusion_patterns)
+
     def _get_checksums(self, path):
         if HAS_LZMA:
             LZMAError = lzma.LZMAError
@@ -637,6 +797,8 @@ def main():
             exclusion_patterns=dict(type='list', elements='path'),
             force_archive=dict(type='bool', default=False),
             remove=dict(type='bool', default=False),
+            compression_threads=dict(type='int', default=1),
+            change_detection=dict(type='str', default='checksum', choices=['checksum', 'manifest']),
         ),
         add_file_common_args=True,
         supports_check_mode=True,
@@ -657,11 +819,15 @@ def main():
             archive.destination_state = STATE_ARCHIVED if is_archive(archive.destination) else STATE_COMPRESSED
     elif archive.has_targets() and archive.must_archive:
         if check_mode:
-            archive.changed = True
+            archive.changed = not archive.is_up_to_date()
         else:
-            archive.add_targets()
+            if archive.is_up_to_date():
+                archive.keep_destination()
+            else:
+                archive.add_targets()
+                archive.changed |= archive.is_different_from_original()
+                archive.write_manifest()
             archive.destination_state = STATE_INCOMPLETE if archive.has_unfound_targets() else STATE_ARCHIVED
-            archive.changed |= archive.is_different_from_original()
             if archive.remove:
                 archive.remove_targets()
     else:
@@ -670,8 +836,13 @@ def main():
                 archive.changed = True
         else:
             path = archive.paths[0]
-            archive.add_single_target(path)
-            archive.changed |= archive.is_different_from_original()
+            if archive.is_up_to_date():
+                archive.keep_destination()
+                archive.destination_state = STATE_ARCHIVED if archive.format in ('zip', 'tar') else STATE_COMPRESSED
+            else:
+                archive.add_single_target(path)
+                archive.changed |= archive.is_different_from_original()
+                archive.write_manifest()
             if archive.remove:
                 archive.remove_single_target(path)
 
@@ -165,6 +165,7 @@ changed_pkgs:
     version_added: '0.2.0'
 '''
 
+import json
 import os.path
 import re
 
@@ -422,6 +423,7 @@ class Homebrew(object):
         self.changed_pkgs = []
         self.unchanged_pkgs = []
         self.message = ''
+        self._reset_package_index()
 
     def _setup_instance_vars(self, **kwargs):
         for key, val in iteritems(kwargs):
@@ -469,6 +471,59 @@ class Homebrew(object):
 
         return (failed, changed, message)
 
+    # package index ------------------------------------------------ {{{
+    def _reset_package_index(self):
+        # None means "not loaded yet", False means "brew cannot produce
+        # JSON, fall back to querying every package on its own".
+        self._installed_formulae = None
+        self._outdated_formulae = None
+
+    def _brew_json(self, cmd):
+        rc, out, err = self.module.run_command(cmd)
+        # "brew outdated" exits non-zero when something is outdated
+        if not out:
+            return None
+        try:
+            return json.loads(out)
+        except ValueError:
+            return None
+
+    def _get_installed_formulae(self):
+        if self._installed_formulae is None:
+            data = self._brew_json([self.brew_path, 'info', '--json=v2', '--installed'])
+            if not isinstance(data, dict):
+                self._installed_formulae = False
+                return False
+
+            index = {}
+            for formula in data.get('formulae', []):
+                if not formula.get('installed'):
+                    continue
+                name = formula['name']
+                keys = [name, formula.get('full_name'), formula.get('oldname')]
+                keys.extend(formula.get('aliases') or [])
+                keys.extend(formula.get('oldnames') or [])
+                for key in keys:
+                    if key:
+                        index[key] = name
+            self._installed_formulae = index
+
+        return self._installed_formulae
+
+    def _get_outdated_formulae(self):
+        if self._outdated_formulae is None:
+            data = self._brew_json([self.brew_path, 'outdated', '--json=v2'])
+            if not isinstance(data, dict):
+                self._outdated_formulae = False
+                return False
+
+            self._outdated_formulae = set(
+                formula['name'] for formula in data.get('formulae', [])
+            )
+
+        return self._outdated_formulae
+    # /package index ----------------------------------------------- }}}
+
     # checks ------------------------------------------------------- {{{
     def _current_package_is_installed(self):
         if not self.valid_package(self.current_package):
@@ -476,6 +531,10 @@ class Homebrew(object):
             self.message = 'Invalid package: {0}.'.format(self.current_package)
             raise HomebrewException(self.message)
 
+        installed = self._get_installed_formulae()
+        if installed is not False:
+            return self.current_package in installed
+
         cmd = [
             "{brew_path}".format(brew_path=self.brew_path),
             "info",
@@ -495,6 +554,12 @@ class Homebrew(object):
         if not self.valid_package(self.current_package):
             return False
 
+        installed = self._get_installed_formulae()
+        outdated = self._get_outdated_formulae()
+        if installed is not False and outdated is not False:
+            name = installed.get(self.current_package, self.current_package)
+            return name in outdated or self.current_package in outdated
+
         rc, out, err = self.module.run_command([
             self.brew_path,
             'outdated',
@@ -601,24 +666,24 @@ class Homebrew(object):
     # /_upgrade_all -------------------------- }}}
 
     # installed ------------------------------ {{{
-    def _install_current_package(self):
-        if not self.valid_package(self.current_package):
-            self.failed = True
-            self.message = 'Invalid package: {0}.'.format(self.current_package)
-            raise HomebrewException(self.message)
+    def _install_packages(self):
+        missing = []
+        for package in self.packages:
+            self.current_package = package
+            if self._current_package_is_installed():
+                self.unchanged_count += 1
+                self.unchanged_pkgs.append(package)
+                self.message = 'Package already installed: {0}'.format(package)
+            else:
+                missing.append(package)
 
-        if self._current_package_is_installed():
-            self.unchanged_count += 1
-            self.unchanged_pkgs.append(self.current_package)
-            self.message = 'Package already installed: {0}'.format(
-                self.current_package,
-            )
+        if not missing:
             return True
 
         if self.module.check_mode:
             self.changed = True
             self.message = 'Package would be installed: {0}'.format(
-                self.current_package
+                ', '.join(missing)
             )
             raise HomebrewException(self.message)
 
@@ -630,76 +695,29 @@ class Homebrew(object):
         opts = (
             [self.brew_path, 'install']
             + self.install_options
-            + [self.current_package, head]
+            + missing
+            + [head]
         )
         cmd = [opt for opt in opts if opt]
         rc, out, err = self.module.run_command(cmd)
+        self._reset_package_index()
+
+        for package in missing:
+            self.current_package = package
+            if not self._current_package_is_installed():
+                self.failed = True
+                self.message = err.strip()
+                raise HomebrewException(self.message)
 
-        if self._current_package_is_installed():
             self.changed_count += 1
-            self.changed_pkgs.append(self.current_package)
+            self.changed_pkgs.append(package)
             self.changed = True
-            self.message = 'Package installed: {0}'.format(self.current_package)
-            return True
-        else:
-            self.failed = True
-            self.message = err.strip()
-            raise HomebrewException(self.message)
-
-    def _install_packages(self):
-        for package in self.packages:
-            self.current_package = package
-            self._install_current_package()
+            self.message = 'Package installed: {0}'.format(package)
 
         return True
     # /installed ----------------------------- }}}
 
     # upgraded ------------------------------- {{{
-    def _upgrade_current_package(self):
-        command = 'upgrade'
-
-        if not self.valid_package(self.current_package):
-            self.failed = True
-            self.message = 'Invalid package: {0}.'.format(self.current_package)
-            raise HomebrewException(self.message)
-
-        if not self._current_package_is_installed():
-            command = 'install'
-
-        if self._current_package_is_installed() and not self._current_package_is_outdated():
-            self.message = 'Package is already upgraded: {0}'.format(
-                self.current_package,
-            )
-            self.unchanged_count += 1
-            self.unchanged_pkgs.append(self.current_package)
-            return True
-
-        if self.module.check_mode:
-            self.changed = True
-            self.message = 'Package would be upgraded: {0}'.format(
-                self.current_package
-            )
-            raise HomebrewException(self.message)
-
-        opts = (
-            [self.brew_path, command]
-            + self.install_options
-            + [self.current_package]
-        )
-        cmd = [opt for opt in opts if opt]
-        rc, out, err = self.module.run_command(cmd)
-
-        if self._current_package_is_installed() and not self._current_package_is_outdated():
-            self.changed_count += 1
-            self.changed_pkgs.append(self.current_package)
-            self.changed = True
-            self.message = 'Package upgraded: {0}'.format(self.current_package)
-            return True
-        else:
-            self.failed = True
-            self.message = err.strip()
-            raise HomebrewException(self.message)
-
     def _upgrade_all_packages(self):
         opts = (
             [self.brew_path, 'upgrade']
@@ -720,11 +738,63 @@ class Homebrew(object):
     def _upgrade_packages(self):
         if not self.packages:
             self._upgrade_all_packages()
-        else:
-            for package in self.packages:
-                self.current_package = package
-                self._upgrade_current_package()
             return True
+
+        missing = []
+        outdated = []
+        for package in self.packages:
+            self.current_package = package
+            if not self._current_package_is_installed():
+                missing.append(package)
+            elif self._current_package_is_outdated():
+                outdated.append(package)
+            else:
+                self.message = 'Package is already upgraded: {0}'.format(package)
+                self.unchanged_count += 1
+                self.unchanged_pkgs.append(package)
+
+        pending = [package for package in self.packages
+                   if package in missing or package in outdated]
+        if not pending:
+            return True
+
+        if self.module.check_mode:
+            self.changed = True
+            self.message = 'Package would be upgraded: {0}'.format(
+                ', '.join(pending)
+            )
+            raise HomebrewException(self.message)
+
+        # One brew call per verb instead of one per package, so brew resolves
+        # the shared dependencies of all requested packages only once.
+        errors = []
+        for command, names in (('install', missing), ('upgrade', outdated)):
+            if not names:
+                continue
+            opts = (
+                [self.brew_path, command]
+                + self.install_options
+                + names
+            )
+            cmd = [opt for opt in opts if opt]
+            rc, out, err = self.module.run_command(cmd)
+            if err.strip():
+                errors.append(err.strip())
+        self._reset_package_index()
+
+        for package in pending:
+            self.current_package = package
+            if not self._current_package_is_installed() or self._current_package_is_outdated():
+                self.failed = True
+                self.message = '\n'.join(errors)
+                raise HomebrewException(self.message)
+
+            self.changed_count += 1
+            self.changed_pkgs.append(package)
+            self.changed = True
+            self.message = 'Package upgraded: {0}'.format(package)
+
+        return True
     # /upgraded ------------------------------ }}}
 
     # uninstalled ---------------------------- {{{
@@ -756,6 +826,7 @@ class Homebrew(object):
         )
         cmd = [opt for opt in opts if opt]
         rc, out, err = self.module.run_command(cmd)
+        self._reset_package_index()
 
         if not self._current_package_is_installed():
             self.changed_count += 1
@@ -153,6 +153,7 @@ EXAMPLES = '''
     sudo_password: "{{ ansible_become_pass }}"
 '''
 
+import json
 import os
 import re
 import tempfile
@@ -413,6 +414,7 @@ class HomebrewCask(object):
         self.changed_count = 0
         self.unchanged_count = 0
         self.message = ''
+        self._reset_cask_index()
 
     def _setup_instance_vars(self, **kwargs):
         for key, val in iteritems(kwargs):
@@ -460,11 +462,72 @@ class HomebrewCask(object):
 
         return (failed, changed, message)
 
+    # cask index --------------------------------------------------- {{{
+    def _reset_cask_index(self):
+        # None means "not loaded yet", False means "brew cannot produce
+        # JSON, fall back to querying every cask on its own".
+        self._installed_casks = None
+        self._outdated_casks = None
+
+    def _brew_json(self, cmd):
+        rc, out, err = self.module.run_command(cmd)
+        # "brew outdated" exits non-zero when something is outdated
+        if not out:
+            return None
+        try:
+            return json.loads(out)
+        except ValueError:
+            return None
+
+    def _get_installed_casks(self):
+        if self._installed_casks is None:
+            data = None
+            if self._brew_cask_command_is_deprecated():
+                data = self._brew_json([self.brew_path, 'info', '--json=v2', '--installed', '--cask'])
+            if not isinstance(data, dict):
+                self._installed_casks = False
+                return False
+
+            index = {}
+            for cask in data.get('casks', []):
+                if not cask.get('installed'):
+                    continue
+                token = cask['token']
+                keys = [token, cask.get('full_token'), cask.get('old_token')]
+                keys.extend(cask.get('old_tokens') or [])
+                for key in keys:
+                    if key:
+                        index[key] = token
+            self._installed_casks = index
+
+        return self._installed_casks
+
+    def _get_outdated_casks(self):
+        if self._outdated_casks is None:
+            data = None
+            if self._brew_cask_command_is_deprecated():
+                cmd = [self.brew_path, 'outdated', '--cask', '--json=v2'] + (['--greedy'] if self.greedy else [])
+                data = self._brew_json(cmd)
+            if not isinstance(data, dict):
+                self._outdated_casks = False
+                return False
+
+            self._outdated_casks = set(cask['name'] for cask in data.get('casks', []))
+
+        return self._outdated_casks
+    # /cask index -------------------------------------------------- }}}
+
     # checks ------------------------------------------------------- {{{
     def _current_cask_is_outdated(self):
         if not self.valid_cask(self.current_cask):
             return False
 
+        installed = self._get_installed_casks()
+        outdated = self._get_outdated_casks()
+        if installed is not False and outdated is not False:
+            token = installed.get(self.current_cask, self.current_cask)
+            return token in outdated or self.current_cask in outdated
+
         if self._brew_cask_command_is_deprecated():
             base_opts = [self.brew_path, 'outdated', '--cask']
         else:
@@ -482,6 +545,10 @@ class HomebrewCask(object):
             self.message = 'Invalid cask: {0}.'.format(self.current_cask)
             raise HomebrewCaskException(self.message)
 
+        installed = self._get_installed_casks()
+        if installed is not False:
+            return self.current_cask in installed
+
         if self._brew_cask_command_is_deprecated():
             base_opts = [self.brew_path, "list", "--cask"]
         else:
@@ -596,6 +663,7 @@ class HomebrewCask(object):
             rc, out, err = self._run_command_with_sudo_password(cmd)
         else:
             rc, out, err = self.module.run_command(cmd)
+        self._reset_cask_index()
 
         if rc == 0:
             if re.search(r'==> No Casks to upgrade', out.strip(), re.IGNORECASE):
@@ -648,6 +716,7 @@ class HomebrewCask(object):
             rc, out, err = self._run_command_with_sudo_password(cmd)
         else:
             rc, out, err = self.module.run_command(cmd)
+        self._reset_cask_index()
 
         if self._current_cask_is_installed():
             self.changed_count += 1
@@ -666,45 +735,36 @@ class HomebrewCask(object):
             raise HomebrewCaskException(self.message)
 
     def _install_casks(self):
+        missing = []
         for cask in self.casks:
             self.current_cask = cask
-            self._install_current_cask()
-
-        return True
-    # /installed ----------------------------- }}}
-
-    # upgraded ------------------------------- {{{
-    def _upgrade_current_cask(self):
-        command = 'upgrade'
-
-        if not self.valid_cask(self.current_cask):
-            self.failed = True
-            self.message = 'Invalid cask: {0}.'.format(self.current_cask)
-            raise HomebrewCaskException(self.message)
-
-        if not self._current_cask_is_installed():
-            command = 'install'
+            if not self.valid_cask(cask):
+                self.failed = True
+                self.message = 'Invalid cask: {0}.'.format(cask)
+                raise HomebrewCaskException(self.message)
+
+            if '--force' not in self.install_options and self._current_cask_is_installed():
+                self.unchanged_count += 1
+                self.message = 'Cask already installed: {0}'.format(cask)
+            else:
+                missing.append(cask)
 
-        if self._current_cask_is_installed() and not self._current_cask_is_outdated():
-            self.message = 'Cask is already upgraded: {0}'.format(
-                self.current_cask,
-            )
-            self.unchanged_count += 1
+        if not missing:
             return True
 
         if self.module.check_mode:
             self.changed = True
-            self.message = 'Cask would be upgraded: {0}'.format(
-                self.current_cask
+            self.message = 'Cask would be installed: {0}'.format(
+                ', '.join(missing)
             )
             raise HomebrewCaskException(self.message)
 
         if self._brew_cask_command_is_deprecated():
-            base_opts = [self.brew_path, command, '--cask']
+            base_opts = [self.brew_path, 'install', '--cask']
         else:
-            base_opts = [self.brew_path, 'cask', command]
+            base_opts = [self.brew_path, 'cask', 'install']
 
-        opts = base_opts + self.install_options + [self.current_cask]
+        opts = base_opts + missing + self.install_options
 
         cmd = [opt for opt in opts if opt]
 
@@ -714,21 +774,94 @@ class HomebrewCask(object):
             rc, out, err = self._run_command_with_sudo_password(cmd)
         else:
             rc, out, err = self.module.run_command(cmd)
+        self._reset_cask_index()
 
-        if self._current_cask_is_installed() and not self._current_cask_is_outdated():
-            self.changed_count += 1
-            self.changed = True
-            self.message = 'Cask upgraded: {0}'.format(self.current_cask)
-            return True
-        else:
-            self.failed = True
-            self.message = err.strip()
-            raise HomebrewCaskException(self.message)
+        external_app = self.accept_external_apps and re.search(r"Error: It seems there is already an App at", err)
+        for cask in missing:
+            self.current_cask = cask
+            if self._current_cask_is_installed():
+                self.changed_count += 1
+                self.changed = True
+                self.message = 'Cask installed: {0}'.format(cask)
+            elif external_app and len(missing) > 1:
+                # brew does not say which cask of the batch collided with an
+                # existing app, so retry this one on its own to find out.
+                self._install_current_cask()
+            elif external_app:
+                self.unchanged_count += 1
+                self.message = 'Cask already installed: {0}'.format(cask)
+            else:
+                self.failed = True
+                self.message = err.strip()
+                raise HomebrewCaskException(self.message)
 
+        return True
+    # /installed ----------------------------- }}}
+
+    # upgraded ------------------------------- {{{
     def _upgrade_casks(self):
+        missing = []
+        outdated = []
         for cask in self.casks:
             self.current_cask = cask
-            self._upgrade_current_cask()
+            if not self.valid_cask(cask):
+                self.failed = True
+                self.message = 'Invalid cask: {0}.'.format(cask)
+                raise HomebrewCaskException(self.message)
+
+            if not self._current_cask_is_installed():
+                missing.append(cask)
+            elif self._current_cask_is_outdated():
+                outdated.append(cask)
+            else:
+                self.message = 'Cask is already upgraded: {0}'.format(cask)
+                self.unchanged_count += 1
+
+        pending = [cask for cask in self.casks if cask in missing or cask in outdated]
+        if not pending:
+            return True
+
+        if self.module.check_mode:
+            self.changed = True
+            self.message = 'Cask would be upgraded: {0}'.format(
+                ', '.join(pending)
+            )
+            raise HomebrewCaskException(self.message)
+
+        errors = []
+        for command, names in (('install', missing), ('upgrade', outdated)):
+            if not names:
+                continue
+
+            if self._brew_cask_command_is_deprecated():
+                base_opts = [self.brew_path, command, '--cask']
+            else:
+                base_opts = [self.brew_path, 'cask', command]
+
+            opts = base_opts + self.install_options + names
+
+            cmd = [opt for opt in opts if opt]
+
+            rc, out, err = '', '', ''
+
+            if self.sudo_password:
+                rc, out, err = self._run_command_with_sudo_password(cmd)
+            else:
+                rc, out, err = self.module.run_command(cmd)
+            if err.strip():
+                errors.append(err.strip())
+        self._reset_cask_index()
+
+        for cask in pending:
+            self.current_cask = cask
+            if not self._current_cask_is_installed() or self._current_cask_is_outdated():
+                self.failed = True
+                self.message = '\n'.join(errors)
+                raise HomebrewCaskException(self.message)
+
+            self.changed_count += 1
+            self.changed = True
+            self.message = 'Cask upgraded: {0}'.format(cask)
 
         return True
     # /upgraded ------------------------------ }}}
@@ -769,6 +902,7 @@ class HomebrewCask(object):
             rc, out, err = self._run_command_with_sudo_password(cmd)
         else:
             rc, out, err = self.module.run_command(cmd)
+        self._reset_cask_index()
 
         if not self._current_cask_is_installed():
             self.changed_count += 1
@@ -128,6 +128,20 @@ options:
         type: str
         version_added: 5.4.0
 
+    inventory_source:
+        description:
+            - How the module finds out which packages and groups are installed and available.
+            - V(database) reads the local and sync databases of pacman directly, and only reads what
+              is needed for the task. For example the install reasons are only read for the requested packages,
+              and the sync databases are only read when O(name) is given or O(upgrade=true).
+            - V(pacman) runs O(executable) to query the databases.
+            - V(auto) uses V(database) if O(executable) is C(pacman) and the databases configured in C(/etc/pacman.conf)
+              can be read, and V(pacman) otherwise.
+        default: auto
+        choices: [ auto, database, pacman ]
+        type: str
+        version_added: 8.2.0
+
 notes:
   - When used with a C(loop:) each package will be processed individually,
     it is much more efficient to pass the list directly to the O(name) option.
@@ -266,9 +280,13 @@ EXAMPLES = """
     reason_for: all
 """
 
+import fnmatch
+import os
 import re
 import shlex
+import tarfile
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.text.converters import to_text
 from collections import defaultdict, namedtuple
 
 
@@ -291,6 +309,244 @@ class Package(object):
 VersionTuple = namedtuple("VersionTuple", ["current", "latest"])
 
 
+def _rpmvercmp(a, b):
+    """Python version of rpmvercmp() from libalpm"""
+    if a == b:
+        return 0
+
+    i = j = 0
+    while i < len(a) and j < len(b):
+        sep_i, sep_j = i, j
+        while i < len(a) and not a[i].isalnum():
+            i += 1
+        while j < len(b) and not b[j].isalnum():
+            j += 1
+        if i >= len(a) or j >= len(b):
+            break
+        # If the separator lengths differ, the longer one wins
+        if i - sep_i != j - sep_j:
+            return -1 if i - sep_i < j - sep_j else 1
+
+        start_i, start_j = i, j
+        isnum = a[i].isdigit()
+        if isnum:
+            while i < len(a) and a[i].isdigit():
+                i += 1
+            while j < len(b) and b[j].isdigit():
+                j += 1
+        else:
+            while i < len(a) and a[i].isalpha():
+                i += 1
+            while j < len(b) and b[j].isalpha():
+                j += 1
+        seg_a, seg_b = a[start_i:i], b[start_j:j]
+
+        # Numeric segments are always newer than alpha segments
+        if not seg_b:
+            return 1 if isnum else -1
+        if isnum:
+            seg_a, seg_b = seg_a.lstrip("0"), seg_b.lstrip("0")
+            if len(seg_a) != len(seg_b):
+                return 1 if len(seg_a) > len(seg_b) else -1
+        if seg_a != seg_b:
+            return 1 if seg_a > seg_b else -1
+
+    if i >= len(a) and j >= len(b):
+        return 0
+    # A remaining alpha string never beats an empty string
+    if (i >= len(a) and not b[j].isalpha()) or (i < len(a) and a[i].isalpha()):
+        return -1
+    return 1
+
+
+def _parse_evr(version):
+    match = re.match(r"^(\d*):(.*)$", version)
+    if match:
+        epoch, version = match.group(1) or "0", match.group(2)
+    else:
+        epoch = "0"
+    release = None
+    if "-" in version:
+        version, release = version.rsplit("-", 1)
+    return epoch, version, release
+
+
+def vercmp(a, b):
+    """Compares two package versions like vercmp(8) does"""
+    if a == b:
+        return 0
+    epoch_a, version_a, release_a = _parse_evr(a)
+    epoch_b, version_b, release_b = _parse_evr(b)
+    ret = _rpmvercmp(epoch_a, epoch_b)
+    if ret == 0:
+        ret = _rpmvercmp(version_a, version_b)
+        if ret == 0 and release_a and release_b:
+            ret = _rpmvercmp(release_a, release_b)
+    return ret
+
+
+def _parse_desc(data, fields):
+    """Returns the values of fields from a desc file of a pacman database, see alpm-db(5)"""
+    values = {}
+    current = None
+    for line in to_text(data, errors="surrogate_or_strict").splitlines():
+        if not line:
+            current = None
+        elif line.startswith("%") and line.endswith("%") and current is None:
+            current = line[1:-1]
+            if current in fields:
+                values[current] = []
+            else:
+                current = ""
+        elif current:
+            values[current].append(line)
+    return values
+
+
+class PacmanDatabase(object):
+    """Reads the local and sync databases of pacman without running pacman
+
+    Only the layout written by pacman >= 4.2 is understood. usable() tells
+    whether the databases configured in pacman.conf can be read.
+    """
+
+    CONF = "/etc/pacman.conf"
+    DB_PATH = "/var/lib/pacman/"
+
+    def __init__(self):
+        self.db_path = self.DB_PATH
+        self.repos = []
+        self.ignore_pkgs = []
+        self.ignore_groups = []
+        self._known_layout = self._read_conf()
+        self._local = None
+
+    def _read_conf(self):
+        try:
+            with open(self.CONF) as f:
+                lines = f.read().splitlines()
+        except (IOError, OSError):
+            return False
+
+        section = None
+        for line in lines:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            if line.startswith("[") and line.endswith("]"):
+                section = line[1:-1]
+                if section != "options":
+                    self.repos.append(section)
+                continue
+            if section != "options":
+                continue
+            key, dummy, value = [x.strip() for x in line.partition("=")]
+            if key == "DBPath":
+                self.db_path = value
+            elif key == "IgnorePkg":
+                self.ignore_pkgs.extend(value.split())
+            elif key == "IgnoreGroup":
+                self.ignore_groups.extend(value.split())
+            elif key == "Include":
+                # options might be changed in another file
+                return False
+        return True
+
+    def _local_path(self, *parts):
+        return os.path.join(self.db_path, "local", *parts)
+
+    def _sync_path(self, repo):
+        return os.path.join(self.db_path, "sync", "%s.db" % repo)
+
+    def usable(self):
+        if not self._known_layout or not os.path.exists(self._local_path("ALPM_DB_VERSION")):
+            return False
+        for repo in self.repos:
+            try:
+                if not tarfile.is_tarfile(self._sync_path(repo)):
+                    return False
+            except (IOError, OSError):
+                return False
+        return True
+
+    def local_packages(self):
+        """Returns {pkgname: (version, entry)} from the names of the local database entries"""
+        if self._local is None:
+            self._local = {}
+            for entry in os.listdir(self._local_path()):
+                parts = entry.rsplit("-", 2)
+                if len(parts) == 3 and os.path.isdir(self._local_path(entry)):
+                    self._local[parts[0]] = ("%s-%s" % (parts[1], parts[2]), entry)
+        return self._local
+
+    def local_desc(self, pkg, fields):
+        with open(self._local_path(self.local_packages()[pkg][1], "desc"), "rb") as f:
+            return _parse_desc(f.read(), fields)
+
+    def sync_packages(self):
+        """Yields (repo, pkgname, version, groups) for every package in the sync databases"""
+        for repo in self.repos:
+            # streaming mode, entries are read in the order they are stored in
+            with tarfile.open(self._sync_path(repo), "r|*") as tar:
+                for member in tar:
+                    if not member.isfile() or not member.name.endswith("/desc"):
+                        continue
+                    desc = _parse_desc(tar.extractfile(member).read(), ("NAME", "VERSION", "GROUPS"))
+                    yield repo, desc["NAME"][0], desc["VERSION"][0], desc.get("GROUPS", [])
+
+    def ignored(self, pkg, groups):
+        return (
+            any(fnmatch.fnmatch(pkg, pattern) for pattern in self.ignore_pkgs)
+            or any(fnmatch.fnmatch(group, pattern) for group in groups for pattern in self.ignore_groups)
+        )
+
+
+class LazyInventory(dict):
+    """Inventory whose entries are only built when they are used
+
+    loaders maps the inventory keys to functions returning a dict with
+    that key and possibly other keys built at the same time. on_error is
+    called when reading the databases fails.
+    """
+
+    def __init__(self, loaders, on_error):
+        super(LazyInventory, self).__init__()
+        self._loaders = loaders
+        self._on_error = on_error
+
+    def __missing__(self, key):
+        try:
+            self.update(self._loaders[key]())
+        except (IOError, OSError, IndexError, tarfile.TarError) as e:
+            self._on_error(e)
+        return dict.__getitem__(self, key)
+
+
+class LocalReasons(object):
+    """Read-only mapping of installed packages to their install reason, read on first access"""
+
+    def __init__(self, db):
+        self._db = db
+        self._reasons = {}
+
+    def __contains__(self, pkg):
+        return pkg in self._db.local_packages()
+
+    def __getitem__(self, pkg):
+        if pkg not in self._reasons:
+            if pkg not in self:
+                raise KeyError(pkg)
+            reason = self._db.local_desc(pkg, ("REASON",)).get("REASON", ["0"])
+            self._reasons[pkg] = "dependency" if reason and reason[0] == "1" else "explicit"
+        return self._reasons[pkg]
+
+    def __iter__(self):
+        return iter(self._db.local_packages())
+
+    def __len__(self):
+        return len(self._db.local_packages())
+
+
 class Pacman(object):
     def __init__(self, module):
         self.m = module
@@ -692,6 +948,17 @@ class Pacman(object):
 
         return pkg_list
 
+    def _use_database(self):
+        source = self.m.params["inventory_source"]
+        if source == "pacman" or source == "auto" and os.path.basename(self.pacman_path) != "pacman":
+            return None
+        db = PacmanDatabase()
+        if db.usable():
+            return db
+        if source == "database":
+            self.fail("Cannot read the pacman databases configured in %s" % PacmanDatabase.CONF)
+        return None
+
     def _build_inventory(self):
         """Build a cache datastructure used for all pkg lookups
         Returns a dict:
@@ -707,6 +974,10 @@ class Pacman(object):
         Fails the module if a package requested for install cannot be found
         """
 
+        db = self._use_database()
+        if db is not None:
+            return self._build_inventory_from_database(db)
+
         installed_pkgs = {}
         dummy, stdout, dummy = self.m.run_command([self.pacman_path, "--query"], check_rc=True)
         # Format of a line: "pacman 6.0.1-2"
@@ -829,6 +1100,59 @@ class Pacman(object):
             pkg_reasons=pkg_reasons,
         )
 
+    def _build_inventory_from_database(self, db):
+        """Same as _build_inventory(), but reading the pacman databases when an entry is first used"""
+
+        def local():
+            installed_pkgs = dict((pkg, version) for pkg, (version, dummy) in db.local_packages().items())
+            return dict(installed_pkgs=installed_pkgs, pkg_reasons=LocalReasons(db))
+
+        def installed_groups():
+            groups = defaultdict(set)
+            for pkg in db.local_packages():
+                for group in db.local_desc(pkg, ("GROUPS",)).get("GROUPS", []):
+                    groups[group].add(pkg)
+            return dict(installed_groups=groups)
+
+        def sync():
+            local_pkgs = db.local_packages()
+            available_pkgs = {}
+            available_groups = defaultdict(set)
+            # like pacman, the first repository containing a package decides its new version
+            new_versions = {}
+            for dummy, pkg, version, groups in db.sync_packages():
+                available_pkgs[pkg] = version
+                for group in groups:
+                    available_groups[group].add(pkg)
+                if pkg in local_pkgs and pkg not in new_versions:
+                    new_versions[pkg] = version
+
+            upgradable_pkgs = {}
+            for pkg, latest in new_versions.items():
+                current = local_pkgs[pkg][0]
+                if vercmp(latest, current) <= 0:
+                    continue
+                local_groups = db.local_desc(pkg, ("GROUPS",)).get("GROUPS", []) if db.ignore_groups else []
+                if db.ignored(pkg, local_groups):
+                    continue
+                upgradable_pkgs[pkg] = VersionTuple(current=current, latest=latest)
+            return dict(available_pkgs=available_pkgs, available_groups=available_groups, upgradable_pkgs=upgradable_pkgs)
+
+        def on_error(e):
+            self.fail("Failed to read the pacman databases: %s" % e)
+
+        return LazyInventory(
+            dict(
+                installed_pkgs=local,
+                pkg_reasons=local,
+                installed_groups=installed_groups,
+                available_pkgs=sync,
+                available_groups=sync,
+                upgradable_pkgs=sync,
+            ),
+            on_error,
+        )
+
 
 def setup_module():
     module = AnsibleModule(
@@ -849,6 +1173,7 @@ def setup_module():
             update_cache_extra_args=dict(type="str", default=""),
             reason=dict(type="str", choices=["explicit", "dependency"]),
             reason_for=dict(type="str", default="new", choices=["new", "all"]),
+            inventory_source=dict(type="str", default="auto", choices=["auto", "database", "pacman"]),
         ),
         required_one_of=[["name", "update_cache", "upgrade"]],
         mutually_exclusive=[["name", "upgrade"]],
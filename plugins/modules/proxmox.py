@@ -471,7 +471,6 @@ EXAMPLES = r'''
 '''
 
 import re
-import time
 
 from ansible_collections.community.general.plugins.module_utils.version import LooseVersion
 
@@ -660,28 +659,18 @@ class ProxmoxLxcAnsible(ProxmoxAnsible):
         else:
             taskid = getattr(proxmox_node, VZ_TYPE).create(vmid=vmid, storage=storage, memory=memory, swap=swap, **kwargs)
 
-        while timeout:
-            if self.api_task_ok(node, taskid):
-                return True
-            timeout -= 1
-            if timeout == 0:
-                self.module.fail_json(vmid=vmid, node=node, msg='Reached timeout while waiting for creating VM. Last line in task before timeout: %s' %
-                                      proxmox_node.tasks(taskid).log.get()[:1])
-
-            time.sleep(1)
+        if self.api_task_wait(node, taskid, timeout):
+            return True
+        self.module.fail_json(vmid=vmid, node=node, msg='Reached timeout while waiting for creating VM. Last line in task before timeout: %s' %
+                              self.api_task_last_log(node, taskid))
         return False
 
     def start_instance(self, vm, vmid, timeout):
         taskid = getattr(self.proxmox_api.nodes(vm['node']), VZ_TYPE)(vmid).status.start.post()
-        while timeout:
-            if self.api_task_ok(vm['node'], taskid):
-                return True
-            timeout -= 1
-            if timeout == 0:
-                self.module.fail_json(vmid=vmid, taskid=taskid, msg='Reached timeout while waiting for starting VM. Last line in task before timeout: %s' %
-                                      self.proxmox_api.nodes(vm['node']).tasks(taskid).log.get()[:1])
-
-            time.sleep(1)
+        if self.api_task_wait(vm['node'], taskid, timeout):
+            return True
+        self.module.fail_json(vmid=vmid, taskid=taskid, msg='Reached timeout while waiting for starting VM. Last line in task before timeout: %s' %
+                              self.api_task_last_log(vm['node'], taskid))
         return False
 
     def stop_instance(self, vm, vmid, timeout, force):
@@ -689,15 +678,10 @@ class ProxmoxLxcAnsible(ProxmoxAnsible):
             taskid = getattr(self.proxmox_api.nodes(vm['node']), VZ_TYPE)(vmid).status.shutdown.post(forceStop=1)
         else:
             taskid = getattr(self.proxmox_api.nodes(vm['node']), VZ_TYPE)(vmid).status.shutdown.post()
-        while timeout:
-            if self.api_task_ok(vm['node'], taskid):
-                return True
-            timeout -= 1
-            if timeout == 0:
-                self.module.fail_json(vmid=vmid, taskid=taskid, msg='Reached timeout while waiting for stopping VM. Last line in task before timeout: %s' %
-                                      self.proxmox_api.nodes(vm['node']).tasks(taskid).log.get()[:1])
-
-            time.sleep(1)
+        if self.api_task_wait(vm['node'], taskid, timeout):
+            return True
+        self.module.fail_json(vmid=vmid, taskid=taskid, msg='Reached timeout while waiting for stopping VM. Last line in task before timeout: %s' %
+                              self.api_task_last_log(vm['node'], taskid))
         return False
 
     def convert_to_template(self, vm, vmid, timeout, force):
@@ -709,15 +693,10 @@ class ProxmoxLxcAnsible(ProxmoxAnsible):
 
     def umount_instance(self, vm, vmid, timeout):
         taskid = getattr(self.proxmox_api.nodes(vm['node']), VZ_TYPE)(vmid).status.umount.post()
-        while timeout:
-            if self.api_task_ok(vm['node'], taskid):
-                return True
-            timeout -= 1
-            if timeout == 0:
-                self.module.fail_json(vmid=vmid, taskid=taskid, msg='Reached timeout while waiting for unmounting VM. Last line in task before timeout: %s' %
-                                      self.proxmox_api.nodes(vm['node']).tasks(taskid).log.get()[:1])
-
-            time.sleep(1)
+        if self.api_task_wait(vm['node'], taskid, timeout):
+            return True
+        self.module.fail_json(vmid=vmid, taskid=taskid, msg='Reached timeout while waiting for unmounting VM. Last line in task before timeout: %s' %
+                              self.api_task_last_log(vm['node'], taskid))
         return False
 
 
@@ -1003,15 +982,10 @@ def main():
 
             taskid = getattr(proxmox.proxmox_api.nodes(vm['node']), VZ_TYPE).delete(vmid, **delete_params)
 
-            while timeout:
-                if proxmox.api_task_ok(vm['node'], taskid):
-                    module.exit_json(changed=True, vmid=vmid, taskid=taskid, msg="VM %s removed" % vmid)
-                timeout -= 1
-                if timeout == 0:
-                    module.fail_json(vmid=vmid, taskid=taskid, msg='Reached timeout while waiting for removing VM. Last line in task before timeout: %s'
-                                     % proxmox.proxmox_api.nodes(vm['node']).tasks(taskid).log.get()[:1])
-
-                time.sleep(1)
+            if proxmox.api_task_wait(vm['node'], taskid, timeout):
+                module.exit_json(changed=True, vmid=vmid, taskid=taskid, msg="VM %s removed" % vmid)
+            module.fail_json(vmid=vmid, taskid=taskid, msg='Reached timeout while waiting for removing VM. Last line in task before timeout: %s'
+                             % proxmox.api_task_last_log(vm['node'], taskid))
         except Exception as e:
             module.fail_json(vmid=vmid, msg="deletion of VM %s failed with exception: %s" % (vmid, to_native(e)))
 
@@ -970,15 +970,10 @@ class ProxmoxKvmAnsible(ProxmoxAnsible):
             # Increase task timeout in case of stopped state to be sure it waits longer than VM stop operation itself
             timeout += 10
 
-        while timeout:
-            if self.api_task_ok(node, taskid):
-                # Wait an extra second as the API can be a ahead of the hypervisor
-                time.sleep(1)
-                return True
-            timeout = timeout - 1
-            if timeout == 0:
-                break
+        if self.api_task_wait(node, taskid, timeout):
+            # Wait an extra second as the API can be a ahead of the hypervisor
             time.sleep(1)
+            return True
         return False
 
     def create_vm(self, vmid, newid, node, name, memory, cpu, cores, sockets, update, **kwargs):
@@ -1133,7 +1128,7 @@ class ProxmoxKvmAnsible(ProxmoxAnsible):
 
         if not self.wait_for_task(node, taskid):
             self.module.fail_json(msg='Reached timeout while waiting for creating VM. Last line in task before timeout: %s' %
-                                  proxmox_node.tasks(taskid).log.get()[:1])
+                                  self.api_task_last_log(node, taskid))
             return False
         return True
 
@@ -1143,7 +1138,7 @@ class ProxmoxKvmAnsible(ProxmoxAnsible):
         taskid = proxmox_node.qemu(vmid).status.start.post()
         if not self.wait_for_task(vm['node'], taskid):
             self.module.fail_json(msg='Reached timeout while waiting for starting VM. Last line in task before timeout: %s' %
-                                  proxmox_node.tasks(taskid).log.get()[:1])
+                                  self.api_task_last_log(vm['node'], taskid))
             return False
         return True
 
@@ -1153,7 +1148,7 @@ class ProxmoxKvmAnsible(ProxmoxAnsible):
         taskid = proxmox_node.qemu(vmid).status.shutdown.post(forceStop=(1 if force else 0), timeout=timeout)
         if not self.wait_for_task(vm['node'], taskid):
             self.module.fail_json(msg='Reached timeout while waiting for stopping VM. Last line in task before timeout: %s' %
-                                  proxmox_node.tasks(taskid).log.get()[:1])
+                                  self.api_task_last_log(vm['node'], taskid))
             return False
         return True
 
@@ -1164,7 +1159,7 @@ class ProxmoxKvmAnsible(ProxmoxAnsible):
             taskid = proxmox_node.qemu(vmid).status.reset.post() if force else proxmox_node.qemu(vmid).status.reboot.post()
             if not self.wait_for_task(vm['node'], taskid):
                 self.module.fail_json(msg='Reached timeout while waiting for rebooting VM. Last line in task before timeout: %s' %
-                                          proxmox_node.tasks(taskid).log.get()[:1])
+                                          self.api_task_last_log(vm['node'], taskid))
                 return False
             return True
         except Exception as e:
@@ -1190,7 +1185,7 @@ class ProxmoxKvmAnsible(ProxmoxAnsible):
         taskid = proxmox_node.qemu(vmid).migrate.post(vmid=vmid, node=vm['node'], target=target_node, online=1)
         if not self.wait_for_task(vm['node'], taskid):
             self.module.fail_json(msg='Reached timeout while waiting for migrating VM. Last line in task before timeout: %s' %
-                                  proxmox_node.tasks(taskid).log.get()[:1])
+                                  self.api_task_last_log(vm['node'], taskid))
             return False
         return True
 
@@ -1594,7 +1589,7 @@ def main():
             taskid = proxmox_node.qemu.delete(vmid)
             if not proxmox.wait_for_task(vm['node'], taskid):
                 module.fail_json(msg='Reached timeout while waiting for removing VM. Last line in task before timeout: %s' %
-                                 proxmox_node.tasks(taskid).log.get()[:1])
+                                 proxmox.api_task_last_log(vm['node'], taskid))
             else:
                 module.exit_json(changed=True, vmid=vmid, msg="VM %s removed" % vmid)
         except Exception as e:
@@ -215,6 +215,34 @@ options:
       - Handle to check the status of an update in progress.
     type: str
     version_added: '6.1.0'
+  update_wait:
+    required: false
+    description:
+      - Wait for the task or job started by V(SimpleUpdate), V(MultipartHTTPPushUpdate)
+        or V(PerformRequestedOperations) to finish, or to request a reset to continue.
+      - The task is polled as often as the service asks for with C(Retry-After), and
+        with an exponential backoff with jitter otherwise.
+      - The final status is returned in C(update_status) and the timing of the wait
+        in RV(return_values.update_wait).
+    type: bool
+    default: false
+    version_added: 8.2.0
+  update_wait_timeout:
+    required: false
+    description:
+      - Maximum number of seconds to wait when O(update_wait=true).
+    type: int
+    default: 1800
+    version_added: 8.2.0
+  update_wait_events:
+    required: false
+    description:
+      - Also listen on the server-sent events stream of the service's C(EventService)
+        while waiting, and check the task as soon as a task event arrives.
+      - Polling is used alone when the service does not provide such a stream.
+    type: bool
+    default: false
+    version_added: 8.2.0
   virtual_media:
     required: false
     description:
@@ -619,6 +647,18 @@ EXAMPLES = '''
       password: "{{ password }}"
       update_handle: /redfish/v1/TaskService/TaskMonitors/735
 
+  - name: Simple update, waiting for the update task to finish
+    community.general.redfish_command:
+      category: Update
+      command: SimpleUpdate
+      baseuri: "{{ baseuri }}"
+      username: "{{ username }}"
+      password: "{{ password }}"
+      update_image_uri: https://example.com/myupdate.img
+      update_wait: true
+      update_wait_timeout: 3600
+      update_wait_events: true
+
   - name: Insert Virtual Media
     community.general.redfish_command:
       category: Systems
@@ -746,6 +786,22 @@ return_values:
             "status": "New"
         }
     }
+    contains:
+      update_wait:
+        description:
+          - Timing of the wait for the update task, when O(update_wait=true).
+          - C(elapsed) and C(waited) are in seconds.
+          - C(events) counts the task events received from the event stream.
+        returned: when O(update_wait=true)
+        type: dict
+        version_added: 8.2.0
+        sample: {
+            "elapsed": 312.84,
+            "event_stream": true,
+            "events": 3,
+            "polls": 5,
+            "waited": 310.512
+        }
 '''
 
 from ansible.module_utils.basic import AnsibleModule
@@ -811,6 +867,9 @@ def main():
             update_apply_time=dict(choices=['Immediate', 'OnReset', 'AtMaintenanceWindowStart',
                                             'InMaintenanceWindowOnReset', 'OnStartUpdateRequest']),
             update_handle=dict(),
+            update_wait=dict(type='bool', default=False),
+            update_wait_timeout=dict(type='int', default=1800),
+            update_wait_events=dict(type='bool', default=False),
             virtual_media=dict(
                 type='dict',
                 options=dict(
@@ -1025,16 +1084,34 @@ def main():
             module.fail_json(msg=resource['msg'])
 
         for command in command_list:
+            handle = None
+            resets_performed = None
             if command == "SimpleUpdate":
                 result = rf_utils.simple_update(update_opts)
                 if 'update_status' in result:
                     return_values['update_status'] = result['update_status']
+                    handle = result['update_status']['handle']
             elif command == "MultipartHTTPPushUpdate":
                 result = rf_utils.multipath_http_push_update(update_opts)
                 if 'update_status' in result:
                     return_values['update_status'] = result['update_status']
+                    handle = result['update_status']['handle']
             elif command == "PerformRequestedOperations":
                 result = rf_utils.perform_requested_update_operations(update_opts['update_handle'])
+                if result['ret'] is True and result['changed']:
+                    # The resets let the update continue
+                    handle = update_opts['update_handle']
+                    resets_performed = result['resets_performed']
+
+            if handle and module.params['update_wait']:
+                wait = rf_utils.wait_for_task(handle, module.params['update_wait_timeout'],
+                                              use_events=module.params['update_wait_events'],
+                                              resets_performed=resets_performed)
+                return_values['update_wait'] = wait['wait']
+                if 'update_status' in wait:
+                    return_values['update_status'] = wait['update_status']
+                if wait['ret'] is False:
+                    module.fail_json(msg=to_native(wait['msg']), return_values=return_values)
 
     # Return data back or fail with proper message
     if result['ret'] is True:
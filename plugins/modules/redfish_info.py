@@ -431,7 +431,8 @@ def main():
 
     # Build root URI
     root_uri = "https://" + module.params['baseuri']
-    rf_utils = RedfishUtils(creds, root_uri, timeout, module)
+    # Nothing is modified here, so every resource needs to be read only once
+    rf_utils = RedfishUtils(creds, root_uri, timeout, module, cache_responses=True)
 
     # Build Category list
     if "all" in module.params['category']:
@@ -81,6 +81,15 @@ options:
         required: false
         default: false
         version_added: 7.2.0
+    use_snapd_api:
+        description:
+            - Talk to snapd through its REST API on C(/run/snapd.socket) instead of running the C(snap) command.
+            - The state of all snaps is then read with a single request, and the snaps are installed, refreshed,
+              removed, enabled or disabled and configured by submitting all changes to snapd before waiting for them.
+            - Snap files given in O(name) are still installed with the C(snap) command.
+        type: bool
+        default: false
+        version_added: 8.2.0
 
 author:
     - Victor Carceler (@vcarceler) <vcarceler@iespuigcastellar.xeill.net>
@@ -165,6 +174,7 @@ options_changed:
     version_added: 4.4.0
 '''
 
+import os
 import re
 import json
 import numbers
@@ -172,7 +182,7 @@ import numbers
 from ansible.module_utils.common.text.converters import to_native
 
 from ansible_collections.community.general.plugins.module_utils.module_helper import StateModuleHelper
-from ansible_collections.community.general.plugins.module_utils.snap import snap_runner
+from ansible_collections.community.general.plugins.module_utils.snap import snap_runner, SnapdClient, SnapdError
 
 
 class Snap(StateModuleHelper):
@@ -191,10 +201,13 @@ class Snap(StateModuleHelper):
             'channel': dict(type='str'),
             'options': dict(type='list', elements='str'),
             'dangerous': dict(type='bool', default=False),
+            'use_snapd_api': dict(type='bool', default=False),
         },
         supports_check_mode=True,
     )
 
+    _snapd_actions = dict(absent='remove', enabled='enable', disabled='disable')
+
     @staticmethod
     def _first_non_zero(a):
         for elem in a:
@@ -205,6 +218,10 @@ class Snap(StateModuleHelper):
 
     def __init_module__(self):
         self.runner = snap_runner(self.module)
+        self.client = SnapdClient() if self.vars.use_snapd_api else None
+        self._snapd_enabled = None
+        # state read by names_from_snaps(), reused by the first snap_status() call
+        self._snapd_installed = None
         # if state=present there might be file names passed in 'name', in
         # which case they must be converted to their actual snap names, which
         # is done using the names_from_snaps() method calling 'snap info'.
@@ -283,6 +300,12 @@ class Snap(StateModuleHelper):
         return self.convert_json_subtree_to_map(json_object)
 
     def retrieve_option_map(self, snap_name):
+        if self.client:
+            try:
+                return self.convert_json_subtree_to_map(self.client.conf(snap_name))
+            except SnapdError as e:
+                self.do_raise(msg="Cannot get the options of snap '{0}': {1}".format(snap_name, e.msg))
+
         with self.runner("get name") as ctx:
             rc, out, err = ctx.run(name=snap_name)
 
@@ -302,6 +325,11 @@ class Snap(StateModuleHelper):
                 msg="Parsing option map returned by 'snap get {0}' triggers exception '{1}', output:\n'{2}'".format(snap_name, str(e), out))
 
     def names_from_snaps(self, snaps):
+        if self.client:
+            return self._names_from_snaps_api(snaps)
+        return self._names_from_snaps_cli(snaps)
+
+    def _names_from_snaps_cli(self, snaps):
         def process_one(rc, out, err):
             res = [line for line in out.split("\n") if line.startswith("name:")]
             name = res[0].split()[1]
@@ -340,6 +368,54 @@ class Snap(StateModuleHelper):
                     self.vars.snapinfo_run_info.append(ctx.run_info)
         return names
 
+    @staticmethod
+    def _is_snap_file(name):
+        return name.endswith('.snap') or os.path.sep in name
+
+    def _names_from_snaps_api(self, snaps):
+        files = [s for s in snaps if self._is_snap_file(s)]
+        # reading the name from a snap file is not offered by the API
+        file_names = iter(self._names_from_snaps_cli(files))
+        installed = self._snapd_snaps(snaps)
+        self._snapd_installed = installed
+
+        names = []
+        not_found = []
+        for snap in snaps:
+            if self._is_snap_file(snap):
+                names.append(next(file_names))
+            elif snap in installed:
+                names.append(snap)
+            elif self._snapd_call(self.client.find, snap) is not None:
+                names.append(snap)
+            else:
+                not_found.append(snap)
+        if not_found:
+            self.do_raise("Snaps not found: {0}.".format(not_found))
+        return names
+
+    def _snapd_call(self, func, *args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except SnapdError as e:
+            self.do_raise(msg="snapd request failed: {0}".format(e.msg))
+
+    def _snapd_snaps(self, names):
+        snaps = self._snapd_call(self.client.snaps, names)
+        self.vars.status_run_info = dict(request='GET /v2/snaps', snaps=names)
+        return snaps
+
+    def _snapd_change(self, action, names, **options):
+        """Submits the changes for all names first, then waits for them"""
+        self.vars.cmd = "snapd: {0} {1}".format(action, " ".join(names))
+        try:
+            changes = self.client.action(action, names, **options)
+            self.vars.run_info = changes
+            self.client.wait(changes)
+        except SnapdError as e:
+            return e
+        return None
+
     def snap_status(self, snap_name, channel):
         def _status_check(name, channel, installed):
             match = [c for n, c in installed if n == name]
@@ -350,6 +426,15 @@ class Snap(StateModuleHelper):
             else:
                 return Snap.INSTALLED
 
+        if self.client:
+            installed = self._snapd_installed
+            self._snapd_installed = None
+            if installed is None:
+                installed = self._snapd_snaps(snap_name)
+            list_out = [(n, s.get('tracking-channel') or s.get('channel')) for n, s in installed.items()]
+            self.vars.status_out = list_out
+            return [_status_check(n, channel, list_out) for n in snap_name]
+
         with self.runner("_list") as ctx:
             rc, out, err = ctx.run(check_rc=True)
         list_out = out.split('\n')[1:]
@@ -361,6 +446,13 @@ class Snap(StateModuleHelper):
         return [_status_check(n, channel, list_out) for n in snap_name]
 
     def is_snap_enabled(self, snap_name):
+        if self.client:
+            if self._snapd_enabled is None:
+                # one request for all snaps of the task
+                snaps = self._snapd_snaps(self.vars.name)
+                self._snapd_enabled = dict((n, s.get('status') == 'active') for n, s in snaps.items())
+            return self._snapd_enabled.get(snap_name)
+
         with self.runner("_list name") as ctx:
             rc, out, err = ctx.run(name=snap_name)
         if rc != 0:
@@ -379,6 +471,17 @@ class Snap(StateModuleHelper):
         if self.check_mode:
             return
 
+        if self.client and not self.vars.dangerous and not any(self._is_snap_file(s) for s in actionable_snaps):
+            error = self._snapd_change('refresh' if refresh else 'install', actionable_snaps,
+                                       channel=self.vars.channel, classic=self.vars.classic)
+            if error is None:
+                return
+            if error.kind == 'snap-needs-classic':
+                msg = "Couldn't install {name} because it requires classic confinement".format(name=" ".join(actionable_snaps))
+            else:
+                msg = "Ooops! Snap installation failed while executing '{cmd}': {err}".format(cmd=self.vars.cmd, err=error.msg)
+            self.do_raise(msg=msg)
+
         params = ['state', 'classic', 'channel', 'dangerous']  # get base cmd parts
         has_one_pkg_params = bool(self.vars.classic) or self.vars.channel != 'stable'
         has_multiple_snaps = len(actionable_snaps) > 1
@@ -423,6 +526,7 @@ class Snap(StateModuleHelper):
 
         actionable_snaps = [s for s in self.vars.name if self.vars.snap_status_map[s] != Snap.NOT_INSTALLED]
         overall_options_changed = []
+        changes = []
 
         for snap_name in actionable_snaps:
             option_map = self.retrieve_option_map(snap_name=snap_name)
@@ -456,7 +560,10 @@ class Snap(StateModuleHelper):
             if options_changed:
                 self.changed = True
 
-                if not self.check_mode:
+                if not self.check_mode and self.client:
+                    conf = dict(self._snapd_conf_value(option.split("=", 1)) for option in options_changed)
+                    changes.append(self._snapd_call(self.client.set_conf, snap_name, conf))
+                elif not self.check_mode:
                     with self.runner("_set name options") as ctx:
                         rc, out, err = ctx.run(name=snap_name, options=options_changed)
                     if rc != 0:
@@ -468,9 +575,25 @@ class Snap(StateModuleHelper):
                             options=" ".join(options_changed), snap=snap_name, error=err)
                         self.do_raise(msg)
 
+        if changes:
+            # the options of all snaps are set in parallel
+            try:
+                self.client.wait(changes)
+            except SnapdError as e:
+                self.do_raise("Cannot set options '{options}': error={error}".format(options=" ".join(overall_options_changed), error=e.msg))
+
         if overall_options_changed:
             self.vars.options_changed = overall_options_changed
 
+    @staticmethod
+    def _snapd_conf_value(key_value):
+        # like 'snap set', use the value as JSON if it is valid JSON, as string otherwise
+        key, value = key_value
+        try:
+            return key, json.loads(value)
+        except ValueError:
+            return key, value
+
     def _generic_state_action(self, actionable_func, actionable_var, params):
         actionable_snaps = [s for s in self.vars.name if actionable_func(s)]
         if not actionable_snaps:
@@ -479,6 +602,11 @@ class Snap(StateModuleHelper):
         self.vars[actionable_var] = actionable_snaps
         if self.check_mode:
             return
+        if self.client:
+            error = self._snapd_change(self._snapd_actions[self.vars.state], actionable_snaps)
+            if error is not None:
+                self.do_raise(msg="Ooops! Snap operation failed while executing '{cmd}': {err}".format(cmd=self.vars.cmd, err=error.msg))
+            return
         self.vars.cmd, rc, out, err, run_info = self._run_multiple_commands(params, actionable_snaps)
         self.vars.run_info = run_info
         if rc == 0:
@@ -11,8 +11,68 @@ import pytest
 pytest.importorskip('memcache')
 
 from ansible.plugins.loader import cache_loader
-from ansible_collections.community.general.plugins.cache.memcached import CacheModule as MemcachedCache
+from ansible_collections.community.general.plugins.cache.memcached import CacheModule as MemcachedCache, CacheModuleKeys, ProxyClientPool
 
 
 def test_memcached_cachemodule():
     assert isinstance(cache_loader.get('community.general.memcached'), MemcachedCache)
+
+
+class FakeMemcache(object):
+    def __init__(self):
+        self.data = {}
+        self.calls = []
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def get_multi(self, keys, key_prefix=''):
+        self.calls.append('get_multi')
+        return dict((key, self.data[key_prefix + key]) for key in keys if key_prefix + key in self.data)
+
+    def set(self, key, value, time=0, min_compress_len=0):
+        self.calls.append('set %s' % key)
+        self.data[key] = value
+
+    def set_multi(self, mapping, time=0, key_prefix='', min_compress_len=0):
+        self.calls.append('set_multi')
+        for key, value in mapping.items():
+            self.data[key_prefix + key] = value
+
+    def add(self, key, value):
+        if key in self.data:
+            return 0
+        self.data[key] = value
+        return 1
+
+    def append(self, key, value):
+        if key not in self.data:
+            return 0
+        self.data[key] += value
+        return 1
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+def test_memcached_cachemodule_write_behind(monkeypatch):
+    db = FakeMemcache()
+    monkeypatch.setattr(ProxyClientPool, '__getattr__', lambda self, name: getattr(db, name))
+    cache = cache_loader.get('community.general.memcached', _write_behind=True, _flush_size=3, _flush_interval=3600)
+
+    for i in range(4):
+        cache.set('host%d' % i, {'ansible_hostname': 'host%d' % i})
+    # the keyset is not rewritten, the new keys are appended to the journal
+    assert db.calls == ['set_multi']
+    assert 'ansible_factshost3' not in db.data
+    assert 'host2' in db.data[CacheModuleKeys.JOURNAL]
+
+    cache._flush_pending()
+    assert db.calls == ['set_multi', 'set_multi']
+    assert 'host3' in db.data[CacheModuleKeys.JOURNAL]
+
+    # a new invocation sees the keyset including the journal and fetches all hosts at once
+    db.calls = []
+    cache = cache_loader.get('community.general.memcached', _write_behind=True, _flush_size=3)
+    assert cache.copy() == dict(('host%d' % i, {'ansible_hostname': 'host%d' % i}) for i in range(4))
+    assert db.calls == ['get_multi', 'get_multi']
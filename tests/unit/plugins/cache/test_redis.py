@@ -24,3 +24,88 @@ def test_redis_cachemodule():
     # The _uri option is required for the redis plugin
     connection = '[::1]:6379:1'
     assert isinstance(cache_loader.get('community.general.redis', **{'_uri': connection}), RedisCache)
+
+
+class FakePipeline(object):
+    def __init__(self, db):
+        self.db = db
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.calls.append((name, args))
+        return queue
+
+    def execute(self):
+        self.db.executed.append([name for name, dummy in self.calls])
+        for name, args in self.calls:
+            getattr(self.db, name)(*args)
+
+
+class FakeRedis(object):
+    def __init__(self):
+        self.data = {}
+        self.zset = {}
+        self.executed = []
+        self.mget_calls = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def setex(self, key, timeout, value):
+        self.set(key, value)
+
+    def set(self, key, value):
+        self.data[key] = value if isinstance(value, bytes) else value.encode('utf-8')
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        self.mget_calls += 1
+        return [self.data.get(key) for key in keys]
+
+    def zadd(self, name, mapping):
+        self.zset.update(mapping)
+
+    def zrem(self, name, *keys):
+        for key in keys:
+            self.zset.pop(key, None)
+
+    def zremrangebyscore(self, name, start, end):
+        pass
+
+    def zrange(self, name, start, end):
+        return [key.encode('utf-8') for key in sorted(self.zset)]
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.mark.parametrize('compression', ['none', 'zlib'])
+def test_redis_cachemodule_pipeline(compression):
+    cache = cache_loader.get('community.general.redis', **{
+        '_uri': '127.0.0.1:6379:1', '_compact': True, '_compression': compression, '_pipeline': True, '_batch_size': 2,
+    })
+    db = cache._db = FakeRedis()
+
+    for i in range(5):
+        cache.set('host%d' % i, {'ansible_hostname': 'host%d' % i})
+    assert db.executed == [['setex', 'zadd']] * 5
+    assert db.data['ansible_factshost0'] != b'{\n'
+    if compression == 'none':
+        assert db.data['ansible_factshost0'] == b'{"ansible_hostname":"host0"}'
+
+    # entry written by another invocation which is missing its value
+    db.zset['stale'] = 0
+
+    assert cache.copy() == dict(('host%d' % i, {'ansible_hostname': 'host%d' % i}) for i in range(5))
+    assert db.mget_calls == 3
+    assert 'stale' not in db.zset
+
+    # a new process loads all hosts with the first lookup
+    cache._cache = {}
+    db.mget_calls = 0
+    assert cache.get('host3') == {'ansible_hostname': 'host3'}
+    assert db.mget_calls == 3
+    assert len(cache._cache) == 5
@@ -0,0 +1,45 @@
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Make coding more python3-ish
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import time
+
+from ansible.plugins.loader import cache_loader
+from ansible_collections.community.general.plugins.cache.sqlite import CacheModule as SqliteCache
+
+
+def test_sqlite_cachemodule(tmp_path):
+    cache = cache_loader.get('community.general.sqlite', _uri=str(tmp_path))
+    assert isinstance(cache, SqliteCache)
+
+    cache.set('host1', {'ansible_hostname': 'host1'})
+    cache.set('host2', {'ansible_hostname': 'host2'})
+    assert sorted(cache.keys()) == ['host1', 'host2']
+
+    # a new invocation loads all records at once, but only decodes the accessed ones
+    cache = cache_loader.get('community.general.sqlite', _uri=str(tmp_path))
+    assert cache.get('host1') == {'ansible_hostname': 'host1'}
+    assert list(cache._cache) == ['host1']
+    assert list(cache._raw) == ['host2']
+    assert cache.copy() == {'host1': {'ansible_hostname': 'host1'}, 'host2': {'ansible_hostname': 'host2'}}
+
+    cache.delete('host1')
+    assert not cache.contains('host1')
+    assert cache.contains('host2')
+
+    cache.flush()
+    assert cache.keys() == []
+
+
+def test_sqlite_cachemodule_expiry(tmp_path):
+    cache = cache_loader.get('community.general.sqlite', _uri=str(tmp_path), _timeout=60)
+    cache.set('host1', {'ansible_hostname': 'host1'})
+    cache._execute('UPDATE facts SET updated = ?', time.time() - 120)
+
+    cache = cache_loader.get('community.general.sqlite', _uri=str(tmp_path), _timeout=60)
+    assert cache.keys() == []
+    assert not cache.contains('host1')
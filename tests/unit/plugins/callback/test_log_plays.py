@@ -0,0 +1,40 @@
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import gzip
+import os
+
+from ansible_collections.community.general.plugins.callback.log_plays import LogFilePool
+
+
+def test_log_file_pool_lru(tmp_path):
+    pool = LogFilePool(max_open=2)
+    for host in ('a', 'b', 'a', 'c'):
+        pool.write(str(tmp_path / host), host.encode() + b'\n')
+
+    # 'b' was the least recently used file and has been closed and written out
+    assert list(pool._files) == [str(tmp_path / 'a'), str(tmp_path / 'c')]
+    assert (tmp_path / 'b').read_bytes() == b'b\n'
+
+    pool.close()
+    assert (tmp_path / 'a').read_bytes() == b'a\na\n'
+    assert (tmp_path / 'c').read_bytes() == b'c\n'
+
+
+def test_log_file_pool_rotate(tmp_path):
+    pool = LogFilePool(max_open=1, rotate_size=10)
+    path = str(tmp_path / 'host')
+    pool.write(path, b'12345')
+    pool.write(path, b'67890')
+    pool.write(path, b'abc')
+    pool.close()
+
+    rotated = [name for name in os.listdir(str(tmp_path)) if name.endswith('.gz')]
+    assert len(rotated) == 1
+    with gzip.open(str(tmp_path / rotated[0])) as f:
+        assert f.read() == b'1234567890'
+    assert (tmp_path / 'host').read_bytes() == b'abc'
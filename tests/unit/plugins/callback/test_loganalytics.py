@@ -69,3 +69,23 @@ class TestAzureLogAnalytics(unittest.TestCase):
 
         self.assertRegex(headers['Authorization'], r'^SharedKey 01234567-0123-0123-0123-01234567890a:.*=$')
         self.assertEqual(headers['Log-Type'], 'ansible_playbook')
+
+    @patch('ansible_collections.community.general.plugins.callback.loganalytics.open_url')
+    def test_background_send(self, open_url_mock):
+        self.loganalytics.start_sender('01234567-0123-0123-0123-01234567890a',
+                                       'dZD0kCbKl3ehZG6LHFMuhtE0yHiFCmetzFMc2u+roXIUQuatqU924SsAAAAPemhjbGlAemhjbGktTUJQAQIDBA==',
+                                       batch_size=10, flush_interval=60)
+        for i in range(3):
+            result = TaskResult(host=self.mock_host, task=self.mock_task, return_data={'i': i}, task_fields={'args': {}})
+            self.loganalytics.send_event(workspace_id='01234567-0123-0123-0123-01234567890a',
+                                         shared_key='dZD0kCbKl3ehZG6LHFMuhtE0yHiFCmetzFMc2u+roXIUQuatqU924SsAAAAPemhjbGlAemhjbGktTUJQAQIDBA==',
+                                         state='OK',
+                                         result=result,
+                                         runtime=100)
+        self.assertTrue(self.loganalytics.sender.flush(timeout=10))
+
+        self.assertEqual(open_url_mock.call_count, 1)
+        args, kwargs = open_url_mock.call_args
+        sent_data = json.loads(args[1])
+        self.assertEqual([event['event']['ansible_result']['i'] for event in sent_data], [0, 1, 2])
+        self.assertRegex(kwargs['headers']['Authorization'], r'^SharedKey 01234567-0123-0123-0123-01234567890a:.*=$')
@@ -62,3 +62,21 @@ class TestSplunkClient(unittest.TestCase):
         self.assertEqual(sent_data['event']['timestamp'], '2020-12-01 00:00:00 +0000')
         self.assertEqual(sent_data['event']['host'], 'my-host')
         self.assertEqual(sent_data['event']['ip_address'], '1.2.3.4')
+
+    @patch('ansible_collections.community.general.plugins.callback.splunk.open_url')
+    def test_background_send(self, open_url_mock):
+        self.splunk.start_sender('endpoint', 'token', False, batch_size=2, flush_interval=60)
+
+        for i in range(3):
+            result = TaskResult(host=self.mock_host, task=self.mock_task, return_data={'i': i}, task_fields={'args': {}})
+            self.splunk.send_event(
+                url='endpoint', authtoken='token', validate_certs=False, include_milliseconds=False,
+                batch=None, state='OK', result=result, runtime=100
+            )
+        self.assertTrue(self.splunk.sender.flush(timeout=10))
+
+        self.assertEqual(open_url_mock.call_count, 2)
+        sent = [[json.loads(event)['event']['ansible_result']['i'] for event in call[0][1].split('\n')] for call in open_url_mock.call_args_list]
+        self.assertEqual(sent, [[0, 1], [2]])
+        self.assertEqual(self.splunk.sender.stats['sent'], 3)
+        self.assertEqual(self.splunk.sender.stats['requests'], 2)
@@ -0,0 +1,49 @@
+# Copyright (c) Ansible project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible.executor.task_result import TaskResult
+from ansible_collections.community.general.tests.unit.compat import unittest
+from ansible_collections.community.general.tests.unit.compat.mock import patch, Mock
+from ansible_collections.community.general.plugins.callback.sumologic import SumologicHTTPCollectorSource
+
+import json
+
+
+class TestSumologic(unittest.TestCase):
+    @patch('ansible_collections.community.general.plugins.callback.sumologic.socket')
+    def setUp(self, mock_socket):
+        mock_socket.gethostname.return_value = 'my-host'
+        mock_socket.gethostbyname.return_value = '1.2.3.4'
+        self.sumologic = SumologicHTTPCollectorSource()
+        self.mock_task = Mock('MockTask')
+        self.mock_task._role = 'myrole'
+        self.mock_task._uuid = 'myuuid'
+
+    def send_events(self, hosts):
+        for i, name in enumerate(hosts):
+            host = Mock('MockHost')
+            host.name = name
+            result = TaskResult(host=host, task=self.mock_task, return_data={'i': i}, task_fields={'args': {}})
+            self.sumologic.send_event('https://collector', 'OK', result, 100)
+
+    @patch('ansible_collections.community.general.plugins.callback.sumologic.open_url')
+    def test_background_send_retries_failed_host_only(self, open_url_mock):
+        calls = []
+
+        def post(url, data=None, headers=None, method=None):
+            calls.append((headers['X-Sumo-Host'], [json.loads(line)['ansible_result']['i'] for line in data.split('\n')]))
+            if len(calls) == 2:
+                raise Exception('unavailable')
+
+        open_url_mock.side_effect = post
+        self.sumologic.start_sender('https://collector', False, batch_size=10, flush_interval=60, retry_delay=0)
+        self.send_events(['web1', 'web2', 'web1'])
+        self.assertTrue(self.sumologic.sender.flush(timeout=10))
+
+        self.assertEqual(calls, [('web1', [0, 2]), ('web2', [1]), ('web2', [1])])
+        self.assertEqual(self.sumologic.sender.stats['sent'], 3)
+        self.assertEqual(self.sumologic.sender.stats['failed'], 0)
@@ -0,0 +1,100 @@
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import subprocess
+
+import pytest
+
+from io import StringIO
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible.playbook.play_context import PlayContext
+from ansible.plugins.loader import connection_loader
+
+
+@pytest.fixture
+def chroot(tmp_path):
+    """A directory that looks like a chroot, and a chroot binary that only
+    runs the command, so that the tests do not need to be run as root."""
+    root = tmp_path / 'root'
+    (root / 'bin').mkdir(parents=True)
+    (root / 'tmp').mkdir()
+    os.symlink('/bin/sh', str(root / 'bin' / 'sh'))
+    fake_chroot = tmp_path / 'chroot'
+    fake_chroot.write_text(u'#!/bin/sh\nshift\nexec "$@"\n')
+    fake_chroot.chmod(0o755)
+    return root, str(fake_chroot)
+
+
+@pytest.fixture
+def conn(chroot):
+    root, fake_chroot = chroot
+    play_context = PlayContext()
+    play_context.remote_addr = str(root)
+    conn = connection_loader.get('community.general.chroot', play_context, StringIO())
+    conn.set_options(direct={'chroot_exe': fake_chroot, 'disable_root_check': True, 'persistent_shell': True})
+    yield conn
+    conn.close()
+
+
+def test_persistent_shell(conn, mocker):
+    popen = mocker.spy(subprocess, 'Popen')
+
+    assert conn.exec_command('echo out; echo err >&2; exit 3') == (3, b'out\n', b'err\n')
+    assert conn.exec_command('printf no-newline') == (0, b'no-newline', b'')
+    assert conn.exec_command('cat', in_data=b'line 1\nline 2\n') == (0, b'line 1\nline 2\n', b'')
+    assert conn.exec_command('if then')[0] != 0
+    assert conn.exec_command('cd /tmp; FOO=bar') == (0, b'', b'')
+    assert conn.exec_command('pwd; echo "${FOO:-unset}"')[1] == (os.getcwd() + '\nunset\n').encode()
+    assert popen.call_count == 1
+
+    # input that cannot be passed as a here-document is run on its own
+    assert conn.exec_command('cat', in_data=b'no newline') == (0, b'no newline', b'')
+    assert popen.call_count == 2
+
+
+def test_persistent_shell_exit(conn):
+    with pytest.raises(AnsibleConnectionFailure, match='shell session failed'):
+        conn.exec_command('kill -9 $$')
+    assert conn.exec_command('echo again') == (0, b'again\n', b'')
+
+
+def test_host_copy(conn, chroot, tmp_path, mocker):
+    root = chroot[0]
+    conn.set_option('host_copy', True)
+    popen = mocker.spy(subprocess, 'Popen')
+    src = tmp_path / 'src'
+    src.write_bytes(os.urandom(300000))
+
+    conn.put_file(str(src), '/tmp/dest')
+    assert (root / 'tmp' / 'dest').read_bytes() == src.read_bytes()
+    conn.fetch_file('tmp/dest', str(tmp_path / 'fetched'))
+    assert (tmp_path / 'fetched').read_bytes() == src.read_bytes()
+    assert popen.call_count == 0
+
+    # links are resolved inside the chroot by dd, not on the controller
+    os.symlink('/tmp', str(root / 'link'))
+    os.symlink('/tmp/dest', str(root / 'tmp' / 'link'))
+    buffered_exec = mocker.patch.object(conn, '_buffered_exec_command')
+    buffered_exec.return_value.communicate.return_value = (b'', b'')
+    buffered_exec.return_value.returncode = 0
+    conn.put_file(str(src), '/link/other')
+    conn.put_file(str(src), '/tmp/link')
+    assert [c[0][0].split(' ')[:2] for c in buffered_exec.call_args_list] == [['dd', 'of=/link/other'], ['dd', 'of=/tmp/link']]
+
+
+def test_host_copy_fallback(conn, chroot, tmp_path, mocker):
+    conn.set_option('host_copy', True)
+    mocker.patch('os.copy_file_range', side_effect=OSError(18, 'Invalid cross-device link'), create=True)
+    sendfile = mocker.patch('os.sendfile', side_effect=OSError(22, 'Invalid argument'), create=True)
+    src = tmp_path / 'src'
+    src.write_bytes(b'data' * 1000)
+
+    conn.put_file(str(src), '/tmp/dest')
+    assert (chroot[0] / 'tmp' / 'dest').read_bytes() == src.read_bytes()
+    assert sendfile.call_count == 1
@@ -6,13 +6,17 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import fcntl
+import os
 import pytest
+import subprocess
 import sys
 
 from io import StringIO
 
 from ansible.errors import AnsibleError
 from ansible.playbook.play_context import PlayContext
+from ansible.plugins.connection import ConnectionBase
 from ansible.plugins.loader import connection_loader
 from ansible_collections.community.general.tests.unit.compat import mock
 
@@ -141,3 +145,69 @@ class TestLXCConnectionClass():
         assert conn.container is not None
         assert conn.container is not container1
         assert conn.container.name == container2_name
+
+
+@pytest.fixture
+def conn(lxc):
+    conn = connection_loader.get('community.general.lxc', PlayContext(), StringIO())
+    assert isinstance(conn, ConnectionBase)
+    conn.set_option('remote_addr', 'my-container')
+    conn.container_name = 'my-container'
+    conn.container = mock.MagicMock()
+    conn._connected = True
+    # run the transfer functions in the current process instead of the container
+    conn.container.attach_wait.side_effect = lambda func, args: func(args)
+    return conn
+
+
+def test_communicate(lxc):
+    read_stdin, write_stdin = os.pipe()
+    read_stdout, write_stdout = os.pipe()
+    read_stderr, write_stderr = os.pipe()
+    process = subprocess.Popen(['sh', '-c', 'cat; echo done >&2'],
+                               stdin=read_stdin, stdout=write_stdout, stderr=write_stderr)
+    for fd in (read_stdin, write_stdout, write_stderr):
+        os.close(fd)
+    fcntl.fcntl(write_stdin, fcntl.F_SETFL, fcntl.fcntl(write_stdin, fcntl.F_GETFL) | os.O_NONBLOCK)
+    data = os.urandom(3 * 1024 * 1024)
+
+    try:
+        rc, stdout, stderr = lxc.Connection._communicate(process.pid, data, write_stdin, read_stdout, read_stderr)
+    finally:
+        process.returncode = 0
+        for fd in (read_stdout, read_stderr):
+            os.close(fd)
+
+    assert (rc, stderr) == (0, b'done\n')
+    assert stdout == data
+
+
+def test_batch_put_file(conn, tmp_path):
+    conn.set_option('batch_put_file', True)
+    sources = []
+    for name in ('module', 'args'):
+        src = tmp_path / name
+        src.write_bytes(name.encode() * 100000)
+        sources.append(src.read_bytes())
+        conn.put_file(str(src), str(tmp_path / (name + '.out')))
+        # the caller may remove the file as soon as put_file returned
+        src.unlink()
+    assert conn.container.attach_wait.call_count == 0
+
+    conn.close()
+    assert conn.container.attach_wait.call_count == 1
+    assert [(tmp_path / name).read_bytes() for name in ('module.out', 'args.out')] == sources
+
+
+def test_put_files(conn, tmp_path):
+    src = tmp_path / 'src'
+    src.write_bytes(b'content')
+
+    conn.put_files([(str(src), str(tmp_path / 'one')), (str(src), str(tmp_path / 'two'))])
+    assert conn.container.attach_wait.call_count == 1
+    assert (tmp_path / 'one').read_bytes() == (tmp_path / 'two').read_bytes() == b'content'
+
+    conn.container.attach_wait.side_effect = None
+    conn.container.attach_wait.return_value = 1
+    with pytest.raises(AnsibleError, match='failed to transfer file to .*one, .*two'):
+        conn.put_files([(str(src), str(tmp_path / 'one')), (str(src), str(tmp_path / 'two'))])
@@ -0,0 +1,151 @@
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import os
+import threading
+
+import pytest
+
+from io import StringIO
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible.module_utils.six.moves import BaseHTTPServer, socketserver
+from ansible.module_utils.six.moves.urllib.parse import urlparse, parse_qs
+from ansible.playbook.play_context import PlayContext
+from ansible.plugins.loader import connection_loader
+
+
+class FakeLXDHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Answers the few LXD API calls used by the connection plugin"""
+    protocol_version = 'HTTP/1.1'
+
+    def _send(self, status, body, content_type='application/json'):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self, method):
+        self.server.connections.add(id(self.connection))
+        # LXDClient sends a JSON body with every request, GET included
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        self.server.requests.append((method, url.path, query))
+        files = self.server.files
+        if not url.path.startswith('/1.0/instances/c1/') and url.path.startswith('/1.0/instances/'):
+            return self._send(404, {'type': 'error', 'error': 'Instance not found', 'error_code': 404})
+        if method == 'POST' and url.path.endswith('/exec'):
+            self.server.commands.append(json.loads(body))
+            return self._send(202, {'type': 'async', 'operation': '/1.0/operations/1'})
+        if url.path == '/1.0/operations/1/wait':
+            command = self.server.commands[-1]['command'][-1]
+            files['/logs/stdout'] = ('out: %s' % command).encode('utf-8')
+            files['/logs/stderr'] = b''
+            return self._send(200, {'type': 'sync', 'metadata': {'status': 'Success', 'metadata': {
+                'return': 3, 'output': {'1': '/1.0/instances/c1/logs/stdout', '2': '/1.0/instances/c1/logs/stderr'}}}})
+        if '/logs/' in url.path:
+            path = url.path[len('/1.0/instances/c1'):]
+            if method == 'DELETE':
+                del files[path]
+                return self._send(200, {'type': 'sync', 'metadata': {}})
+            return self._send(200, files[path], 'application/octet-stream')
+        if url.path.endswith('/files'):
+            path = query['path'][0]
+            if method == 'POST':
+                files[path] = body
+                self.server.modes[path] = self.headers['X-LXD-mode']
+                return self._send(200, {'type': 'sync', 'metadata': {}})
+            if path not in files:
+                return self._send(404, {'type': 'error', 'error': 'not found', 'error_code': 404})
+            return self._send(200, files[path], 'application/octet-stream')
+        return self._send(404, {'type': 'error', 'error': 'not found', 'error_code': 404})
+
+    def do_GET(self):
+        self._route('GET')
+
+    def do_POST(self):
+        self._route('POST')
+
+    def do_DELETE(self):
+        self._route('DELETE')
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeLXDServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def lxd_server(tmp_path):
+    path = str(tmp_path / 'unix.socket')
+    server = FakeLXDServer(path, FakeLXDHandler)
+    server.requests = []
+    server.commands = []
+    server.connections = set()
+    server.files = {}
+    server.modes = {}
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield path, server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def conn(lxd_server):
+    conn = connection_loader.get('community.general.lxd', PlayContext(), StringIO())
+    conn.set_options(direct={'remote_addr': 'c1.example.com', 'url': 'unix:' + lxd_server[0], 'project': 'web'})
+    yield conn
+    conn.close()
+
+
+def test_api_exec(conn, lxd_server, mocker):
+    server = lxd_server[1]
+    popen = mocker.patch('ansible_collections.community.general.plugins.connection.lxd.Popen')
+    assert not conn.has_pipelining
+
+    assert conn.exec_command('echo hello') == (3, u'out: echo hello', u'')
+    assert conn.exec_command('true')[0] == 3
+    assert server.commands[0] == {'command': ['/bin/sh', '-c', 'echo hello'], 'record-output': True,
+                                  'wait-for-websocket': False, 'interactive': False}
+    assert ('POST', '/1.0/instances/c1/exec', {'project': ['web']}) in server.requests
+    # the recorded output was removed, and everything went through one connection
+    assert '/logs/stdout' not in server.files
+    assert len(server.connections) == 1
+    assert not popen.called
+
+
+def test_api_put_and_fetch(conn, lxd_server, tmp_path):
+    server = lxd_server[1]
+    src = tmp_path / 'src'
+    src.write_bytes(b'x' * 200000)
+    os.chmod(str(src), 0o640)
+    conn.put_file(str(src), '/tmp/module.py')
+    assert server.files['/tmp/module.py'] == b'x' * 200000
+    assert server.modes['/tmp/module.py'] == '0640'
+
+    dest = tmp_path / 'dest'
+    conn.fetch_file('/tmp/module.py', str(dest))
+    assert dest.read_bytes() == b'x' * 200000
+    assert len(server.connections) == 1
+
+    with pytest.raises(AnsibleConnectionFailure, match='not found'):
+        conn.fetch_file('/tmp/missing', str(dest))
+
+
+def test_api_instance_not_found(conn):
+    conn.set_option('remote_addr', 'c2')
+    with pytest.raises(AnsibleConnectionFailure, match='instance not found: c2'):
+        conn.exec_command('true')
@@ -0,0 +1,85 @@
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import subprocess
+
+import pytest
+
+from io import StringIO
+
+from ansible.playbook.play_context import PlayContext
+from ansible.plugins.loader import connection_loader
+
+
+FAKE_QVM_RUN = u'''#!/bin/sh
+# qvm-run --pass-io --service [-u USER] VM SERVICE reads the commands on stdin
+# with bash, like qubes.VMShell,
+# qvm-run --pass-io VM COMMAND runs COMMAND
+if [ "$2" = "--service" ]; then
+    exec bash
+fi
+for last; do :; done
+exec bash -c "$last"
+'''
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    qvm_run = bin_dir / 'qvm-run'
+    qvm_run.write_text(FAKE_QVM_RUN)
+    qvm_run.chmod(0o755)
+    monkeypatch.setenv('PATH', str(bin_dir) + os.pathsep + os.environ['PATH'])
+
+    play_context = PlayContext()
+    play_context.remote_addr = 'work'
+    conn = connection_loader.get('community.general.qubes', play_context, StringIO())
+    conn.set_options(direct={'remote_addr': 'work'})
+    yield conn
+    conn.close()
+
+
+def test_exec_command_input(conn):
+    assert conn.exec_command('cat; echo err >&2', in_data=b'module data') == (0, b'module data', b'err\n')
+
+
+def test_persistent_shell(conn, mocker):
+    conn.set_option('persistent_shell', True)
+    popen = mocker.spy(subprocess, 'Popen')
+
+    assert conn.exec_command('echo one; exit 4') == (4, b'one\n', b'')
+    assert conn.exec_command('cat', in_data=b'two\n') == (0, b'two\n', b'')
+    assert popen.call_count == 1
+    assert popen.call_args[0][0][-2:] == [b'work', b'qubes.VMShell']
+
+
+@pytest.mark.parametrize('compression', [False, True])
+def test_put_and_fetch_file(conn, tmp_path, mocker, compression):
+    conn.set_option('transfer_compression', compression)
+    process = mocker.spy(conn, '_qubes_process')
+    src = tmp_path / 'src'
+    src.write_bytes(b'compressible line\n' * 20000)
+
+    conn.put_file(str(src), str(tmp_path / 'dest'))
+    assert (tmp_path / 'dest').read_bytes() == src.read_bytes()
+    assert process.call_args_list[0][0][0].startswith('gzip -dc > ' if compression else 'cat > ')
+
+    conn.fetch_file(str(tmp_path / 'dest'), str(tmp_path / 'fetched'))
+    assert (tmp_path / 'fetched').read_bytes() == src.read_bytes()
+
+
+def test_put_incompressible_file(conn, tmp_path, mocker):
+    conn.set_option('transfer_compression', True)
+    process = mocker.spy(conn, '_qubes_process')
+    src = tmp_path / 'src'
+    src.write_bytes(os.urandom(100000))
+
+    conn.put_file(str(src), str(tmp_path / 'dest'))
+    assert (tmp_path / 'dest').read_bytes() == src.read_bytes()
+    assert process.call_args[0][0].startswith('cat > ')
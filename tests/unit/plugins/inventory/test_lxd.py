@@ -104,3 +104,59 @@ def test_build_inventory_groups_with_no_groupselection(inventory):
         if generated_data[key] != value:
             eq = False
     assert eq
+
+
+class FakeSocket(object):
+    """Serves the instances of the test data like the LXD API does"""
+
+    def __init__(self, data):
+        self.instances = data['instances']
+        self.requests = []
+
+    def do(self, method, url):
+        self.requests.append(url)
+        path = url.split('?')[0]
+        if path == '/1.0/instances':
+            assert 'recursion=2' in url
+            metadata = []
+            for name, branches in self.instances.items():
+                instance = dict(branches['instances']['metadata'])
+                instance['state'] = branches['state']['metadata']
+                instance['snapshots'] = []
+                metadata.append(instance)
+            return {'type': 'sync', 'status': 'Success', 'status_code': 200, 'metadata': metadata}
+        parts = path.split('/')
+        branch = 'state' if len(parts) == 5 else 'instances'
+        return self.instances[parts[3]][branch]
+
+
+def test_get_instance_data_recursive(inventory):
+    """Fetch all instances with a single request and check that the hosts are built as before."""
+    socket = FakeSocket(inventory.data)
+    networks = inventory.data['networks']
+    inventory.project = 'default'
+    inventory.socket = socket
+    inventory.data = {}
+    inventory.get_instance_data_recursive()
+    inventory.data['networks'] = networks
+
+    assert socket.requests == ['/1.0/instances?recursion=2&project=default']
+    assert 'snapshots' not in inventory.data['instances']['vlantest']['instances']['metadata']
+    assert inventory.data['instances']['vlantest']['state']['metadata'] == socket.instances['vlantest']['state']['metadata']
+
+    inventory._populate()
+    generated_data = inventory.inventory.get_host('vlantest').get_vars()
+    for key, value in HOST_COMPARATIVE_DATA.items():
+        assert generated_data[key] == value
+
+
+def test_get_instance_data(inventory):
+    """Fetch the instances one by one and check that all branches are kept."""
+    socket = FakeSocket(inventory.data)
+    inventory.project = 'default'
+    inventory.socket = socket
+    inventory.data = {}
+    inventory.get_instance_data(['vlantest'])
+
+    assert len(socket.requests) == 2
+    assert inventory.data['instances'] == socket.instances
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import io
+import time
+
+import pytest
+
+from ansible.inventory.data import InventoryData
+from ansible.parsing.dataloader import DataLoader
+from ansible.template import Templar
+from ansible_collections.community.general.plugins.inventory import nmap
+from ansible_collections.community.general.plugins.inventory.nmap import InventoryModule
+
+
+XML_OUTPUT = b"""<?xml version="1.0" encoding="UTF-8"?>
+<nmaprun scanner="nmap" args="nmap -oX - 10.0.0.0/30">
+<host><status state="up" reason="arp-response"/>
+<address addr="10.0.0.1" addrtype="ipv4"/><address addr="52:54:00:12:34:56" addrtype="mac"/>
+<hostnames><hostname name="gw.example.com" type="PTR"/></hostnames>
+<ports><port protocol="tcp" portid="22"><state state="open"/><service name="ssh"/></port>
+<port protocol="tcp" portid="443"><state state="open"/><service name="https"/></port></ports>
+</host>
+<host><status state="up" reason="arp-response"/>
+<address addr="10.0.0.2" addrtype="ipv4"/>
+<hostnames><hostname name="2.0.0.10.in-addr.arpa" type="PTR"/></hostnames>
+</host>
+<host><status state="down" reason="no-response"/>
+<address addr="10.0.0.3" addrtype="ipv4"/>
+</host>
+<runstats><finished time="1700000000"/></runstats>
+</nmaprun>
+"""
+
+TEXT_OUTPUT = b"""Nmap scan report for gw.example.com (10.0.0.1)
+PORT    STATE SERVICE
+22/tcp  open  ssh
+443/tcp open  https
+Nmap scan report for 10.0.0.2
+"""
+
+EXPECTED = [
+    {'name': 'gw.example.com', 'ip': '10.0.0.1', 'ports': [
+        {'port': '22', 'protocol': 'tcp', 'state': 'open', 'service': 'ssh'},
+        {'port': '443', 'protocol': 'tcp', 'state': 'open', 'service': 'https'}]},
+    {'name': '10.0.0.2', 'ip': '10.0.0.2'},
+]
+
+
+class FakePopen(object):
+    commands = []
+    output = b''
+
+    def __init__(self, cmd, stdout=None, stderr=None):
+        FakePopen.commands.append(cmd)
+        self.stdout = io.BytesIO(FakePopen.output)
+        self.returncode = 0
+
+    def communicate(self):
+        return self.stdout.read(), b''
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self):
+        return self.returncode
+
+
+@pytest.fixture
+def inventory(monkeypatch):
+    monkeypatch.setattr(nmap, 'Popen', FakePopen)
+    FakePopen.commands = []
+    plugin = InventoryModule()
+    plugin.inventory = InventoryData()
+    plugin.templar = Templar(loader=DataLoader())
+    plugin._nmap = 'nmap'
+    plugin._options = {
+        'address': '10.0.0.0/30', 'sudo': False, 'port': None, 'ports': True, 'ipv4': True, 'ipv6': True,
+        'exclude': None, 'dns_resolve': False, 'udp_scan': False, 'icmp_timestamp': False, 'open': False,
+        'use_arp_ping': True, 'output_format': 'xml', 'timing': None, 'min_parallelism': None,
+        'max_parallelism': None, 'max_hostgroup': None, 'rescan_ttl': 0,
+        'strict': False, 'compose': {}, 'groups': {}, 'keyed_groups': [], 'leading_separator': True, 'use_extra_vars': False,
+    }
+    return plugin
+
+
+def test_scan_xml(inventory):
+    FakePopen.output = XML_OUTPUT
+    inventory._options.update(timing=4, max_hostgroup=64)
+    assert inventory._scan_and_populate(['10.0.0.0/30']) == EXPECTED
+
+    cmd = FakePopen.commands[0]
+    assert cmd[-3:] == ['-oX', '-', '10.0.0.0/30']
+    assert '-T4' in cmd
+    assert cmd[cmd.index('--max-hostgroup') + 1] == '64'
+    assert inventory.inventory.get_host('gw.example.com').vars['ip'] == '10.0.0.1'
+
+
+def test_scan_text(inventory):
+    FakePopen.output = TEXT_OUTPUT
+    inventory._options['output_format'] = 'text'
+    assert inventory._scan_and_populate(['10.0.0.0/30']) == EXPECTED
+    assert '-oX' not in FakePopen.commands[0]
+
+
+def test_rescan(inventory):
+    FakePopen.output = XML_OUTPUT
+    now = time.time()
+    cached = [{'name': 'old', 'ip': '10.0.0.9'}, {'name': 'fresh', 'ip': '10.0.0.8'}, EXPECTED[1]]
+    scanned = {'10.0.0.9': now - 100, '10.0.0.8': now - 10}
+
+    results, scanned, changed = inventory._rescan(cached, scanned, 60)
+
+    # only the stale hosts are scanned, and hosts which are not up any more are removed
+    assert changed
+    assert FakePopen.commands[0][-2] == '-iL'
+    assert [host['name'] for host in results] == ['fresh', 'gw.example.com', '10.0.0.2']
+    assert scanned['10.0.0.8'] == now - 10
+    assert scanned['10.0.0.1'] >= now
+    assert '10.0.0.9' not in scanned
+    assert inventory.inventory.get_host('fresh') is not None
+    assert inventory.inventory.get_host('old') is None
+
+
+class FakeCache(dict):
+    """Inventory cache that records which keys are written"""
+
+    def __init__(self):
+        super(FakeCache, self).__init__()
+        self.writes = []
+
+    def __setitem__(self, key, value):
+        self.writes.append(key)
+        super(FakeCache, self).__setitem__(key, value)
+
+
+def test_rescan_full_scan_after_cache_timeout(inventory, mocker):
+    FakePopen.output = XML_OUTPUT
+    inventory._options.update({'cache': True, 'rescan_ttl': 60, 'cache_timeout': 3600})
+    inventory._cache = FakeCache()
+    mocker.patch.object(nmap, 'get_bin_path', return_value='nmap')
+    mocker.patch.object(inventory, '_read_config_data')
+    now = mocker.patch.object(nmap.time, 'time', return_value=1000)
+
+    def parse(at):
+        now.return_value = at
+        del FakePopen.commands[:]
+        del inventory._cache.writes[:]
+        inventory.parse(InventoryData(), DataLoader(), 'nmap.yml')
+        return ['-iL' in command for command in FakePopen.commands]
+
+    # the first read scans address and caches the hosts
+    assert parse(1000) == [False]
+    # nothing is stale, so nothing is scanned or written
+    assert parse(1030) == []
+    assert inventory._cache.writes == []
+    # stale hosts are scanned again, but this is no full scan
+    assert parse(2000) == [True]
+    assert parse(3000) == [True]
+    # the last full scan is older than cache_timeout, new hosts in address are looked for
+    assert parse(4700) == [False]
+    assert inventory._cache[inventory.get_cache_key('nmap.yml') + '_scanned']['full_scan'] == 4700
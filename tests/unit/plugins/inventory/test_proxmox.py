@@ -8,6 +8,8 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import time
+
 import pytest
 
 from ansible.inventory.data import InventoryData
@@ -784,3 +786,71 @@ def test_populate_exclude_nodes(inventory, mocker):
     # make sure that nodes are not in the "ungrouped" group
     for node in ['testnode', 'testnode2']:
         assert node not in inventory.inventory.get_groups_dict()["ungrouped"]
+
+
+def get_json_cluster_resources(url):
+    if url == "https://localhost:8006/api2/json/cluster/resources?type=vm":
+        resources = []
+        for vmtype in ('lxc', 'qemu'):
+            for item in get_json("https://localhost:8006/api2/json/nodes/testnode/%s" % vmtype):
+                item = dict(item, node='testnode', type=vmtype)
+                resources.append(item)
+        return resources
+    return get_json(url)
+
+
+def test_populate_cluster_resources_concurrency(mocker):
+    inventory = InventoryModule()
+    inventory.inventory = InventoryData()
+    inventory.proxmox_user = 'root@pam'
+    inventory.proxmox_password = 'password'
+    inventory.proxmox_url = 'https://localhost:8006'
+    inventory.group_prefix = 'proxmox_'
+    inventory.facts_prefix = 'proxmox_'
+    inventory.strict = False
+    inventory.exclude_nodes = False
+
+    opts = {
+        'group_prefix': 'proxmox_',
+        'facts_prefix': 'proxmox_',
+        'want_facts': True,
+        'want_proxmox_nodes_ansible_host': True,
+        'qemu_extended_statuses': False,
+        'exclude_nodes': False,
+        'use_cluster_resources': True,
+        'concurrency': 4,
+    }
+
+    inventory._get_auth = mocker.MagicMock(side_effect=get_auth)
+    inventory._get_json = mocker.MagicMock(side_effect=get_json_cluster_resources)
+    inventory._get_vm_snapshots = mocker.MagicMock(side_effect=get_vm_snapshots)
+    inventory.get_option = mocker.MagicMock(side_effect=get_option(opts))
+    inventory._can_add_host = mocker.MagicMock(return_value=True)
+    inventory._populate()
+
+    requested = [call[0][0] for call in inventory._get_json.call_args_list]
+    # the guests are listed with a single request and their status is taken from it
+    assert not [url for url in requested if url.endswith(('/lxc', '/qemu', '/status/current'))]
+    assert "https://localhost:8006/api2/json/nodes/testnode/qemu/101/agent/network-get-interfaces" in requested
+
+    host_lxc = inventory.inventory.get_host('test-lxc')
+    assert host_lxc.get_vars()['proxmox_status'] == 'running'
+    assert inventory.inventory.groups['proxmox_all_lxc'].hosts == [host_lxc]
+    assert 'eth0' in [d['name'] for d in inventory.inventory.get_host('test-qemu').get_vars()['proxmox_agent_interfaces']]
+    assert inventory.inventory.get_host('test-qemu-template') is None
+    assert inventory.inventory.groups['proxmox_pool_test'].hosts == [inventory.inventory.get_host('test-qemu')]
+
+
+def test_cache_ttls(mocker):
+    inventory = InventoryModule()
+    inventory.cache_key = 'key'
+    inventory.use_cache = True
+    inventory.get_option = mocker.MagicMock(side_effect=get_option({'cache_ttls': {'config': 60}}))
+    config_url = 'https://localhost:8006/api2/json/nodes/testnode/qemu/101/config'
+    snapshot_url = 'https://localhost:8006/api2/json/nodes/testnode/qemu/101/snapshot'
+    inventory._cache[inventory.cache_key] = {
+        config_url: {}, snapshot_url: [], '_fetched': {config_url: time.time() - 120, snapshot_url: time.time() - 120},
+    }
+
+    assert not inventory._is_cached(config_url)
+    assert inventory._is_cached(snapshot_url)
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import pytest
+
+from ansible.inventory.data import InventoryData
+from ansible.parsing.dataloader import DataLoader
+from ansible.template import Templar
+from ansible_collections.community.general.plugins.inventory import virtualbox
+from ansible_collections.community.general.plugins.inventory.virtualbox import InventoryModule
+
+
+LIST_VMS = b"""Name:                        web1
+Groups:                      /webservers
+Guest OS:                    Ubuntu (64-bit)
+Memory size:                 1024MB
+Name:                        db1
+Groups:                      /
+Guest OS:                    Debian (64-bit)
+Memory size:                 2048MB
+""".splitlines()
+
+ENUMERATE = {
+    # VirtualBox 7
+    b'web1': b"""/VirtualBox/GuestInfo/Net/0/V4/IP = '192.168.56.10' @ 2023-11-14T22:13:20.000000000Z
+/VirtualBox/GuestInfo/OS/LoggedInUsersList = 'alice,bob' @ 2023-11-14T22:13:20.000000000Z [TRANSIENT, RDONLYGUEST]
+""",
+    # VirtualBox 6
+    b'db1': b"""Name: /VirtualBox/GuestInfo/Net/0/V4/IP, value: 192.168.56.11, timestamp: 1700000000000000000, flags:
+Name: /VirtualBox/GuestInfo/OS/LoggedInUsersList, value: carol, timestamp: 1700000000000000000, flags: TRANSIENT, RDONLYGUEST
+""",
+}
+
+
+class FakePopen(object):
+    calls = []
+
+    def __init__(self, cmd, stdout=None):
+        FakePopen.calls.append(cmd[1:])
+        self.returncode = 0
+        if cmd[1:3] == [b'guestproperty', b'enumerate']:
+            self.output = ENUMERATE[cmd[3]]
+        else:
+            self.returncode = 1
+            self.output = b''
+
+    def communicate(self):
+        return self.output, b''
+
+
+@pytest.fixture
+def inventory(monkeypatch):
+    monkeypatch.setattr(virtualbox, 'Popen', FakePopen)
+    FakePopen.calls = []
+    plugin = InventoryModule()
+    plugin.inventory = InventoryData()
+    plugin.templar = Templar(loader=DataLoader())
+    plugin._vbox_path = b'VBoxManage'
+    plugin._options = {
+        'network_info_path': '/VirtualBox/GuestInfo/Net/0/V4/IP',
+        'query': {'logged_in_users': '/VirtualBox/GuestInfo/OS/LoggedInUsersList'},
+        'concurrency': 4,
+        'strict': False,
+        'compose': {},
+        'groups': {},
+        'keyed_groups': [],
+        'leading_separator': True,
+        'use_extra_vars': False,
+    }
+    return plugin
+
+
+def test_populate_from_source(inventory):
+    results = inventory._populate_from_source(LIST_VMS)
+
+    assert results['webservers'] == {'hosts': ['web1']}
+    assert results['ungrouped'] == {'hosts': ['db1']}
+
+    web1 = inventory.inventory.get_host('web1').vars
+    assert web1['ansible_host'] == '192.168.56.10'
+    assert web1['logged_in_users'] == 'alice,bob'
+    assert web1['vbox_Guest_OS'] == 'Ubuntu (64-bit)'
+    db1 = inventory.inventory.get_host('db1').vars
+    assert db1['ansible_host'] == '192.168.56.11'
+    assert db1['logged_in_users'] == 'carol'
+
+    # one call per VM for all properties
+    assert sorted(call[2] for call in FakePopen.calls) == [b'db1', b'web1']
+
+
+def test_enumerate_failure_falls_back_to_get(inventory, monkeypatch):
+    monkeypatch.setattr(inventory, '_enumerate_vbox_data', lambda host: None)
+    monkeypatch.setattr(inventory, '_query_vbox_data', lambda host, path: '%s:%s' % (host, path))
+    inventory._options['concurrency'] = 1
+    inventory._populate_from_source(LIST_VMS)
+
+    assert inventory.inventory.get_host('db1').vars['ansible_host'] == 'db1:/VirtualBox/GuestInfo/Net/0/V4/IP'
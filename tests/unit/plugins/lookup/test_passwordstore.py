@@ -0,0 +1,104 @@
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import subprocess
+
+import pytest
+
+from ansible.errors import AnsibleError
+from ansible.plugins.loader import lookup_loader
+
+from ansible_collections.community.general.plugins.lookup import passwordstore
+
+
+class FakePass(object):
+    """Stands in for check_output2() running pass on a store kept in a dict."""
+
+    def __init__(self, directory, entries):
+        self.directory = directory
+        self.entries = dict(entries)
+        self.calls = []
+        for passname in entries:
+            self._touch(passname)
+
+    def _touch(self, passname):
+        path = self.directory.joinpath(passname + '.gpg')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+
+    def __call__(self, cmd, input=None, env=None):
+        self.calls.append(cmd[1])
+        if cmd[1] == 'show':
+            if cmd[2] not in self.entries:
+                raise subprocess.CalledProcessError(1, cmd, 'Error: {0} is not in the password store.'.format(cmd[2]))
+            return self.entries[cmd[2]].encode()
+        if cmd[1] == 'insert':
+            self.entries[cmd[-1]] = input
+            self._touch(cmd[-1])
+            return b''
+        raise AssertionError('unexpected command {0}'.format(cmd))
+
+
+@pytest.fixture
+def fake_pass(mocker, tmp_path):
+    fake = FakePass(tmp_path, {
+        'example/one': 'first\nuser: alice\n',
+        'example/two': 'second\n',
+        'other': 'third\n',
+    })
+    mocker.patch.object(passwordstore, 'check_output2', side_effect=fake)
+    mocker.patch.dict(passwordstore._PASS_CACHE, clear=True)
+    return fake
+
+
+def lookup(fake, terms, **kwargs):
+    kwargs.setdefault('directory', str(fake.directory))
+    return lookup_loader.get('community.general.passwordstore').run(terms, {}, **kwargs)
+
+
+def test_cache(fake_pass):
+    assert lookup(fake_pass, ['example/one']) == ['first']
+    assert lookup(fake_pass, ['example/one']) == ['first']
+    assert fake_pass.calls == ['show', 'show']
+
+    del fake_pass.calls[:]
+    assert lookup(fake_pass, ['example/one'], cache=True) == ['first']
+    assert lookup(fake_pass, ['example/one'], cache=True, subkey='user') == ['alice']
+    assert fake_pass.calls == ['show']
+
+
+def test_cache_ttl(fake_pass, mocker):
+    now = mocker.patch.object(passwordstore.time, 'time', return_value=1000)
+    lookup(fake_pass, ['other'], cache=True, cache_ttl='10s')
+    now.return_value = 1009
+    lookup(fake_pass, ['other'], cache=True, cache_ttl='10s')
+    assert fake_pass.calls == ['show']
+    now.return_value = 1010
+    lookup(fake_pass, ['other'], cache=True, cache_ttl='10s')
+    assert fake_pass.calls == ['show', 'show']
+
+
+def test_cache_overwrite_and_create(fake_pass):
+    lookup(fake_pass, ['example/two'], cache=True)
+    # overwrite reads the current content again before writing
+    assert lookup(fake_pass, ['example/two'], cache=True, overwrite=True, userpass='new') == ['new']
+    assert fake_pass.calls == ['show', 'show', 'insert']
+    assert lookup(fake_pass, ['example/two'], cache=True) == ['new']
+    assert fake_pass.calls == ['show', 'show', 'insert']
+
+    # missing entries are not cached, created ones are
+    del fake_pass.calls[:]
+    assert lookup(fake_pass, ['example/new'], cache=True, missing='empty') == [None]
+    assert lookup(fake_pass, ['example/new'], cache=True, create=True, userpass='created') == ['created']
+    assert lookup(fake_pass, ['example/new'], cache=True) == ['created']
+    # create looks the password up again under the write lock
+    assert fake_pass.calls == ['show', 'show', 'show', 'insert']
+
+
+def test_cache_ttl_invalid(fake_pass):
+    with pytest.raises(AnsibleError, match='10x is not a correct value for cache_ttl'):
+        lookup(fake_pass, ['other'], cache=True, cache_ttl='10x')
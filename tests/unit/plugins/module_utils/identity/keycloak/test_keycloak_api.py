@@ -0,0 +1,169 @@
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import threading
+
+import pytest
+
+from ansible.module_utils.six import StringIO
+from ansible.module_utils.six.moves import BaseHTTPServer
+from ansible.module_utils.six.moves.urllib.error import HTTPError
+from ansible.module_utils.six.moves.urllib.parse import urlparse, parse_qs
+
+from ansible_collections.community.general.tests.unit.compat.mock import MagicMock
+from ansible_collections.community.general.plugins.module_utils.identity.keycloak.keycloak import (
+    KeycloakAPI,
+    KeycloakSession,
+)
+
+OPEN_URL = 'ansible_collections.community.general.plugins.module_utils.identity.keycloak.keycloak.open_url'
+BASE = 'http://keycloak.url/auth/admin/realms/master'
+
+
+def make_api(**params):
+    module = MagicMock()
+    module.params = dict(auth_keycloak_url='http://keycloak.url/auth', validate_certs=True,
+                         connection_timeout=10, http_agent='Ansible', http_keep_alive=False)
+    module.params.update(params)
+    module.fail_json.side_effect = AssertionError
+    return KeycloakAPI(module, {'Authorization': 'Bearer token'})
+
+
+@pytest.fixture()
+def server(mocker):
+    """Fake Keycloak answering from a dict of path -> (status, body), recording every request."""
+    requests = []
+    routes = {}
+
+    def _open_url(url, method='GET', data=None, **kwargs):
+        parsed = urlparse(url)
+        requests.append((method, parsed.path, parse_qs(parsed.query)))
+        status, body = routes.get((method, parsed.path), (404, None))
+        if status >= 400:
+            raise HTTPError(url=url, code=status, msg='Error', hdrs='', fp=StringIO(''))
+        return StringIO(json.dumps(body) if body is not None else '')
+
+    mocker.patch(OPEN_URL, side_effect=_open_url)
+    return routes, requests
+
+
+def test_clientscope_names_are_indexed_once(server):
+    routes, requests = server
+    routes[('GET', '/auth/admin/realms/master/client-scopes')] = (200, [{'id': '1', 'name': 'email'}, {'id': '2', 'name': 'profile'}])
+    routes[('GET', '/auth/admin/realms/master/client-scopes/1')] = (200, {'id': '1', 'name': 'email'})
+    routes[('GET', '/auth/admin/realms/master/client-scopes/2')] = (200, {'id': '2', 'name': 'profile'})
+    routes[('POST', '/auth/admin/realms/master/client-scopes')] = (201, None)
+    api = make_api()
+
+    assert api.get_clientscope_by_name('email')['id'] == '1'
+    assert api.get_clientscope_by_name('profile')['id'] == '2'
+    assert api.get_clientscope_by_name('missing') is None
+    assert len([r for r in requests if r[1].endswith('/client-scopes')]) == 1
+
+    # creating a clientscope drops the index
+    api.create_clientscope({'name': 'new'})
+    api.get_clientscope_by_name('email')
+    assert len([r for r in requests if r[1].endswith('/client-scopes') and r[0] == 'GET']) == 2
+
+
+def test_group_lookup_uses_server_side_search(server):
+    routes, requests = server
+    routes[('GET', '/auth/admin/realms/master/groups')] = (200, [
+        {'id': 'a', 'name': 'admins-old', 'subGroups': []},
+        {'id': 'b', 'name': 'admins', 'subGroups': []},
+    ])
+    routes[('GET', '/auth/admin/realms/master/groups/b')] = (200, {'id': 'b', 'name': 'admins', 'subGroups': []})
+    api = make_api()
+
+    assert api.get_group_by_name('admins')['id'] == 'b'
+    assert api.get_group_by_name('admins')['id'] == 'b'
+
+    searches = [r for r in requests if r[1].endswith('/groups')]
+    assert len(searches) == 1
+    assert searches[0][2] == {'search': ['admins'], 'exact': ['true'], 'briefRepresentation': ['true'],
+                              'first': ['0'], 'max': ['100']}
+
+
+def test_paged_lookup_fetches_all_pages(server):
+    routes, requests = server
+    api = make_api()
+    pages = [[{'id': str(i), 'name': 'g'} for i in range(100)], [{'id': 'last', 'name': 'g'}]]
+    api._request = MagicMock(side_effect=lambda url, **kwargs: StringIO(json.dumps(pages.pop(0))))
+
+    groups = api.search_groups('g')
+    assert len(groups) == 101
+    urls = [call[0][0] for call in api._request.call_args_list]
+    assert 'first=0' in urls[0] and 'first=100' in urls[1]
+
+
+def test_client_ids_are_memoised_and_invalidated(server):
+    routes, requests = server
+    routes[('GET', '/auth/admin/realms/master/clients')] = (200, [{'id': 'uuid', 'clientId': 'web'}])
+    routes[('DELETE', '/auth/admin/realms/master/clients/uuid')] = (204, None)
+    api = make_api()
+
+    assert api.get_client_id('web') == 'uuid'
+    assert api.get_client_id('web') == 'uuid'
+    assert len(requests) == 1
+
+    api.delete_client('uuid')
+    api.get_client_id('web')
+    assert len([r for r in requests if r[0] == 'GET']) == 2
+
+
+class KeepAliveHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.connections.add(self.client_address)
+        if self.path.endswith('/missing'):
+            body = b'{"error": "not found"}'
+            self.send_response(404)
+        else:
+            body = json.dumps({'path': self.path, 'agent': self.headers.get('User-Agent')}).encode()
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def http_server():
+    httpd = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    httpd.connections = set()
+    thread = threading.Thread(target=httpd.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_session_reuses_connection(http_server, monkeypatch):
+    monkeypatch.delenv('http_proxy', raising=False)
+    monkeypatch.delenv('HTTP_PROXY', raising=False)
+    url = 'http://127.0.0.1:%d/auth/admin/realms/master' % http_server.server_address[1]
+    session = KeycloakSession()
+    try:
+        for dummy in range(3):
+            response = session.open(url + '/groups?first=0', http_agent='Ansible')
+            assert json.loads(response.read()) == {'path': '/auth/admin/realms/master/groups?first=0', 'agent': 'Ansible'}
+            assert response.getcode() == 200
+
+        with pytest.raises(HTTPError) as e:
+            session.open(url + '/missing')
+        assert e.value.code == 404
+        assert json.loads(e.value.read()) == {'error': 'not found'}
+    finally:
+        session.close()
+
+    assert len(http_server.connections) == 1
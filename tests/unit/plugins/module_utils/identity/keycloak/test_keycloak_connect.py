@@ -5,15 +5,20 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import json
+import time
+
 import pytest
 from itertools import count
 
 from ansible_collections.community.general.plugins.module_utils.identity.keycloak.keycloak import (
     get_token,
     KeycloakError,
+    _token_cache_path,
 )
 from ansible.module_utils.six import StringIO
 from ansible.module_utils.six.moves.urllib.error import HTTPError
+from ansible.module_utils.six.moves.urllib.parse import parse_qsl
 
 module_params_creds = {
     'auth_keycloak_url': 'http://keycloak.url/auth',
@@ -163,3 +168,69 @@ def test_json_without_token_returned(mock_json_without_token_returned):
         'Could not obtain access token from http://keycloak.url'
         '/auth/realms/master/protocol/openid-connect/token'
     )
+
+
+@pytest.fixture()
+def mock_token_endpoint(mocker):
+    responses = []
+
+    def _token_endpoint(url, method, data, **kwargs):
+        payload = dict(parse_qsl(data))
+        responses.append(payload)
+        if payload['grant_type'] == 'refresh_token' and payload['refresh_token'] == 'revoked':
+            raise HTTPError(url=url, code=400, msg='Bad Request', hdrs='', fp=StringIO(''))
+        return StringIO(json.dumps({
+            'access_token': 'token%d' % len(responses),
+            'expires_in': 300,
+            'refresh_token': 'refresh%d' % len(responses),
+            'refresh_expires_in': 1800,
+        }))
+
+    mocker.patch(
+        'ansible_collections.community.general.plugins.module_utils.identity.keycloak.keycloak.open_url',
+        side_effect=_token_endpoint,
+    )
+    return responses
+
+
+def cached_params(tmp_path, **kwargs):
+    params = dict(module_params_creds, token_cache=True, token_cache_dir=str(tmp_path))
+    params.update(kwargs)
+    return params
+
+
+def test_token_cache_reuses_token(mock_token_endpoint, tmp_path):
+    assert get_token(cached_params(tmp_path))['Authorization'] == 'Bearer token1'
+    assert get_token(cached_params(tmp_path))['Authorization'] == 'Bearer token1'
+    assert len(mock_token_endpoint) == 1
+
+    cache_files = [p for p in tmp_path.iterdir() if p.name.startswith('token-')]
+    assert len(cache_files) == 1
+    assert oct(cache_files[0].stat().st_mode & 0o777) == oct(0o600)
+
+
+def test_token_cache_keyed_by_credentials(mock_token_endpoint, tmp_path):
+    get_token(cached_params(tmp_path))
+    assert get_token(cached_params(tmp_path, auth_password='other'))['Authorization'] == 'Bearer token2'
+    assert len(mock_token_endpoint) == 2
+
+
+def test_token_cache_uses_refresh_grant(mock_token_endpoint, tmp_path, mocker):
+    get_token(cached_params(tmp_path))
+    later = time.time() + 300
+    mocker.patch('ansible_collections.community.general.plugins.module_utils.identity.keycloak.keycloak.time.time', return_value=later)
+
+    assert get_token(cached_params(tmp_path))['Authorization'] == 'Bearer token2'
+    assert mock_token_endpoint[1]['grant_type'] == 'refresh_token'
+    assert mock_token_endpoint[1]['refresh_token'] == 'refresh1'
+    assert 'password' not in mock_token_endpoint[1]
+
+
+def test_token_cache_logs_in_when_refresh_fails(mock_token_endpoint, tmp_path, mocker):
+    params = cached_params(tmp_path)
+    path = _token_cache_path(params, str(tmp_path))
+    with open(path, 'w') as f:
+        json.dump({'access_token': 'old', 'expires_at': 0, 'refresh_token': 'revoked', 'refresh_expires_at': None}, f)
+
+    assert get_token(params)['Authorization'] == 'Bearer token2'
+    assert [r['grant_type'] for r in mock_token_endpoint] == ['refresh_token', 'password']
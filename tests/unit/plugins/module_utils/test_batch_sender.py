@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import gzip
+import threading
+import time
+
+from ansible_collections.community.general.plugins.module_utils._batch_sender import BatchSender, gzip_compress
+
+
+def test_batch_sender_retries():
+    calls = []
+
+    def send(batch):
+        calls.append(list(batch))
+        if len(calls) == 1:
+            raise Exception('unavailable')
+
+    sender = BatchSender(send, batch_size=10, flush_interval=60, retry_delay=0)
+    sender.put('a')
+    sender.put('b')
+    assert sender.flush(timeout=10)
+    assert calls == [['a', 'b'], ['a', 'b']]
+    assert sender.stats['sent'] == 2
+    assert sender.stats['failed'] == 0
+
+
+def test_batch_sender_drops_when_full():
+    release = threading.Event()
+    errors = []
+
+    def send(batch):
+        release.wait(10)
+        raise Exception('failed')
+
+    sender = BatchSender(send, queue_size=1, batch_size=1, retries=0, on_error=errors.append)
+    sender.put('a')
+    # wait for the worker to pick up the first payload
+    while sender._queue.qsize():
+        time.sleep(0.01)
+    assert sender.put('b')
+    assert not sender.put('c')
+    release.set()
+    assert sender.flush(timeout=10)
+    assert sender.stats['dropped'] == 1
+    assert sender.stats['failed'] == 2
+    assert len(errors) == 2
+
+
+def test_batch_sender_drop_oldest_and_size():
+    release = threading.Event()
+    calls = []
+
+    def send(batch):
+        release.wait(10)
+        calls.append(list(batch))
+
+    sender = BatchSender(send, queue_size=2, batch_size=10, batch_bytes=4, flush_interval=60, overflow='drop_oldest')
+    sender.put(('host', 'aaaa'))
+    while sender._queue.qsize():
+        time.sleep(0.01)
+    for payload in ('bb', 'cc', 'dd'):
+        assert sender.put(('host', payload))
+    release.set()
+    assert sender.flush(timeout=10)
+    assert calls == [[('host', 'aaaa')], [('host', 'cc'), ('host', 'dd')]]
+    assert sender.stats['dropped'] == 1
+
+
+def test_gzip_compress():
+    assert gzip.decompress(gzip_compress('{"event": 1}')) == b'{"event": 1}'
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import io
+import json
+
+import pytest
+
+from ansible.module_utils.six.moves import http_client
+
+from ansible_collections.community.general.plugins.module_utils.lxd import LXDClient, LXDClientException
+
+
+class FakeResponse(object):
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return json.dumps(self.data).encode('utf-8')
+
+
+class FakeConnection(object):
+    """Connection which was closed by the server after the first ``served`` requests"""
+
+    def __init__(self, served=1):
+        self.served = served
+        self.requests = []
+        self.closed = 0
+
+    def request(self, method, url, body=None, headers=None):
+        self.requests.append((method, url, headers))
+
+    def getresponse(self):
+        if len(self.requests) == self.served + 1 and not self.closed:
+            raise http_client.BadStatusLine('')
+        return FakeResponse({'type': 'sync', 'metadata': {'url': self.requests[-1][1]}})
+
+    def close(self):
+        self.closed += 1
+
+
+@pytest.fixture
+def client():
+    lxd = LXDClient('unix:/nonexistent')
+    lxd.connection = FakeConnection()
+    return lxd
+
+
+def test_keep_alive(client):
+    assert client.do('GET', '/1.0')['metadata'] == {'url': '/1.0'}
+    assert client.connection.requests[0][2]['Connection'] == 'keep-alive'
+    assert client.connection.closed == 0
+
+
+def test_reconnect_get(client):
+    client.do('GET', '/1.0')
+    assert client.do('GET', '/1.0/instances')['metadata'] == {'url': '/1.0/instances'}
+    assert client.connection.closed == 1
+    assert len(client.connection.requests) == 3
+
+
+def test_no_resend_post(client):
+    client.do('GET', '/1.0')
+    with pytest.raises(LXDClientException):
+        client.do('POST', '/1.0/instances', body_json={})
+    assert len(client.connection.requests) == 2
+
+
+class RawResponse(object):
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = len(self.body)
+        chunk, self.body = self.body[:size], self.body[size:]
+        return chunk
+
+
+def test_download_in_chunks(client):
+    reads = []
+    response = RawResponse(200, b'x' * 10)
+    read = response.read
+    response.read = lambda size=-1: reads.append(size) or read(size)
+    client.connection.getresponse = lambda: response
+    out = io.BytesIO()
+    client.download('/1.0/instances/c1/files?path=%2Fetc%2Fhosts', out, chunk_size=4)
+    assert out.getvalue() == b'x' * 10
+    assert reads == [4, 4, 4, 4]
+
+
+def test_download_error(client):
+    client.connection.getresponse = lambda: RawResponse(404, json.dumps(
+        {'type': 'error', 'error': 'Instance not found', 'error_code': 404}).encode('utf-8'))
+    with pytest.raises(LXDClientException) as e:
+        client.download('/1.0/instances/c1/files?path=%2Fetc%2Fhosts', io.BytesIO())
+    assert e.value.msg == 'Instance not found'
+
+
+def test_upload_streams_file(client):
+    body = io.BytesIO(b'data')
+    assert client.upload('/1.0/instances/c1/files?path=%2Ftmp%2Fx', body, 4, headers={'X-LXD-mode': '0644'})['type'] == 'sync'
+    method, url, headers = client.connection.requests[0]
+    assert method == 'POST'
+    assert headers['Content-Length'] == '4'
+    assert headers['Content-Type'] == 'application/octet-stream'
+    assert headers['X-LXD-mode'] == '0644'
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+
+import pytest
+
+from ansible_collections.community.general.tests.unit.compat.mock import MagicMock
+import ansible_collections.community.general.plugins.module_utils.proxmox as proxmox_utils
+
+proxmoxer = pytest.importorskip('proxmoxer')
+
+VMS = [
+    {'vmid': 100, 'name': 'web', 'node': 'pve1', 'status': 'running'},
+    {'vmid': 101, 'name': 'db', 'node': 'pve2', 'status': 'stopped'},
+    {'vmid': 102, 'name': 'db', 'node': 'pve2', 'status': 'stopped'},
+]
+
+
+class FailJson(Exception):
+    pass
+
+
+def make_proxmox(mocker, api=None, connect_errors=(), **params):
+    mocker.patch.object(proxmox_utils, 'HAS_PROXMOXER', True)
+    mocker.patch.object(proxmox_utils, 'proxmoxer_version', proxmox_utils.LooseVersion('2.0.0'), create=True)
+    api = api or MagicMock()
+    mocker.patch.object(proxmox_utils, 'ProxmoxAPI', side_effect=list(connect_errors) + [api], create=True)
+    module = MagicMock()
+    module.params = dict(api_host='pve', api_user='root@pam', api_password='secret',
+                         api_token_id=None, api_token_secret=None, validate_certs=False)
+    module.params.update(params)
+    module.fail_json.side_effect = FailJson
+    return proxmox_utils.ProxmoxAnsible(module), api
+
+
+def test_vm_lookups_share_one_snapshot(mocker):
+    proxmox, api = make_proxmox(mocker)
+    api.cluster.resources.get.return_value = VMS
+
+    assert proxmox.get_vmid('web') == 100
+    assert proxmox.get_vm(101)['node'] == 'pve2'
+    assert proxmox.get_vm('102')['vmid'] == 102
+    assert proxmox.get_vmid('missing', ignore_missing=True) is None
+    assert proxmox.get_vm(999, ignore_missing=True) is None
+    with pytest.raises(FailJson):
+        proxmox.get_vmid('db')
+    assert api.cluster.resources.get.call_count == 1
+
+    proxmox.invalidate_vm_resources()
+    proxmox.get_vm(100)
+    assert api.cluster.resources.get.call_count == 2
+
+
+def test_task_wait_backs_off_and_tails_log(mocker):
+    proxmox, api = make_proxmox(mocker)
+    sleep = mocker.patch.object(proxmox_utils.time, 'sleep')
+    task = api.nodes.return_value.tasks.return_value
+    task.status.get.side_effect = [{'status': 'running'}] * 3 + [{'status': 'stopped', 'exitstatus': 'OK'}]
+    task.log.get.side_effect = [
+        [{'n': 1, 't': 'starting'}],
+        [{'n': 2, 't': 'copying'}, {'n': 3, 't': 'copying more'}],
+        [{'n': 3, 't': 'no content'}],
+        [{'n': 4, 't': 'TASK OK'}],
+        [{'n': 4, 't': 'no content'}],
+    ]
+    proxmox.get_vm(100, ignore_missing=True)
+
+    assert proxmox.api_task_wait('pve1', 'UPID:1', 60) is True
+    assert [c[0][0] for c in sleep.call_args_list] == [0.5, 1, 2]
+    assert [c[1]['start'] for c in task.log.get.call_args_list] == [0, 1, 3, 3]
+    assert proxmox.api_task_last_log('pve1', 'UPID:1') == [{'n': 4, 't': 'TASK OK'}]
+    assert task.log.get.call_args[1]['start'] == 4
+    # the stopped task dropped the VM snapshot
+    assert proxmox._vm_resources is None
+
+
+def test_task_wait_stops_on_failure_and_timeout(mocker):
+    proxmox, api = make_proxmox(mocker)
+    mocker.patch.object(proxmox_utils.time, 'sleep')
+    task = api.nodes.return_value.tasks.return_value
+    task.log.get.return_value = []
+
+    task.status.get.return_value = {'status': 'stopped', 'exitstatus': 'command failed'}
+    with pytest.raises(FailJson):
+        proxmox.api_task_wait('pve1', 'UPID:1', 60)
+    assert proxmox.module.fail_json.call_args[1]['msg'].startswith('Task UPID:1 on node pve1 failed: command failed.')
+
+    task.status.get.return_value = {'status': 'running'}
+    assert proxmox.api_task_wait('pve1', 'UPID:2', 0) is False
+
+
+def test_ticket_cache(mocker, tmp_path):
+    cache_dir = str(tmp_path)
+    api = MagicMock()
+    api.get_tokens.return_value = ('PVE:ticket1', 'csrf')
+    proxmox, api = make_proxmox(mocker, api, api_ticket_cache=True, api_ticket_cache_dir=cache_dir)
+    assert proxmox_utils.ProxmoxAPI.call_args[1]['password'] == 'secret'
+    assert len([f for f in os.listdir(cache_dir) if f.startswith('ticket-')]) == 1
+
+    api.get_tokens.return_value = ('PVE:ticket2', 'csrf')
+    proxmox, api = make_proxmox(mocker, api, api_ticket_cache=True, api_ticket_cache_dir=cache_dir)
+    assert proxmox_utils.ProxmoxAPI.call_args[1]['password'] == 'PVE:ticket1'
+
+    # a rejected ticket falls back to the password
+    proxmox, api = make_proxmox(mocker, api, connect_errors=[Exception('401 Unauthorized')],
+                                api_ticket_cache=True, api_ticket_cache_dir=cache_dir)
+    assert [c[1]['password'] for c in proxmox_utils.ProxmoxAPI.call_args_list[-2:]] == ['PVE:ticket2', 'secret']
+
+    # other credentials do not share the ticket
+    proxmox, api = make_proxmox(mocker, api, api_ticket_cache=True, api_ticket_cache_dir=cache_dir, api_password='other')
+    assert proxmox_utils.ProxmoxAPI.call_args[1]['password'] == 'other'
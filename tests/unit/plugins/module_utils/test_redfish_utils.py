@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import threading
+from io import BytesIO
+
+import pytest
+
+from ansible.module_utils.six.moves.urllib.error import HTTPError
+
+from ansible_collections.community.general.tests.unit.compat.mock import MagicMock
+from ansible_collections.community.general.plugins.module_utils.redfish_utils import RedfishUtils
+
+ROOT = 'https://bmc'
+
+
+class FakeResponse(object):
+    def __init__(self, data, headers=None):
+        self._body = json.dumps(data).encode()
+        self._headers = headers or {}
+
+    def read(self):
+        return self._body
+
+    def info(self):
+        return self._headers
+
+
+class FakeService(object):
+    """Serves a tiny Redfish tree through a replacement of open_url."""
+
+    def __init__(self, expand=None):
+        self.requests = []
+        self.lock = threading.Lock()
+        self.etags = {}
+        self.resources = {
+            '/redfish/v1/': {'Systems': {'@odata.id': '/redfish/v1/Systems'}},
+            '/redfish/v1/Systems': {'Members': [{'@odata.id': '/redfish/v1/Systems/1'}]},
+            '/redfish/v1/Systems/1': {'Id': '1', 'Memory': {'@odata.id': '/redfish/v1/Systems/1/Memory'}},
+            '/redfish/v1/Systems/1/Memory': {'Members': [{'@odata.id': '/redfish/v1/Systems/1/Memory/%d' % i} for i in range(3)]},
+        }
+        for i in range(3):
+            self.resources['/redfish/v1/Systems/1/Memory/%d' % i] = {
+                'Id': str(i), 'CapacityMiB': 1024,
+                'Status': {'State': 'Enabled'}}
+        for path, resource in self.resources.items():
+            resource['@odata.id'] = path
+        if expand:
+            self.resources['/redfish/v1/']['ProtocolFeaturesSupported'] = {'ExpandQuery': expand}
+
+    def __call__(self, uri, method='GET', headers=None, data=None, **kwargs):
+        path, dummy, query = uri[len(ROOT):].partition('?')
+        with self.lock:
+            self.requests.append((method, path, query))
+        if method != 'GET':
+            return FakeResponse({})
+        etag = self.etags.get(path)
+        if etag and headers.get('If-None-Match') == etag:
+            raise HTTPError(uri, 304, 'Not Modified', {}, BytesIO(b''))
+        data = self.resources[path]
+        if query.startswith('$expand') and 'Members' in data:
+            data = dict(data, Members=[self.resources[m['@odata.id']] for m in data['Members']])
+        return FakeResponse(data, {'ETag': etag} if etag else {})
+
+    def gets(self, path=None):
+        return [r for r in self.requests if r[0] == 'GET' and (path is None or r[1] == path)]
+
+
+def make_utils(mocker, service, **kwargs):
+    mocker.patch('ansible_collections.community.general.plugins.module_utils.redfish_utils.open_url', side_effect=service)
+    utils = RedfishUtils({'user': 'u', 'pswd': 'p'}, ROOT, 10, MagicMock(), **kwargs)
+    assert utils._find_systems_resource()['ret']
+    return utils
+
+
+def test_no_cache_by_default(mocker):
+    service = FakeService()
+    utils = make_utils(mocker, service)
+    utils.get_request(ROOT + '/redfish/v1/Systems/1')
+    utils.get_request(ROOT + '/redfish/v1/Systems/1')
+    assert len(service.gets('/redfish/v1/Systems/1')) == 2
+
+
+def test_cached_responses_are_copies(mocker):
+    service = FakeService()
+    utils = make_utils(mocker, service, cache_responses=True)
+    first = utils.get_request(ROOT + '/redfish/v1/Systems/1')
+    first['data']['Id'] = 'changed'
+    assert utils.get_request(ROOT + '/redfish/v1/Systems/1')['data']['Id'] == '1'
+    assert len(service.gets('/redfish/v1/Systems/1')) == 1
+
+
+@pytest.mark.parametrize('expand, query', [
+    ({'NoLinks': True, 'Levels': True}, '$expand=.($levels=1)'),
+    ({'NoLinks': True}, '$expand=.'),
+])
+def test_memory_inventory_with_expand(mocker, expand, query):
+    service = FakeService(expand=expand)
+    utils = make_utils(mocker, service, cache_responses=True)
+    result = utils.get_multi_memory_inventory()
+    assert result['ret']
+    assert [dimm['Id'] for dimm in result['entries'][0][1]] == ['0', '1', '2']
+    assert service.gets('/redfish/v1/Systems/1/Memory') == [('GET', '/redfish/v1/Systems/1/Memory', query)]
+    # the members came inline with the collection
+    assert not [r for r in service.gets() if r[1].startswith('/redfish/v1/Systems/1/Memory/')]
+
+
+def test_memory_inventory_prefetches_members(mocker):
+    service = FakeService()
+    utils = make_utils(mocker, service, cache_responses=True)
+    result = utils.get_multi_memory_inventory()
+    assert len(result['entries'][0][1]) == 3
+    for i in range(3):
+        assert len(service.gets('/redfish/v1/Systems/1/Memory/%d' % i)) == 1
+    assert len(service.gets('/redfish/v1/Systems/1')) == 1
+
+
+def test_patch_revalidates_cached_etag(mocker):
+    service = FakeService()
+    service.etags['/redfish/v1/Systems/1'] = '"v1"'
+    utils = make_utils(mocker, service, cache_responses=True)
+    utils.get_request(ROOT + '/redfish/v1/Systems/1')
+
+    result = utils.patch_request(ROOT + '/redfish/v1/Systems/1', {'AssetTag': 'x'})
+    assert result['ret']
+    patch = [r for r in service.requests if r[0] == 'PATCH']
+    assert len(patch) == 1
+    # one plain GET, one conditional GET answered with 304
+    assert len(service.gets('/redfish/v1/Systems/1')) == 2
+
+    # the modification dropped the cache
+    utils.get_request(ROOT + '/redfish/v1/Systems/1')
+    assert len(service.gets('/redfish/v1/Systems/1')) == 3
+
+
+class TaskResponse(object):
+    def __init__(self, status, data=None, headers=None, lines=None):
+        self.status = status
+        self._body = json.dumps(data).encode() if data is not None else b''
+        self._headers = headers or {}
+        self._lines = list(lines or [])
+
+    def read(self):
+        return self._body
+
+    def getheader(self, name, default=None):
+        return self._headers.get(name, default)
+
+    def readline(self):
+        return self._lines.pop(0) if self._lines else b''
+
+    def close(self):
+        pass
+
+
+def running_task(headers=None):
+    return TaskResponse(202, {'@odata.type': '#Task.v1_5_0.Task', 'TaskState': 'Running'}, headers)
+
+
+def completed_task():
+    return TaskResponse(200, {'@odata.type': '#Task.v1_5_0.Task', 'TaskState': 'Completed'})
+
+
+def make_task_utils(mocker, responses):
+    open_url = mocker.patch('ansible_collections.community.general.plugins.module_utils.redfish_utils.open_url',
+                            side_effect=responses)
+    sleep = mocker.patch('ansible_collections.community.general.plugins.module_utils.redfish_utils.time.sleep')
+    utils = RedfishUtils({'user': 'u', 'pswd': 'p'}, ROOT, 10, MagicMock())
+    return utils, open_url, sleep
+
+
+def test_wait_for_task_honours_retry_after(mocker):
+    utils, open_url, sleep = make_task_utils(mocker, [
+        running_task({'Retry-After': '7'}), running_task({'Retry-After': '3'}), completed_task()])
+    result = utils.wait_for_task('/redfish/v1/TaskService/TaskMonitors/1', 600)
+    assert result['ret']
+    assert result['update_status']['status'] == 'Completed'
+    assert [c[0][0] for c in sleep.call_args_list] == [7, 3]
+    assert result['wait']['polls'] == 3
+    assert result['wait']['event_stream'] is False
+
+
+def test_wait_for_task_backs_off_with_jitter(mocker):
+    utils, open_url, sleep = make_task_utils(mocker, [running_task() for dummy in range(7)] + [completed_task()])
+    mocker.patch('ansible_collections.community.general.plugins.module_utils.redfish_utils.random.uniform',
+                 side_effect=lambda low, high: high)
+    result = utils.wait_for_task('/redfish/v1/TaskService/TaskMonitors/1', 600)
+    assert result['ret']
+    assert [c[0][0] for c in sleep.call_args_list] == [1, 2, 4, 8, 16, 30, 30]
+
+
+def reset_task(state, *resets):
+    return TaskResponse(202, {'@odata.type': '#Task.v1_5_0.Task', 'TaskState': state, 'Messages': [
+        {'MessageId': 'Base.1.10.ResetRequired', 'MessageArgs': list(reset)} for reset in resets]})
+
+
+def test_wait_for_task_stops_on_requested_reset(mocker):
+    utils, open_url, sleep = make_task_utils(mocker, [
+        reset_task('Running', ('/redfish/v1/Managers/BMC', 'ForceRestart'))])
+    result = utils.wait_for_task('/redfish/v1/TaskService/TaskMonitors/1', 600)
+    assert result['ret']
+    assert result['update_status']['resets_requested'] == [{'uri': '/redfish/v1/Managers/BMC', 'type': 'ForceRestart'}]
+    assert not sleep.called
+
+
+def test_wait_for_task_ignores_performed_resets(mocker):
+    bmc = ('/redfish/v1/Managers/BMC', 'ForceRestart')
+    system = ('/redfish/v1/Systems/1', 'GracefulRestart')
+    performed = [{'uri': bmc[0], 'type': bmc[1]}]
+    # The task keeps the messages of the reset that was just performed
+    utils, open_url, sleep = make_task_utils(mocker, [
+        reset_task('Running', bmc), reset_task('Running', bmc), reset_task('Completed', bmc)])
+    result = utils.wait_for_task('/redfish/v1/TaskService/TaskMonitors/1', 600, resets_performed=performed)
+    assert result['ret']
+    assert result['update_status']['status'] == 'Completed'
+    assert result['wait']['polls'] == 3
+    assert sleep.call_count == 2
+
+    # A reset that was not performed yet still ends the wait
+    utils, open_url, sleep = make_task_utils(mocker, [
+        reset_task('Running', bmc), reset_task('Running', bmc, system)])
+    result = utils.wait_for_task('/redfish/v1/TaskService/TaskMonitors/1', 600, resets_performed=performed)
+    assert result['ret']
+    assert result['update_status']['status'] == 'Running'
+    assert result['wait']['polls'] == 2
+
+
+def test_perform_requested_update_operations_returns_resets(mocker):
+    utils, open_url, sleep = make_task_utils(mocker, [])
+    reset = {'uri': '/redfish/v1/Managers/BMC', 'type': 'ForceRestart'}
+    mocker.patch.object(utils, 'get_update_status', return_value={'ret': True, 'resets_requested': [reset]})
+    post_request = mocker.patch.object(utils, 'post_request', return_value={'ret': True})
+    result = utils.perform_requested_update_operations('/redfish/v1/TaskService/TaskMonitors/1')
+    post_request.assert_called_once_with(ROOT + '/redfish/v1/Managers/BMC', {'ResetType': 'ForceRestart'})
+    assert result['changed']
+    assert result['resets_performed'] == [{'uri': '/redfish/v1/Managers/BMC', 'type': 'ForceRestart'}]
+
+
+def test_wait_for_task_times_out(mocker):
+    utils, open_url, sleep = make_task_utils(mocker, [running_task({'Retry-After': '5'}) for dummy in range(3)])
+    clock = [1000.0]
+    sleep.side_effect = lambda delay: clock.__setitem__(0, clock[0] + delay)
+    mocker.patch('ansible_collections.community.general.plugins.module_utils.redfish_utils.time.time',
+                 side_effect=lambda: clock[0])
+    result = utils.wait_for_task('/redfish/v1/TaskService/TaskMonitors/1', 8)
+    assert result['ret'] is False
+    assert 'Timed out after 8 seconds' in result['msg']
+    # the second delay is cut to the time left
+    assert [c[0][0] for c in sleep.call_args_list] == [5, 3]
+    assert result['wait']['elapsed'] == 8
+
+
+def test_wait_for_task_wakes_up_on_task_event(mocker):
+    event = json.dumps({'Events': [{'MessageId': 'TaskEvent.1.0.TaskCompletedOK',
+                                    'OriginOfCondition': {'@odata.id': '/redfish/v1/TaskService/Tasks/1'}}]})
+    stream = TaskResponse(200, lines=[b'id: 1\n', ('data: %s\n' % event).encode(), b'\n'])
+    service_root = TaskResponse(200, {'EventService': {'@odata.id': '/redfish/v1/EventService'}})
+    event_service = TaskResponse(200, {'ServerSentEventUri': '/redfish/v1/EventService/SSE'})
+    for response in (service_root, event_service):
+        response.info = lambda: {}
+    utils, open_url, sleep = make_task_utils(mocker, [service_root, event_service, stream,
+                                                      running_task({'Retry-After': '600'}), completed_task()])
+    result = utils.wait_for_task('/redfish/v1/TaskService/Tasks/1', 3600, use_events=True)
+    assert result['ret']
+    assert result['wait']['event_stream'] is True
+    assert result['wait']['events'] == 1
+    assert result['wait']['waited'] < 600
+    assert not sleep.called
+    assert open_url.call_args_list[2][1]['headers']['accept'] == 'text/event-stream'
@@ -5,6 +5,10 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import os
+import shutil
+import tempfile
+
 from ansible_collections.community.general.tests.unit.compat import mock
 from ansible_collections.community.general.tests.unit.compat import unittest
 
@@ -36,3 +40,66 @@ class TestApkQueryLatest(unittest.TestCase):
             mock_module.run_command.return_value = (0, command_output, None)
             command_result = apk.query_latest(mock_module, module_name)
             self.assertTrue(command_result)
+
+
+INSTALLED_DB = """C:Q1abc=
+P:bash
+V:5.2.15-r0
+T:The GNU Bourne Again shell
+D:/bin/sh so:libc.musl-x86_64.so.1
+p:cmd:bash=5.2.15-r0
+
+C:Q1def=
+P:.build-deps
+V:20230101.000000
+T:virtual meta package
+D:gcc make>=4.0 !curl
+
+P:gcc
+V:12.2.1-r0
+T:The GNU Compiler Collection
+
+P:make
+V:4.3-r1
+T:GNU make utility
+"""
+
+
+class TestApkResolver(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.world = os.path.join(self.tmpdir, 'world')
+        with open(self.world, 'w') as f:
+            f.write('bash\n.build-deps\ncurl@edge\n')
+        installed_db = os.path.join(self.tmpdir, 'installed')
+        with open(installed_db, 'w') as f:
+            f.write(INSTALLED_DB)
+        patcher = mock.patch.object(apk, 'INSTALLED_DB', installed_db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        apk.APK_PATH = "apk"
+
+    def test_read_installed(self):
+        installed = apk.read_installed()
+        self.assertEqual(sorted(installed), ['.build-deps', 'bash', 'gcc', 'make'])
+        self.assertEqual(installed['.build-deps']['depends'], ['gcc', 'make>=4.0', '!curl'])
+        self.assertIn('cmd:bash', apk.installed_names(installed))
+
+    def test_resolve_present(self):
+        module = mock.Mock()
+        to_install, to_upgrade = apk.resolve_packages(module, ['bash', 'curl', 'vim', '.build-deps'], 'present', self.world, apk.read_installed())
+        self.assertEqual(to_install, ['vim'])
+        self.assertEqual(to_upgrade, [])
+        module.run_command.assert_not_called()
+
+    def test_resolve_latest(self):
+        module = mock.Mock()
+        module.run_command.return_value = (0, 'Installed:                                Available:\n'
+                                              'bash-5.2.15-r0          < 5.2.21-r0\nmake-4.3-r1             < 4.4-r0\n', '')
+        to_install, to_upgrade = apk.resolve_packages(module, ['bash', 'vim', '.build-deps'], 'latest', self.world, apk.read_installed())
+        self.assertEqual(to_install, ['vim'])
+        self.assertEqual(to_upgrade, ['bash', 'make'])
+        # a single apk call for all packages
+        module.run_command.assert_called_once_with("apk version -l '<' bash gcc make", check_rc=False)
@@ -6,11 +6,22 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import os
+import tarfile
+
 import pytest
 
+from ansible.module_utils import basic
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.community.general.tests.unit.compat.mock import Mock, patch
-from ansible_collections.community.general.tests.unit.plugins.modules.utils import ModuleTestCase, set_module_args
+from ansible_collections.community.general.tests.unit.plugins.modules.utils import (
+    AnsibleExitJson,
+    ModuleTestCase,
+    exit_json,
+    fail_json,
+    set_module_args,
+)
+from ansible_collections.community.general.plugins.modules import archive as archive_module
 from ansible_collections.community.general.plugins.modules.archive import get_archive, common_path
 
 
@@ -73,3 +84,74 @@ PATHS = (
 @pytest.mark.parametrize("paths,root", PATHS)
 def test_common_path(paths, root):
     assert common_path(paths) == root
+
+
+@pytest.fixture
+def source_tree(tmp_path, mocker):
+    mocker.patch.multiple(basic.AnsibleModule, exit_json=exit_json, fail_json=fail_json)
+    source = tmp_path / 'logs'
+    (source / 'app').mkdir(parents=True)
+    (source / 'app' / 'a.log').write_text(u'a' * 1000)
+    (source / 'b.log').write_text(u'b' * 1000)
+    return tmp_path
+
+
+def run_archive(**args):
+    set_module_args(args)
+    with pytest.raises(AnsibleExitJson) as e:
+        archive_module.main()
+    return e.value.args[0]
+
+
+def archive_members(path):
+    with tarfile.open(path) as archive:
+        return sorted(archive.getnames())
+
+
+@pytest.mark.parametrize('fmt', ['xz', 'gz'])
+def test_streamed_archive(source_tree, fmt):
+    dest = str(source_tree / ('logs.tar.' + fmt))
+    result = run_archive(path=str(source_tree / 'logs'), dest=dest, format=fmt)
+    assert result['changed']
+    assert archive_members(dest) == ['logs/app', 'logs/app/a.log', 'logs/b.log']
+
+
+def test_parallel_compressor_is_piped(source_tree, mocker):
+    dest = str(source_tree / 'logs.tgz')
+    mocker.patch.object(basic.AnsibleModule, 'get_bin_path', return_value='/usr/bin/pigz')
+    popen = mocker.patch.object(archive_module.subprocess, 'Popen')
+    written = []
+    popen.return_value.stdin.write.side_effect = written.append
+    popen.return_value.communicate.return_value = (b'', b'')
+    popen.return_value.returncode = 0
+
+    run_archive(path=str(source_tree / 'logs'), dest=dest, compression_threads=4)
+    assert popen.call_args[0][0] == ['/usr/bin/pigz', '-c', '-p4']
+    assert popen.call_args[1]['stdout'].name == dest
+    # the uncompressed tar stream went to the compressor
+    assert len(b''.join(written)) >= 3 * 512
+
+
+def test_manifest_change_detection(source_tree, mocker):
+    dest = str(source_tree / 'logs.tar.gz')
+    args = dict(path=str(source_tree / 'logs'), dest=dest, change_detection='manifest')
+    assert run_archive(**args)['changed']
+    assert os.path.exists(str(source_tree / '.logs.tar.gz.manifest.json'))
+    mtime = os.stat(dest).st_mtime
+
+    # unchanged sources: nothing is read back nor written again
+    checksums = mocker.spy(archive_module.TarArchive, '_get_checksums')
+    result = run_archive(**args)
+    assert not result['changed']
+    assert sorted(os.path.basename(p) for p in result['archived']) == ['a.log', 'app', 'b.log']
+    assert os.stat(dest).st_mtime == mtime
+    assert not checksums.called
+
+    args['_ansible_check_mode'] = True
+    assert not run_archive(**args)['changed']
+    (source_tree / 'logs' / 'b.log').write_text(u'c' * 2000)
+    assert run_archive(**args)['changed']
+
+    del args['_ansible_check_mode']
+    assert run_archive(**args)['changed']
+    assert not run_archive(**args)['changed']
@@ -6,7 +6,11 @@ from __future__ import (absolute_import, division, print_function)
 
 __metaclass__ = type
 
+import json
+
+from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.community.general.tests.unit.compat import unittest
+from ansible_collections.community.general.tests.unit.compat.mock import MagicMock
 from ansible_collections.community.general.plugins.modules.homebrew import Homebrew
 
 
@@ -22,3 +26,100 @@ class TestHomebrewModule(unittest.TestCase):
     def test_valid_package_names(self):
         for name in self.brew_app_names:
             self.assertTrue(Homebrew.valid_package(name))
+
+
+class FakeBrew(object):
+    """Minimal stand-in for the brew executable behind run_command."""
+
+    def __init__(self, installed, outdated=(), json_support=True):
+        self.installed = set(installed)
+        self.outdated = set(outdated)
+        self.json_support = json_support
+        self.calls = []
+
+    def __call__(self, cmd, **kwargs):
+        self.calls.append(cmd[1:])
+        verb, args = cmd[1], cmd[2:]
+        if '--json=v2' in args:
+            if not self.json_support:
+                return 1, '', 'Error: invalid option: --json=v2'
+            if verb == 'info':
+                formulae = [dict(name=name, full_name='homebrew/core/' + name, aliases=[name + '-alias'],
+                                 installed=[dict(version='1.0')]) for name in sorted(self.installed)]
+                return 0, json.dumps(dict(formulae=formulae, casks=[])), ''
+            formulae = [dict(name=name) for name in sorted(self.outdated)]
+            return (1 if formulae else 0), json.dumps(dict(formulae=formulae, casks=[])), ''
+        if verb == 'info':
+            return 0, 'Poured from bottle' if args[0] in self.installed else 'Not installed', ''
+        if verb == 'outdated':
+            return (1 if args[0] in self.outdated else 0), '', ''
+        names = [arg for arg in args if not arg.startswith('--')]
+        if verb in ('install', 'upgrade'):
+            self.installed.update(names)
+            self.outdated.difference_update(names)
+        return 0, '', ''
+
+
+class TestHomebrewIndex(unittest.TestCase):
+
+    def _brew(self, fake, packages, state, check_mode=False):
+        module = MagicMock(spec=AnsibleModule)
+        module.check_mode = check_mode
+        module.get_bin_path.return_value = '/usr/local/bin/brew'
+        module.run_command.side_effect = fake
+        return Homebrew(module=module, path=['/usr/local/bin'], packages=packages, state=state)
+
+    def test_install_batches_missing_packages(self):
+        fake = FakeBrew(installed=['git'])
+        brew = self._brew(fake, ['git', 'jq', 'wget-alias', 'homebrew/core/git'], 'installed')
+        failed, changed, message = brew.run()
+        self.assertFalse(failed)
+        self.assertTrue(changed)
+        self.assertEqual(brew.changed_pkgs, ['jq', 'wget-alias'])
+        self.assertEqual(brew.unchanged_pkgs, ['git', 'homebrew/core/git'])
+        installs = [call for call in fake.calls if call[0] == 'install']
+        self.assertEqual(installs, [['install', 'jq', 'wget-alias']])
+        self.assertEqual(message, 'Changed: 2, Unchanged: 2')
+
+    def test_upgrade_uses_one_install_and_one_upgrade(self):
+        fake = FakeBrew(installed=['git', 'jq', 'curl'], outdated=['git', 'jq'])
+        brew = self._brew(fake, ['git', 'jq', 'curl', 'wget'], 'upgraded')
+        failed, changed, message = brew.run()
+        self.assertFalse(failed)
+        self.assertEqual(brew.changed_pkgs, ['git', 'jq', 'wget'])
+        self.assertEqual(brew.unchanged_pkgs, ['curl'])
+        self.assertEqual(
+            [call for call in fake.calls if call[0] in ('install', 'upgrade')],
+            [['install', 'wget'], ['upgrade', 'git', 'jq']],
+        )
+        self.assertEqual(len([call for call in fake.calls if '--json=v2' in call]), 4)
+
+    def test_check_mode_lists_all_pending_packages(self):
+        fake = FakeBrew(installed=[])
+        brew = self._brew(fake, ['git', 'jq'], 'installed', check_mode=True)
+        failed, changed, message = brew.run()
+        self.assertTrue(changed)
+        self.assertEqual(message, 'Package would be installed: git, jq')
+        self.assertFalse([call for call in fake.calls if call[0] == 'install'])
+
+    def test_falls_back_without_json(self):
+        fake = FakeBrew(installed=['git'], outdated=['git'], json_support=False)
+        brew = self._brew(fake, ['git'], 'upgraded')
+        failed, changed, message = brew.run()
+        self.assertFalse(failed)
+        self.assertEqual(message, 'Package upgraded: git')
+        self.assertIn(['outdated', 'git'], fake.calls)
+
+    def test_failed_install_reports_error(self):
+        fake = FakeBrew(installed=[])
+        fake_call = fake.__call__
+
+        def broken(cmd, **kwargs):
+            if cmd[1] == 'install':
+                return 1, '', 'Error: No available formula with the name "nope".\n'
+            return fake_call(cmd, **kwargs)
+
+        brew = self._brew(broken, ['nope'], 'installed')
+        failed, changed, message = brew.run()
+        self.assertTrue(failed)
+        self.assertEqual(message, 'Error: No available formula with the name "nope".')
@@ -6,7 +6,11 @@ from __future__ import (absolute_import, division, print_function)
 
 __metaclass__ = type
 
+import json
+
+from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.community.general.tests.unit.compat import unittest
+from ansible_collections.community.general.tests.unit.compat.mock import MagicMock
 from ansible_collections.community.general.plugins.modules.homebrew_cask import HomebrewCask
 
 
@@ -21,3 +25,64 @@ class TestHomebrewCaskModule(unittest.TestCase):
     def test_valid_cask_names(self):
         for name in self.brew_cask_names:
             self.assertTrue(HomebrewCask.valid_cask(name))
+
+
+class FakeBrewCask(object):
+    """Minimal stand-in for the brew executable behind run_command."""
+
+    def __init__(self, installed, outdated=()):
+        self.installed = set(installed)
+        self.outdated = set(outdated)
+        self.calls = []
+
+    def __call__(self, cmd, **kwargs):
+        self.calls.append(cmd[1:])
+        verb, args = cmd[1], cmd[2:]
+        if verb == '--version':
+            return 0, 'Homebrew 4.1.0\n', ''
+        if '--json=v2' in args:
+            if verb == 'info':
+                casks = [dict(token=token, full_token='homebrew/cask/' + token, old_tokens=[],
+                              installed='1.0') for token in sorted(self.installed)]
+                return 0, json.dumps(dict(formulae=[], casks=casks)), ''
+            casks = [dict(name=token) for token in sorted(self.outdated)]
+            return 0, json.dumps(dict(formulae=[], casks=casks)), ''
+        tokens = [arg for arg in args if not arg.startswith('--')]
+        if verb in ('install', 'upgrade'):
+            self.installed.update(tokens)
+            self.outdated.difference_update(tokens)
+        return 0, '', ''
+
+
+class TestHomebrewCaskIndex(unittest.TestCase):
+
+    def _brew(self, fake, casks, state):
+        module = MagicMock(spec=AnsibleModule)
+        module.check_mode = False
+        module.get_bin_path.return_value = '/usr/local/bin/brew'
+        module.run_command.side_effect = fake
+        return HomebrewCask(module=module, path=['/usr/local/bin'], casks=casks, state=state)
+
+    def test_install_batches_missing_casks(self):
+        fake = FakeBrewCask(installed=['firefox'])
+        cask = self._brew(fake, ['firefox', 'homebrew/cask/firefox', 'iterm2', 'slack'], 'installed')
+        failed, changed, message = cask.run()
+        self.assertFalse(failed)
+        self.assertTrue(changed)
+        self.assertEqual(message, 'Changed: 2, Unchanged: 2')
+        self.assertEqual(
+            [call for call in fake.calls if call[0] == 'install'],
+            [['install', '--cask', 'iterm2', 'slack']],
+        )
+
+    def test_upgrade_uses_one_install_and_one_upgrade(self):
+        fake = FakeBrewCask(installed=['firefox', 'slack', 'zoom'], outdated=['firefox', 'slack'])
+        cask = self._brew(fake, ['firefox', 'slack', 'zoom', 'iterm2'], 'upgraded')
+        failed, changed, message = cask.run()
+        self.assertFalse(failed)
+        self.assertEqual(message, 'Changed: 3, Unchanged: 1')
+        self.assertEqual(
+            [call for call in fake.calls if call[0] in ('install', 'upgrade')],
+            [['install', '--cask', 'iterm2'], ['upgrade', '--cask', 'firefox', 'slack']],
+        )
+        self.assertEqual(len([call for call in fake.calls if '--json=v2' in call]), 4)
@@ -21,8 +21,12 @@ from ansible_collections.community.general.plugins.modules import pacman
 from ansible_collections.community.general.plugins.modules.pacman import (
     Package,
     VersionTuple,
+    vercmp,
 )
 
+import io
+import tarfile
+
 import pytest
 
 
@@ -128,6 +132,11 @@ class TestPacman:
     def run_command(self, mocker):
         self.mock_run_command = mocker.patch.object(basic.AnsibleModule, "run_command", autospec=True)
 
+    @pytest.fixture(autouse=True)
+    def no_database(self, mocker):
+        # These tests exercise the pacman CLI, never read the databases of the host
+        mocker.patch.object(pacman.PacmanDatabase, "CONF", "/nonexistent/pacman.conf")
+
     @pytest.fixture
     def mock_package_list(self, mocker):
         return mocker.patch.object(pacman.Pacman, "package_list", autospec=True)
@@ -1097,3 +1106,99 @@ class TestPacman:
         else:
             assert out["stdout"] == "stdout"
             assert out["stderr"] == "stderr"
+
+
+@pytest.mark.parametrize(
+    "a, b, expected",
+    [
+        ("1.0-1", "1.0-1", 0),
+        ("1.0-1", "1.0-2", -1),
+        ("1.0", "1.0-1", 0),
+        ("1.0.1-1", "1.0-1", 1),
+        ("1.0a-1", "1.0-1", -1),
+        ("1.0alpha-1", "1.0beta-1", -1),
+        ("1.10-1", "1.9-1", 1),
+        ("1:1.0-1", "2.0-1", 1),
+        ("1.0-1", "1.0.0-1", -1),
+        ("1.0.rc1-1", "1.0-1", 1),
+        ("249.7-2", "249.7-1", 1),
+    ],
+)
+def test_vercmp(a, b, expected):
+    assert vercmp(a, b) == expected
+    assert vercmp(b, a) == -expected
+
+
+@pytest.fixture
+def pacman_db(tmp_path, mocker):
+    """A pacman database with a local database and two sync databases"""
+    conf = tmp_path / "pacman.conf"
+    db = tmp_path / "db"
+    conf.write_text(u"""[options]
+DBPath = %s
+IgnorePkg = linux
+# comment
+[core]
+Include = /etc/pacman.d/mirrorlist
+[extra]
+Include = /etc/pacman.d/mirrorlist
+""" % db)
+    mocker.patch.object(pacman.PacmanDatabase, "CONF", str(conf))
+
+    local = db / "local"
+    local.mkdir(parents=True)
+    (local / "ALPM_DB_VERSION").write_text(u"9\n")
+    for name, version, reason in [("pacman", "6.0.1-2", None), ("linux", "6.1-1", None), ("zlib", "1:1.2.13-1", "1")]:
+        entry = local / ("%s-%s" % (name, version))
+        entry.mkdir()
+        desc = "%%NAME%%\n%s\n\n%%VERSION%%\n%s\n\n" % (name, version)
+        if reason:
+            desc += "%%REASON%%\n%s\n\n" % reason
+        (entry / "desc").write_text(desc)
+
+    (db / "sync").mkdir()
+    repos = {
+        "core": [("pacman", "6.0.2-1", []), ("linux", "6.2-1", []), ("zlib", "1:1.2.13-1", [])],
+        "extra": [("pacman", "7.0-1", []), ("vim", "9.0-1", ["editors"]), ("nano", "7.2-1", ["editors"])],
+    }
+    for repo, pkgs in repos.items():
+        with tarfile.open(str(db / "sync" / ("%s.db" % repo)), "w:gz") as tar:
+            for name, version, groups in pkgs:
+                desc = "%%FILENAME%%\n%s-%s.pkg.tar.zst\n\n%%NAME%%\n%s\n\n%%VERSION%%\n%s\n\n" % (name, version, name, version)
+                if groups:
+                    desc += "%%GROUPS%%\n%s\n\n" % "\n".join(groups)
+                data = desc.encode("utf-8")
+                info = tarfile.TarInfo("%s-%s/desc" % (name, version))
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+    return db
+
+
+def test_build_inventory_from_database(pacman_db, mocker):
+    mocker.patch.multiple(basic.AnsibleModule, exit_json=exit_json, fail_json=fail_json, get_bin_path=get_bin_path)
+    run_command = mocker.patch.object(basic.AnsibleModule, "run_command", autospec=True)
+    set_module_args({"name": ["pacman"]})
+    P = pacman.Pacman(pacman.setup_module())
+    inventory = P._build_inventory()
+
+    assert inventory["installed_pkgs"] == {"pacman": "6.0.1-2", "linux": "6.1-1", "zlib": "1:1.2.13-1"}
+    assert inventory["pkg_reasons"]["zlib"] == "dependency"
+    assert inventory["pkg_reasons"]["pacman"] == "explicit"
+    assert "vim" not in inventory["pkg_reasons"]
+    # the sync databases are only read when needed
+    assert "available_pkgs" not in inventory
+
+    assert inventory["available_pkgs"] == {"pacman": "7.0-1", "linux": "6.2-1", "zlib": "1:1.2.13-1", "vim": "9.0-1", "nano": "7.2-1"}
+    assert inventory["available_groups"] == {"editors": set(["vim", "nano"])}
+    # the version of the first repository counts, and linux is ignored
+    assert inventory["upgradable_pkgs"] == {"pacman": VersionTuple(current="6.0.1-2", latest="6.0.2-1")}
+    assert run_command.call_count == 0
+
+
+def test_build_inventory_database_unusable(pacman_db, mocker):
+    mocker.patch.multiple(basic.AnsibleModule, exit_json=exit_json, fail_json=fail_json, get_bin_path=get_bin_path)
+    (pacman_db / "sync" / "extra.db").unlink()
+    set_module_args({"name": ["pacman"], "inventory_source": "database"})
+    P = pacman.Pacman(pacman.setup_module())
+    with pytest.raises(AnsibleFailJson):
+        P._build_inventory()
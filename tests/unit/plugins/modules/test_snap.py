@@ -6,7 +6,14 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import json
+
+import pytest
+
+from ansible.module_utils import basic
 from .helper import Helper, ModuleTestCase, RunCmdCall
+from .utils import set_module_args
+from ansible_collections.community.general.plugins.module_utils import snap as snap_utils
 from ansible_collections.community.general.plugins.modules import snap
 
 
@@ -472,3 +479,107 @@ TEST_CASES = [
 helper = Helper.from_list(snap.main, TEST_CASES)
 patch_bin = helper.cmd_fixture
 test_module = helper.test_module
+
+
+class FakeSnapd(object):
+    """Answers requests like snapd on its socket does"""
+
+    def __init__(self, installed):
+        self.installed = installed
+        self.requests = []
+        self.changes = {}
+
+    def __call__(self, path):
+        self.path = path
+        return self
+
+    def request(self, method, url, body=None, headers=None):
+        self.requests.append((method, url, json.loads(body) if body else None))
+
+    def _reply(self, result, status_code=200, type_='sync', **kwargs):
+        data = dict(type=type_, result=result, **kwargs)
+        data['status-code'] = status_code
+        return FakeResponse(json.dumps(data))
+
+    def getresponse(self):
+        method, url, body = self.requests[-1]
+        if method == 'GET' and url.startswith('/v2/snaps?'):
+            names = url.split('=', 1)[1].split('%2C')
+            found = [dict(name=n, **self.installed[n]) for n in names if n in self.installed]
+            if not found:
+                return self._reply(dict(message='no snaps installed', kind='snap-not-found'), 404, 'error')
+            return self._reply(found)
+        if method == 'GET' and url.startswith('/v2/find?'):
+            return self._reply([dict(name=url.split('=', 1)[1])])
+        if method == 'GET' and url.startswith('/v2/changes/'):
+            return self._reply(dict(ready=True, status='Done'))
+        if method == 'GET' and url.endswith('/conf'):
+            return self._reply({'foo': {'bar': 1}})
+        change = str(len(self.changes) + 1)
+        self.changes[change] = (method, url, body)
+        return self._reply(None, 202, 'async', change=change)
+
+
+class FakeResponse(object):
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data.encode('utf-8')
+
+
+@pytest.fixture
+def snapd(mocker):
+    mocker.patch.object(basic.AnsibleModule, 'get_bin_path', return_value='/testbin/snap')
+    run_command = mocker.patch.object(basic.AnsibleModule, 'run_command')
+    fake = FakeSnapd({
+        'lxd': {'tracking-channel': 'latest/stable', 'status': 'active'},
+        'hello-world': {'tracking-channel': 'latest/edge', 'status': 'installed'},
+    })
+    mocker.patch.object(snap_utils, 'UnixHTTPConnection', fake)
+    yield fake
+    run_command.assert_not_called()
+
+
+def run_snap(capfd, args):
+    args['use_snapd_api'] = True
+    set_module_args(args)
+    with pytest.raises(SystemExit):
+        snap.main()
+    out, err = capfd.readouterr()
+    result = json.loads(out)
+    assert not result.get('failed'), result
+    return result
+
+
+def test_api_install_batch(snapd, capfd):
+    result = run_snap(capfd, {'name': ['lxd', 'jq', 'yq']})
+
+    assert result['changed'] is True
+    assert result['snaps_installed'] == ['jq', 'yq']
+    # one change for both snaps
+    assert list(snapd.changes.values()) == [('POST', '/v2/snaps', {'action': 'install', 'snaps': ['jq', 'yq']})]
+    # status of all snaps with one request, before and after
+    assert [r[1] for r in snapd.requests].count('/v2/snaps?snaps=lxd%2Cjq%2Cyq') == 2
+
+
+def test_api_refresh_channel(snapd, capfd):
+    result = run_snap(capfd, {'name': ['hello-world'], 'channel': 'stable'})
+
+    assert result['changed'] is True
+    assert list(snapd.changes.values()) == [('POST', '/v2/snaps/hello-world', {'action': 'refresh', 'channel': 'stable'})]
+
+
+def test_api_enable_and_options(snapd, capfd):
+    result = run_snap(capfd, {'name': ['lxd', 'hello-world'], 'state': 'enabled'})
+    assert result['snaps_enabled'] == ['hello-world']
+    assert list(snapd.changes.values()) == [('POST', '/v2/snaps/hello-world', {'action': 'enable'})]
+
+    snapd.changes.clear()
+    result = run_snap(capfd, {'name': ['lxd', 'hello-world'], 'options': ['foo.bar=1', 'lxd:baz=[1, 2]', 'hello-world:qux=a b']})
+    # foo.bar is already set, and the options of both snaps are set at once
+    assert sorted(result['options_changed']) == ['hello-world:qux=a b', 'lxd:baz=[1, 2]']
+    assert sorted(snapd.changes.values()) == [
+        ('PUT', '/v2/snaps/hello-world/conf', {'qux': 'a b'}),
+        ('PUT', '/v2/snaps/lxd/conf', {'baz': [1, 2]}),
+    ]